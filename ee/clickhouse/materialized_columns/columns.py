@@ -8,6 +8,7 @@ from django.utils.timezone import now
 from posthog.cache_utils import cache_for
 from posthog.clickhouse.kafka_engine import trim_quotes_expr
 from posthog.client import sync_execute
+from posthog.hogql.schema_version import bump_global_schema_version
 from posthog.models.instance_setting import get_instance_setting
 from posthog.models.property import PropertyName, TableColumn, TableWithProperties
 from posthog.models.utils import generate_random_short_suffix
@@ -33,7 +34,7 @@ SHORT_TABLE_COLUMN_NAME = {
 }
 
 
-@cache_for(timedelta(minutes=15))
+@cache_for(timedelta(minutes=15), invalidate_across_workers=True)
 def get_materialized_columns(
     table: TablesWithMaterializedColumns,
 ) -> dict[tuple[PropertyName, TableColumn], ColumnName]:
@@ -115,6 +116,9 @@ def materialize(
     if create_minmax_index:
         add_minmax_index(table, column_name)
 
+    bump_global_schema_version()
+    get_materialized_columns.invalidate(table)
+
 
 def add_minmax_index(table: TablesWithMaterializedColumns, column_name: str):
     # Note: This will be populated on backfill
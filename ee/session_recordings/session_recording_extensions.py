@@ -13,6 +13,7 @@ from posthog import settings
 from posthog.session_recordings.models.metadata import PersistedRecordingV1
 from posthog.session_recordings.models.session_recording import SessionRecording
 from posthog.session_recordings.session_recording_helpers import decompress
+from posthog.session_recordings.snapshots.sources_manifest import blob_sources_from_keys, save_sources_manifest
 from posthog.storage import object_storage
 
 logger = structlog.get_logger(__name__)
@@ -67,6 +68,11 @@ def save_recording_with_new_content(recording: SessionRecording, content: str) -
     recording.storage_version = "2023-08-01"
     recording.object_storage_path = target_prefix
     recording.save()
+    try:
+        save_sources_manifest(target_prefix, blob_sources_from_keys(target_prefix, [new_path]))
+    except Exception as e:
+        # Playback lists the blobs itself without the manifest, so this mustn't fail saving the recording
+        capture_exception(e)
 
     return new_path
 
@@ -126,6 +132,13 @@ def persist_recording(recording_id: str, team_id: int) -> None:
         recording.storage_version = "2023-08-01"
         recording.object_storage_path = target_prefix
         recording.save()
+        # Persisted blobs don't change, so list them once here rather than whenever the recording is played
+        try:
+            persisted_keys = object_storage.list_objects(target_prefix) or []
+            save_sources_manifest(target_prefix, blob_sources_from_keys(target_prefix, persisted_keys))
+        except Exception as e:
+            # Playback lists the blobs itself without the manifest, so this mustn't fail persisting
+            capture_exception(e)
         SNAPSHOT_PERSIST_SUCCESS_COUNTER.inc()
         logger.info(
             "Persisting recording: done!",
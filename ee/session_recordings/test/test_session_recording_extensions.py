@@ -24,6 +24,7 @@ from posthog.settings import (
     OBJECT_STORAGE_SECRET_ACCESS_KEY,
     OBJECT_STORAGE_BUCKET,
 )
+from posthog.session_recordings.snapshots.sources_manifest import get_sources_manifest
 from posthog.storage.object_storage import write, list_objects
 from posthog.test.base import APIBaseTest, ClickhouseTestMixin
 
@@ -136,6 +137,40 @@ class TestSessionRecordingExtensions(ClickhouseTestMixin, APIBaseTest):
                 f"{recording.build_object_storage_path('2023-08-01')}/c",
             ]
 
+    def test_persisting_recording_saves_its_sources_manifest(self):
+        with self.settings(OBJECT_STORAGE_SESSION_RECORDING_BLOB_INGESTION_FOLDER=TEST_BUCKET):
+            two_minutes_ago = (datetime.now() - timedelta(minutes=2)).replace(tzinfo=UTC)
+
+            with freeze_time(two_minutes_ago):
+                session_id = f"test_persisting_recording_saves_its_sources_manifest-s1-{uuid4()}"
+                start = two_minutes_ago - timedelta(hours=48)
+
+                produce_replay_summary(
+                    session_id=session_id,
+                    team_id=self.team.pk,
+                    first_timestamp=start.isoformat(),
+                    last_timestamp=(start + timedelta(minutes=2)).isoformat(),
+                    distinct_id="distinct_id_1",
+                )
+
+                blob_keys = []
+                for minute in range(2):
+                    blob_start = int((start + timedelta(minutes=minute)).timestamp() * 1000)
+                    blob_keys.append(f"{blob_start}-{blob_start + 60000}")
+                    write(
+                        f"{TEST_BUCKET}/team_id/{self.team.pk}/session_id/{session_id}/data/{blob_keys[-1]}",
+                        b"my content",
+                    )
+
+                recording: SessionRecording = SessionRecording.objects.create(team=self.team, session_id=session_id)
+
+            persist_recording(recording.session_id, recording.team_id)
+            recording.refresh_from_db()
+
+            manifest = get_sources_manifest(recording.build_object_storage_path("2023-08-01"))
+            assert manifest is not None
+            assert [source["blob_key"] for source in manifest] == blob_keys
+
     @patch("ee.session_recordings.session_recording_extensions.object_storage.write")
     def test_can_save_content_to_new_location(self, mock_write: MagicMock):
         # mute selected signals so the post create signal does not try to persist the recording
@@ -785,6 +785,10 @@ class ApiRequest {
         return apiRequest
     }
 
+    public queryStatusStream(queryId: string, teamId?: TeamType['id']): ApiRequest {
+        return this.query(teamId).addPathComponent(queryId).addPathComponent('stream')
+    }
+
     // Chat
     public chat(teamId?: TeamType['id']): ApiRequest {
         return this.projectsDetail(teamId).addPathComponent('query').addPathComponent('chat')
@@ -2323,6 +2327,9 @@ const api = {
         async get(queryId: string, showProgress: boolean): Promise<QueryStatusResponse> {
             return await new ApiRequest().queryStatus(queryId, showProgress).get()
         },
+        streamUrl(queryId: string): string {
+            return new ApiRequest().queryStatusStream(queryId).assembleFullUrl(true)
+        },
     },
 
     personalApiKeys: {
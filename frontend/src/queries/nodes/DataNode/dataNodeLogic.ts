@@ -294,6 +294,7 @@ export const dataNodeLogic = kea<dataNodeLogicType>([
                             ...queryResponse,
                             results: [...(queryResponse?.results ?? []), ...(newResponse?.results ?? [])],
                             hasMore: newResponse?.hasMore,
+                            nextCursor: newResponse?.nextCursor,
                         }
                     } else if (isPersonsNode(props.query)) {
                         const newResponse =
@@ -502,6 +503,15 @@ export const dataNodeLogic = kea<dataNodeLogicType>([
                     if ((response as EventsQueryResponse | ActorsQueryResponse)?.hasMore) {
                         const sortKey = query.orderBy?.[0] ?? 'timestamp DESC'
                         const typedResults = (response as EventsQueryResponse | ActorsQueryResponse)?.results
+                        const nextCursor = (response as EventsQueryResponse | ActorsQueryResponse)?.nextCursor
+                        if (nextCursor) {
+                            // Continue after the last row, without skipping all the rows before it again
+                            return {
+                                ...query,
+                                cursor: nextCursor,
+                                limit: Math.max(100, Math.min(2 * (typedResults?.length || 100), LOAD_MORE_ROWS_LIMIT)),
+                            } as EventsQuery | ActorsQuery
+                        }
                         if (isEventsQuery(query) && sortKey === 'timestamp DESC') {
                             const sortColumnIndex = query.select
                                 .map((hql) => removeExpressionComment(hql))
@@ -69,6 +69,59 @@ export async function pollForResults(
     throw new Error('Query timed out')
 }
 
+/**
+ * Wait for the results of an async query over server-sent events, instead of polling for them.
+ * Falls back to polling when the stream breaks or ends before the query completes, and for failed queries,
+ * so that errors are raised the same way.
+ */
+export async function streamForResults(
+    queryId: string,
+    methodOptions?: ApiMethodOptions,
+    onProgress?: (response: QueryStatus) => void
+): Promise<QueryStatus> {
+    if (typeof EventSource === 'undefined') {
+        return await pollForResults(queryId, methodOptions, onProgress)
+    }
+
+    const finalStatus = await new Promise<QueryStatus | null>((resolve, reject) => {
+        const source = new EventSource(api.queryStatus.streamUrl(queryId))
+        let lastStatus: QueryStatus | null = null
+
+        const onAbort = (): void => {
+            source.close()
+            reject(new DOMException('The query was aborted', 'AbortError'))
+        }
+        const finish = (status: QueryStatus | null): void => {
+            source.close()
+            methodOptions?.signal?.removeEventListener('abort', onAbort)
+            resolve(status)
+        }
+        methodOptions?.signal?.addEventListener('abort', onAbort)
+
+        source.addEventListener('status', (event: MessageEvent) => {
+            const status: QueryStatus = JSON.parse(event.data).query_status
+            if (status.complete) {
+                finish(status)
+            } else {
+                lastStatus = status
+                onProgress?.(status)
+            }
+        })
+        source.addEventListener('progress', (event: MessageEvent) => {
+            if (lastStatus) {
+                lastStatus = { ...lastStatus, query_progress: JSON.parse(event.data) }
+                onProgress?.(lastStatus)
+            }
+        })
+        source.onerror = () => finish(null)
+    })
+
+    if (finalStatus && !finalStatus.error) {
+        return finalStatus
+    }
+    return await pollForResults(queryId, methodOptions, onProgress)
+}
+
 /**
  * Execute a query node and return the response, use async query if enabled
  */
@@ -112,7 +165,10 @@ async function executeQuery<N extends DataNode>(
             throw new Error('pollOnly requires a queryId')
         }
     }
-    const statusResponse = await pollForResults(queryId, methodOptions, setPollResponse)
+    const streamResults = !!featureFlagLogic.findMounted()?.values.featureFlags?.[FEATURE_FLAGS.QUERY_ASYNC_STREAMING]
+    const statusResponse = streamResults
+        ? await streamForResults(queryId, methodOptions, setPollResponse)
+        : await pollForResults(queryId, methodOptions, setPollResponse)
     return statusResponse.results
 }
 
@@ -229,6 +229,8 @@ export interface HogQLQueryModifiers {
     sessionTableVersion?: 'auto' | 'v1' | 'v2'
     propertyGroupsMode?: 'enabled' | 'disabled' | 'optimized'
     useMaterializedViews?: boolean
+    /** Read web analytics from the rollups, which miss events arriving after they're rolled up */
+    useWebAnalyticsRollups?: boolean
 }
 
 export interface DataWarehouseEventsModifier {
@@ -509,6 +511,8 @@ export interface EventsQueryResponse extends AnalyticsQueryResponseBase<any[][]>
     hasMore?: boolean
     limit?: integer
     offset?: integer
+    /** Cursor to fetch the next page with, when there are more rows and they are sorted by a unique key */
+    nextCursor?: string
 }
 
 export type CachedEventsQueryResponse = CachedQueryResponse<EventsQueryResponse>
@@ -544,6 +548,10 @@ export interface EventsQuery extends DataNode<EventsQueryResponse> {
      * Number of rows to skip before returning rows
      */
     offset?: integer
+    /**
+     * Fetch the rows after this cursor, from the `nextCursor` of the previous page, instead of skipping rows
+     */
+    cursor?: string
     /**
      * Show events matching a given action
      */
@@ -1330,6 +1338,8 @@ export interface ActorsQueryResponse extends AnalyticsQueryResponseBase<any[][]>
     limit: integer
     offset: integer
     missing_actors_count?: integer
+    /** Cursor to fetch the next page with, when there are more rows and they are sorted by a unique key */
+    nextCursor?: string
 }
 
 export type CachedActorsQueryResponse = CachedQueryResponse<ActorsQueryResponse>
@@ -1346,6 +1356,8 @@ export interface ActorsQuery extends DataNode<ActorsQueryResponse> {
     orderBy?: string[]
     limit?: integer
     offset?: integer
+    /** Fetch the rows after this cursor, from the `nextCursor` of the previous page, instead of skipping rows */
+    cursor?: string
 }
 
 export interface TimelineEntry {
@@ -0,0 +1,50 @@
+"""
+Benchmarks the Python HogVM on the compiled programs in hogvm/__tests__/__snapshots__.
+
+    python -m hogvm.python.benchmark [--repeat=5] [name ...]
+
+Prints the best time of `repeat` runs for each program, and the total.
+"""
+
+import json
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from .execute import execute_bytecode
+
+SNAPSHOTS_DIR = Path(__file__).parent.parent / "__tests__" / "__snapshots__"
+
+
+def benchmark(bytecode: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        execute_bytecode(bytecode, globals=None, timeout=timedelta(seconds=120), team=None)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: list[str]) -> None:
+    repeat = 5
+    names: list[str] = []
+    for arg in argv:
+        if arg.startswith("--repeat="):
+            repeat = int(arg.split("=", 1)[1])
+        else:
+            names.append(arg)
+
+    total = 0.0
+    for path in sorted(SNAPSHOTS_DIR.glob("*.hoge")):
+        if names and path.stem not in names:
+            continue
+        bytecode = json.loads(path.read_text())
+        elapsed = benchmark(bytecode, repeat)
+        total += elapsed
+        print(f"{path.stem:<24} {elapsed * 1000:>10.2f} ms")  # noqa: T201
+    print(f"{'total':<24} {total * 1000:>10.2f} ms")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
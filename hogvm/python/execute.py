@@ -2,6 +2,7 @@ from datetime import timedelta
 import re
 import time
 from copy import deepcopy
+from functools import lru_cache
 from typing import Any, Optional, TYPE_CHECKING
 from collections.abc import Callable
 
@@ -13,6 +14,7 @@ from hogvm.python.stl.bytecode import BYTECODE_STL
 from dataclasses import dataclass
 
 from hogvm.python.utils import (
+    COST_PER_UNIT,
     UncaughtHogVMException,
     HogVMException,
     get_nested_value,
@@ -27,6 +29,8 @@ if TYPE_CHECKING:
 
 MAX_MEMORY = 64 * 1024 * 1024  # 64 MB
 MAX_FUNCTION_ARGS_LENGTH = 300
+# Number of root bytecodes whose decoded instructions are kept around
+DECODED_BYTECODE_CACHE_SIZE = 256
 
 
 @dataclass
@@ -36,116 +40,187 @@ class BytecodeResult:
     stdout: list[str]
 
 
-def execute_bytecode(
-    bytecode: list[Any],
-    globals: Optional[dict[str, Any]] = None,
-    functions: Optional[dict[str, Callable[..., Any]]] = None,
-    timeout=timedelta(seconds=5),
-    team: Optional["Team"] = None,
-    debug=False,
-) -> BytecodeResult:
-    if len(bytecode) == 0 or (bytecode[0] != HOGQL_BYTECODE_IDENTIFIER and bytecode[0] != HOGQL_BYTECODE_IDENTIFIER_V0):
-        raise HogVMException(f"Invalid bytecode. Must start with '{HOGQL_BYTECODE_IDENTIFIER}'")
-    version = bytecode[1] if len(bytecode) >= 2 and bytecode[0] == HOGQL_BYTECODE_IDENTIFIER else 0
-    result = None
-    start_time = time.time()
-    last_op = len(bytecode) - 1
-    stack: list = []
-    upvalues: list[dict] = []
-    upvalues_by_id: dict[int, dict] = {}
-    mem_stack: list = []
-    call_stack: list[CallFrame] = []
-    throw_stack: list[ThrowFrame] = []
-    declared_functions: dict[str, tuple[int, int]] = {}
-    mem_used = 0
-    max_mem_used = 0
-    ops = 0
-    stdout: list[str] = []
-    colored_bytecode = color_bytecode(bytecode) if debug else []
-    if isinstance(timeout, int):
-        timeout = timedelta(seconds=timeout)
+# What a handler returns, when it didn't just advance to the next instruction
+JUMPED = 1  # The current frame, chunk or ip changed
+HALTED = 2  # Stop executing
 
-    if len(call_stack) == 0:
-        call_stack.append(
-            CallFrame(
-                ip=2 if bytecode[0] == HOGQL_BYTECODE_IDENTIFIER else 1,
-                chunk="root",
-                stack_start=0,
-                arg_len=0,
-                closure=new_hog_closure(
-                    new_hog_callable(
-                        type="main",
-                        arg_count=0,
-                        upvalue_count=0,
-                        ip=2 if bytecode[0] == HOGQL_BYTECODE_IDENTIFIER else 1,
-                        chunk="root",
-                        name="",
-                    )
-                ),
-            )
+
+class DecodedChunk:
+    """
+    The instructions of a chunk of bytecode, decoded lazily by ip. Each instruction is a tuple of its handler, its
+    operands (with jump targets resolved to absolute ips), and the ip of the next instruction.
+    """
+
+    __slots__ = ("bytecode", "instructions")
+
+    def __init__(self, bytecode: list[Any]):
+        self.bytecode = bytecode
+        self.instructions: list[Optional[tuple]] = [None] * len(bytecode)
+
+    def decode(self, ip: int) -> tuple:
+        symbol = self.bytecode[ip]
+        try:
+            decoder = DECODERS.get(symbol)
+        except TypeError:  # unhashable
+            decoder = None
+        if decoder is None:
+            instruction = (op_halt if symbol is None else op_unexpected, symbol, ip + 1)
+        else:
+            try:
+                instruction = decoder(self.bytecode, ip)
+            except IndexError:
+                instruction = (op_unexpected_end, None, ip + 1)
+        self.instructions[ip] = instruction
+        return instruction
+
+
+@lru_cache(maxsize=DECODED_BYTECODE_CACHE_SIZE)
+def _decoded_root_chunk(bytecode: tuple, types: tuple) -> DecodedChunk:
+    return DecodedChunk(list(bytecode))
+
+
+def decoded_root_chunk(bytecode: list[Any]) -> DecodedChunk:
+    # The types are part of the key, as e.g. `1 == 1.0 == True` but they don't push the same value
+    try:
+        return _decoded_root_chunk(tuple(bytecode), tuple(map(type, bytecode)))
+    except TypeError:  # unhashable elements, don't cache
+        return DecodedChunk(bytecode)
+
+
+_DECODED_STL_CHUNKS: dict[str, DecodedChunk] = {}
+
+
+def decoded_stl_chunk(name: str) -> DecodedChunk:
+    chunk = _DECODED_STL_CHUNKS.get(name)
+    if chunk is None:
+        chunk = _DECODED_STL_CHUNKS[name] = DecodedChunk(BYTECODE_STL[name][1])
+    return chunk
+
+
+class VM:
+    __slots__ = (
+        "bytecode",
+        "version",
+        "globals",
+        "functions",
+        "team",
+        "timeout_seconds",
+        "root_chunk",
+        "chunk",
+        "frame",
+        "stack",
+        "mem_stack",
+        "mem_used",
+        "max_mem_used",
+        "upvalues",
+        "upvalues_by_id",
+        "call_stack",
+        "throw_stack",
+        "declared_functions",
+        "stdout",
+        "result",
+        "returned",
+    )
+
+    def __init__(
+        self,
+        bytecode: list[Any],
+        globals: Optional[dict[str, Any]],
+        functions: Optional[dict[str, Callable[..., Any]]],
+        timeout: timedelta,
+        team: Optional["Team"],
+    ):
+        self.bytecode = bytecode
+        self.version = bytecode[1] if len(bytecode) >= 2 and bytecode[0] == HOGQL_BYTECODE_IDENTIFIER else 0
+        self.globals = globals
+        self.functions = functions
+        self.team = team
+        self.timeout_seconds = timeout.total_seconds()
+        self.root_chunk = decoded_root_chunk(bytecode)
+        self.chunk = self.root_chunk
+        self.stack: list = []
+        self.mem_stack: list = []
+        self.mem_used = 0
+        self.max_mem_used = 0
+        self.upvalues: list[dict] = []
+        self.upvalues_by_id: dict[int, dict] = {}
+        self.throw_stack: list[ThrowFrame] = []
+        self.declared_functions: dict[str, tuple[int, int]] = {}
+        self.stdout: list[str] = []
+        self.result: Any = None
+        self.returned = False
+
+        start_ip = 2 if bytecode[0] == HOGQL_BYTECODE_IDENTIFIER else 1
+        self.frame = CallFrame(
+            ip=start_ip,
+            chunk="root",
+            stack_start=0,
+            arg_len=0,
+            closure=new_hog_closure(
+                new_hog_callable(type="main", arg_count=0, upvalue_count=0, ip=start_ip, chunk="root", name="")
+            ),
         )
-    frame = call_stack[-1]
-    chunk_bytecode: list[Any] = bytecode
-
-    def set_chunk_bytecode():
-        nonlocal chunk_bytecode, last_op
-        if not frame.chunk or frame.chunk == "root":
-            chunk_bytecode = bytecode
-            last_op = len(bytecode) - 1
-        elif frame.chunk.startswith("stl/") and frame.chunk[4:] in BYTECODE_STL:
-            chunk_bytecode = BYTECODE_STL[frame.chunk[4:]][1]
-            last_op = len(bytecode) - 1
+        self.call_stack: list[CallFrame] = [self.frame]
+
+    def set_chunk(self) -> None:
+        chunk = self.frame.chunk
+        if not chunk or chunk == "root":
+            self.chunk = self.root_chunk
+        elif chunk.startswith("stl/") and chunk[4:] in BYTECODE_STL:
+            self.chunk = decoded_stl_chunk(chunk[4:])
         else:
-            raise HogVMException(f"Unknown chunk: {frame.chunk}")
+            raise HogVMException(f"Unknown chunk: {chunk}")
 
-    def stack_keep_first_elements(count: int) -> list[Any]:
-        nonlocal stack, mem_stack, mem_used
-        if count < 0 or len(stack) < count:
+    def push(self, value) -> None:
+        self.stack.append(value)
+        value_type = type(value)
+        if value_type is str:
+            cost = COST_PER_UNIT + len(value)
+        elif value is None or value_type is int or value_type is float or value_type is bool:
+            cost = COST_PER_UNIT
+        else:
+            cost = calculate_cost(value)
+        self.mem_stack.append(cost)
+        self.mem_used += cost
+        if self.mem_used > self.max_mem_used:
+            self.max_mem_used = self.mem_used
+        if self.mem_used > MAX_MEMORY:
+            raise HogVMException(
+                f"Memory limit of {MAX_MEMORY} bytes exceeded. Tried to allocate {self.mem_used} bytes."
+            )
+
+    def pop(self):
+        if not self.stack:
+            raise HogVMException("Stack underflow")
+        self.mem_used -= self.mem_stack.pop()
+        return self.stack.pop()
+
+    def pop_many(self, count: int) -> list[Any]:
+        """Removes the top `count` elements, without closing upvalues. Returns them bottom first."""
+        elems = self.stack[-count:]
+        self.stack = self.stack[:-count]
+        self.mem_used -= sum(self.mem_stack[-count:])
+        self.mem_stack = self.mem_stack[:-count]
+        return elems
+
+    def stack_keep_first_elements(self, count: int) -> list[Any]:
+        if count < 0 or len(self.stack) < count:
             raise HogVMException("Stack underflow")
-        for upvalue in reversed(upvalues):
+        for upvalue in reversed(self.upvalues):
             if upvalue["location"] >= count:
                 if not upvalue["closed"]:
                     upvalue["closed"] = True
-                    upvalue["value"] = stack[upvalue["location"]]
+                    upvalue["value"] = self.stack[upvalue["location"]]
             else:
                 break
-        removed = stack[count:]
-        stack = stack[0:count]
-        mem_used -= sum(mem_stack[count:])
-        mem_stack = mem_stack[0:count]
+        removed = self.stack[count:]
+        self.stack = self.stack[0:count]
+        self.mem_used -= sum(self.mem_stack[count:])
+        self.mem_stack = self.mem_stack[0:count]
         return removed
 
-    def next_token():
-        nonlocal frame, chunk_bytecode
-        if frame.ip >= last_op:
-            raise HogVMException("Unexpected end of bytecode")
-        frame.ip += 1
-        return chunk_bytecode[frame.ip]
-
-    def pop_stack():
-        if not stack:
-            raise HogVMException("Stack underflow")
-        nonlocal mem_used
-        mem_used -= mem_stack.pop()
-        return stack.pop()
-
-    def push_stack(value):
-        stack.append(value)
-        mem_stack.append(calculate_cost(value))
-        nonlocal mem_used
-        mem_used += mem_stack[-1]
-        nonlocal max_mem_used
-        max_mem_used = max(mem_used, max_mem_used)
-        if mem_used > MAX_MEMORY:
-            raise HogVMException(f"Memory limit of {MAX_MEMORY} bytes exceeded. Tried to allocate {mem_used} bytes.")
-
-    def check_timeout():
-        if time.time() - start_time > timeout.total_seconds() and not debug:
-            raise HogVMException(f"Execution timed out after {timeout.total_seconds()} seconds. Performed {ops} ops.")
-
-    def capture_upvalue(index) -> dict:
-        nonlocal upvalues
-        for upvalue in reversed(upvalues):
+    def capture_upvalue(self, index) -> dict:
+        for upvalue in reversed(self.upvalues):
             if upvalue["location"] < index:
                 break
             if upvalue["location"] == index:
@@ -155,453 +230,647 @@ def execute_bytecode(
             "location": index,
             "closed": False,
             "value": None,
-            "id": len(upvalues) + 1,
+            "id": len(self.upvalues) + 1,
         }
-        upvalues.append(created_upvalue)
-        upvalues_by_id[created_upvalue["id"]] = created_upvalue
-        upvalues.sort(key=lambda x: x["location"])
+        self.upvalues.append(created_upvalue)
+        self.upvalues_by_id[created_upvalue["id"]] = created_upvalue
+        self.upvalues.sort(key=lambda x: x["location"])
         return created_upvalue
 
-    symbol: Any = None
-    while frame.ip <= last_op:
+    def call(self, frame: CallFrame) -> int:
+        self.frame = frame
+        self.set_chunk()
+        self.call_stack.append(frame)
+        return JUMPED
+
+
+def execute_bytecode(
+    bytecode: list[Any],
+    globals: Optional[dict[str, Any]] = None,
+    functions: Optional[dict[str, Callable[..., Any]]] = None,
+    timeout=timedelta(seconds=5),
+    team: Optional["Team"] = None,
+    debug=False,
+) -> BytecodeResult:
+    if len(bytecode) == 0 or (bytecode[0] != HOGQL_BYTECODE_IDENTIFIER and bytecode[0] != HOGQL_BYTECODE_IDENTIFIER_V0):
+        raise HogVMException(f"Invalid bytecode. Must start with '{HOGQL_BYTECODE_IDENTIFIER}'")
+    if isinstance(timeout, int):
+        timeout = timedelta(seconds=timeout)
+    vm = VM(bytecode, globals, functions, timeout, team)
+    colored_bytecode = color_bytecode(bytecode) if debug else []
+    start_time = time.time()
+    timeout_seconds = vm.timeout_seconds
+
+    frame = vm.frame
+    chunk = vm.chunk
+    instructions = chunk.instructions
+    last_ip = len(instructions) - 1
+    ops = 0
+    while frame.ip <= last_ip:
+        ip = frame.ip
+        instruction = instructions[ip] or chunk.decode(ip)
         ops += 1
-        symbol = chunk_bytecode[frame.ip]
         if (ops & 127) == 0:  # every 128th operation
-            check_timeout()
+            if time.time() - start_time > timeout_seconds and not debug:
+                raise HogVMException(f"Execution timed out after {timeout_seconds} seconds. Performed {ops} ops.")
         elif debug:
-            debugger(symbol, bytecode, colored_bytecode, frame.ip, stack, call_stack, throw_stack)
-        match symbol:
-            case None:
-                break
-            case Operation.STRING:
-                push_stack(next_token())
-            case Operation.INTEGER:
-                push_stack(next_token())
-            case Operation.FLOAT:
-                push_stack(next_token())
-            case Operation.TRUE:
-                push_stack(True)
-            case Operation.FALSE:
-                push_stack(False)
-            case Operation.NULL:
-                push_stack(None)
-            case Operation.NOT:
-                push_stack(not pop_stack())
-            case Operation.AND:
-                push_stack(all([pop_stack() for _ in range(next_token())]))  # noqa: C419
-            case Operation.OR:
-                push_stack(any([pop_stack() for _ in range(next_token())]))  # noqa: C419
-            case Operation.PLUS:
-                push_stack(pop_stack() + pop_stack())
-            case Operation.MINUS:
-                push_stack(pop_stack() - pop_stack())
-            case Operation.DIVIDE:
-                push_stack(pop_stack() / pop_stack())
-            case Operation.MULTIPLY:
-                push_stack(pop_stack() * pop_stack())
-            case Operation.MOD:
-                push_stack(pop_stack() % pop_stack())
-            case Operation.EQ:
-                var1, var2 = unify_comparison_types(pop_stack(), pop_stack())
-                push_stack(var1 == var2)
-            case Operation.NOT_EQ:
-                var1, var2 = unify_comparison_types(pop_stack(), pop_stack())
-                push_stack(var1 != var2)
-            case Operation.GT:
-                var1, var2 = unify_comparison_types(pop_stack(), pop_stack())
-                push_stack(var1 > var2)
-            case Operation.GT_EQ:
-                var1, var2 = unify_comparison_types(pop_stack(), pop_stack())
-                push_stack(var1 >= var2)
-            case Operation.LT:
-                var1, var2 = unify_comparison_types(pop_stack(), pop_stack())
-                push_stack(var1 < var2)
-            case Operation.LT_EQ:
-                var1, var2 = unify_comparison_types(pop_stack(), pop_stack())
-                push_stack(var1 <= var2)
-            case Operation.LIKE:
-                push_stack(like(pop_stack(), pop_stack()))
-            case Operation.ILIKE:
-                push_stack(like(pop_stack(), pop_stack(), re.IGNORECASE))
-            case Operation.NOT_LIKE:
-                push_stack(not like(pop_stack(), pop_stack()))
-            case Operation.NOT_ILIKE:
-                push_stack(not like(pop_stack(), pop_stack(), re.IGNORECASE))
-            case Operation.IN:
-                push_stack(pop_stack() in pop_stack())
-            case Operation.NOT_IN:
-                push_stack(pop_stack() not in pop_stack())
-            case Operation.REGEX:
-                args = [pop_stack(), pop_stack()]
-                # TODO: swap this for re2, as used in HogQL/ClickHouse and in the NodeJS VM
-                push_stack(bool(re.search(re.compile(args[1]), args[0])))
-            case Operation.NOT_REGEX:
-                args = [pop_stack(), pop_stack()]
-                # TODO: swap this for re2, as used in HogQL/ClickHouse and in the NodeJS VM
-                push_stack(not bool(re.search(re.compile(args[1]), args[0])))
-            case Operation.IREGEX:
-                args = [pop_stack(), pop_stack()]
-                push_stack(bool(re.search(re.compile(args[1], re.RegexFlag.IGNORECASE), args[0])))
-            case Operation.NOT_IREGEX:
-                args = [pop_stack(), pop_stack()]
-                push_stack(not bool(re.search(re.compile(args[1], re.RegexFlag.IGNORECASE), args[0])))
-            case Operation.GET_GLOBAL:
-                chain = [pop_stack() for _ in range(next_token())]
-                if globals and chain[0] in globals:
-                    push_stack(deepcopy(get_nested_value(globals, chain, True)))
-                elif functions and chain[0] in functions:
-                    push_stack(
-                        new_hog_closure(
-                            new_hog_callable(
-                                type="stl",
-                                name=chain[0],
-                                arg_count=0,
-                                upvalue_count=0,
-                                ip=-1,
-                                chunk="stl",
-                            )
-                        )
-                    )
-                elif chain[0] in STL and len(chain) == 1:
-                    push_stack(
-                        new_hog_closure(
-                            new_hog_callable(
-                                type="stl",
-                                name=chain[0],
-                                arg_count=STL[chain[0]].maxArgs or 0,
-                                upvalue_count=0,
-                                ip=-1,
-                                chunk="stl",
-                            )
-                        )
-                    )
-                elif chain[0] in BYTECODE_STL and len(chain) == 1:
-                    push_stack(
-                        new_hog_closure(
-                            new_hog_callable(
-                                type="stl",
-                                name=chain[0],
-                                arg_count=len(BYTECODE_STL[chain[0]][0]),
-                                upvalue_count=0,
-                                ip=0,
-                                chunk=f"stl/{chain[0]}",
-                            )
-                        )
-                    )
-                else:
-                    raise HogVMException(f"Global variable not found: {chain[0]}")
-            case Operation.POP:
-                pop_stack()
-            case Operation.CLOSE_UPVALUE:
-                stack_keep_first_elements(len(stack) - 1)
-            case Operation.RETURN:
-                response = pop_stack()
-                last_call_frame = call_stack.pop()
-                if len(call_stack) == 0 or last_call_frame is None:
-                    return BytecodeResult(result=response, stdout=stdout, bytecode=bytecode)
-                stack_start = last_call_frame.stack_start
-                stack_keep_first_elements(stack_start)
-                push_stack(response)
-                frame = call_stack[-1]
-                set_chunk_bytecode()
-                continue  # resume the loop without incrementing frame.ip
-
-            case Operation.GET_LOCAL:
-                stack_start = 0 if not call_stack else call_stack[-1].stack_start
-                push_stack(stack[next_token() + stack_start])
-            case Operation.SET_LOCAL:
-                stack_start = 0 if not call_stack else call_stack[-1].stack_start
-                value = pop_stack()
-                index = next_token() + stack_start
-                stack[index] = value
-                last_cost = mem_stack[index]
-                mem_stack[index] = calculate_cost(value)
-                mem_used += mem_stack[index] - last_cost
-                max_mem_used = max(mem_used, max_mem_used)
-            case Operation.GET_PROPERTY:
-                property = pop_stack()
-                push_stack(get_nested_value(pop_stack(), [property]))
-            case Operation.GET_PROPERTY_NULLISH:
-                property = pop_stack()
-                push_stack(get_nested_value(pop_stack(), [property], nullish=True))
-            case Operation.SET_PROPERTY:
-                value = pop_stack()
-                field = pop_stack()
-                set_nested_value(pop_stack(), [field], value)
-            case Operation.DICT:
-                count = next_token()
-                if count > 0:
-                    elems = stack[-(count * 2) :]
-                    stack = stack[: -(count * 2)]
-                    mem_used -= sum(mem_stack[-(count * 2) :])
-                    mem_stack = mem_stack[: -(count * 2)]
-                    push_stack({elems[i]: elems[i + 1] for i in range(0, len(elems), 2)})
-                else:
-                    push_stack({})
-            case Operation.ARRAY:
-                count = next_token()
-                if count > 0:
-                    elems = stack[-count:]
-                    stack = stack[:-count]
-                    mem_used -= sum(mem_stack[-count:])
-                    mem_stack = mem_stack[:-count]
-                    push_stack(elems)
-                else:
-                    push_stack([])
-            case Operation.TUPLE:
-                count = next_token()
-                if count > 0:
-                    elems = stack[-count:]
-                    stack = stack[:-count]
-                    mem_used -= sum(mem_stack[-count:])
-                    mem_stack = mem_stack[:-count]
-                    push_stack(tuple(elems))
-                else:
-                    push_stack(())
-            case Operation.JUMP:
-                count = next_token()
-                frame.ip += count
-            case Operation.JUMP_IF_FALSE:
-                count = next_token()
-                if not pop_stack():
-                    frame.ip += count
-            case Operation.JUMP_IF_STACK_NOT_NULL:
-                count = next_token()
-                if len(stack) > 0 and stack[-1] is not None:
-                    frame.ip += count
-            case Operation.DECLARE_FN:
-                # DEPRECATED
-                name = next_token()
-                arg_len = next_token()
-                body_len = next_token()
-                declared_functions[name] = (frame.ip + 1, arg_len)
-                frame.ip += body_len
-            case Operation.CALLABLE:
-                name = next_token()  # TODO: do we need it? it could change as the variable is reassigned
-                arg_count = next_token()
-                upvalue_count = next_token()
-                body_length = next_token()
-                push_stack(
-                    new_hog_callable(
-                        type="local",
-                        name=name,
-                        chunk=frame.chunk,
-                        arg_count=arg_count,
-                        upvalue_count=upvalue_count,
-                        ip=frame.ip + 1,
-                    )
+            debugger(chunk.bytecode[ip], bytecode, colored_bytecode, ip, vm.stack, vm.call_stack, vm.throw_stack)
+
+        handler, operands, next_ip = instruction
+        control = handler(vm, operands)
+        if control is None:
+            frame.ip = next_ip
+        elif control == JUMPED:
+            frame = vm.frame
+            chunk = vm.chunk
+            instructions = chunk.instructions
+            last_ip = len(instructions) - 1
+        else:
+            if vm.returned:
+                return BytecodeResult(result=vm.result, stdout=vm.stdout, bytecode=bytecode)
+            break
+
+    if debug:
+        symbol = chunk.bytecode[frame.ip] if frame.ip <= last_ip else None
+        debugger(symbol, bytecode, colored_bytecode, frame.ip, vm.stack, vm.call_stack, vm.throw_stack)
+    if len(vm.stack) > 1:
+        raise HogVMException("Invalid bytecode. More than one value left on stack")
+    result = None
+    if len(vm.stack) == 1:
+        result = vm.pop()
+    return BytecodeResult(result=result, stdout=vm.stdout, bytecode=bytecode)
+
+
+# Handlers. Each gets the VM and the decoded operands of the instruction.
+
+
+def op_halt(vm: VM, operands) -> int:
+    return HALTED
+
+
+def op_unexpected(vm: VM, symbol) -> None:
+    raise HogVMException(f'Unexpected node while running bytecode in chunk "{vm.frame.chunk}": {symbol}')
+
+
+def op_unexpected_end(vm: VM, operands) -> None:
+    raise HogVMException("Unexpected end of bytecode")
+
+
+def op_push_operand(vm: VM, value) -> None:
+    vm.push(value)
+
+
+def op_true(vm: VM, operands) -> None:
+    vm.push(True)
+
+
+def op_false(vm: VM, operands) -> None:
+    vm.push(False)
+
+
+def op_null(vm: VM, operands) -> None:
+    vm.push(None)
+
+
+def op_not(vm: VM, operands) -> None:
+    vm.push(not vm.pop())
+
+
+def op_and(vm: VM, count) -> None:
+    vm.push(all([vm.pop() for _ in range(count)]))  # noqa: C419
+
+
+def op_or(vm: VM, count) -> None:
+    vm.push(any([vm.pop() for _ in range(count)]))  # noqa: C419
+
+
+def op_plus(vm: VM, operands) -> None:
+    vm.push(vm.pop() + vm.pop())
+
+
+def op_minus(vm: VM, operands) -> None:
+    vm.push(vm.pop() - vm.pop())
+
+
+def op_divide(vm: VM, operands) -> None:
+    vm.push(vm.pop() / vm.pop())
+
+
+def op_multiply(vm: VM, operands) -> None:
+    vm.push(vm.pop() * vm.pop())
+
+
+def op_mod(vm: VM, operands) -> None:
+    vm.push(vm.pop() % vm.pop())
+
+
+def op_eq(vm: VM, operands) -> None:
+    var1, var2 = unify_comparison_types(vm.pop(), vm.pop())
+    vm.push(var1 == var2)
+
+
+def op_not_eq(vm: VM, operands) -> None:
+    var1, var2 = unify_comparison_types(vm.pop(), vm.pop())
+    vm.push(var1 != var2)
+
+
+def op_gt(vm: VM, operands) -> None:
+    var1, var2 = unify_comparison_types(vm.pop(), vm.pop())
+    vm.push(var1 > var2)
+
+
+def op_gt_eq(vm: VM, operands) -> None:
+    var1, var2 = unify_comparison_types(vm.pop(), vm.pop())
+    vm.push(var1 >= var2)
+
+
+def op_lt(vm: VM, operands) -> None:
+    var1, var2 = unify_comparison_types(vm.pop(), vm.pop())
+    vm.push(var1 < var2)
+
+
+def op_lt_eq(vm: VM, operands) -> None:
+    var1, var2 = unify_comparison_types(vm.pop(), vm.pop())
+    vm.push(var1 <= var2)
+
+
+def op_like(vm: VM, operands) -> None:
+    vm.push(like(vm.pop(), vm.pop()))
+
+
+def op_ilike(vm: VM, operands) -> None:
+    vm.push(like(vm.pop(), vm.pop(), re.IGNORECASE))
+
+
+def op_not_like(vm: VM, operands) -> None:
+    vm.push(not like(vm.pop(), vm.pop()))
+
+
+def op_not_ilike(vm: VM, operands) -> None:
+    vm.push(not like(vm.pop(), vm.pop(), re.IGNORECASE))
+
+
+def op_in(vm: VM, operands) -> None:
+    vm.push(vm.pop() in vm.pop())
+
+
+def op_not_in(vm: VM, operands) -> None:
+    vm.push(vm.pop() not in vm.pop())
+
+
+def op_regex(vm: VM, operands) -> None:
+    args = [vm.pop(), vm.pop()]
+    # TODO: swap this for re2, as used in HogQL/ClickHouse and in the NodeJS VM
+    vm.push(bool(re.search(re.compile(args[1]), args[0])))
+
+
+def op_not_regex(vm: VM, operands) -> None:
+    args = [vm.pop(), vm.pop()]
+    # TODO: swap this for re2, as used in HogQL/ClickHouse and in the NodeJS VM
+    vm.push(not bool(re.search(re.compile(args[1]), args[0])))
+
+
+def op_iregex(vm: VM, operands) -> None:
+    args = [vm.pop(), vm.pop()]
+    vm.push(bool(re.search(re.compile(args[1], re.RegexFlag.IGNORECASE), args[0])))
+
+
+def op_not_iregex(vm: VM, operands) -> None:
+    args = [vm.pop(), vm.pop()]
+    vm.push(not bool(re.search(re.compile(args[1], re.RegexFlag.IGNORECASE), args[0])))
+
+
+def op_get_global(vm: VM, count) -> None:
+    chain = [vm.pop() for _ in range(count)]
+    globals, functions = vm.globals, vm.functions
+    if globals and chain[0] in globals:
+        vm.push(deepcopy(get_nested_value(globals, chain, True)))
+    elif functions and chain[0] in functions:
+        vm.push(
+            new_hog_closure(
+                new_hog_callable(type="stl", name=chain[0], arg_count=0, upvalue_count=0, ip=-1, chunk="stl")
+            )
+        )
+    elif chain[0] in STL and len(chain) == 1:
+        vm.push(
+            new_hog_closure(
+                new_hog_callable(
+                    type="stl",
+                    name=chain[0],
+                    arg_count=STL[chain[0]].maxArgs or 0,
+                    upvalue_count=0,
+                    ip=-1,
+                    chunk="stl",
                 )
-                frame.ip += body_length
-            case Operation.CLOSURE:
-                closure_callable = pop_stack()
-                closure = new_hog_closure(closure_callable)
-                stack_start = frame.stack_start
-                upvalue_count = next_token()
-                if upvalue_count != closure_callable["upvalueCount"]:
-                    raise HogVMException(
-                        f"Invalid upvalue count. Expected {closure_callable['upvalueCount']}, got {upvalue_count}"
-                    )
-                for _ in range(closure_callable["upvalueCount"]):
-                    is_local, index = next_token(), next_token()
-                    if is_local:
-                        closure["upvalues"].append(capture_upvalue(stack_start + index)["id"])
-                    else:
-                        closure["upvalues"].append(frame.closure["upvalues"][index])
-                push_stack(closure)
-            case Operation.GET_UPVALUE:
-                index = next_token()
-                closure = frame.closure
-                if index >= len(closure["upvalues"]):
-                    raise HogVMException(f"Invalid upvalue index: {index}")
-                upvalue = upvalues_by_id[closure["upvalues"][index]]
-                if not is_hog_upvalue(upvalue):
-                    raise HogVMException(f"Invalid upvalue: {upvalue}")
-                if upvalue["closed"]:
-                    push_stack(upvalue["value"])
-                else:
-                    push_stack(stack[upvalue["location"]])
-            case Operation.SET_UPVALUE:
-                index = next_token()
-                closure = frame.closure
-                if index >= len(closure["upvalues"]):
-                    raise HogVMException(f"Invalid upvalue index: {index}")
-                upvalue = upvalues_by_id[closure["upvalues"][index]]
-                if not is_hog_upvalue(upvalue):
-                    raise HogVMException(f"Invalid upvalue: {upvalue}")
-                if upvalue["closed"]:
-                    upvalue["value"] = pop_stack()
-                else:
-                    stack[upvalue["location"]] = pop_stack()
-            case Operation.CALL_GLOBAL:
-                check_timeout()
-                name = next_token()
-                arg_count = next_token()
-                # This is for backwards compatibility. We use a closure on the stack with local functions now.
-                if name in declared_functions:
-                    func_ip, arg_len = declared_functions[name]
-                    frame.ip += 1  # advance for when we return
-                    if arg_len > arg_count:
-                        for _ in range(arg_len - arg_count):
-                            push_stack(None)
-                    frame = CallFrame(
-                        ip=func_ip,
-                        chunk=frame.chunk,
-                        stack_start=len(stack) - arg_len,
-                        arg_len=arg_len,
-                        closure=new_hog_closure(
-                            new_hog_callable(
-                                type="local",
-                                name=name,
-                                arg_count=arg_len,
-                                upvalue_count=0,
-                                ip=func_ip,
-                                chunk=frame.chunk,
-                            )
-                        ),
-                    )
-                    call_stack.append(frame)
-                    continue  # resume the loop without incrementing frame.ip
-                else:
-                    if functions is not None and name in functions:
-                        if version == 0:
-                            args = [pop_stack() for _ in range(arg_count)]
-                        else:
-                            args = stack_keep_first_elements(len(stack) - arg_count)
-                        push_stack(functions[name](*args))
-                    elif name in STL:
-                        if version == 0:
-                            args = [pop_stack() for _ in range(arg_count)]
-                        else:
-                            args = stack_keep_first_elements(len(stack) - arg_count)
-                        push_stack(STL[name].fn(args, team, stdout, timeout.total_seconds()))
-                    elif name in BYTECODE_STL:
-                        arg_names = BYTECODE_STL[name][0]
-                        if len(arg_names) != arg_count:
-                            raise HogVMException(f"Function {name} requires exactly {len(arg_names)} arguments")
-                        frame.ip += 1  # advance for when we return
-                        frame = CallFrame(
-                            ip=0,
-                            chunk=f"stl/{name}",
-                            stack_start=len(stack) - arg_count,
-                            arg_len=arg_count,
-                            closure=new_hog_closure(
-                                new_hog_callable(
-                                    type="stl",
-                                    name=name,
-                                    arg_count=arg_count,
-                                    upvalue_count=0,
-                                    ip=0,
-                                    chunk=f"stl/{name}",
-                                )
-                            ),
-                        )
-                        set_chunk_bytecode()
-                        call_stack.append(frame)
-                        continue  # resume the loop without incrementing frame.ip
-                    else:
-                        raise HogVMException(f"Unsupported function call: {name}")
-            case Operation.CALL_LOCAL:
-                check_timeout()
-                closure = pop_stack()
-                if not isinstance(closure, dict) or closure.get("__hogClosure__") is None:
-                    raise HogVMException(f"Invalid closure: {closure}")
-                callable = closure.get("callable")
-                if not isinstance(callable, dict) or callable.get("__hogCallable__") is None:
-                    raise HogVMException(f"Invalid callable: {callable}")
-                args_length = next_token()
-                if args_length > MAX_FUNCTION_ARGS_LENGTH:
-                    raise HogVMException("Too many arguments")
-
-                if callable.get("__hogCallable__") == "local":
-                    if callable["argCount"] > args_length:
-                        # TODO: specify minimum required arguments somehow
-                        for _ in range(callable["argCount"] - args_length):
-                            push_stack(None)
-                    elif callable["argCount"] < args_length:
-                        raise HogVMException(
-                            f"Too many arguments. Passed {args_length}, expected {callable['argCount']}"
-                        )
-                    frame.ip += 1  # advance for when we return
-                    frame = CallFrame(
-                        ip=callable["ip"],
-                        chunk=callable["chunk"],
-                        stack_start=len(stack) - callable["argCount"],
-                        arg_len=callable["argCount"],
-                        closure=closure,
-                    )
-                    set_chunk_bytecode()
-                    call_stack.append(frame)
-                    continue  # resume the loop without incrementing frame.ip
-
-                elif callable.get("__hogCallable__") == "stl":
-                    if callable["name"] not in STL:
-                        raise HogVMException(f"Unsupported function call: {callable['name']}")
-                    stl_fn = STL[callable["name"]]
-                    if stl_fn.minArgs is not None and args_length < stl_fn.minArgs:
-                        raise HogVMException(
-                            f"Function {callable['name']} requires at least {stl_fn.minArgs} arguments"
-                        )
-                    if stl_fn.maxArgs is not None and args_length > stl_fn.maxArgs:
-                        raise HogVMException(f"Function {callable['name']} requires at most {stl_fn.maxArgs} arguments")
-                    if version == 0:
-                        args = [pop_stack() for _ in range(args_length)]
-                    else:
-                        args = list(reversed([pop_stack() for _ in range(args_length)]))
-                        if stl_fn.maxArgs is not None and len(args) < stl_fn.maxArgs:
-                            args = [*args, *([None] * (stl_fn.maxArgs - len(args)))]
-                    push_stack(stl_fn.fn(args, team, stdout, timeout.total_seconds()))
-
-                elif callable.get("__hogCallable__") == "async":
-                    raise HogVMException("Async functions are not supported")
-
-                else:
-                    raise HogVMException("Invalid callable")
-
-            case Operation.TRY:
-                throw_stack.append(
-                    ThrowFrame(
-                        call_stack_len=len(call_stack), stack_len=len(stack), catch_ip=frame.ip + 1 + next_token()
-                    )
+            )
+        )
+    elif chain[0] in BYTECODE_STL and len(chain) == 1:
+        vm.push(
+            new_hog_closure(
+                new_hog_callable(
+                    type="stl",
+                    name=chain[0],
+                    arg_count=len(BYTECODE_STL[chain[0]][0]),
+                    upvalue_count=0,
+                    ip=0,
+                    chunk=f"stl/{chain[0]}",
                 )
-            case Operation.POP_TRY:
-                if throw_stack:
-                    throw_stack.pop()
-                else:
-                    raise HogVMException("Invalid operation POP_TRY: no try block to pop")
-            case Operation.THROW:
-                exception = pop_stack()
-                if not is_hog_error(exception):
-                    raise HogVMException("Can not throw: value is not of type Error")
-                if throw_stack:
-                    last_throw = throw_stack.pop()
-                    call_stack_len, stack_len, catch_ip = (
-                        last_throw.call_stack_len,
-                        last_throw.stack_len,
-                        last_throw.catch_ip,
+            )
+        )
+    else:
+        raise HogVMException(f"Global variable not found: {chain[0]}")
+
+
+def op_pop(vm: VM, operands) -> None:
+    vm.pop()
+
+
+def op_close_upvalue(vm: VM, operands) -> None:
+    vm.stack_keep_first_elements(len(vm.stack) - 1)
+
+
+def op_return(vm: VM, operands) -> int:
+    response = vm.pop()
+    last_call_frame = vm.call_stack.pop()
+    if len(vm.call_stack) == 0 or last_call_frame is None:
+        vm.result = response
+        vm.returned = True
+        return HALTED
+    vm.stack_keep_first_elements(last_call_frame.stack_start)
+    vm.push(response)
+    vm.frame = vm.call_stack[-1]
+    vm.set_chunk()
+    return JUMPED  # resume at the ip stored in the frame
+
+
+def op_get_local(vm: VM, index) -> None:
+    vm.push(vm.stack[index + vm.frame.stack_start])
+
+
+def op_set_local(vm: VM, index) -> None:
+    value = vm.pop()
+    index += vm.frame.stack_start
+    vm.stack[index] = value
+    last_cost = vm.mem_stack[index]
+    vm.mem_stack[index] = calculate_cost(value)
+    vm.mem_used += vm.mem_stack[index] - last_cost
+    vm.max_mem_used = max(vm.mem_used, vm.max_mem_used)
+
+
+def op_get_property(vm: VM, operands) -> None:
+    property = vm.pop()
+    vm.push(get_nested_value(vm.pop(), [property]))
+
+
+def op_get_property_nullish(vm: VM, operands) -> None:
+    property = vm.pop()
+    vm.push(get_nested_value(vm.pop(), [property], nullish=True))
+
+
+def op_set_property(vm: VM, operands) -> None:
+    value = vm.pop()
+    field = vm.pop()
+    set_nested_value(vm.pop(), [field], value)
+
+
+def op_dict(vm: VM, count) -> None:
+    if count > 0:
+        elems = vm.pop_many(count * 2)
+        vm.push({elems[i]: elems[i + 1] for i in range(0, len(elems), 2)})
+    else:
+        vm.push({})
+
+
+def op_array(vm: VM, count) -> None:
+    vm.push(vm.pop_many(count) if count > 0 else [])
+
+
+def op_tuple(vm: VM, count) -> None:
+    vm.push(tuple(vm.pop_many(count)) if count > 0 else ())
+
+
+def op_jump(vm: VM, target) -> int:
+    vm.frame.ip = target
+    return JUMPED
+
+
+def op_jump_if_false(vm: VM, target) -> Optional[int]:
+    if not vm.pop():
+        vm.frame.ip = target
+        return JUMPED
+    return None
+
+
+def op_jump_if_stack_not_null(vm: VM, target) -> Optional[int]:
+    if len(vm.stack) > 0 and vm.stack[-1] is not None:
+        vm.frame.ip = target
+        return JUMPED
+    return None
+
+
+def op_declare_fn(vm: VM, operands) -> None:
+    # DEPRECATED
+    name, arg_len, body_ip = operands
+    vm.declared_functions[name] = (body_ip, arg_len)
+
+
+def op_callable(vm: VM, operands) -> None:
+    name, arg_count, upvalue_count, body_ip = operands
+    vm.push(
+        new_hog_callable(
+            type="local",
+            name=name,
+            chunk=vm.frame.chunk,
+            arg_count=arg_count,
+            upvalue_count=upvalue_count,
+            ip=body_ip,
+        )
+    )
+
+
+def op_closure(vm: VM, operands) -> None:
+    upvalue_count, upvalue_refs = operands
+    closure_callable = vm.pop()
+    closure = new_hog_closure(closure_callable)
+    frame = vm.frame
+    stack_start = frame.stack_start
+    if upvalue_count != closure_callable["upvalueCount"]:
+        raise HogVMException(f"Invalid upvalue count. Expected {closure_callable['upvalueCount']}, got {upvalue_count}")
+    for is_local, index in upvalue_refs:
+        if is_local:
+            closure["upvalues"].append(vm.capture_upvalue(stack_start + index)["id"])
+        else:
+            closure["upvalues"].append(frame.closure["upvalues"][index])
+    vm.push(closure)
+
+
+def _get_upvalue(vm: VM, index) -> dict:
+    closure = vm.frame.closure
+    if index >= len(closure["upvalues"]):
+        raise HogVMException(f"Invalid upvalue index: {index}")
+    upvalue = vm.upvalues_by_id[closure["upvalues"][index]]
+    if not is_hog_upvalue(upvalue):
+        raise HogVMException(f"Invalid upvalue: {upvalue}")
+    return upvalue
+
+
+def op_get_upvalue(vm: VM, index) -> None:
+    upvalue = _get_upvalue(vm, index)
+    if upvalue["closed"]:
+        vm.push(upvalue["value"])
+    else:
+        vm.push(vm.stack[upvalue["location"]])
+
+
+def op_set_upvalue(vm: VM, index) -> None:
+    upvalue = _get_upvalue(vm, index)
+    if upvalue["closed"]:
+        upvalue["value"] = vm.pop()
+    else:
+        vm.stack[upvalue["location"]] = vm.pop()
+
+
+def op_call_global(vm: VM, operands) -> Optional[int]:
+    name, arg_count, return_ip = operands
+    frame = vm.frame
+    # This is for backwards compatibility. We use a closure on the stack with local functions now.
+    if name in vm.declared_functions:
+        func_ip, arg_len = vm.declared_functions[name]
+        frame.ip = return_ip
+        if arg_len > arg_count:
+            for _ in range(arg_len - arg_count):
+                vm.push(None)
+        return vm.call(
+            CallFrame(
+                ip=func_ip,
+                chunk=frame.chunk,
+                stack_start=len(vm.stack) - arg_len,
+                arg_len=arg_len,
+                closure=new_hog_closure(
+                    new_hog_callable(
+                        type="local", name=name, arg_count=arg_len, upvalue_count=0, ip=func_ip, chunk=frame.chunk
                     )
-                    stack_keep_first_elements(stack_len)
-                    call_stack = call_stack[0:call_stack_len]
-                    push_stack(exception)
-                    frame = call_stack[-1]
-                    set_chunk_bytecode()
-                    frame.ip = catch_ip
-                    continue
-                else:
-                    raise UncaughtHogVMException(
-                        type=exception.get("type"),
-                        message=exception.get("message"),
-                        payload=exception.get("payload"),
+                ),
+            )
+        )
+    elif vm.functions is not None and name in vm.functions:
+        if vm.version == 0:
+            args = [vm.pop() for _ in range(arg_count)]
+        else:
+            args = vm.stack_keep_first_elements(len(vm.stack) - arg_count)
+        vm.push(vm.functions[name](*args))
+    elif name in STL:
+        if vm.version == 0:
+            args = [vm.pop() for _ in range(arg_count)]
+        else:
+            args = vm.stack_keep_first_elements(len(vm.stack) - arg_count)
+        vm.push(STL[name].fn(args, vm.team, vm.stdout, vm.timeout_seconds))
+    elif name in BYTECODE_STL:
+        arg_names = BYTECODE_STL[name][0]
+        if len(arg_names) != arg_count:
+            raise HogVMException(f"Function {name} requires exactly {len(arg_names)} arguments")
+        frame.ip = return_ip
+        return vm.call(
+            CallFrame(
+                ip=0,
+                chunk=f"stl/{name}",
+                stack_start=len(vm.stack) - arg_count,
+                arg_len=arg_count,
+                closure=new_hog_closure(
+                    new_hog_callable(
+                        type="stl", name=name, arg_count=arg_count, upvalue_count=0, ip=0, chunk=f"stl/{name}"
                     )
-            case _:
-                raise HogVMException(
-                    f'Unexpected node while running bytecode in chunk "{frame.chunk}": {chunk_bytecode[frame.ip]}'
-                )
+                ),
+            )
+        )
+    else:
+        raise HogVMException(f"Unsupported function call: {name}")
+    return None
 
-        frame.ip += 1
-    if debug:
-        debugger(symbol, bytecode, colored_bytecode, frame.ip, stack, call_stack, throw_stack)
-    if len(stack) > 1:
-        raise HogVMException("Invalid bytecode. More than one value left on stack")
-    if len(stack) == 1:
-        result = pop_stack()
-    return BytecodeResult(result=result, stdout=stdout, bytecode=bytecode)
+
+def op_call_local(vm: VM, operands) -> Optional[int]:
+    args_length, return_ip = operands
+    closure = vm.pop()
+    if not isinstance(closure, dict) or closure.get("__hogClosure__") is None:
+        raise HogVMException(f"Invalid closure: {closure}")
+    callable = closure.get("callable")
+    if not isinstance(callable, dict) or callable.get("__hogCallable__") is None:
+        raise HogVMException(f"Invalid callable: {callable}")
+    if args_length > MAX_FUNCTION_ARGS_LENGTH:
+        raise HogVMException("Too many arguments")
+
+    if callable.get("__hogCallable__") == "local":
+        if callable["argCount"] > args_length:
+            # TODO: specify minimum required arguments somehow
+            for _ in range(callable["argCount"] - args_length):
+                vm.push(None)
+        elif callable["argCount"] < args_length:
+            raise HogVMException(f"Too many arguments. Passed {args_length}, expected {callable['argCount']}")
+        vm.frame.ip = return_ip
+        return vm.call(
+            CallFrame(
+                ip=callable["ip"],
+                chunk=callable["chunk"],
+                stack_start=len(vm.stack) - callable["argCount"],
+                arg_len=callable["argCount"],
+                closure=closure,
+            )
+        )
+
+    elif callable.get("__hogCallable__") == "stl":
+        if callable["name"] not in STL:
+            raise HogVMException(f"Unsupported function call: {callable['name']}")
+        stl_fn = STL[callable["name"]]
+        if stl_fn.minArgs is not None and args_length < stl_fn.minArgs:
+            raise HogVMException(f"Function {callable['name']} requires at least {stl_fn.minArgs} arguments")
+        if stl_fn.maxArgs is not None and args_length > stl_fn.maxArgs:
+            raise HogVMException(f"Function {callable['name']} requires at most {stl_fn.maxArgs} arguments")
+        if vm.version == 0:
+            args = [vm.pop() for _ in range(args_length)]
+        else:
+            args = list(reversed([vm.pop() for _ in range(args_length)]))
+            if stl_fn.maxArgs is not None and len(args) < stl_fn.maxArgs:
+                args = [*args, *([None] * (stl_fn.maxArgs - len(args)))]
+        vm.push(stl_fn.fn(args, vm.team, vm.stdout, vm.timeout_seconds))
+        return None
+
+    elif callable.get("__hogCallable__") == "async":
+        raise HogVMException("Async functions are not supported")
+
+    else:
+        raise HogVMException("Invalid callable")
+
+
+def op_try(vm: VM, catch_ip) -> None:
+    vm.throw_stack.append(ThrowFrame(call_stack_len=len(vm.call_stack), stack_len=len(vm.stack), catch_ip=catch_ip))
+
+
+def op_pop_try(vm: VM, operands) -> None:
+    if vm.throw_stack:
+        vm.throw_stack.pop()
+    else:
+        raise HogVMException("Invalid operation POP_TRY: no try block to pop")
+
+
+def op_throw(vm: VM, operands) -> int:
+    exception = vm.pop()
+    if not is_hog_error(exception):
+        raise HogVMException("Can not throw: value is not of type Error")
+    if not vm.throw_stack:
+        raise UncaughtHogVMException(
+            type=exception.get("type"),
+            message=exception.get("message"),
+            payload=exception.get("payload"),
+        )
+    last_throw = vm.throw_stack.pop()
+    vm.stack_keep_first_elements(last_throw.stack_len)
+    vm.call_stack = vm.call_stack[0 : last_throw.call_stack_len]
+    vm.push(exception)
+    vm.frame = vm.call_stack[-1]
+    vm.set_chunk()
+    vm.frame.ip = last_throw.catch_ip
+    return JUMPED
+
+
+# Decoders. Each reads the operands of the instruction at `ip`, resolves them, and returns the instruction.
+# Reading past the end of the bytecode raises an IndexError.
+
+
+def _no_operands(handler: Callable) -> Callable:
+    return lambda bytecode, ip: (handler, None, ip + 1)
+
+
+def _one_operand(handler: Callable) -> Callable:
+    return lambda bytecode, ip: (handler, bytecode[ip + 1], ip + 2)
+
+
+def _jump(handler: Callable) -> Callable:
+    return lambda bytecode, ip: (handler, ip + 2 + bytecode[ip + 1], ip + 2)
+
+
+def _decode_try(bytecode: list, ip: int) -> tuple:
+    # The catch target is relative to the TRY instruction itself, not to the end of its operand
+    return op_try, ip + 1 + bytecode[ip + 1], ip + 2
+
+
+def _decode_declare_fn(bytecode: list, ip: int) -> tuple:
+    name, arg_len, body_len = bytecode[ip + 1], bytecode[ip + 2], bytecode[ip + 3]
+    return op_declare_fn, (name, arg_len, ip + 4), ip + 4 + body_len
+
+
+def _decode_callable(bytecode: list, ip: int) -> tuple:
+    name, arg_count, upvalue_count, body_length = bytecode[ip + 1], bytecode[ip + 2], bytecode[ip + 3], bytecode[ip + 4]
+    return op_callable, (name, arg_count, upvalue_count, ip + 5), ip + 5 + body_length
+
+
+def _decode_closure(bytecode: list, ip: int) -> tuple:
+    upvalue_count = bytecode[ip + 1]
+    upvalue_refs = tuple((bytecode[ip + 2 + i * 2], bytecode[ip + 3 + i * 2]) for i in range(upvalue_count))
+    return op_closure, (upvalue_count, upvalue_refs), ip + 2 + upvalue_count * 2
+
+
+def _decode_call_global(bytecode: list, ip: int) -> tuple:
+    return op_call_global, (bytecode[ip + 1], bytecode[ip + 2], ip + 3), ip + 3
+
+
+def _decode_call_local(bytecode: list, ip: int) -> tuple:
+    return op_call_local, (bytecode[ip + 1], ip + 2), ip + 2
+
+
+DECODERS: dict[Any, Callable[[list, int], tuple]] = {
+    Operation.GET_GLOBAL: _one_operand(op_get_global),
+    Operation.CALL_GLOBAL: _decode_call_global,
+    Operation.AND: _one_operand(op_and),
+    Operation.OR: _one_operand(op_or),
+    Operation.NOT: _no_operands(op_not),
+    Operation.PLUS: _no_operands(op_plus),
+    Operation.MINUS: _no_operands(op_minus),
+    Operation.MULTIPLY: _no_operands(op_multiply),
+    Operation.DIVIDE: _no_operands(op_divide),
+    Operation.MOD: _no_operands(op_mod),
+    Operation.EQ: _no_operands(op_eq),
+    Operation.NOT_EQ: _no_operands(op_not_eq),
+    Operation.GT: _no_operands(op_gt),
+    Operation.GT_EQ: _no_operands(op_gt_eq),
+    Operation.LT: _no_operands(op_lt),
+    Operation.LT_EQ: _no_operands(op_lt_eq),
+    Operation.LIKE: _no_operands(op_like),
+    Operation.ILIKE: _no_operands(op_ilike),
+    Operation.NOT_LIKE: _no_operands(op_not_like),
+    Operation.NOT_ILIKE: _no_operands(op_not_ilike),
+    Operation.IN: _no_operands(op_in),
+    Operation.NOT_IN: _no_operands(op_not_in),
+    Operation.REGEX: _no_operands(op_regex),
+    Operation.NOT_REGEX: _no_operands(op_not_regex),
+    Operation.IREGEX: _no_operands(op_iregex),
+    Operation.NOT_IREGEX: _no_operands(op_not_iregex),
+    Operation.TRUE: _no_operands(op_true),
+    Operation.FALSE: _no_operands(op_false),
+    Operation.NULL: _no_operands(op_null),
+    Operation.STRING: _one_operand(op_push_operand),
+    Operation.INTEGER: _one_operand(op_push_operand),
+    Operation.FLOAT: _one_operand(op_push_operand),
+    Operation.POP: _no_operands(op_pop),
+    Operation.GET_LOCAL: _one_operand(op_get_local),
+    Operation.SET_LOCAL: _one_operand(op_set_local),
+    Operation.RETURN: _no_operands(op_return),
+    Operation.JUMP: _jump(op_jump),
+    Operation.JUMP_IF_FALSE: _jump(op_jump_if_false),
+    Operation.DECLARE_FN: _decode_declare_fn,
+    Operation.DICT: _one_operand(op_dict),
+    Operation.ARRAY: _one_operand(op_array),
+    Operation.TUPLE: _one_operand(op_tuple),
+    Operation.GET_PROPERTY: _no_operands(op_get_property),
+    Operation.SET_PROPERTY: _no_operands(op_set_property),
+    Operation.JUMP_IF_STACK_NOT_NULL: _jump(op_jump_if_stack_not_null),
+    Operation.GET_PROPERTY_NULLISH: _no_operands(op_get_property_nullish),
+    Operation.THROW: _no_operands(op_throw),
+    Operation.TRY: _decode_try,
+    Operation.POP_TRY: _no_operands(op_pop_try),
+    Operation.CALLABLE: _decode_callable,
+    Operation.CLOSURE: _decode_closure,
+    Operation.CALL_LOCAL: _decode_call_local,
+    Operation.GET_UPVALUE: _one_operand(op_get_upvalue),
+    Operation.SET_UPVALUE: _one_operand(op_set_upvalue),
+    Operation.CLOSE_UPVALUE: _no_operands(op_close_upvalue),
+}
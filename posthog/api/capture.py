@@ -3,6 +3,7 @@ import json
 import re
 from random import random
 
+import orjson
 import sentry_sdk
 import structlog
 import time
@@ -178,13 +179,21 @@ def build_kafka_event_data(
         "distinct_id": safe_clickhouse_string(distinct_id),
         "ip": safe_clickhouse_string(ip) if ip else ip,
         "site_url": safe_clickhouse_string(site_url),
-        "data": json.dumps(data),
+        "data": serialize_event(data),
         "now": now.isoformat(),
         "sent_at": sent_at.isoformat() if sent_at else "",
         "token": token,
     }
 
 
+def serialize_event(data: dict) -> str:
+    try:
+        return orjson.dumps(data).decode("utf-8")
+    except orjson.JSONEncodeError:
+        # orjson is strict about e.g. integers over 64 bits and lone surrogates, which json handles
+        return json.dumps(data)
+
+
 def _kafka_topic(event_name: str, historical: bool = False, overflowing: bool = False) -> str:
     # To allow for different quality of service on session recordings
     # and other events, we push to a different topic.
@@ -233,6 +242,24 @@ def log_event(
         raise
 
 
+def log_events(topic: str, messages: list[tuple[dict, Optional[str]]]) -> list[FutureRecordMetadata]:
+    """Produces already built (data, partition_key) messages for analytics events, which all go to one topic."""
+    logger.debug("logging_events", kafka_topic=topic, count=len(messages))
+
+    try:
+        producer = KafkaProducer()
+        futures = [
+            producer.produce(topic=topic, data=data, key=partition_key, headers=None)
+            for data, partition_key in messages
+        ]
+        statsd.incr("posthog_cloud_plugin_server_ingestion", len(futures))
+        return futures
+    except Exception:
+        statsd.incr("capture_endpoint_log_event_error")
+        logger.exception("Failed to produce event to Kafka topic %s with error", topic)
+        raise
+
+
 def _datetime_from_seconds_or_millis(timestamp: str) -> datetime:
     if len(timestamp) > 11:  # assuming milliseconds / update "11" to "12" if year > 5138 (set a reminder!)
         timestamp_number = float(timestamp) / 1000
@@ -518,27 +545,22 @@ def get_event(request):
 
     with start_span(op="kafka.produce") as span:
         span.set_tag("event.count", len(processed_events))
-        for event, event_uuid, distinct_id in processed_events:
-            try:
-                futures.append(
-                    capture_internal(
-                        event, distinct_id, ip, site_url, now, sent_at, event_uuid, token, historical=historical
-                    )
-                )
-            except Exception as exc:
-                capture_exception(exc, {"data": data})
-                statsd.incr("posthog_cloud_raw_endpoint_failure", tags={"endpoint": "capture"})
-                logger.exception("kafka_produce_failure", exc_info=exc)
-                return cors_response(
-                    request,
-                    generate_exception_response(
-                        "capture",
-                        "Unable to store event. Please try again. If you are the owner of this app you can check the logs for further details.",
-                        code="server_error",
-                        type="server_error",
-                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    ),
-                )
+        try:
+            futures = capture_batch(processed_events, ip, site_url, now, sent_at, token, historical=historical)
+        except Exception as exc:
+            capture_exception(exc, {"data": data})
+            statsd.incr("posthog_cloud_raw_endpoint_failure", tags={"endpoint": "capture"})
+            logger.exception("kafka_produce_failure", exc_info=exc)
+            return cors_response(
+                request,
+                generate_exception_response(
+                    "capture",
+                    "Unable to store event. Please try again. If you are the owner of this app you can check the logs for further details.",
+                    code="server_error",
+                    type="server_error",
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                ),
+            )
 
     with start_span(op="kafka.wait"):
         span.set_tag("future.count", len(futures))
@@ -883,6 +905,135 @@ def capture_internal(
     return log_event(parsed_event, event["event"], partition_key=kafka_partition_key, historical=historical)
 
 
+def capture_batch(
+    events: list[tuple[dict[str, Any], UUIDT, str]],
+    ip: Optional[str],
+    site_url: str,
+    now: datetime,
+    sent_at: Optional[datetime],
+    token: str,
+    historical: bool = False,
+) -> list[FutureRecordMetadata]:
+    """
+    Like `capture_internal` for each of the preprocessed events, but builds the Kafka messages for all analytics
+    events in one pass and decides their partition keys once per distinct ID rather than once per event.
+    """
+    futures: list[FutureRecordMetadata] = []
+    analytics_events: list[tuple[dict[str, Any], UUIDT, str]] = []
+    for event, event_uuid, distinct_id in events:
+        if event["event"] in SESSION_RECORDING_EVENT_NAMES:
+            futures.append(capture_internal(event, distinct_id, ip, site_url, now, sent_at, event_uuid, token))
+        else:
+            analytics_events.append((event, event_uuid, distinct_id))
+
+    if not analytics_events:
+        return futures
+
+    # The fields that are the same for every event in the batch
+    safe_ip = safe_clickhouse_string(ip) if ip else ip
+    safe_site_url = safe_clickhouse_string(site_url)
+    now_isoformat = now.isoformat()
+    sent_at_isoformat = sent_at.isoformat() if sent_at else ""
+
+    partition_keys = get_partition_keys(
+        token, [distinct_id for _, _, distinct_id in analytics_events], historical=historical
+    )
+    messages = [
+        (
+            {
+                "uuid": str(event_uuid),
+                "distinct_id": safe_clickhouse_string(distinct_id),
+                "ip": safe_ip,
+                "site_url": safe_site_url,
+                "data": serialize_event(event),
+                "now": now_isoformat,
+                "sent_at": sent_at_isoformat,
+                "token": token,
+            },
+            partition_key,
+        )
+        for (event, event_uuid, distinct_id), partition_key in zip(analytics_events, partition_keys)
+    ]
+
+    futures.extend(log_events(_kafka_topic(analytics_events[0][0]["event"], historical=historical), messages))
+    return futures
+
+
+def get_partition_keys(token: str, distinct_ids: list[str], historical: bool = False) -> list[Optional[str]]:
+    """
+    The partition key for each of a batch of events, as `capture_internal` would choose them one event at a time.
+
+    Each distinct ID's token bucket is checked once for all of its events in the batch. If the bucket doesn't have
+    capacity for all of them, the events it has capacity for keep the key, in order, and the rest are randomly
+    partitioned.
+    """
+    candidate_partition_keys = [f"{token}:{distinct_id}" for distinct_id in distinct_ids]
+    if historical or not settings.CAPTURE_ALLOW_RANDOM_PARTITIONING:
+        return list(candidate_partition_keys)
+
+    keys_to_override = settings.EVENT_PARTITION_KEYS_TO_OVERRIDE
+
+    # How many more events with each key can keep it
+    remaining_capacity: dict[str, int] = {}
+    event_counts: dict[tuple[str, str], int] = {}
+    for distinct_id, candidate_partition_key in zip(distinct_ids, candidate_partition_keys):
+        event_counts[(distinct_id, candidate_partition_key)] = (
+            event_counts.get((distinct_id, candidate_partition_key), 0) + 1
+        )
+
+    for (distinct_id, candidate_partition_key), count in event_counts.items():
+        if distinct_id.lower() in LIKELY_ANONYMOUS_IDS:
+            remaining_capacity[candidate_partition_key] = 0
+            continue
+
+        if settings.PARTITION_KEY_AUTOMATIC_OVERRIDE_ENABLED:
+            capacity = _consume_partition_key_capacity(candidate_partition_key, count)
+        else:
+            capacity = count
+        remaining_capacity[candidate_partition_key] = 0 if candidate_partition_key in keys_to_override else capacity
+
+    partition_keys: list[Optional[str]] = []
+    for candidate_partition_key in candidate_partition_keys:
+        if remaining_capacity[candidate_partition_key] > 0:
+            remaining_capacity[candidate_partition_key] -= 1
+            partition_keys.append(candidate_partition_key)
+        else:
+            partition_keys.append(None)
+    return partition_keys
+
+
+def _consume_partition_key_capacity(candidate_partition_key: str, count: int) -> int:
+    """Takes up to `count` tokens from the key's bucket, returning how many of the events it had capacity for."""
+    if LIMITER.consume(candidate_partition_key, count):
+        return count
+
+    consumed = 0
+    if count > 1:
+        # Not enough for all of them, so take what's left one by one
+        while consumed < count and LIMITER.consume(candidate_partition_key):
+            consumed += 1
+
+    _log_partition_key_capacity_exceeded(candidate_partition_key)
+    return consumed
+
+
+def _log_partition_key_capacity_exceeded(candidate_partition_key: str) -> None:
+    if not LOG_RATE_LIMITER.consume(candidate_partition_key):
+        # Return early if we have logged this key already.
+        return
+
+    PARTITION_KEY_CAPACITY_EXCEEDED_COUNTER.labels(partition_key=candidate_partition_key.split(":")[0]).inc()
+    statsd.incr(
+        "partition_key_capacity_exceeded",
+        tags={"partition_key": candidate_partition_key},
+    )
+    logger.warning(
+        "Partition key %s overridden as bucket capacity of %s tokens exceeded",
+        candidate_partition_key,
+        LIMITER._capacity,
+    )
+
+
 def is_randomly_partitioned(candidate_partition_key: str) -> bool:
     """Check whether event with given partition key is to be randomly partitioned.
 
@@ -912,20 +1063,7 @@ def is_randomly_partitioned(candidate_partition_key: str) -> bool:
         has_capacity = LIMITER.consume(candidate_partition_key)
 
         if not has_capacity:
-            if not LOG_RATE_LIMITER.consume(candidate_partition_key):
-                # Return early if we have logged this key already.
-                return True
-
-            PARTITION_KEY_CAPACITY_EXCEEDED_COUNTER.labels(partition_key=candidate_partition_key.split(":")[0]).inc()
-            statsd.incr(
-                "partition_key_capacity_exceeded",
-                tags={"partition_key": candidate_partition_key},
-            )
-            logger.warning(
-                "Partition key %s overridden as bucket capacity of %s tokens exceeded",
-                candidate_partition_key,
-                LIMITER._capacity,
-            )
+            _log_partition_key_capacity_exceeded(candidate_partition_key)
             return True
 
     keys_to_override = settings.EVENT_PARTITION_KEYS_TO_OVERRIDE
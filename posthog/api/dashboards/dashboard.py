@@ -16,7 +16,7 @@ from posthog.api.dashboards.dashboard_template_json_schema_parser import (
     DashboardTemplateCreationJSONSchemaParser,
 )
 from posthog.api.forbid_destroy_model import ForbidDestroyModel
-from posthog.api.insight import InsightSerializer, InsightViewSet
+from posthog.api.insight import InsightSerializer, InsightViewSet, insight_execution_mode
 from posthog.api.monitoring import Feature, monitor
 from posthog.api.routing import TeamAndOrgViewSetMixin
 from posthog.api.shared import UserBasicSerializer
@@ -372,6 +372,8 @@ class DashboardSerializer(DashboardBasicSerializer):
         Insight.objects.bulk_update(insights_to_undelete, ["deleted"])
 
     def get_tiles(self, dashboard: Dashboard) -> Optional[list[ReturnDict]]:
+        from posthog.caching.calculate_results import calculate_batched_trends_for_dashboard
+
         if self.context["view"].action == "list":
             return None
 
@@ -389,6 +391,17 @@ class DashboardSerializer(DashboardBasicSerializer):
         )
         self.user_permissions.set_preloaded_dashboard_tiles(list(tiles))
 
+        # Trends tiles scanning the same events are calculated together upfront, instead of one by one below
+        request = self.context["request"]
+        batched_insight_ids = calculate_batched_trends_for_dashboard(
+            dashboard,
+            [tile.insight for tile in tiles if tile.insight is not None and not tile.insight.deleted],
+            execution_mode=insight_execution_mode(request, is_shared=self.context.get("is_shared", False)),
+            user=request.user,
+            filters_override=filters_override_requested_by_client(request),
+        )
+        self.context.update({"batched_insight_ids": batched_insight_ids})
+
         for tile in tiles:
             self.context.update({"dashboard_tile": tile})
 
@@ -47,7 +47,12 @@ from posthog.models.feature_flag import (
     get_user_blast_radius,
 )
 from posthog.models.feature_flag.flag_analytics import increment_request_count
-from posthog.models.feature_flag.flag_matching import check_flag_evaluation_query_is_ok
+from posthog.models.feature_flag.flag_matching import (
+    MAX_BULK_EVALUATION_TARGETS,
+    FlagEvaluationTarget,
+    check_flag_evaluation_query_is_ok,
+    get_all_feature_flags_for_targets,
+)
 from posthog.models.feedback.survey import Survey
 from posthog.models.group_type_mapping import GroupTypeMapping
 from posthog.models.property import Property
@@ -416,6 +421,19 @@ class MinimalFeatureFlagSerializer(serializers.ModelSerializer):
         ]
 
 
+class FlagEvaluationTargetSerializer(serializers.Serializer):
+    distinct_id = serializers.CharField(max_length=400)
+    groups = serializers.DictField(child=serializers.CharField(), required=False, default=dict)
+    person_properties = serializers.DictField(required=False, default=dict)
+    group_properties = serializers.DictField(child=serializers.DictField(), required=False, default=dict)
+
+
+class BulkEvaluationSerializer(serializers.Serializer):
+    targets = serializers.ListField(
+        child=FlagEvaluationTargetSerializer(), allow_empty=False, max_length=MAX_BULK_EVALUATION_TARGETS
+    )
+
+
 class FeatureFlagViewSet(
     TeamAndOrgViewSetMixin,
     TaggedItemViewSetMixin,
@@ -642,6 +660,36 @@ class FeatureFlagViewSet(
             }
         )
 
+    @action(
+        methods=["POST"], detail=False, throttle_classes=[FeatureFlagThrottle], required_scopes=["feature_flag:read"]
+    )
+    def bulk_evaluation(self, request: request.Request, **kwargs):
+        """
+        Evaluate all feature flags for up to 1000 distinct IDs at once, e.g. from a server side SDK.
+        """
+        serializer = BulkEvaluationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        targets = [FlagEvaluationTarget(**target) for target in serializer.validated_data["targets"]]
+
+        results = get_all_feature_flags_for_targets(self.team_id, targets)
+
+        # Add request for analytics, counting each distinct ID like a /decide request
+        increment_request_count(self.team.pk, len(targets), FlagRequestType.DECIDE)
+
+        return Response(
+            {
+                "results": [
+                    {
+                        "distinct_id": target.distinct_id,
+                        "flags": flags,
+                        "payloads": payloads,
+                        "errors_while_computing_flags": errors,
+                    }
+                    for target, (flags, _, payloads, errors) in zip(targets, results)
+                ]
+            }
+        )
+
     @action(methods=["GET"], detail=False)
     def evaluation_reasons(self, request: request.Request, **kwargs):
         distinct_id = request.query_params.get("distinct_id", None)
@@ -124,6 +124,13 @@ INSIGHT_REFRESH_INITIATED_COUNTER = Counter(
 )
 
 
+def insight_execution_mode(request: Request, *, is_shared: bool) -> ExecutionMode:
+    execution_mode = execution_mode_from_refresh(refresh_requested_by_client(request))
+    if is_shared:
+        execution_mode = shared_insights_execution_mode(execution_mode)
+    return execution_mode
+
+
 def log_and_report_insight_activity(
     *,
     activity: str,
@@ -636,12 +643,14 @@ class InsightSerializer(InsightBasicSerializer, UserPermissionsSerializerMixin):
 
         with conversion_to_query_based(insight):
             try:
-                refresh_requested = refresh_requested_by_client(self.context["request"])
-                execution_mode = execution_mode_from_refresh(refresh_requested)
+                execution_mode = insight_execution_mode(
+                    self.context["request"], is_shared=self.context.get("is_shared", False)
+                )
                 filters_override = filters_override_requested_by_client(self.context["request"])
 
-                if self.context.get("is_shared", False):
-                    execution_mode = shared_insights_execution_mode(execution_mode)
+                if insight.pk in self.context.get("batched_insight_ids", ()):
+                    # Just calculated together with other insights of the dashboard, so the cached result is fresh
+                    execution_mode = ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE
 
                 return calculate_for_query_based_insight(
                     insight,
@@ -3,6 +3,8 @@ from posthog.clickhouse.client.connection import Workload
 from posthog.models.person.missing_person import MissingPerson
 from posthog.renderers import SafeJSONRenderer
 from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+from uuid import UUID
 from typing import (  # noqa: UP035
     Any,
     List,
@@ -38,6 +40,8 @@ from posthog.constants import (
     FunnelVizType,
 )
 from posthog.hogql.constants import CSV_EXPORT_LIMIT
+from posthog.hogql.errors import QueryError
+from posthog.hogql_queries.insights.paginators import decode_cursor, encode_cursor
 from posthog.decorators import cached_by_filters
 from posthog.logging.timing import timed
 from posthog.models import Cohort, Filter, Person, User, Team
@@ -119,7 +123,7 @@ class PersonLimitOffsetPagination(LimitOffsetPagination):
                     "type": "string",
                     "nullable": True,
                     "format": "uri",
-                    "example": "https://app.posthog.com/api/projects/{project_id}/accounts/?offset=400&limit=100",
+                    "example": "https://app.posthog.com/api/projects/{project_id}/accounts/?limit=100&cursor=WyIyMDI0LTAxLTAxIl0",
                 },
                 "previous": {
                     "type": "string",
@@ -133,6 +137,25 @@ class PersonLimitOffsetPagination(LimitOffsetPagination):
         }
 
 
+def parse_person_list_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        values = decode_cursor(cursor)
+    except QueryError:
+        values = []
+    if len(values) != 2 or not isinstance(values[0], datetime) or not isinstance(values[1], UUID):
+        raise ValidationError({"cursor": "Invalid pagination cursor"})
+    return values[0], values[1]
+
+
+def format_cursor_url(request: request.Request, cursor: str) -> str:
+    """Returns the requested URL with `cursor` set, and `offset` removed, as the cursor replaces it."""
+    url = urlparse(request.build_absolute_uri())
+    params = [
+        (key, value) for key, value in parse_qsl(url.query, keep_blank_values=True) if key not in ("cursor", "offset")
+    ]
+    return urlunparse(url._replace(query=urlencode([*params, ("cursor", cursor)])))
+
+
 def get_person_name(team: Team, person: Person) -> str:
     return get_person_name_helper(person.pk, person.properties, person.distinct_ids, team)
 
@@ -281,6 +304,11 @@ class PersonViewSet(TeamAndOrgViewSetMixin, viewsets.ModelViewSet):
                 OpenApiTypes.STR,
                 description="Search persons, either by email (full text search) or distinct_id (exact match).",
             ),
+            OpenApiParameter(
+                "cursor",
+                OpenApiTypes.STR,
+                description="Return the persons after this cursor. Use the `next` URL to paginate, instead of building it.",
+            ),
             PersonPropertiesSerializer(required=False),
         ],
     )
@@ -296,7 +324,12 @@ class PersonViewSet(TeamAndOrgViewSetMixin, viewsets.ModelViewSet):
         elif not filter.limit:
             filter = filter.shallow_clone({LIMIT: DEFAULT_PAGE_LIMIT})
 
-        person_query = PersonQuery(filter, team.pk)
+        # The next page starts after the last person of this one, instead of skipping all the persons before it
+        cursor = parse_person_list_cursor(request.GET["cursor"]) if request.GET.get("cursor") else None
+        if cursor is not None:
+            filter = filter.shallow_clone({OFFSET: 0})
+
+        person_query = PersonQuery(filter, team.pk, extra_fields=["created_at"], cursor=cursor)
         paginated_query, paginated_params = person_query.get_query(paginate=True, filter_future_persons=True)
 
         raw_paginated_result = insight_sync_execute(
@@ -310,6 +343,10 @@ class PersonViewSet(TeamAndOrgViewSetMixin, viewsets.ModelViewSet):
         actor_ids = [row[0] for row in raw_paginated_result]
         serialized_actors = get_serialized_people(team, actor_ids)
         _should_paginate = len(actor_ids) >= filter.limit
+        created_at_index = 1 + person_query.fields.index("created_at")
+        next_cursor = (
+            encode_cursor([raw_paginated_result[-1][created_at_index], actor_ids[-1]]) if _should_paginate else None
+        )
 
         # If the undocumented include_total param is set to true, we'll return the total count of people
         # This is extra time and DB load, so we only do this when necessary, which is in PostHog 3000 navigation
@@ -327,10 +364,10 @@ class PersonViewSet(TeamAndOrgViewSetMixin, viewsets.ModelViewSet):
             )
             total_count = raw_paginated_result[0][0]
 
-        next_url = format_query_params_absolute_url(request, filter.offset + filter.limit) if _should_paginate else None
+        next_url = format_cursor_url(request, next_cursor) if next_cursor else None
         previous_url = (
             format_query_params_absolute_url(request, filter.offset - filter.limit)
-            if filter.offset - filter.limit >= 0
+            if cursor is None and filter.offset - filter.limit >= 0
             else None
         )
 
@@ -1,18 +1,20 @@
 import json
 import re
+import time
 import uuid
 
 from django.http import JsonResponse, StreamingHttpResponse
 from drf_spectacular.utils import OpenApiResponse
 from pydantic import BaseModel
 from rest_framework import status, viewsets
-from rest_framework.exceptions import NotAuthenticated, ValidationError
+from rest_framework.exceptions import NotAuthenticated, Throttled, ValidationError
 from rest_framework.renderers import BaseRenderer
 from rest_framework.request import Request
 from rest_framework.response import Response
 from sentry_sdk import capture_exception, set_tag
 
 from ee.hogai.generate_trends_agent import Conversation, GenerateTrendsAgent
+from posthog import redis
 from posthog.api.documentation import extend_schema
 from posthog.api.mixins import PydanticModelMixin
 from posthog.api.monitoring import Feature, monitor
@@ -20,9 +22,12 @@ from posthog.api.routing import TeamAndOrgViewSetMixin
 from posthog.api.services.query import process_query_model
 from posthog.api.utils import action
 from posthog.clickhouse.client.execute_async import (
+    QueryNotFoundError,
     cancel_query,
     get_query_status,
+    iter_query_status_events,
 )
+from posthog.clickhouse.client.limit import lua_script as limit_concurrency_script
 from posthog.clickhouse.query_tagging import tag_queries
 from posthog.errors import ExposedCHQueryError
 from posthog.event_usage import report_user_action
@@ -37,8 +42,15 @@ from posthog.rate_limit import (
     HogQLQueryThrottle,
     ClickHouseBurstRateThrottle,
     ClickHouseSustainedRateThrottle,
+    QueryStatusStreamThrottle,
 )
-from posthog.schema import QueryRequest, QueryResponseAlternative, QueryStatusResponse
+from posthog.schema import QueryRequest, QueryResponseAlternative, QueryStatus, QueryStatusResponse
+
+# Streams of query status end after this long, clients reconnect if the query is still running
+QUERY_STATUS_STREAM_TIMEOUT_SECONDS = 60 * 5
+# Each open stream holds a web worker, so only this many can be open per team, the rest poll
+QUERY_STATUS_STREAM_MAX_CONCURRENT_PER_TEAM = 10
+QUERY_STATUS_STREAMS_KEY = "query_status_streams:team:{team_id}"
 
 
 class ServerSentEventRenderer(BaseRenderer):
@@ -53,13 +65,15 @@ class QueryViewSet(TeamAndOrgViewSetMixin, PydanticModelMixin, viewsets.ViewSet)
     # NOTE: Do we need to override the scopes for the "create"
     scope_object = "query"
     # Special case for query - these are all essentially read actions
-    scope_object_read_actions = ["retrieve", "create", "list", "destroy"]
+    scope_object_read_actions = ["retrieve", "create", "list", "destroy", "stream"]
     scope_object_write_actions: list[str] = []
     sharing_enabled_actions = ["retrieve"]
 
     def get_throttles(self):
         if self.action in ("draft_sql", "chat"):
             return [AIBurstRateThrottle(), AISustainedRateThrottle()]
+        if self.action == "stream":
+            return [QueryStatusStreamThrottle()]
         if query := self.request.data.get("query"):
             if isinstance(query, dict) and query.get("kind") == "HogQLQuery":
                 return [HogQLQueryThrottle()]
@@ -148,6 +162,50 @@ class QueryViewSet(TeamAndOrgViewSetMixin, PydanticModelMixin, viewsets.ViewSet)
         cancel_query(self.team.pk, pk)
         return Response(status=204)
 
+    @extend_schema(
+        description="(Experimental) Server-sent events with the progress of the query, then its status once complete",
+        responses={200: OpenApiResponse(description="Stream of `progress` and `status` events")},
+    )
+    @action(methods=["GET"], detail=True, renderer_classes=[ServerSentEventRenderer])
+    def stream(self, request: Request, pk=None, *args, **kwargs) -> StreamingHttpResponse:
+        get_query_status(team_id=self.team.pk, query_id=pk)  # 404 before starting the stream
+
+        redis_client = redis.get_client()
+        streams_key = QUERY_STATUS_STREAMS_KEY.format(team_id=self.team.pk)
+        stream_id = str(uuid.uuid4())
+        # Entries of streams that never got to remove themselves expire a bit after the stream would have ended
+        if not redis_client.eval(
+            limit_concurrency_script,
+            1,
+            streams_key,
+            int(time.time()),
+            stream_id,
+            QUERY_STATUS_STREAM_MAX_CONCURRENT_PER_TEAM,
+            QUERY_STATUS_STREAM_TIMEOUT_SECONDS + 60,
+        ):
+            raise Throttled(detail="Too many open query status streams for this project, poll the status instead.")
+
+        def generate():
+            try:
+                for event, data in iter_query_status_events(
+                    team_id=self.team.pk, query_id=pk, timeout=QUERY_STATUS_STREAM_TIMEOUT_SECONDS
+                ):
+                    if data is None:
+                        yield f": {event}\n\n"
+                    elif isinstance(data, QueryStatus):
+                        yield f"event: status\ndata: {QueryStatusResponse(query_status=data).model_dump_json()}\n\n"
+                    else:
+                        yield f"event: {event}\ndata: {data.model_dump_json()}\n\n"
+            except QueryNotFoundError as e:
+                yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+            finally:
+                redis_client.zrem(streams_key, stream_id)
+
+        response = StreamingHttpResponse(generate(), content_type=ServerSentEventRenderer.media_type)
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
     @action(methods=["GET"], detail=False)
     def draft_sql(self, request: Request, *args, **kwargs) -> Response:
         if not isinstance(request.user, User):
@@ -1,5 +1,6 @@
 import structlog
 from typing import Optional
+from collections.abc import Collection, Iterator
 
 from pydantic import BaseModel
 from rest_framework.exceptions import ValidationError
@@ -10,7 +11,7 @@ from posthog.cloud_utils import is_cloud
 from posthog.hogql.bytecode import execute_hog
 from posthog.hogql.constants import LimitContext
 from posthog.hogql.context import HogQLContext
-from posthog.hogql.database.database import create_hogql_database, serialize_database
+from posthog.hogql.database.database import get_cached_hogql_database, serialize_database
 from posthog.hogql.autocomplete import get_hogql_autocomplete
 from posthog.hogql.metadata import get_hogql_metadata
 from posthog.hogql.modifiers import create_default_modifiers_for_team
@@ -58,6 +59,32 @@ def process_query_dict(
     )
 
 
+def process_query_dict_iter(
+    team: Team,
+    query_json: dict,
+    *,
+    limit_context: Optional[LimitContext] = None,
+    actor_properties: Optional[Collection[str]] = None,
+) -> tuple[list[str], Iterator[list]]:
+    """
+    Like `process_query_dict` with `ExecutionMode.CALCULATE_BLOCKING_ALWAYS`, but streams the rows of events and actors
+    queries instead of loading all of them in memory. Returns the columns and an iterator of rows. Actors only have
+    `actor_properties`, if given.
+    """
+    # Imported here, as the actors runner imports the insight runners, which import this module through the cache
+    from posthog.hogql_queries.actors_query_runner import ActorsQueryRunner
+    from posthog.hogql_queries.events_query_runner import EventsQueryRunner
+
+    model = QuerySchemaRoot.model_validate(query_json)
+    tag_queries(query=query_json)
+    query_runner = get_query_runner(model.root, team, limit_context=limit_context)
+    if isinstance(query_runner, ActorsQueryRunner):
+        return query_runner.calculate_iter(actor_properties=actor_properties)
+    if isinstance(query_runner, EventsQueryRunner):
+        return query_runner.calculate_iter()
+    raise ValidationError(f"Can't stream the results of query kind: {model.root.__class__.__name__}")
+
+
 def process_query_model(
     team: Team,
     query: BaseModel,  # mypy has problems with unions and isinstance
@@ -111,7 +138,9 @@ def process_query_model(
             metadata_response = get_hogql_metadata(query=metadata_query, team=team)
             result = metadata_response
         elif isinstance(query, DatabaseSchemaQuery):
-            database = create_hogql_database(team.pk, modifiers=create_default_modifiers_for_team(team))
+            database = get_cached_hogql_database(
+                team.pk, modifiers=create_default_modifiers_for_team(team), team_arg=team
+            )
             context = HogQLContext(team_id=team.pk, team=team, database=database)
             result = DatabaseSchemaQueryResponse(tables=serialize_database(context))
         else:
@@ -427,6 +427,36 @@ class TestCapture(BaseTest):
                 ):
                     assert capture.is_randomly_partitioned(partition_key) is False
 
+    def test_get_partition_keys_for_batch(self):
+        """Assert a batch consumes each key's bucket once, and the events over its capacity are randomly partitioned."""
+        token = self.team.api_token
+        limiter = Limiter(
+            rate=1,
+            capacity=2,
+            storage=MemoryStorage(),
+        )
+
+        with patch("posthog.api.capture.LIMITER", new=limiter), freeze_time(datetime.now(UTC)):
+            with self.settings(
+                EVENT_PARTITION_KEYS_TO_OVERRIDE=[f"{token}:overridden"],
+                PARTITION_KEY_AUTOMATIC_OVERRIDE_ENABLED=True,
+                CAPTURE_ALLOW_RANDOM_PARTITIONING=True,
+            ):
+                assert capture.get_partition_keys(token, ["hot", "other", "hot", "hot", "overridden", "null"]) == [
+                    f"{token}:hot",
+                    f"{token}:other",
+                    f"{token}:hot",
+                    None,
+                    None,
+                    None,
+                ]
+                assert capture.is_randomly_partitioned(f"{token}:hot") is True
+
+                assert capture.get_partition_keys(token, ["hot", "null"], historical=True) == [
+                    f"{token}:hot",
+                    f"{token}:null",
+                ]
+
     @patch("posthog.kafka_client.client._KafkaProducer.produce")
     def test_capture_event(self, kafka_produce):
         data = {
@@ -987,7 +1017,7 @@ class TestCapture(BaseTest):
 
         validate_response(openapi_spec, response)
 
-    @patch("gzip.decompress")
+    @patch("posthog.utils.gunzip")
     @patch("posthog.kafka_client.client._KafkaProducer.produce")
     def test_invalid_js_gzip_zlib_error(self, kafka_produce, gzip_decompress):
         """
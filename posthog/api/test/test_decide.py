@@ -4521,13 +4521,13 @@ class TestDecideUsesReadReplica(TransactionTestCase):
             )
             self.assertFalse(response.json()["errorsWhileComputingFlags"])
 
-        with self.assertNumQueries(9, using="replica"), self.assertNumQueries(0, using="default"):
+        with self.assertNumQueries(8, using="replica"), self.assertNumQueries(0, using="default"):
             # E   1. SET LOCAL statement_timeout = 300
             # E   2. SELECT "posthog_grouptypemapping"."id", "posthog_grouptypemapping"."team_id", -- a.k.a get group type mappings
 
             # E   3. SET LOCAL statement_timeout = 600
-            # E   4. SELECT (UPPER(("posthog_group"."group_properties" ->> 'email')::text) AS "flag_182_condition_0" FROM "posthog_group" -- a.k.a get group0 conditions
-            # E   5. SELECT (true) AS "flag_181_condition_0" FROM "posthog_group" WHERE ("posthog_group"."team_id" = 91 -- a.k.a get group1 conditions
+            # E   4. SELECT '0'::text, row_to_json(entity_row) FROM (SELECT ... AS "flag_182_condition_0" FROM "posthog_group" ...)
+            #        UNION ALL SELECT '1'::text, row_to_json(entity_row) FROM (...) -- a.k.a get group0 and group1 conditions
             response = self._post_decide(
                 distinct_id="example_id",
                 groups={"organization": "foo2", "project": "bar"},
@@ -4538,13 +4538,12 @@ class TestDecideUsesReadReplica(TransactionTestCase):
             )
             self.assertFalse(response.json()["errorsWhileComputingFlags"])
 
-        with self.assertNumQueries(9, using="replica"), self.assertNumQueries(0, using="default"):
+        with self.assertNumQueries(8, using="replica"), self.assertNumQueries(0, using="default"):
             # E   2. SET LOCAL statement_timeout = 300
             # E   3. SELECT "posthog_grouptypemapping"."id", "posthog_grouptypemapping"."team_id", -- a.k.a get group type mappings
 
             # E   6. SET LOCAL statement_timeout = 600
-            # E   7. SELECT (UPPER(("posthog_group"."group_properties" ->> 'email')::text) AS "flag_182_condition_0" FROM "posthog_group" -- a.k.a get group0 conditions
-            # E   8. SELECT (true) AS "flag_181_condition_0" FROM "posthog_group" WHERE ("posthog_group"."team_id" = 91 -- a.k.a get group1 conditions
+            # E   7. SELECT '0'::text, row_to_json(entity_row) FROM (...) UNION ALL SELECT '1'::text, ... -- a.k.a get group0 and group1 conditions
             response = self._post_decide(
                 distinct_id="example_id",
                 groups={"organization": "foo", "project": "bar"},
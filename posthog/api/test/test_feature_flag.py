@@ -2885,6 +2885,57 @@ class TestFeatureFlag(APIBaseTest, ClickhouseTestMixin):
                 {b"165192618": b"6"},
             )
 
+    def test_bulk_evaluation(self):
+        FeatureFlag.objects.all().delete()
+        GroupTypeMapping.objects.create(team=self.team, group_type="organization", group_type_index=0)
+        Person.objects.create(team_id=self.team.pk, distinct_ids=["beta-user"], properties={"plan": "beta"})
+        FeatureFlag.objects.create(
+            key="beta-feature",
+            team=self.team,
+            filters={"groups": [{"properties": [{"key": "plan", "value": "beta"}], "rollout_percentage": 100}]},
+            created_by=self.user,
+        )
+        FeatureFlag.objects.create(
+            key="group-feature",
+            team=self.team,
+            filters={"aggregation_group_type_index": 0, "groups": [{"rollout_percentage": 100}]},
+            created_by=self.user,
+        )
+
+        response = self.client.post(
+            f"/api/projects/{self.team.pk}/feature_flags/bulk_evaluation",
+            {
+                "targets": [
+                    {"distinct_id": "beta-user"},
+                    {"distinct_id": "unknown-user", "groups": {"organization": "posthog"}},
+                    {"distinct_id": "local-user", "person_properties": {"plan": "beta"}},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(result["distinct_id"], result["flags"]) for result in response.json()["results"]],
+            [
+                ("beta-user", {"beta-feature": True, "group-feature": False}),
+                ("unknown-user", {"beta-feature": False, "group-feature": True}),
+                ("local-user", {"beta-feature": True, "group-feature": False}),
+            ],
+        )
+
+    def test_bulk_evaluation_validates_targets(self):
+        response = self.client.post(
+            f"/api/projects/{self.team.pk}/feature_flags/bulk_evaluation",
+            {"targets": [{"distinct_id": str(i)} for i in range(1001)]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            f"/api/projects/{self.team.pk}/feature_flags/bulk_evaluation", {"targets": []}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     @patch("posthog.api.feature_flag.report_user_action")
     def test_evaluation_reasons(self, mock_capture):
         FeatureFlag.objects.all().delete()
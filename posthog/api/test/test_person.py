@@ -888,6 +888,31 @@ class TestPerson(ClickhouseTestMixin, APIBaseTest):
             response_include_total = self.client.get("/api/person/?limit=10&include_total").json()
         self.assertEqual(response_include_total["count"], 20)  #  With `include_total`, the total count is returned too
 
+    @override_settings(PERSON_ON_EVENTS_V2_OVERRIDE=False)
+    def test_pagination_with_cursor(self):
+        created_ids = []
+        with freeze_time("2024-01-01T12:00:00Z"):
+            # Persons created at the same time are still returned exactly once
+            for index in range(7):
+                created_ids.append(str(index + 100))
+                Person.objects.create(team=self.team, distinct_ids=[str(index + 100)])
+
+        returned_ids = []
+        url: Optional[str] = "/api/person/?limit=3"
+        while url:
+            response = self.client.get(url).json()
+            returned_ids += [x["distinct_ids"][0] for x in response["results"]]
+            url = response["next"]
+            if url:
+                self.assertIn("cursor=", url)
+                self.assertNotIn("offset=", url)
+                self.assertEqual(self.client.get(url).json()["previous"], None)
+
+        self.assertEqual(sorted(returned_ids), sorted(created_ids))
+
+        response = self.client.get("/api/person/?limit=3&cursor=invalid")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_retrieve_person(self):
         person = Person.objects.create(  # creating without _create_person to guarentee created_at ordering
             team=self.team, distinct_ids=["123456789"]
@@ -1089,6 +1089,46 @@ class TestQueryRetrieve(APIBaseTest):
         self.assertEqual(response.status_code, 400)
         self.assertTrue(response.json()["query_status"]["error"])
 
+    def test_stream_completed_query(self):
+        self.redis_client_mock.get.return_value = json.dumps(
+            {
+                "id": self.valid_query_id,
+                "team_id": self.team_id,
+                "complete": True,
+                "results": ["result1", "result2"],
+            }
+        ).encode()
+        response = self.client.get(
+            f"/api/projects/{self.team.id}/query/{self.valid_query_id}/stream/", HTTP_ACCEPT="text/event-stream"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        content = response.getvalue().decode()
+        self.assertTrue(content.startswith("event: status\ndata: "), content)
+        status = json.loads(content.removeprefix("event: status\ndata: "))["query_status"]
+        self.assertEqual(status["results"], ["result1", "result2"])
+        self.redis_client_mock.pubsub.return_value.close.assert_called_once()
+        self.redis_client_mock.zrem.assert_called_once()
+
+    def test_stream_when_too_many_streams_are_open(self):
+        self.redis_client_mock.get.return_value = json.dumps(
+            {"id": self.valid_query_id, "team_id": self.team_id, "complete": False}
+        ).encode()
+        self.redis_client_mock.eval.return_value = 0
+        response = self.client.get(
+            f"/api/projects/{self.team.id}/query/{self.valid_query_id}/stream/", HTTP_ACCEPT="text/event-stream"
+        )
+        self.assertEqual(response.status_code, 429)
+        self.redis_client_mock.pubsub.assert_not_called()
+
+    def test_stream_with_invalid_query_id(self):
+        self.redis_client_mock.get.return_value = None
+        response = self.client.get(
+            f"/api/projects/{self.team.id}/query/{self.invalid_query_id}/stream/", HTTP_ACCEPT="text/event-stream"
+        )
+        self.assertEqual(response.status_code, 404)
+
     def test_destroy(self):
         self.redis_client_mock.get.return_value = json.dumps(
             {
@@ -1,51 +1,309 @@
+import json
+import os
 import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Hashable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from enum import Enum
 from functools import wraps
-from typing import no_type_check, Any
+from typing import no_type_check, Any, Optional, cast
 
 import orjson
+import structlog
+from prometheus_client import Counter
 from rest_framework.utils.encoders import JSONEncoder
-from django.utils.timezone import now
 from django_redis.serializers.base import BaseSerializer
 
 from posthog.settings import TEST
 
+logger = structlog.get_logger(__name__)
+
+CACHE_FOR_MAX_SIZE = 1024
+CACHE_FOR_REFRESH_WORKERS = 4
+CACHE_FOR_INVALIDATION_CHANNEL = "posthog:cache_for:invalidations"
+CACHE_FOR_INVALIDATION_RETRY_SECONDS = 5
+
+CACHE_FOR_LOOKUPS_COUNTER = Counter(
+    "cache_for_lookups_total",
+    "Lookups in the process-local caches of function results",
+    labelnames=["function", "result"],
+)
+CACHE_FOR_EVICTIONS_COUNTER = Counter(
+    "cache_for_evictions_total",
+    "Entries removed from the process-local caches of function results",
+    labelnames=["function", "reason"],
+)
+
+
+class CacheState(Enum):
+    FRESH = "hit"
+    STALE = "stale"
+    MISSING = "miss"
+
+
+class LocalCache:
+    """
+    Process-local LRU of up to `max_size` values, each of which expires `ttl` after it was set.
+
+    An expired value is still returned as stale for `stale_ttl` longer, so that it can be served while it's refreshed.
+    """
+
+    def __init__(
+        self, name: str, ttl: timedelta, max_size: int = CACHE_FOR_MAX_SIZE, stale_ttl: Optional[timedelta] = None
+    ):
+        self.name = name
+        self.ttl_seconds = ttl.total_seconds()
+        self.stale_ttl_seconds = stale_ttl.total_seconds() if stale_ttl is not None else 0.0
+        self.max_size = max_size
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._refreshing: set[Hashable] = set()
+        # Bumped on every invalidation, so that calculations that started before it don't bring back the old value
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> tuple[CacheState, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                state, value = CacheState.MISSING, None
+            else:
+                set_at, value = entry
+                age = time.monotonic() - set_at
+                if age <= self.ttl_seconds:
+                    state = CacheState.FRESH
+                    self._entries.move_to_end(key)
+                elif age <= self.ttl_seconds + self.stale_ttl_seconds:
+                    state = CacheState.STALE
+                    self._entries.move_to_end(key)
+                else:
+                    state, value = CacheState.MISSING, None
+                    del self._entries[key]
+                    CACHE_FOR_EVICTIONS_COUNTER.labels(function=self.name, reason="expired").inc()
+        CACHE_FOR_LOOKUPS_COUNTER.labels(function=self.name, result=state.value).inc()
+        return state, value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                CACHE_FOR_EVICTIONS_COUNTER.labels(function=self.name, reason="size").inc()
+
+    def generation(self) -> int:
+        """Returns the generation to set a value calculated from now on with."""
+        with self._lock:
+            return self._generation
+
+    def start_refresh(self, key: Hashable) -> Optional[int]:
+        """Marks the key as being refreshed. Returns the generation to set the value with, or None if it already is."""
+        with self._lock:
+            if key in self._refreshing:
+                return None
+            self._refreshing.add(key)
+            return self._generation
+
+    def finish_refresh(self, key: Hashable) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            if self._entries.pop(key, None) is not None:
+                CACHE_FOR_EVICTIONS_COUNTER.labels(function=self.name, reason="invalidated").inc()
+
+    def invalidate_matching(self, key_repr: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if _key_repr(key) == key_repr]:
+                del self._entries[key]
+                CACHE_FOR_EVICTIONS_COUNTER.labels(function=self.name, reason="invalidated").inc()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            if self._entries:
+                CACHE_FOR_EVICTIONS_COUNTER.labels(function=self.name, reason="invalidated").inc(len(self._entries))
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_refresh_executor: Optional[ThreadPoolExecutor] = None
+_refresh_executor_pid: Optional[int] = None
+_refresh_executor_lock = threading.Lock()
+
+
+def _get_refresh_executor() -> ThreadPoolExecutor:
+    """The executor shared by all background refreshes, created lazily so that each forked worker gets its own."""
+    global _refresh_executor, _refresh_executor_pid
+    with _refresh_executor_lock:
+        if _refresh_executor is None or _refresh_executor_pid != os.getpid():
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=CACHE_FOR_REFRESH_WORKERS, thread_name_prefix="cache_for_refresh"
+            )
+            _refresh_executor_pid = os.getpid()
+        return _refresh_executor
+
+
+# Caches that are invalidated in all workers, by name
+_shared_caches: dict[str, LocalCache] = {}
+# Identifies this process in invalidation messages. PIDs can't, as they repeat across hosts and containers.
+_process_id = uuid.uuid4().hex
+_invalidation_listener_pid: Optional[int] = None
+_invalidation_listener_lock = threading.Lock()
+
+
+def _reset_process_id() -> None:
+    global _process_id
+    _process_id = uuid.uuid4().hex
+
+
+os.register_at_fork(after_in_child=_reset_process_id)
+
+
+def _key_repr(key: Hashable) -> str:
+    """Represents a `cache_for` key the same way in every process, which the repr of its kwargs frozenset doesn't."""
+    args, kwargs = cast(tuple[tuple, frozenset], key)
+    return repr((args, sorted(kwargs, key=lambda item: item[0])))
+
+
+def _ensure_invalidation_listener() -> None:
+    global _invalidation_listener_pid
+    if TEST or _invalidation_listener_pid == os.getpid():
+        return
+    with _invalidation_listener_lock:
+        if _invalidation_listener_pid == os.getpid():
+            return
+        _invalidation_listener_pid = os.getpid()
+        threading.Thread(target=_listen_for_invalidations, name="cache_for_invalidations", daemon=True).start()
+
+
+def _listen_for_invalidations() -> None:
+    from posthog.redis import get_client
+
+    while True:
+        try:
+            pubsub = get_client().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CACHE_FOR_INVALIDATION_CHANNEL)
+            for message in pubsub.listen():
+                _apply_invalidation(message["data"])
+        except Exception:
+            logger.warning("cache_for_invalidation_listener_failed", exc_info=True)
+            time.sleep(CACHE_FOR_INVALIDATION_RETRY_SECONDS)
+
+
+def _apply_invalidation(data: bytes) -> None:
+    message = json.loads(data)
+    if message["process"] == _process_id:
+        # Already applied when it was published
+        return
+    cache = _shared_caches.get(message["name"])
+    if cache is None:
+        return
+    if message["key"] is None:
+        cache.clear()
+    else:
+        cache.invalidate_matching(message["key"])
+
+
+def _publish_invalidation(name: str, key_repr: Optional[str]) -> None:
+    from posthog.redis import get_client
+
+    try:
+        get_client().publish(
+            CACHE_FOR_INVALIDATION_CHANNEL, json.dumps({"name": name, "key": key_repr, "process": _process_id})
+        )
+    except Exception:
+        # The other workers will pick up the change once their entries expire
+        logger.warning("cache_for_invalidation_publish_failed", name=name, exc_info=True)
+
+
+def cache_for(
+    cache_time: timedelta,
+    background_refresh: bool = False,
+    max_size: int = CACHE_FOR_MAX_SIZE,
+    stale_time: Optional[timedelta] = None,
+    invalidate_across_workers: bool = False,
+):
+    """
+    Memoizes the function's results by arguments, for `cache_time`, in a process-local LRU of `max_size` entries.
+
+    With `background_refresh`, an expired result keeps being returned while it's recomputed on a shared executor, for
+    up to `stale_time` after expiring (or for as long as recomputing it fails, if not set).
+
+    The decorated function gets `invalidate(*args, **kwargs)` and `invalidate_all()`, which drop cached results in
+    this process, and in all others that have the function cached if `invalidate_across_workers` is set.
+    """
+    if background_refresh:
+        stale_ttl: Optional[timedelta] = stale_time if stale_time is not None else timedelta.max
+    else:
+        stale_ttl = None
 
-def cache_for(cache_time: timedelta, background_refresh=False):
     def wrapper(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+        cache = LocalCache(name, cache_time, max_size=max_size, stale_ttl=stale_ttl)
+        if invalidate_across_workers:
+            _shared_caches[name] = cache
+
+        def cache_key(*args, **kwargs) -> Hashable:
+            return (args, frozenset(kwargs.items()))
+
+        def refresh(key, generation, args, kwargs):
+            try:
+                cache.set(key, fn(*args, **kwargs), generation=generation)
+            except Exception:
+                logger.exception("cache_for_background_refresh_failed", function=name)
+            finally:
+                cache.finish_refresh(key)
+
         @wraps(fn)
         @no_type_check
         def memoized_fn(*args, use_cache=not TEST, **kwargs):
             if not use_cache:
                 return fn(*args, **kwargs)
 
-            current_time = now()
-            key = (args, frozenset(sorted(kwargs.items())))
-
-            def refresh():
-                try:
-                    value = fn(*args, **kwargs)
-                    memoized_fn._cache[key] = (now(), value)
-                    memoized_fn._refreshing[key] = None
-                except Exception:
-                    memoized_fn._refreshing[key] = None
-                    raise
-
-            if key not in memoized_fn._cache:
-                refresh()
-            elif current_time - memoized_fn._cache[key][0] > cache_time:
-                if background_refresh:
-                    if not memoized_fn._refreshing.get(key):
-                        memoized_fn._refreshing[key] = current_time
-                        t = threading.Thread(target=refresh)
-                        t.start()
-                else:
-                    refresh()
+            if invalidate_across_workers:
+                _ensure_invalidation_listener()
+
+            key = cache_key(*args, **kwargs)
+            state, value = cache.get(key)
+            if state == CacheState.FRESH:
+                return value
+
+            if state == CacheState.STALE:
+                generation = cache.start_refresh(key)
+                if generation is not None:
+                    _get_refresh_executor().submit(refresh, key, generation, args, kwargs)
+                return value
+
+            generation = cache.generation()
+            value = fn(*args, **kwargs)
+            cache.set(key, value, generation=generation)
+            return value
+
+        def invalidate(*args, **kwargs) -> None:
+            key = cache_key(*args, **kwargs)
+            cache.invalidate(key)
+            if invalidate_across_workers:
+                _publish_invalidation(name, _key_repr(key))
 
-            return memoized_fn._cache[key][1]
+        def invalidate_all() -> None:
+            cache.clear()
+            if invalidate_across_workers:
+                _publish_invalidation(name, None)
 
-        memoized_fn._cache = {}
-        memoized_fn._refreshing = {}
+        memoized_fn.cache = cache
+        memoized_fn.cache_key = cache_key
+        memoized_fn.invalidate = invalidate
+        memoized_fn.invalidate_all = invalidate_all
         return memoized_fn
 
     return wrapper
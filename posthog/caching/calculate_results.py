@@ -186,6 +186,69 @@ def calculate_for_query_based_insight(
     )
 
 
+def calculate_batched_trends_for_dashboard(
+    dashboard: Dashboard,
+    insights: list[Insight],
+    *,
+    execution_mode: ExecutionMode,
+    user: Optional[User],
+    filters_override: Optional[dict] = None,
+) -> set[int]:
+    """
+    Calculates the trends insights of a dashboard that scan the same events in one ClickHouse query per group,
+    instead of one query per insight. Returns the IDs of the insights that now have a fresh result in the cache.
+    """
+    from posthog.hogql_queries.insights.trends.trends_query_batch import batch_trends_query_runners
+    from posthog.hogql_queries.insights.trends.trends_query_runner import TrendsQueryRunner
+
+    if execution_mode not in (
+        ExecutionMode.CALCULATE_BLOCKING_ALWAYS,
+        ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE,
+    ):
+        return set()
+
+    dashboard_filters_json = filters_override if filters_override is not None else dashboard.filters
+    dashboard_filters = DashboardFilter.model_validate(dashboard_filters_json) if dashboard_filters_json else None
+
+    runners: dict[int, TrendsQueryRunner] = {}
+    for insight in insights:
+        with conversion_to_query_based(insight):
+            query = insight.query or {}
+            if query.get("kind") == "InsightVizNode":
+                query = query.get("source") or {}
+            if query.get("kind") != "TrendsQuery":
+                continue
+            try:
+                runner = TrendsQueryRunner(query=query, team=insight.team)
+                if dashboard_filters:
+                    runner.apply_dashboard_filters(dashboard_filters)
+            except Exception as e:
+                # The insight will fail on its own when it's calculated
+                logger.warning("dashboard_trends_batch_skipped_insight", insight_id=insight.pk, error=str(e))
+                continue
+            runners[insight.pk] = runner
+
+    batches = batch_trends_query_runners(list(runners.values()))
+    if not batches:
+        return set()
+
+    calculated_insight_ids: set[int] = set()
+    for insight_id, runner in runners.items():
+        if runner.batch is None:
+            continue
+        tag_queries(team_id=dashboard.team_id, insight_id=insight_id, dashboard_id=dashboard.pk)
+        try:
+            response = runner.run(
+                execution_mode=execution_mode, user=user, insight_id=insight_id, dashboard_id=dashboard.pk
+            )
+        except Exception as e:
+            logger.warning("dashboard_trends_batch_failed", insight_id=insight_id, error=str(e))
+            continue
+        if not isinstance(response, CacheMissResponse) and not getattr(response, "error", None):
+            calculated_insight_ids.add(insight_id)
+    return calculated_insight_ids
+
+
 def calculate_result_by_cache_type(cache_type: CacheType, filter: Filter, team: Team) -> list[dict[str, Any]]:
     if cache_type == CacheType.FUNNEL:
         return _calculate_funnel(filter, team)
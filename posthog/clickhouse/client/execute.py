@@ -2,10 +2,11 @@ import json
 import threading
 import types
 from contextlib import contextmanager
+from dataclasses import dataclass
 from functools import lru_cache
 from time import perf_counter
 from typing import Any, Optional, Union
-from collections.abc import Sequence
+from collections.abc import Callable, Iterator, Sequence
 
 import sqlparse
 from clickhouse_driver import Client as SyncClient
@@ -13,6 +14,13 @@ from django.conf import settings as app_settings
 
 from posthog.clickhouse.client.connection import Workload, get_pool
 from posthog.clickhouse.client.escape import substitute_params
+from posthog.clickhouse.client.result_cache import (
+    RESULT_CACHE_COUNTER,
+    get_cached_result,
+    get_result_cache_backend,
+    result_cache_key,
+    set_cached_result,
+)
 from posthog.clickhouse.query_tagging import get_query_tag_value, get_query_tags
 from posthog.errors import wrap_query_error
 from posthog.settings import TEST
@@ -38,6 +46,12 @@ QueryArgs = Optional[Union[InsertParams, NonInsertParams]]
 
 thread_local_storage = threading.local()
 
+# Rows per block when streaming results, which bounds how much of the result set is in memory at once
+STREAMING_CHUNK_SIZE = 10_000
+
+# ClickHouse sends progress packets for every block read, report them at most this often
+PROGRESS_REPORT_INTERVAL_SECONDS = 0.5
+
 # As of CH 22.8 - more algorithms have been added on newer versions
 CLICKHOUSE_SUPPORTED_JOIN_ALGORITHMS = [
     "default",
@@ -98,7 +112,162 @@ def sync_execute(
     workload: Workload = Workload.DEFAULT,
     team_id: Optional[int] = None,
     readonly=False,
+    columnar=False,
+    cacheable=False,
 ):
+    """
+    With `cacheable`, the result may come from the ClickHouse result cache, which is shared by all queries with the
+    same SQL, args and settings for the team. Ingested data only shows up in cached results after up to
+    `CLICKHOUSE_RESULT_CACHE_FRESHNESS_SECONDS`, see `result_cache`.
+    """
+    cache_backend = get_result_cache_backend() if cacheable else None
+    cache_key = None
+    if cache_backend is not None:
+        if team_id is None or isinstance(args, list | tuple | types.GeneratorType):
+            RESULT_CACHE_COUNTER.labels(result="uncacheable").inc()
+            cache_backend = None
+        else:
+            cache_key = result_cache_key(
+                team_id,
+                query,
+                args,
+                {**default_settings(), **(settings or {})},
+                with_column_types=with_column_types,
+                columnar=columnar,
+            )
+            is_cached, result = get_cached_result(cache_backend, cache_key)
+            if is_cached:
+                return result
+
+    progress_callback = getattr(thread_local_storage, "progress_callback", None)
+    with _execution(
+        query, args, settings, flush=flush, workload=workload, team_id=team_id, readonly=readonly
+    ) as execution:
+        if progress_callback is None:
+            result = execution.client.execute(
+                execution.sql,
+                params=execution.params,
+                settings=execution.settings,
+                with_column_types=with_column_types,
+                columnar=columnar,
+                query_id=execution.query_id,
+            )
+        else:
+            result = _execute_with_progress(
+                execution, progress_callback, with_column_types=with_column_types, columnar=columnar
+            )
+
+    if cache_backend is not None and cache_key is not None:
+        set_cached_result(cache_backend, cache_key, result)
+    return result
+
+
+def sync_execute_iter(
+    query,
+    args=None,
+    settings=None,
+    flush=True,
+    *,
+    chunk_size: int = STREAMING_CHUNK_SIZE,
+    workload: Workload = Workload.DEFAULT,
+    team_id: Optional[int] = None,
+    readonly=False,
+) -> Iterator[tuple]:
+    """
+    Like `sync_execute`, but yields result rows as ClickHouse sends them, in blocks of about `chunk_size` rows,
+    instead of loading the whole result set in memory. The connection is held until the generator is exhausted or
+    closed.
+    """
+    settings = {"max_block_size": chunk_size, **(settings or {})}
+    with _execution(
+        query, args, settings, flush=flush, workload=workload, team_id=team_id, readonly=readonly
+    ) as execution:
+        exhausted = False
+        try:
+            yield from execution.client.execute_iter(
+                execution.sql,
+                params=execution.params,
+                settings=execution.settings,
+                query_id=execution.query_id,
+            )
+            exhausted = True
+        finally:
+            if not exhausted:
+                # The rest of the result is still on the wire, so the connection can't be reused for other queries
+                execution.client.disconnect()
+
+
+@contextmanager
+def report_query_progress(callback: Callable[[dict[str, Any]], None]) -> Iterator[None]:
+    """
+    Calls `callback` with the progress ClickHouse reports while running `sync_execute` queries in this thread. The
+    progress has the same shape as the rows of `system.processes` read in `poll_query_performance`.
+    """
+    previous_callback = getattr(thread_local_storage, "progress_callback", None)
+    thread_local_storage.progress_callback = callback
+    try:
+        yield
+    finally:
+        thread_local_storage.progress_callback = previous_callback
+
+
+def _execute_with_progress(
+    execution: "_Execution", callback: Callable[[dict[str, Any]], None], *, with_column_types: bool, columnar: bool
+) -> Any:
+    progress_result = execution.client.execute_with_progress(
+        execution.sql,
+        params=execution.params,
+        settings=execution.settings,
+        with_column_types=with_column_types,
+        columnar=columnar,
+        query_id=execution.query_id,
+    )
+    start_time = perf_counter()
+
+    def report() -> None:
+        totals = progress_result.progress_totals
+        callback(
+            {
+                "initial_query_id": execution.query_id,
+                "query_id": execution.query_id,
+                "bytes_read": totals.bytes,
+                "rows_read": totals.rows,
+                "estimated_rows_total": totals.total_rows,
+                "time_elapsed": int(perf_counter() - start_time),
+            }
+        )
+
+    last_report_time = start_time
+    for _ in progress_result:
+        if perf_counter() - last_report_time >= PROGRESS_REPORT_INTERVAL_SECONDS:
+            report()
+            last_report_time = perf_counter()
+
+    result = progress_result.get_result()
+    report()
+    return result
+
+
+@dataclass
+class _Execution:
+    client: SyncClient
+    sql: str
+    params: Any
+    settings: dict[str, Any]
+    query_id: Optional[str]
+
+
+@contextmanager
+def _execution(
+    query,
+    args,
+    settings,
+    *,
+    flush: bool,
+    workload: Workload,
+    team_id: Optional[int],
+    readonly: bool,
+) -> Iterator[_Execution]:
     if TEST and flush:
         try:
             from posthog.test.base import flush_persons_and_events
@@ -139,12 +308,8 @@ def sync_execute(
         }
 
         try:
-            result = client.execute(
-                prepared_sql,
-                params=prepared_args,
-                settings=settings,
-                with_column_types=with_column_types,
-                query_id=query_id,
+            yield _Execution(
+                client=client, sql=prepared_sql, params=prepared_args, settings=settings, query_id=query_id
             )
         except Exception as e:
             err = wrap_query_error(e)
@@ -163,7 +328,6 @@ def sync_execute(
 
             if app_settings.SHELL_PLUS_PRINT_SQL:
                 print("Execution time: %.6fs" % (execution_time,))  # noqa T201
-    return result
 
 
 def query_with_columns(
@@ -1,7 +1,9 @@
 import datetime
+import time
 
 import orjson as json
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
+from collections.abc import Iterator
 import uuid
 
 from pydantic import BaseModel
@@ -12,6 +14,7 @@ from rest_framework.exceptions import NotFound, APIException
 
 from posthog import celery, redis
 from posthog.clickhouse.client.async_task_chain import add_task_to_on_commit
+from posthog.clickhouse.client.execute import report_query_progress
 from posthog.clickhouse.query_tagging import tag_queries
 from posthog.errors import ExposedCHQueryError, CHQueryErrorTooManySimultaneousQueries
 from posthog.hogql.constants import LimitContext
@@ -31,6 +34,9 @@ QUERY_WAIT_TIME = Histogram(
 )
 QUERY_PROCESS_TIME = Histogram("query_process_time_seconds", "Time from query pick-up to result", labelnames=["team"])
 
+# Sent on query status streams when nothing else happened for this long, so that proxies don't close the connection
+QUERY_STATUS_KEEPALIVE_SECONDS = 15
+
 
 class QueryNotFoundError(NotFound):
     pass
@@ -57,12 +63,24 @@ class QueryStatusManager:
     def clickhouse_query_status_key(self) -> str:
         return f"{self.KEY_PREFIX_ASYNC_RESULTS}:{self.team_id}:{self.query_id}:status"
 
+    @property
+    def events_channel(self) -> str:
+        return f"{self.KEY_PREFIX_ASYNC_RESULTS}:{self.team_id}:{self.query_id}:events"
+
+    def _publish_event(self, event: str, data: dict[str, Any]) -> None:
+        try:
+            self.redis_client.publish(self.events_channel, json.dumps({"event": event, "data": data}))
+        except Exception as e:
+            # Streams fall back to reading the status when they time out, so don't fail the query because of this
+            logger.warning("query_status_publish_failed", error=str(e))
+
     def store_query_status(self, query_status: QueryStatus):
         value = SafeJSONRenderer().render(query_status.model_dump(exclude={"clickhouse_query_progress"}))
         query_status.expiration_time = datetime.datetime.now(datetime.UTC) + datetime.timedelta(
             seconds=self.STATUS_TTL_SECONDS
         )
         self.redis_client.set(self.results_key, value, exat=int(query_status.expiration_time.timestamp()))
+        self._publish_event("status", {"complete": query_status.complete})
 
     def _store_clickhouse_query_progress_dict(self, query_progress_dict):
         value = json.dumps(query_progress_dict)
@@ -91,15 +109,26 @@ class QueryStatusManager:
     def update_clickhouse_query_progresses(self, clickhouse_query_progresses):
         clickhouse_query_progress_dict = self._get_clickhouse_query_progress_dict()
         for clickhouse_query_progress in clickhouse_query_progresses:
-            clickhouse_query_progress_dict[clickhouse_query_progress["query_id"]] = clickhouse_query_progress
+            # Progress packets don't include the CPU time, which only the poller of `system.processes` reports
+            clickhouse_query_progress_dict[clickhouse_query_progress["query_id"]] = {
+                "active_cpu_time": 0,
+                **clickhouse_query_progress_dict.get(clickhouse_query_progress["query_id"], {}),
+                **clickhouse_query_progress,
+            }
         self._store_clickhouse_query_progress_dict(clickhouse_query_progress_dict)
 
+        query_progress = self._sum_clickhouse_query_progresses(clickhouse_query_progress_dict)
+        if query_progress is not None:
+            self._publish_event("progress", query_progress.model_dump())
+
     def has_results(self) -> bool:
         return self.redis_client.exists(self.results_key) == 1
 
     def get_clickhouse_progresses(self) -> Optional[ClickhouseQueryProgress]:
+        return self._sum_clickhouse_query_progresses(self._get_clickhouse_query_progress_dict())
+
+    def _sum_clickhouse_query_progresses(self, clickhouse_query_progress_dict) -> Optional[ClickhouseQueryProgress]:
         try:
-            clickhouse_query_progress_dict = self._get_clickhouse_query_progress_dict()
             query_progress = {
                 "bytes_read": 0,
                 "rows_read": 0,
@@ -132,6 +161,7 @@ class QueryStatusManager:
         logger.info("Deleting redis query key %s", self.results_key)
         self.redis_client.delete(self.results_key)
         self.redis_client.delete(self.clickhouse_query_status_key)
+        self._publish_event("cancelled", {})
 
 
 def execute_process_query(
@@ -177,17 +207,24 @@ def execute_process_query(
         wait_duration = (query_status.pickup_time - query_status.start_time) / datetime.timedelta(seconds=1)
         QUERY_WAIT_TIME.labels(team=team_id, mode=trigger).observe(wait_duration)
 
+    def report_progress(clickhouse_query_progress: dict) -> None:
+        try:
+            manager.update_clickhouse_query_progresses([clickhouse_query_progress])
+        except Exception as e:
+            logger.warning("query_progress_update_failed", team_id=team_id, query_id=query_id, error=str(e))
+
     try:
         tag_queries(client_query_id=query_id, team_id=team_id, user_id=user_id)
-        results = process_query_dict(
-            team=team,
-            query_json=query_json,
-            limit_context=limit_context,
-            execution_mode=ExecutionMode.CALCULATE_BLOCKING_ALWAYS,
-            insight_id=query_status.insight_id,
-            dashboard_id=query_status.dashboard_id,
-            user=user,
-        )
+        with report_query_progress(report_progress):
+            results = process_query_dict(
+                team=team,
+                query_json=query_json,
+                limit_context=limit_context,
+                execution_mode=ExecutionMode.CALCULATE_BLOCKING_ALWAYS,
+                insight_id=query_status.insight_id,
+                dashboard_id=query_status.dashboard_id,
+                user=user,
+            )
         if isinstance(results, BaseModel):
             results = results.model_dump(by_alias=True)
         logger.info("Got results for team %s query %s", team_id, query_id)
@@ -265,6 +302,51 @@ def get_query_status(team_id: int, query_id: str, show_progress: bool = False) -
     return manager.get_query_status(show_progress=show_progress)
 
 
+def iter_query_status_events(team_id: int, query_id: str, timeout: float) -> Iterator[tuple[str, Optional[BaseModel]]]:
+    """
+    Yields the current status of a query, its progress as the worker running it reports it, then its final status,
+    as pairs of:
+    - `("status", QueryStatus)` first, then once the query is complete, or when `timeout` seconds pass
+    - `("progress", ClickhouseQueryProgress)`
+    - `("keepalive", None)` when nothing happened for `QUERY_STATUS_KEEPALIVE_SECONDS`
+
+    Raises `QueryNotFoundError` if the query doesn't exist or is cancelled.
+    """
+    manager = QueryStatusManager(query_id, team_id)
+    pubsub = manager.redis_client.pubsub(ignore_subscribe_messages=True)
+    try:
+        # Subscribe before reading the status, so that the query can't complete in between unnoticed
+        pubsub.subscribe(manager.events_channel)
+        query_status = manager.get_query_status(show_progress=True)
+        yield "status", query_status
+        if query_status.complete:
+            return
+
+        deadline = time.monotonic() + timeout
+        last_event_time = time.monotonic()
+        while (now := time.monotonic()) < deadline:
+            message = pubsub.get_message(timeout=min(1.0, deadline - now))
+            if message is None or message["type"] != "message":
+                if time.monotonic() - last_event_time >= QUERY_STATUS_KEEPALIVE_SECONDS:
+                    last_event_time = time.monotonic()
+                    yield "keepalive", None
+                continue
+
+            last_event_time = time.monotonic()
+            event = json.loads(message["data"])
+            if event["event"] == "progress":
+                yield "progress", ClickhouseQueryProgress(**event["data"])
+            elif event["event"] == "cancelled":
+                raise QueryNotFoundError(f"Query {query_id} was cancelled for team {team_id}")
+            elif event["event"] == "status" and event["data"]["complete"]:
+                yield "status", manager.get_query_status()
+                return
+
+        yield "status", manager.get_query_status(show_progress=True)
+    finally:
+        pubsub.close()
+
+
 def cancel_query(team_id: int, query_id: str) -> bool:
     manager = QueryStatusManager(query_id, team_id)
 
@@ -0,0 +1,171 @@
+"""
+Cache of ClickHouse query results, shared by all code paths calling `sync_execute(..., cacheable=True)`.
+
+Results are keyed by the final SQL, its params and settings, so runners that print the same query share results. The
+key also includes the team's data watermark: a time bucket of `CLICKHOUSE_RESULT_CACHE_FRESHNESS_SECONDS`, because
+ingestion writes to ClickHouse without telling us, combined with a version stamp that Django-side writes bump with
+`bump_team_data_watermark` (currently only deleting persons). So a cached result can miss any other change for up to
+the freshness window.
+"""
+
+import hashlib
+import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Protocol
+from uuid import uuid4
+
+import structlog
+from django.conf import settings
+from django.core.cache import cache
+from prometheus_client import Counter
+
+from posthog.redis import get_client
+
+logger = structlog.get_logger(__name__)
+
+RESULT_CACHE_COUNTER = Counter(
+    "clickhouse_result_cache_lookups_total",
+    "Lookups in the cache of ClickHouse query results",
+    labelnames=["result"],
+)
+
+TEAM_DATA_WATERMARK_KEY = "clickhouse_data_watermark:team:{team_id}"
+DATA_WATERMARK_TTL_SECONDS = 60 * 60 * 24 * 7
+RESULT_CACHE_KEY_PREFIX = "clickhouse_result:"
+
+
+def get_team_data_watermark(team_id: int) -> str:
+    bucket = int(time.time() // settings.CLICKHOUSE_RESULT_CACHE_FRESHNESS_SECONDS)
+    return f"{cache.get(TEAM_DATA_WATERMARK_KEY.format(team_id=team_id), '0')}.{bucket}"
+
+
+def bump_team_data_watermark(team_id: Optional[int]) -> None:
+    """Invalidates all cached results of the team's queries, after changing the team's data in ClickHouse."""
+    if team_id is None:
+        return
+    cache.set(TEAM_DATA_WATERMARK_KEY.format(team_id=team_id), uuid4().hex, timeout=DATA_WATERMARK_TTL_SECONDS)
+
+
+class ResultCacheBackend(Protocol):
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes, ttl: int) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class RedisResultCacheBackend:
+    def get(self, key: str) -> Optional[bytes]:
+        return get_client().get(key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        get_client().set(key, value, ex=ttl)
+
+    def clear(self) -> None:
+        # Entries expire on their own, and the watermark invalidates them per team
+        pass
+
+
+class LocalResultCacheBackend:
+    """Process-local LRU, bounded by the total size of the cached results."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_backends: dict[str, ResultCacheBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_result_cache_backend() -> Optional[ResultCacheBackend]:
+    name = settings.CLICKHOUSE_RESULT_CACHE_BACKEND
+    if not name:
+        return None
+    with _backends_lock:
+        if name not in _backends:
+            if name == "redis":
+                _backends[name] = RedisResultCacheBackend()
+            elif name == "local":
+                _backends[name] = LocalResultCacheBackend(settings.CLICKHOUSE_RESULT_CACHE_LOCAL_MAX_BYTES)
+            else:
+                raise ValueError(f"Unknown ClickHouse result cache backend: {name}")
+        return _backends[name]
+
+
+def clear_result_cache() -> None:
+    with _backends_lock:
+        for backend in _backends.values():
+            backend.clear()
+
+
+def result_cache_key(team_id: int, query: str, args: Any, settings: dict[str, Any], **options: Any) -> str:
+    payload = json.dumps([query, args, settings, options], sort_keys=True, default=str, separators=(",", ":"))
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{RESULT_CACHE_KEY_PREFIX}{team_id}:{get_team_data_watermark(team_id)}:{digest}"
+
+
+def get_cached_result(backend: ResultCacheBackend, key: str) -> tuple[bool, Any]:
+    """Returns whether the result was cached, and the result."""
+    try:
+        value = backend.get(key)
+    except Exception as e:
+        logger.warning("clickhouse_result_cache_get_failed", error=str(e))
+        value = None
+
+    if value is None:
+        RESULT_CACHE_COUNTER.labels(result="miss").inc()
+        return False, None
+    RESULT_CACHE_COUNTER.labels(result="hit").inc()
+    return True, pickle.loads(value)
+
+
+def set_cached_result(backend: ResultCacheBackend, key: str, result: Any) -> None:
+    value = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(value) > settings.CLICKHOUSE_RESULT_CACHE_MAX_ENTRY_BYTES:
+        RESULT_CACHE_COUNTER.labels(result="too_large").inc()
+        return
+    try:
+        backend.set(key, value, settings.CLICKHOUSE_RESULT_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning("clickhouse_result_cache_set_failed", error=str(e))
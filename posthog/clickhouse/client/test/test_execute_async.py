@@ -1,4 +1,6 @@
 import json
+import threading
+from contextlib import contextmanager
 from typing import Any
 
 from posthog.clickhouse.client.async_task_chain import task_chain_context
@@ -10,6 +12,7 @@ from django.db import transaction
 
 from posthog.clickhouse.client import execute_async as client
 from posthog.client import sync_execute
+from posthog.clickhouse.client.execute import report_query_progress
 from posthog.errors import CHQueryErrorTooManySimultaneousQueries
 from posthog.models import Organization, Team
 from posthog.models.user import User
@@ -20,6 +23,7 @@ from unittest.mock import patch, MagicMock
 from posthog.clickhouse.client.execute_async import (
     QueryStatusManager,
     execute_process_query,
+    iter_query_status_events,
     QueryNotFoundError,
 )
 
@@ -99,6 +103,114 @@ class TestQueryStatusManager(SimpleTestCase):
         self.query_status.expiration_time = None  # We don't care about expiration time in this test
         self.assertEqual(self.manager.get_query_status(show_progress=True), self.query_status)
 
+    def test_update_clickhouse_query_progresses_from_progress_packets_keeps_cpu_time(self):
+        self.manager.store_query_status(self.query_status)
+        query_id = f"{self.team_id}_{self.query_id}_1"
+        self.manager.update_clickhouse_query_progresses(
+            [{**ZERO_PROGRESS, "initial_query_id": query_id, "query_id": query_id, "active_cpu_time": 7}]
+        )
+
+        packet_progress = {**ZERO_PROGRESS, "initial_query_id": query_id, "query_id": query_id, "rows_read": 100}
+        del packet_progress["active_cpu_time"]
+        self.manager.update_clickhouse_query_progresses([packet_progress])
+
+        self.assertEqual(
+            self.manager.get_clickhouse_progresses(),
+            ClickhouseQueryProgress(**{**ZERO_PROGRESS, "rows_read": 100, "active_cpu_time": 7}),
+        )
+
+    def test_iter_query_status_events(self):
+        self.manager.store_query_status(self.query_status)
+        query_id = f"{self.team_id}_{self.query_id}_1"
+        events = iter_query_status_events(self.team_id, self.query_id, timeout=10)
+
+        event, initial_status = next(events)
+        self.assertEqual(event, "status")
+        assert isinstance(initial_status, QueryStatus)
+        self.assertFalse(initial_status.complete)
+
+        def run_query():
+            self.manager.update_clickhouse_query_progresses(
+                [{**ZERO_PROGRESS, "initial_query_id": query_id, "query_id": query_id, "rows_read": 10}]
+            )
+            self.manager.store_query_status(
+                QueryStatus(id=self.query_id, team_id=self.team_id, complete=True, results=[[1]])
+            )
+
+        thread = threading.Thread(target=run_query)
+        thread.start()
+        remaining_events = list(events)
+        thread.join()
+
+        self.assertEqual(
+            [event for event, _ in remaining_events],
+            ["progress", "status"],
+        )
+        self.assertEqual(remaining_events[0][1], ClickhouseQueryProgress(**{**ZERO_PROGRESS, "rows_read": 10}))
+        final_status = remaining_events[1][1]
+        assert isinstance(final_status, QueryStatus)
+        self.assertTrue(final_status.complete)
+        self.assertEqual(final_status.results, [[1]])
+
+    def test_iter_query_status_events_when_complete(self):
+        self.manager.store_query_status(QueryStatus(id=self.query_id, team_id=self.team_id, complete=True))
+
+        events = list(iter_query_status_events(self.team_id, self.query_id, timeout=10))
+
+        self.assertEqual([event for event, _ in events], ["status"])
+
+    def test_iter_query_status_events_when_cancelled(self):
+        self.manager.store_query_status(self.query_status)
+        events = iter_query_status_events(self.team_id, self.query_id, timeout=10)
+        next(events)
+
+        self.manager.delete_query_status()
+
+        self.assertRaises(QueryNotFoundError, lambda: next(events))
+
+    def test_iter_query_status_events_times_out(self):
+        self.manager.store_query_status(self.query_status)
+
+        events = list(iter_query_status_events(self.team_id, self.query_id, timeout=0.1))
+
+        self.assertEqual([event for event, _ in events], ["status", "status"])
+        self.assertFalse(events[-1][1].complete)  # type: ignore
+
+
+class TestReportQueryProgress(SimpleTestCase):
+    def test_sync_execute_reports_progress_packets(self):
+        client = MagicMock()
+        progress_result = MagicMock()
+        progress_result.__iter__.return_value = iter([(10, 100), (20, 100)])
+        progress_result.progress_totals = MagicMock(rows=20, bytes=2000, total_rows=100)
+        progress_result.get_result.return_value = [(1,)]
+        client.execute_with_progress.return_value = progress_result
+
+        @contextmanager
+        def execution(query, args, settings, **kwargs):
+            yield MagicMock(client=client, sql=query, params=None, settings=settings, query_id="1_abc_xyz")
+
+        reported: list[dict] = []
+        with patch("posthog.clickhouse.client.execute._execution", side_effect=execution):
+            sync_execute("SELECT 1")
+            client.execute_with_progress.assert_not_called()
+
+            with report_query_progress(reported.append):
+                self.assertEqual(sync_execute("SELECT 1"), [(1,)])
+
+        client.execute_with_progress.assert_called_once()
+        self.assertEqual(
+            reported[-1],
+            {
+                "initial_query_id": "1_abc_xyz",
+                "query_id": "1_abc_xyz",
+                "bytes_read": 2000,
+                "rows_read": 20,
+                "estimated_rows_total": 100,
+                "time_elapsed": 0,
+            },
+        )
+
 
 class TestExecuteProcessQuery(TestCase):
     def setUp(self):
@@ -0,0 +1,96 @@
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from posthog.clickhouse.client.execute import sync_execute
+from posthog.clickhouse.client.result_cache import (
+    LocalResultCacheBackend,
+    bump_team_data_watermark,
+    clear_result_cache,
+    result_cache_key,
+)
+
+
+@pytest.fixture
+def local_result_cache(settings):
+    settings.CLICKHOUSE_RESULT_CACHE_BACKEND = "local"
+    clear_result_cache()
+    yield
+    clear_result_cache()
+
+
+@pytest.fixture
+def execute_mock():
+    client = MagicMock()
+    client.execute.return_value = [(1,)]
+
+    @contextmanager
+    def execution(query, args, settings, **kwargs):
+        yield MagicMock(client=client, sql=query, params=None, settings=settings, query_id=None)
+
+    with patch("posthog.clickhouse.client.execute._execution", side_effect=execution):
+        yield client.execute
+
+
+def test_local_backend_evicts_least_recently_used_by_size():
+    backend = LocalResultCacheBackend(max_bytes=10)
+    backend.set("a", b"aaaa", ttl=60)
+    backend.set("b", b"bbbb", ttl=60)
+    assert backend.get("a") == b"aaaa"
+
+    backend.set("c", b"cccc", ttl=60)
+
+    assert backend.get("a") == b"aaaa"
+    assert backend.get("b") is None
+    assert backend.get("c") == b"cccc"
+    backend.set("d", b"d" * 11, ttl=60)
+    assert backend.get("d") is None
+    assert len(backend) == 2
+
+
+def test_local_backend_expires_entries():
+    backend = LocalResultCacheBackend(max_bytes=10)
+    backend.set("a", b"aaaa", ttl=-1)
+    assert backend.get("a") is None
+    assert len(backend) == 0
+
+
+def test_cache_key_changes_with_query_args_settings_and_watermark():
+    key = result_cache_key(1, "SELECT %(x)s", {"x": 1}, {"max_threads": 1})
+
+    assert key == result_cache_key(1, "SELECT %(x)s", {"x": 1}, {"max_threads": 1})
+    assert key != result_cache_key(1, "SELECT %(x)s", {"x": 2}, {"max_threads": 1})
+    assert key != result_cache_key(1, "SELECT %(x)s", {"x": 1}, {"max_threads": 2})
+    assert key != result_cache_key(2, "SELECT %(x)s", {"x": 1}, {"max_threads": 1})
+
+    bump_team_data_watermark(1)
+    assert key != result_cache_key(1, "SELECT %(x)s", {"x": 1}, {"max_threads": 1})
+
+
+def test_sync_execute_reuses_cached_results(local_result_cache, execute_mock):
+    assert sync_execute("SELECT 1", team_id=1, cacheable=True) == [(1,)]
+    assert sync_execute("SELECT 1", team_id=1, cacheable=True) == [(1,)]
+    assert execute_mock.call_count == 1
+
+    sync_execute("SELECT 1", team_id=1, cacheable=True, with_column_types=True)
+    sync_execute("SELECT 1", team_id=1)
+    assert execute_mock.call_count == 3
+
+    bump_team_data_watermark(1)
+    sync_execute("SELECT 1", team_id=1, cacheable=True)
+    assert execute_mock.call_count == 4
+
+
+def test_sync_execute_without_team_is_not_cached(local_result_cache, execute_mock):
+    sync_execute("SELECT 1", cacheable=True)
+    sync_execute("SELECT 1", cacheable=True)
+    assert execute_mock.call_count == 2
+
+
+def test_sync_execute_skips_results_over_the_size_limit(local_result_cache, execute_mock, settings):
+    settings.CLICKHOUSE_RESULT_CACHE_MAX_ENTRY_BYTES = 1
+
+    sync_execute("SELECT 1", team_id=1, cacheable=True)
+    sync_execute("SELECT 1", team_id=1, cacheable=True)
+    assert execute_mock.call_count == 2
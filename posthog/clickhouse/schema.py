@@ -104,6 +104,12 @@ from posthog.models.sessions.sql import (
     DISTRIBUTED_SESSIONS_TABLE_SQL,
     SESSIONS_VIEW_SQL,
 )
+from posthog.models.web_stats.sql import (
+    WEB_STATS_HOURLY_TABLE_SQL,
+    WEB_STATS_DAILY_TABLE_SQL,
+    DISTRIBUTED_WEB_STATS_HOURLY_TABLE_SQL,
+    DISTRIBUTED_WEB_STATS_DAILY_TABLE_SQL,
+)
 from posthog.session_recordings.sql.session_recording_event_sql import (
     SESSION_RECORDING_EVENTS_TABLE_SQL,
     SESSION_RECORDING_EVENTS_TABLE_MV_SQL,
@@ -141,6 +147,8 @@ CREATE_MERGETREE_TABLE_QUERIES = (
     SESSIONS_TABLE_SQL,
     RAW_SESSIONS_TABLE_SQL,
     HEATMAPS_TABLE_SQL,
+    WEB_STATS_HOURLY_TABLE_SQL,
+    WEB_STATS_DAILY_TABLE_SQL,
 )
 CREATE_DISTRIBUTED_TABLE_QUERIES = (
     WRITABLE_EVENTS_TABLE_SQL,
@@ -159,6 +167,8 @@ CREATE_DISTRIBUTED_TABLE_QUERIES = (
     DISTRIBUTED_RAW_SESSIONS_TABLE_SQL,
     WRITABLE_HEATMAPS_TABLE_SQL,
     DISTRIBUTED_HEATMAPS_TABLE_SQL,
+    DISTRIBUTED_WEB_STATS_HOURLY_TABLE_SQL,
+    DISTRIBUTED_WEB_STATS_DAILY_TABLE_SQL,
 )
 CREATE_KAFKA_TABLE_QUERIES = (
     KAFKA_LOG_ENTRIES_TABLE_SQL,
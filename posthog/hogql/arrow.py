@@ -0,0 +1,102 @@
+import pickle
+import re
+from collections.abc import Sequence
+from datetime import date
+from typing import Any, Optional
+
+import pyarrow as pa
+
+# Columns that can't be stored as a native Arrow type keep their Python values, pickled into a binary column marked
+# with this, so that `table_to_rows` returns exactly what the ClickHouse driver did
+OBJECT_METADATA = {b"posthog.python_type": b"object"}
+
+# ClickHouse types whose values the driver returns as a single Python type, that Arrow can hold without any loss.
+# Anything else (arrays, tuples, maps, UUIDs, decimals, datetimes with their time zones, 128 and 256 bit integers,
+# variants...) is kept as Python objects.
+CLICKHOUSE_TO_ARROW_TYPES: dict[str, pa.DataType] = {
+    "UInt8": pa.uint8(),
+    "UInt16": pa.uint16(),
+    "UInt32": pa.uint32(),
+    "UInt64": pa.uint64(),
+    "Int8": pa.int8(),
+    "Int16": pa.int16(),
+    "Int32": pa.int32(),
+    "Int64": pa.int64(),
+    "Float32": pa.float32(),
+    "Float64": pa.float64(),
+    "Bool": pa.bool_(),
+    "String": pa.string(),
+    "Date": pa.date32(),
+    "Date32": pa.date32(),
+    "Nothing": pa.null(),
+}
+
+_WRAPPER_TYPE = re.compile(r"^(?:Nullable|LowCardinality)\((.*)\)$")
+
+
+def clickhouse_type_to_arrow(clickhouse_type: str) -> Optional[pa.DataType]:
+    """Returns the Arrow type for values of a ClickHouse type, or None if they should be kept as Python objects."""
+    while match := _WRAPPER_TYPE.match(clickhouse_type):
+        clickhouse_type = match.group(1)
+    if clickhouse_type.startswith(("FixedString(", "Enum8(", "Enum16(")):
+        return pa.string()
+    return CLICKHOUSE_TO_ARROW_TYPES.get(clickhouse_type)
+
+
+def columns_to_table(names: Sequence[str], columns: Sequence[Sequence[Any]], types: Sequence[str]) -> pa.Table:
+    """
+    Converts columnar ClickHouse results (as returned with `columnar=True`) to a table, with each column typed after its
+    ClickHouse type. Columns that don't fit that type, or don't have a matching Arrow type, are kept as Python objects.
+    """
+    fields: list[pa.Field] = []
+    arrays: list[pa.Array] = []
+    for index, (name, clickhouse_type) in enumerate(zip(names, types)):
+        # Empty results come back without any columns
+        values = columns[index] if index < len(columns) else []
+        arrow_type = clickhouse_type_to_arrow(clickhouse_type)
+        array = _to_arrow(values, arrow_type) if arrow_type is not None else None
+        if array is None:
+            array = pa.array([pickle.dumps(value) for value in values], type=pa.binary())
+            fields.append(pa.field(name, pa.binary(), metadata=OBJECT_METADATA))
+        else:
+            fields.append(pa.field(name, array.type))
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def table_to_rows(table: pa.Table) -> list[list[Any]]:
+    """Converts a table to rows, the shape of `HogQLQueryResponse.results`."""
+    columns = []
+    for field, column in zip(table.schema, table.columns):
+        values = column.to_pylist()
+        if field.metadata == OBJECT_METADATA:
+            values = [pickle.loads(value) if value is not None else None for value in values]
+        columns.append(values)
+    return [list(row) for row in zip(*columns)]
+
+
+def _to_arrow(values: Sequence[Any], arrow_type: pa.DataType) -> Optional[pa.Array]:
+    # Arrow silently converts some values of other types (e.g. bools and whole floats to integers), so mixed columns
+    # are caught here instead
+    python_type = _python_type(arrow_type)
+    if any(type(value) is not python_type for value in values if value is not None):
+        return None
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        # e.g. integers out of the type's range
+        return None
+
+
+def _python_type(arrow_type: pa.DataType) -> type:
+    if pa.types.is_integer(arrow_type):
+        return int
+    if pa.types.is_floating(arrow_type):
+        return float
+    if pa.types.is_boolean(arrow_type):
+        return bool
+    if pa.types.is_string(arrow_type):
+        return str
+    if pa.types.is_date(arrow_type):
+        return date
+    return type(None)
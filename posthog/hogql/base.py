@@ -1,7 +1,8 @@
 import re
+from collections.abc import Callable
 from dataclasses import dataclass, field
 
-from typing import TYPE_CHECKING, Literal, Optional
+from typing import TYPE_CHECKING, Any, ClassVar, Literal, Optional
 
 from posthog.hogql.constants import ConstantDataType
 from posthog.hogql.errors import NotImplementedError
@@ -12,30 +13,66 @@ if TYPE_CHECKING:
 # Given a string like "CorrectHorseBS", match the "H" and "B", so that we can convert this to "correct_horse_bs"
 camel_case_pattern = re.compile(r"(?<!^)(?<![A-Z])(?=[A-Z])")
 
+# NOTE: Sync with ./test/test_visitor.py#test_hogql_visitor_naming_exceptions
+visit_method_name_replacements = {
+    "hog_qlxtag": "hogqlx_tag",
+    "hog_qlxattribute": "hogqlx_attribute",
+    "uuidtype": "uuid_type",
+}
 
-@dataclass(kw_only=True)
+VisitMethod = Callable[[Any, "AST"], Any]
+
+# The visitor method to call for each pair of visitor class and node class, filled in on the first visit
+_visit_dispatch: dict[tuple[type, type], VisitMethod] = {}
+
+
+def _get_visit_method_name(node_class: type) -> str:
+    name = camel_case_pattern.sub("_", node_class.__name__).lower()
+    for old, new in visit_method_name_replacements.items():
+        name = name.replace(old, new)
+    return f"visit_{name}"
+
+
+def _missing_visit_method(visitor_class: type, method_name: str) -> VisitMethod:
+    def visit(visitor, node):
+        raise NotImplementedError(f"{visitor_class.__name__} has no method {method_name}")
+
+    return visit
+
+
+def _find_visit_method(visitor_class: type, node_class: type["AST"]) -> VisitMethod:
+    method_name = node_class._visit_method_name
+    visit = (
+        getattr(visitor_class, method_name, None)
+        or getattr(visitor_class, "visit_unknown", None)
+        or _missing_visit_method(visitor_class, method_name)
+    )
+    _visit_dispatch[(visitor_class, node_class)] = visit
+    return visit
+
+
+@dataclass(kw_only=True, slots=True)
 class AST:
     start: Optional[int] = field(default=None)
     end: Optional[int] = field(default=None)
 
+    _visit_method_name: ClassVar[str] = "visit_ast"
+
+    def __init_subclass__(cls, **kwargs):
+        # Not the zero-argument super(), which refers to the class from before dataclass() added the slots
+        super(AST, cls).__init_subclass__(**kwargs)
+        cls._visit_method_name = _get_visit_method_name(cls)
+
     # This is part of the visitor pattern from visitor.py.
+    # Visitor methods are looked up on the visitor's class, once per pair of visitor and node classes.
     def accept(self, visitor):
-        name = camel_case_pattern.sub("_", self.__class__.__name__).lower()
-
-        # NOTE: Sync with ./test/test_visitor.py#test_hogql_visitor_naming_exceptions
-        replacements = {"hog_qlxtag": "hogqlx_tag", "hog_qlxattribute": "hogqlx_attribute", "uuidtype": "uuid_type"}
-        for old, new in replacements.items():
-            name = name.replace(old, new)
-        method_name = f"visit_{name}"
-        if hasattr(visitor, method_name):
-            visit = getattr(visitor, method_name)
-            return visit(self)
-        if hasattr(visitor, "visit_unknown"):
-            return visitor.visit_unknown(self)
-        raise NotImplementedError(f"{visitor.__class__.__name__} has no method {method_name}")
-
-
-@dataclass(kw_only=True)
+        visit = _visit_dispatch.get((visitor.__class__, self.__class__))
+        if visit is None:
+            visit = _find_visit_method(visitor.__class__, self.__class__)
+        return visit(visitor, self)
+
+
+@dataclass(kw_only=True, slots=True)
 class Type(AST):
     def get_child(self, name: str, context: "HogQLContext") -> "Type":
         raise NotImplementedError("Type.get_child not overridden")
@@ -50,12 +87,12 @@ class Type(AST):
         raise NotImplementedError(f"{self.__class__.__name__}.resolve_column_constant_type not overridden")
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Expr(AST):
     type: Optional[Type] = field(default=None)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class CTE(Expr):
     """A common table expression."""
 
@@ -65,7 +102,7 @@ class CTE(Expr):
     cte_type: Literal["column", "subquery"]
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ConstantType(Type):
     data_type: ConstantDataType
     nullable: bool = field(default=True)
@@ -77,7 +114,7 @@ class ConstantType(Type):
         raise NotImplementedError("ConstantType.print_type not implemented")
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class UnknownType(ConstantType):
     data_type: ConstantDataType = field(default="unknown", init=False)
 
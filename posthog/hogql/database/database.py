@@ -1,9 +1,13 @@
 import dataclasses
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import Callable
 from typing import TYPE_CHECKING, Any, ClassVar, Literal, Optional, TypeAlias, cast, Union
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from django.db.models import Q
+from prometheus_client import Counter
 from pydantic import ConfigDict, BaseModel
 from sentry_sdk import capture_exception
 
@@ -65,6 +69,7 @@ from posthog.hogql.database.schema.sessions_v2 import (
     join_events_table_to_sessions_table_v2,
 )
 from posthog.hogql.database.schema.static_cohort_people import StaticCohortPeople
+from posthog.hogql.database.schema.web_stats import WebStatsDailyTable, WebStatsHourlyTable
 from posthog.hogql.errors import QueryError, ResolutionError
 from posthog.hogql.parser import parse_expr
 from posthog.models.group_type_mapping import GroupTypeMapping
@@ -121,6 +126,10 @@ class Database(BaseModel):
     raw_person_distinct_id_overrides: RawPersonDistinctIdOverridesTable = RawPersonDistinctIdOverridesTable()
     raw_sessions: Union[RawSessionsTableV1, RawSessionsTableV2] = RawSessionsTableV1()
 
+    # web analytics rollups, see posthog/models/web_stats/sql.py
+    web_stats_hourly: WebStatsHourlyTable = WebStatsHourlyTable()
+    web_stats_daily: WebStatsDailyTable = WebStatsDailyTable()
+
     # system tables
     numbers: NumbersTable = NumbersTable()
 
@@ -462,6 +471,59 @@ def create_hogql_database(
     return database
 
 
+DATABASE_CACHE_COUNTER = Counter(
+    "hogql_database_cache_lookups_total",
+    "Lookups in the process-local cache of per-team HogQL databases",
+    labelnames=["result"],
+)
+
+DATABASE_CACHE_MAX_ENTRIES = 256
+# Group types can be created by the plugin server without going through Django signals
+DATABASE_CACHE_TTL_SECONDS = 5 * 60
+
+_database_cache: OrderedDict[tuple[int, str, str], tuple[float, Database]] = OrderedDict()
+_database_cache_lock = threading.Lock()
+
+
+def get_cached_hogql_database(
+    team_id: int, modifiers: Optional[HogQLQueryModifiers] = None, team_arg: Optional["Team"] = None
+) -> Database:
+    """Like `create_hogql_database`, but reuses the database built for the same team schema version and modifiers.
+
+    The tables of the returned database are shared with other queries, so they must not be modified. Use
+    `create_hogql_database` to get a database of your own.
+    """
+    from posthog.models import Team
+    from posthog.hogql.query import create_default_modifiers_for_team
+    from posthog.hogql.schema_version import get_team_schema_version
+
+    team = team_arg or Team.objects.get(pk=team_id)
+    modifiers = create_default_modifiers_for_team(team, modifiers)
+    key = (team.pk, get_team_schema_version(team.pk), modifiers.model_dump_json(exclude_none=True))
+
+    with _database_cache_lock:
+        entry = _database_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] <= DATABASE_CACHE_TTL_SECONDS:
+            _database_cache.move_to_end(key)
+            DATABASE_CACHE_COUNTER.labels(result="hit").inc()
+            # Copy on write: the top-level attributes are private to this query, the tables are shared
+            return entry[1].model_copy()
+
+    DATABASE_CACHE_COUNTER.labels(result="miss").inc()
+    database = create_hogql_database(team.pk, modifiers, team)
+    with _database_cache_lock:
+        _database_cache[key] = (time.monotonic(), database)
+        _database_cache.move_to_end(key)
+        while len(_database_cache) > DATABASE_CACHE_MAX_ENTRIES:
+            _database_cache.popitem(last=False)
+    return database.model_copy()
+
+
+def clear_database_cache() -> None:
+    with _database_cache_lock:
+        _database_cache.clear()
+
+
 @dataclasses.dataclass
 class SerializedField:
     key: str
@@ -1,4 +1,3 @@
-from copy import deepcopy
 from typing import Optional
 from posthog.hogql import ast
 from posthog.hogql.context import HogQLContext
@@ -11,7 +10,7 @@ from posthog.hogql.database.models import (
 )
 from posthog.hogql.parser import parse_select
 from posthog.hogql.resolver_utils import get_long_table_name, lookup_field_by_name
-from posthog.hogql.visitor import CloningVisitor, TraversingVisitor
+from posthog.hogql.visitor import CloningVisitor, TraversingVisitor, clone_expr
 
 
 class EventsSessionSubTable(VirtualTable):
@@ -84,7 +83,7 @@ class WhereClauseExtractor:
         self.table_name = from_table_name
         self.select_query_type = select_query_type
         self.context = context
-        self.compare_operators = self.run(deepcopy(where_expression))
+        self.compare_operators = self.run(clone_expr(where_expression))
 
     def _is_field_on_table(self, field: ast.Field) -> bool:
         if len(field.chain) == 0:
@@ -160,7 +159,7 @@ class WhereClauseExtractor:
         # Clone field nodes and remove table name from field chains
         return [
             CleanTableNameFromChain(self.table_name, self.select_query_type).visit(
-                CloningVisitor(clear_types=True, clear_locations=True).visit(e)
+                clone_expr(e, clear_types=True, clear_locations=True)
             )
             for e in exprs_to_apply
         ]
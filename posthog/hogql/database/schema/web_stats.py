@@ -0,0 +1,61 @@
+from posthog.hogql.database.models import (
+    DatabaseField,
+    DateTimeDatabaseField,
+    FieldOrTable,
+    FloatDatabaseField,
+    IntegerDatabaseField,
+    StringDatabaseField,
+    Table,
+)
+
+WEB_STATS_FIELDS: dict[str, FieldOrTable] = {
+    "team_id": IntegerDatabaseField(name="team_id"),
+    "period_start": DateTimeDatabaseField(name="period_start"),
+    "kind": IntegerDatabaseField(name="kind"),
+    "pathname": StringDatabaseField(name="pathname", nullable=True),
+    "browser": StringDatabaseField(name="browser", nullable=True),
+    "os": StringDatabaseField(name="os", nullable=True),
+    "device_type": StringDatabaseField(name="device_type", nullable=True),
+    "country_code": StringDatabaseField(name="country_code", nullable=True),
+    "entry_pathname": StringDatabaseField(name="entry_pathname", nullable=True),
+    "referring_domain": StringDatabaseField(name="referring_domain", nullable=True),
+    "utm_source": StringDatabaseField(name="utm_source", nullable=True),
+    "utm_medium": StringDatabaseField(name="utm_medium", nullable=True),
+    "utm_campaign": StringDatabaseField(name="utm_campaign", nullable=True),
+    "utm_term": StringDatabaseField(name="utm_term", nullable=True),
+    "utm_content": StringDatabaseField(name="utm_content", nullable=True),
+    # AggregateFunction(uniq) states, read them with uniqMerge
+    "persons_uniq": DatabaseField(name="persons_uniq"),
+    "sessions_uniq": DatabaseField(name="sessions_uniq"),
+    "pageviews": IntegerDatabaseField(name="pageviews"),
+    "sessions": IntegerDatabaseField(name="sessions"),
+    "bounces": IntegerDatabaseField(name="bounces"),
+    "total_session_duration": FloatDatabaseField(name="total_session_duration"),
+}
+
+
+class WebStatsHourlyTable(Table):
+    fields: dict[str, FieldOrTable] = WEB_STATS_FIELDS
+
+    def to_printed_clickhouse(self, context):
+        return "web_stats_hourly"
+
+    def to_printed_hogql(self):
+        return "web_stats_hourly"
+
+    def avoid_asterisk_fields(self) -> list[str]:
+        # our clickhouse driver can't return aggregate states
+        return ["persons_uniq", "sessions_uniq"]
+
+
+class WebStatsDailyTable(Table):
+    fields: dict[str, FieldOrTable] = WEB_STATS_FIELDS
+
+    def to_printed_clickhouse(self, context):
+        return "web_stats_daily"
+
+    def to_printed_hogql(self):
+        return "web_stats_daily"
+
+    def avoid_asterisk_fields(self) -> list[str]:
+        return ["persons_uniq", "sessions_uniq"]
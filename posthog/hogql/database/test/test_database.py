@@ -7,7 +7,7 @@ from django.test import override_settings
 from parameterized import parameterized
 
 from posthog.hogql.constants import MAX_SELECT_RETURNED_ROWS
-from posthog.hogql.database.database import create_hogql_database, serialize_database
+from posthog.hogql.database.database import create_hogql_database, get_cached_hogql_database, serialize_database
 from posthog.hogql.database.models import FieldTraverser, LazyJoin, StringDatabaseField, ExpressionField, Table
 from posthog.hogql.errors import ExposedHogQLError
 from posthog.hogql.modifiers import create_default_modifiers_for_team
@@ -225,6 +225,30 @@ class TestDatabase(BaseTest, QueryMatchingTest):
 
         assert db.events.fields["test"] == FieldTraverser(chain=["group_0"])
 
+    def test_cached_database_is_invalidated_on_schema_change(self):
+        db = get_cached_hogql_database(team_id=self.team.pk)
+        assert "test" not in db.events.fields
+        assert get_cached_hogql_database(team_id=self.team.pk).events is db.events
+
+        GroupTypeMapping.objects.create(team=self.team, group_type="test", group_type_index=0)
+        db = get_cached_hogql_database(team_id=self.team.pk)
+
+        assert db.events.fields["test"] == FieldTraverser(chain=["group_0"])
+
+    def test_cached_database_depends_on_modifiers(self):
+        db_poe = get_cached_hogql_database(
+            team_id=self.team.pk,
+            modifiers=HogQLQueryModifiers(
+                personsOnEventsMode=PersonsOnEventsMode.PERSON_ID_OVERRIDE_PROPERTIES_ON_EVENTS
+            ),
+        )
+        db_no_poe = get_cached_hogql_database(
+            team_id=self.team.pk, modifiers=HogQLQueryModifiers(personsOnEventsMode=PersonsOnEventsMode.DISABLED)
+        )
+
+        assert db_poe.events.fields["person"] == FieldTraverser(chain=["poe"])
+        assert db_no_poe.events.fields["person"] == FieldTraverser(chain=["pdi", "person"])
+
     def test_database_group_type_mappings_overwrite(self):
         GroupTypeMapping.objects.create(team=self.team, group_type="event", group_type_index=0)
         db = create_hogql_database(team_id=self.team.pk)
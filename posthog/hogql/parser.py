@@ -1,9 +1,11 @@
-from typing import Literal, Optional, cast
+import threading
+from collections import OrderedDict
+from typing import Any, Literal, Optional, cast
 from collections.abc import Callable
 
 from antlr4 import CommonTokenStream, InputStream, ParseTreeVisitor, ParserRuleContext
 from antlr4.error.ErrorListener import ErrorListener
-from prometheus_client import Histogram
+from prometheus_client import Counter, Histogram
 
 from posthog.hogql import ast
 from posthog.hogql.base import AST
@@ -14,6 +16,7 @@ from posthog.hogql.grammar.HogQLParser import HogQLParser
 from posthog.hogql.parse_string import parse_string_literal_text, parse_string_literal_ctx, parse_string_text_ctx
 from posthog.hogql.placeholders import replace_placeholders
 from posthog.hogql.timings import HogQLTimings
+from posthog.hogql.visitor import clone_expr
 from hogql_parser import (
     parse_expr as _parse_expr_cpp,
     parse_order_expr as _parse_order_expr_cpp,
@@ -67,6 +70,98 @@ RULE_TO_HISTOGRAM: dict[Literal["expr", "order_expr", "select", "full_template_s
     for rule in ("expr", "order_expr", "select", "full_template_string")
 }
 
+PARSE_CACHE_COUNTER = Counter(
+    "parse_cache_lookups_total",
+    "Lookups in the process-local cache of parsed HogQL ASTs",
+    labelnames=["rule", "backend", "result"],
+)
+
+# Only short, template-like strings are worth caching. Long user-written queries are rarely repeated verbatim.
+PARSE_CACHE_MAX_ENTRIES = 2048
+PARSE_CACHE_MAX_TEXT_LENGTH = 10_000
+
+
+class ParseCache:
+    """Bounded LRU cache of parsed ASTs, keyed by (rule, text, backend, start).
+
+    Cached nodes are never handed out directly: callers always receive a clone, so they are free to mutate it.
+
+    The cache is bounded by its number of entries, not by memory. An AST grows with the length of the text it was
+    parsed from, so `max_text_length` only caps each entry loosely: at worst the cache holds `max_entries` trees of
+    `max_text_length`-character queries.
+    """
+
+    def __init__(self, max_entries: int = PARSE_CACHE_MAX_ENTRIES, max_text_length: int = PARSE_CACHE_MAX_TEXT_LENGTH):
+        self.max_entries = max_entries
+        self.max_text_length = max_text_length
+        self._entries: OrderedDict[tuple, ast.Expr] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_parse(
+        self,
+        rule: Literal["expr", "order_expr", "select", "full_template_string"],
+        backend: Literal["python", "cpp"],
+        text: str,
+        *args: Any,
+    ) -> ast.Expr:
+        if len(text) > self.max_text_length:
+            return self._parse(rule, backend, text, *args)
+
+        key = (rule, backend, text, *args)
+        with self._lock:
+            node = self._entries.get(key)
+            if node is not None:
+                self._entries.move_to_end(key)
+        if node is not None:
+            PARSE_CACHE_COUNTER.labels(rule=rule, backend=backend, result="hit").inc()
+            return node
+
+        PARSE_CACHE_COUNTER.labels(rule=rule, backend=backend, result="miss").inc()
+        node = self._parse(rule, backend, text, *args)
+        with self._lock:
+            self._entries[key] = node
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return node
+
+    @staticmethod
+    def _parse(
+        rule: Literal["expr", "order_expr", "select", "full_template_string"],
+        backend: Literal["python", "cpp"],
+        text: str,
+        *args: Any,
+    ) -> ast.Expr:
+        # Only actual parsing is timed, so cache hits don't skew the parse time histograms
+        with RULE_TO_HISTOGRAM[rule].labels(backend=backend).time():
+            return RULE_TO_PARSE_FUNCTION[backend][rule](text, *args)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+parse_cache = ParseCache()
+
+
+def _parse_cached(
+    rule: Literal["expr", "order_expr", "select", "full_template_string"],
+    backend: Literal["python", "cpp"],
+    placeholders: Optional[dict[str, ast.Expr]],
+    timings: HogQLTimings,
+    text: str,
+    *args: Any,
+) -> Any:
+    node = parse_cache.get_or_parse(rule, backend, text, *args)
+    if placeholders:
+        # Replacing placeholders clones the tree, leaving the cached node untouched
+        with timings.measure("replace_placeholders"):
+            return replace_placeholders(node, placeholders)
+    return clone_expr(node)
+
 
 def parse_string_template(
     string: str,
@@ -79,11 +174,7 @@ def parse_string_template(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_full_template_string_{backend}"):
-        with RULE_TO_HISTOGRAM["full_template_string"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["full_template_string"]("F'" + string)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
+        node = _parse_cached("full_template_string", backend, placeholders, timings, "F'" + string)
     return node
 
 
@@ -100,11 +191,7 @@ def parse_expr(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_expr_{backend}"):
-        with RULE_TO_HISTOGRAM["expr"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["expr"](expr, start)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
+        node = _parse_cached("expr", backend, placeholders, timings, expr, start)
     return node
 
 
@@ -118,11 +205,7 @@ def parse_order_expr(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_order_expr_{backend}"):
-        with RULE_TO_HISTOGRAM["order_expr"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["order_expr"](order_expr)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
+        node = _parse_cached("order_expr", backend, placeholders, timings, order_expr)
     return node
 
 
@@ -136,11 +219,7 @@ def parse_select(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_select_{backend}"):
-        with RULE_TO_HISTOGRAM["select"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["select"](statement)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
+        node = _parse_cached("select", backend, placeholders, timings, statement)
     return node
 
 
@@ -0,0 +1,181 @@
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from prometheus_client import Counter
+
+from posthog.hogql import ast
+from posthog.hogql.constants import HogQLGlobalSettings, LimitContext
+from posthog.hogql.escape_sql import escape_hogql_string
+from posthog.hogql.schema_version import get_team_schema_version
+from posthog.hogql.visitor import CloningVisitor
+from posthog.schema import HogQLQueryModifiers
+
+if TYPE_CHECKING:
+    from posthog.models import Team
+
+PLAN_CACHE_COUNTER = Counter(
+    "hogql_plan_cache_lookups_total",
+    "Lookups in the process-local cache of compiled HogQL query plans",
+    labelnames=["result"],
+)
+
+PLAN_CACHE_MAX_ENTRIES = 1024
+# Property types and group mappings can also be written outside of Django, so never trust a plan for too long
+PLAN_CACHE_TTL_SECONDS = 10 * 60
+
+# Printed SQL that depends on state that isn't covered by the schema version, or on the time of printing
+UNCACHEABLE_SQL_MARKERS = ("cohortpeople", "session_replay_events")
+
+# Unique per process, so that user-provided strings can never be mistaken for slots
+_SLOT_NONCE = secrets.token_hex(6)
+
+
+@dataclass(frozen=True)
+class CompiledQueryPlan:
+    """Printed HogQL and ClickHouse SQL for a query, with string constants replaced by slots."""
+
+    hogql: str
+    columns: list[str]
+    clickhouse_sql: str
+    values: dict[str, Any]
+
+    def bind(self, slots: dict[str, str]) -> tuple[str, list[str], dict[str, Any]]:
+        """Fill the slots with this execution's constants. Returns the HogQL, the columns and the ClickHouse values."""
+        values = {
+            key: slots[value] if isinstance(value, str) and value in slots else value
+            for key, value in self.values.items()
+        }
+        return (
+            _replace_slots(self.hogql, slots),
+            [_replace_slots(column, slots) for column in self.columns],
+            values,
+        )
+
+
+class ParameterizeConstants(CloningVisitor):
+    """Clones the query, replacing all non-empty string constants with unique slots."""
+
+    def __init__(self):
+        super().__init__(clear_types=True, clear_locations=True)
+        self.slots: dict[str, str] = {}
+
+    def visit_constant(self, node: ast.Constant):
+        if isinstance(node.value, str) and node.value != "":
+            slot = f"__hogql_slot_{_SLOT_NONCE}_{len(self.slots)}__"
+            self.slots[slot] = node.value
+            return ast.Constant(value=slot)
+        return super().visit_constant(node)
+
+
+def parameterize_constants(
+    node: Union[ast.SelectQuery, ast.SelectUnionQuery],
+) -> tuple[Union[ast.SelectQuery, ast.SelectUnionQuery], dict[str, str]]:
+    visitor = ParameterizeConstants()
+    template = visitor.visit(node)
+    return template, visitor.slots
+
+
+def get_plan_cache_key(
+    template: Union[ast.SelectQuery, ast.SelectUnionQuery],
+    team: "Team",
+    modifiers: HogQLQueryModifiers,
+    limit_context: Optional[LimitContext],
+    settings: HogQLGlobalSettings,
+    pretty: bool,
+) -> str:
+    parts = [
+        # Slot names only depend on the order of the constants, so the repr is identical for every execution
+        repr(template),
+        str(team.pk),
+        get_team_schema_version(team.pk),
+        str(team.timezone),
+        str(team.week_start_day),
+        modifiers.model_dump_json(exclude_none=True),
+        str(limit_context.value if limit_context else None),
+        settings.model_dump_json(exclude_none=True),
+        str(pretty),
+    ]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def build_plan(
+    hogql: str, columns: list[str], clickhouse_sql: str, values: dict[str, Any], slots: dict[str, str]
+) -> CompiledQueryPlan | None:
+    """Returns a plan if every slot was passed through to the printed query untouched, None otherwise.
+
+    Printing may inspect constants (e.g. to fold comparisons or look up cohorts by name). If that happened,
+    the printed query is only valid for these exact constants, and can't be reused with other values.
+    """
+    if any(marker in clickhouse_sql for marker in UNCACHEABLE_SQL_MARKERS):
+        return None
+    if _SLOT_NONCE in clickhouse_sql:
+        return None
+
+    used_slots = set()
+    for value in values.values():
+        if isinstance(value, str) and value in slots:
+            used_slots.add(value)
+        elif _SLOT_NONCE in repr(value):
+            return None
+    if used_slots != set(slots.keys()):
+        return None
+
+    # HogQL inlines all constants. Every mention of a slot must be a plain escaped string we can substitute.
+    for text in (hogql, *columns):
+        if text.count(_SLOT_NONCE) != sum(text.count(escape_hogql_string(slot)) for slot in slots):
+            return None
+
+    return CompiledQueryPlan(hogql=hogql, columns=columns, clickhouse_sql=clickhouse_sql, values=values)
+
+
+def _replace_slots(text: str, slots: dict[str, str]) -> str:
+    if _SLOT_NONCE not in text:
+        return text
+    for slot, value in slots.items():
+        text = text.replace(escape_hogql_string(slot), escape_hogql_string(value))
+    return text
+
+
+class PlanCache:
+    """Process-local LRU of compiled query plans. A None plan marks a query that can't be cached."""
+
+    def __init__(self, max_entries: int = PLAN_CACHE_MAX_ENTRIES, ttl_seconds: int = PLAN_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, CompiledQueryPlan | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[bool, CompiledQueryPlan | None]:
+        """Returns whether the key was found, and the plan stored for it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            created_at, plan = entry
+            if time.monotonic() - created_at > self.ttl_seconds:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, plan
+
+    def set(self, key: str, plan: CompiledQueryPlan | None) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), plan)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+plan_cache = PlanCache()
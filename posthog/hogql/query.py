@@ -1,14 +1,26 @@
 import dataclasses
+from collections.abc import Iterator
 from typing import Optional, Union, cast
 
+import pyarrow as pa
+
 from posthog.clickhouse.client.connection import Workload
 from posthog.errors import ExposedCHQueryError
 from posthog.hogql import ast
+from posthog.hogql.arrow import columns_to_table
 from posthog.hogql.constants import HogQLGlobalSettings, LimitContext, get_default_limit_for_context
 from posthog.hogql.errors import ExposedHogQLError
 from posthog.hogql.hogql import HogQLContext
 from posthog.hogql.modifiers import create_default_modifiers_for_team
 from posthog.hogql.parser import parse_select
+from posthog.hogql.plan_cache import (
+    PLAN_CACHE_COUNTER,
+    CompiledQueryPlan,
+    build_plan,
+    get_plan_cache_key,
+    parameterize_constants,
+    plan_cache,
+)
 from posthog.hogql.placeholders import replace_placeholders, find_placeholders
 from posthog.hogql.printer import (
     prepare_ast_for_printing,
@@ -21,7 +33,8 @@ from posthog.hogql.variables import replace_variables
 from posthog.hogql.visitor import clone_expr
 from posthog.models.team import Team
 from posthog.clickhouse.query_tagging import tag_queries
-from posthog.client import sync_execute
+from posthog.client import sync_execute, sync_execute_iter
+from posthog.clickhouse.client.execute import STREAMING_CHUNK_SIZE
 from posthog.schema import (
     HogQLQueryResponse,
     HogQLFilters,
@@ -49,20 +62,281 @@ def execute_hogql_query(
     timings: Optional[HogQLTimings] = None,
     pretty: Optional[bool] = True,
     context: Optional[HogQLContext] = None,
+    cacheable: bool = False,
 ) -> HogQLQueryResponse:
     if timings is None:
         timings = HogQLTimings()
 
+    debug = modifiers is not None and modifiers.debug
+    explain: Optional[list[str]] = None
+    results = None
+    types = None
+    metadata: Optional[HogQLMetadataResponse] = None
+
+    prepared = _prepare_hogql_query(
+        query,
+        team,
+        filters=filters,
+        placeholders=placeholders,
+        variables=variables,
+        settings=settings,
+        modifiers=modifiers,
+        limit_context=limit_context,
+        timings=timings,
+        pretty=pretty,
+        context=context,
+    )
+    hogql = prepared.hogql
+    clickhouse_sql = prepared.clickhouse_sql
+    clickhouse_context = prepared.clickhouse_context
+    error = prepared.error
+
+    if clickhouse_sql is not None:
+        timings_dict = timings.to_dict()
+        with timings.measure("clickhouse_execute"):
+            tag_queries(
+                team_id=team.pk,
+                query_type=query_type,
+                has_joins="JOIN" in clickhouse_sql,
+                has_json_operations="JSONExtract" in clickhouse_sql or "JSONHas" in clickhouse_sql,
+                timings=timings_dict,
+                modifiers={k: v for k, v in modifiers.model_dump().items() if v is not None} if modifiers else {},
+            )
+
+            try:
+                results, types = sync_execute(
+                    clickhouse_sql,
+                    clickhouse_context.values,
+                    with_column_types=True,
+                    workload=workload,
+                    team_id=team.pk,
+                    readonly=True,
+                    cacheable=cacheable and not debug,
+                )
+            except Exception as e:
+                if debug:
+                    results = []
+                    if isinstance(e, ExposedCHQueryError | ExposedHogQLError):
+                        error = str(e)
+                    else:
+                        error = "Unknown error"
+                else:
+                    raise
+
+        if debug and error is None:  # If the query errored, explain will fail as well.
+            with timings.measure("explain"):
+                explain_results = sync_execute(
+                    f"EXPLAIN {clickhouse_sql}",
+                    clickhouse_context.values,
+                    with_column_types=True,
+                    workload=workload,
+                    team_id=team.pk,
+                    readonly=True,
+                )
+                explain = [str(r[0]) for r in explain_results[0]]
+            with timings.measure("metadata"):
+                from posthog.hogql.metadata import get_hogql_metadata
+
+                metadata = get_hogql_metadata(HogQLMetadata(language=HogLanguage.HOG_QL, query=hogql, debug=True), team)
+
+    return HogQLQueryResponse(
+        query=prepared.query,
+        hogql=hogql,
+        clickhouse=clickhouse_sql,
+        error=error,
+        timings=timings.to_list(),
+        results=results,
+        columns=prepared.columns,
+        types=types,
+        modifiers=prepared.modifiers,
+        explain=explain,
+        metadata=metadata,
+    )
+
+
+def execute_hogql_query_iter(
+    query: Union[str, ast.SelectQuery, ast.SelectUnionQuery],
+    team: Team,
+    *,
+    query_type: str = "hogql_query",
+    filters: Optional[HogQLFilters] = None,
+    placeholders: Optional[dict[str, ast.Expr]] = None,
+    variables: Optional[dict[str, HogQLVariable]] = None,
+    workload: Workload = Workload.DEFAULT,
+    settings: Optional[HogQLGlobalSettings] = None,
+    modifiers: Optional[HogQLQueryModifiers] = None,
+    limit_context: Optional[LimitContext] = LimitContext.QUERY,
+    timings: Optional[HogQLTimings] = None,
+    context: Optional[HogQLContext] = None,
+    chunk_size: int = STREAMING_CHUNK_SIZE,
+) -> tuple[list[str], Iterator[tuple]]:
+    """
+    Like `execute_hogql_query`, but streams the result rows instead of loading them all in memory.
+    Returns the columns and an iterator of rows. Debug mode isn't supported.
+    """
+    if timings is None:
+        timings = HogQLTimings()
+
+    prepared = _prepare_hogql_query(
+        query,
+        team,
+        filters=filters,
+        placeholders=placeholders,
+        variables=variables,
+        settings=settings,
+        modifiers=modifiers.model_copy(update={"debug": False}) if modifiers else None,
+        limit_context=limit_context,
+        timings=timings,
+        pretty=False,
+        context=context,
+    )
+    assert prepared.clickhouse_sql is not None and prepared.columns is not None
+
+    tag_queries(
+        team_id=team.pk,
+        query_type=query_type,
+        has_joins="JOIN" in prepared.clickhouse_sql,
+        has_json_operations="JSONExtract" in prepared.clickhouse_sql or "JSONHas" in prepared.clickhouse_sql,
+        timings=timings.to_dict(),
+        modifiers={k: v for k, v in modifiers.model_dump().items() if v is not None} if modifiers else {},
+    )
+    rows = sync_execute_iter(
+        prepared.clickhouse_sql,
+        prepared.clickhouse_context.values,
+        chunk_size=chunk_size,
+        workload=workload,
+        team_id=team.pk,
+        readonly=True,
+    )
+    return prepared.columns, rows
+
+
+def execute_hogql_query_arrow(
+    query: Union[str, ast.SelectQuery, ast.SelectUnionQuery],
+    team: Team,
+    *,
+    query_type: str = "hogql_query",
+    filters: Optional[HogQLFilters] = None,
+    placeholders: Optional[dict[str, ast.Expr]] = None,
+    variables: Optional[dict[str, HogQLVariable]] = None,
+    workload: Workload = Workload.DEFAULT,
+    settings: Optional[HogQLGlobalSettings] = None,
+    modifiers: Optional[HogQLQueryModifiers] = None,
+    limit_context: Optional[LimitContext] = LimitContext.QUERY,
+    timings: Optional[HogQLTimings] = None,
+    context: Optional[HogQLContext] = None,
+) -> tuple[HogQLQueryResponse, pa.Table]:
+    """
+    Like `execute_hogql_query`, but fetches the results column by column, and returns them as an Arrow table for
+    vectorized post-processing (see `posthog.hogql_queries.utils.arrow`). Columns are typed after their ClickHouse
+    types (see `posthog.hogql.arrow`). The response has everything but the results.
+    Debug mode isn't supported.
+    """
+    if timings is None:
+        timings = HogQLTimings()
+
+    prepared = _prepare_hogql_query(
+        query,
+        team,
+        filters=filters,
+        placeholders=placeholders,
+        variables=variables,
+        settings=settings,
+        modifiers=modifiers.model_copy(update={"debug": False}) if modifiers else None,
+        limit_context=limit_context,
+        timings=timings,
+        pretty=True,
+        context=context,
+    )
+    assert prepared.clickhouse_sql is not None and prepared.columns is not None
+
+    timings_dict = timings.to_dict()
+    with timings.measure("clickhouse_execute"):
+        tag_queries(
+            team_id=team.pk,
+            query_type=query_type,
+            has_joins="JOIN" in prepared.clickhouse_sql,
+            has_json_operations="JSONExtract" in prepared.clickhouse_sql or "JSONHas" in prepared.clickhouse_sql,
+            timings=timings_dict,
+            modifiers={k: v for k, v in modifiers.model_dump().items() if v is not None} if modifiers else {},
+        )
+        columns, types = sync_execute(
+            prepared.clickhouse_sql,
+            prepared.clickhouse_context.values,
+            with_column_types=True,
+            columnar=True,
+            workload=workload,
+            team_id=team.pk,
+            readonly=True,
+        )
+
+    with timings.measure("arrow_table"):
+        table = columns_to_table(
+            _unique_column_names(prepared.columns), columns, [clickhouse_type for _, clickhouse_type in types]
+        )
+
+    response = HogQLQueryResponse(
+        query=prepared.query,
+        hogql=prepared.hogql,
+        clickhouse=prepared.clickhouse_sql,
+        timings=timings.to_list(),
+        results=[],
+        columns=prepared.columns,
+        types=types,
+        modifiers=prepared.modifiers,
+    )
+    return response, table
+
+
+def _unique_column_names(columns: list[str]) -> list[str]:
+    # Arrow tables can have duplicate names, but then columns can't be looked up by name
+    seen: dict[str, int] = {}
+    unique = []
+    for column in columns:
+        count = seen.get(column, 0)
+        seen[column] = count + 1
+        unique.append(column if count == 0 else f"{column}_{count}")
+    return unique
+
+
+@dataclasses.dataclass
+class _PreparedHogQLQuery:
+    query: Optional[str]
+    hogql: Optional[str]
+    columns: Optional[list[str]]
+    clickhouse_sql: Optional[str]
+    clickhouse_context: HogQLContext
+    modifiers: HogQLQueryModifiers
+    # Only set in debug mode, where errors are returned instead of raised
+    error: Optional[str]
+
+
+def _prepare_hogql_query(
+    query: Union[str, ast.SelectQuery, ast.SelectUnionQuery],
+    team: Team,
+    *,
+    filters: Optional[HogQLFilters],
+    placeholders: Optional[dict[str, ast.Expr]],
+    variables: Optional[dict[str, HogQLVariable]],
+    settings: Optional[HogQLGlobalSettings],
+    modifiers: Optional[HogQLQueryModifiers],
+    limit_context: Optional[LimitContext],
+    timings: HogQLTimings,
+    pretty: Optional[bool],
+    context: Optional[HogQLContext],
+) -> _PreparedHogQLQuery:
+    # Queries with a custom context may rely on its globals or database, so never reuse their plans
+    use_plan_cache = context is None
+
     if context is None:
         context = HogQLContext(team_id=team.pk)
 
     query_modifiers = create_default_modifiers_for_team(team, modifiers)
     debug = modifiers is not None and modifiers.debug
+    pretty = pretty if pretty is not None else True
     error: Optional[str] = None
-    explain: Optional[list[str]] = None
-    results = None
-    types = None
-    metadata: Optional[HogQLMetadataResponse] = None
+    hogql: Optional[str] = None
+    print_columns: Optional[list[str]] = None
 
     with timings.measure("query"):
         if isinstance(query, ast.SelectQuery) or isinstance(query, ast.SelectUnionQuery):
@@ -112,57 +386,38 @@ def execute_hogql_query(
             if one_query.limit is None:
                 one_query.limit = ast.Constant(value=get_default_limit_for_context(limit_context))
 
-    # Get printed HogQL query, and returned columns. Using a cloned query.
-    with timings.measure("hogql"):
-        with timings.measure("prepare_ast"):
-            hogql_query_context = dataclasses.replace(
-                context,
-                # set the team.pk here so someone can't pass a context for a different team 🤷‍️
-                team_id=team.pk,
-                team=team,
-                enable_select_queries=True,
-                timings=timings,
-                modifiers=query_modifiers,
-            )
-
-            with timings.measure("clone"):
-                cloned_query = clone_expr(select_query, True)
-            select_query_hogql = cast(
-                ast.SelectQuery,
-                prepare_ast_for_printing(node=cloned_query, context=hogql_query_context, dialect="hogql"),
-            )
-
-        with timings.measure("print_ast"):
-            hogql = print_prepared_ast(
-                select_query_hogql, hogql_query_context, "hogql", pretty=pretty if pretty is not None else True
-            )
-            print_columns = []
-            columns_query = (
-                select_query_hogql.select_queries[0]
-                if isinstance(select_query_hogql, ast.SelectUnionQuery)
-                else select_query_hogql
-            )
-            for node in columns_query.select:
-                if isinstance(node, ast.Alias):
-                    print_columns.append(node.alias)
-                else:
-                    print_columns.append(
-                        print_prepared_ast(
-                            node=node,
-                            context=hogql_query_context,
-                            dialect="hogql",
-                            stack=[select_query_hogql],
-                        )
-                    )
-
     settings = settings or HogQLGlobalSettings()
     if limit_context in (LimitContext.EXPORT, LimitContext.COHORT_CALCULATION, LimitContext.QUERY_ASYNC):
         settings.max_execution_time = HOGQL_INCREASED_MAX_EXECUTION_TIME
 
-    # Print the ClickHouse SQL query
-    with timings.measure("print_ast"):
-        try:
-            clickhouse_context = dataclasses.replace(
+    plan: Optional[CompiledQueryPlan] = None
+    slots: dict[str, str] = {}
+    if use_plan_cache and not debug:
+        with timings.measure("plan_cache"):
+            template, slots = parameterize_constants(select_query)
+            plan_cache_key = get_plan_cache_key(template, team, query_modifiers, limit_context, settings, pretty)
+            found, plan = plan_cache.get(plan_cache_key)
+            if not found:
+                plan = _compile_plan(template, slots, team, context, timings, query_modifiers, settings, pretty)
+                plan_cache.set(plan_cache_key, plan)
+            PLAN_CACHE_COUNTER.labels(result="uncacheable" if plan is None else "hit" if found else "miss").inc()
+
+    if plan is not None:
+        hogql, print_columns, values = plan.bind(slots)
+        clickhouse_sql = plan.clickhouse_sql
+        clickhouse_context = dataclasses.replace(
+            context,
+            team_id=team.pk,
+            team=team,
+            enable_select_queries=True,
+            timings=timings,
+            modifiers=query_modifiers,
+            values=values,
+        )
+    else:
+        # Get printed HogQL query, and returned columns. Using a cloned query.
+        with timings.measure("hogql"):
+            hogql_query_context = dataclasses.replace(
                 context,
                 # set the team.pk here so someone can't pass a context for a different team 🤷‍️
                 team_id=team.pk,
@@ -171,47 +426,30 @@ def execute_hogql_query(
                 timings=timings,
                 modifiers=query_modifiers,
             )
-            clickhouse_sql = print_ast(
-                select_query,
-                context=clickhouse_context,
-                dialect="clickhouse",
-                settings=settings,
-                pretty=pretty if pretty is not None else True,
-            )
-        except Exception as e:
-            if debug:
-                clickhouse_sql = None
-                if isinstance(e, ExposedCHQueryError | ExposedHogQLError):
-                    error = str(e)
-                else:
-                    error = "Unknown error"
-            else:
-                raise
-
-    if clickhouse_sql is not None:
-        timings_dict = timings.to_dict()
-        with timings.measure("clickhouse_execute"):
-            tag_queries(
-                team_id=team.pk,
-                query_type=query_type,
-                has_joins="JOIN" in clickhouse_sql,
-                has_json_operations="JSONExtract" in clickhouse_sql or "JSONHas" in clickhouse_sql,
-                timings=timings_dict,
-                modifiers={k: v for k, v in modifiers.model_dump().items() if v is not None} if modifiers else {},
-            )
+            hogql, print_columns = _print_hogql(select_query, hogql_query_context, timings, pretty)
 
+        # Print the ClickHouse SQL query
+        with timings.measure("print_ast"):
             try:
-                results, types = sync_execute(
-                    clickhouse_sql,
-                    clickhouse_context.values,
-                    with_column_types=True,
-                    workload=workload,
+                clickhouse_context = dataclasses.replace(
+                    context,
+                    # set the team.pk here so someone can't pass a context for a different team 🤷‍️
                     team_id=team.pk,
-                    readonly=True,
+                    team=team,
+                    enable_select_queries=True,
+                    timings=timings,
+                    modifiers=query_modifiers,
+                )
+                clickhouse_sql = print_ast(
+                    select_query,
+                    context=clickhouse_context,
+                    dialect="clickhouse",
+                    settings=settings,
+                    pretty=pretty,
                 )
             except Exception as e:
                 if debug:
-                    results = []
+                    clickhouse_sql = None
                     if isinstance(e, ExposedCHQueryError | ExposedHogQLError):
                         error = str(e)
                     else:
@@ -219,32 +457,74 @@ def execute_hogql_query(
                 else:
                     raise
 
-        if debug and error is None:  # If the query errored, explain will fail as well.
-            with timings.measure("explain"):
-                explain_results = sync_execute(
-                    f"EXPLAIN {clickhouse_sql}",
-                    clickhouse_context.values,
-                    with_column_types=True,
-                    workload=workload,
-                    team_id=team.pk,
-                    readonly=True,
-                )
-                explain = [str(r[0]) for r in explain_results[0]]
-            with timings.measure("metadata"):
-                from posthog.hogql.metadata import get_hogql_metadata
-
-                metadata = get_hogql_metadata(HogQLMetadata(language=HogLanguage.HOG_QL, query=hogql, debug=True), team)
-
-    return HogQLQueryResponse(
-        query=query,
+    return _PreparedHogQLQuery(
+        query=query if isinstance(query, str) else None,
         hogql=hogql,
-        clickhouse=clickhouse_sql,
-        error=error,
-        timings=timings.to_list(),
-        results=results,
         columns=print_columns,
-        types=types,
+        clickhouse_sql=clickhouse_sql,
+        clickhouse_context=clickhouse_context,
         modifiers=query_modifiers,
-        explain=explain,
-        metadata=metadata,
+        error=error,
     )
+
+
+def _print_hogql(
+    select_query: ast.SelectQuery | ast.SelectUnionQuery, context: HogQLContext, timings: HogQLTimings, pretty: bool
+) -> tuple[str, list[str]]:
+    with timings.measure("prepare_ast"):
+        with timings.measure("clone"):
+            cloned_query = clone_expr(select_query, True)
+        select_query_hogql = cast(
+            ast.SelectQuery,
+            prepare_ast_for_printing(node=cloned_query, context=context, dialect="hogql"),
+        )
+
+    with timings.measure("print_ast"):
+        hogql = print_prepared_ast(select_query_hogql, context, "hogql", pretty=pretty)
+        print_columns = []
+        columns_query = (
+            select_query_hogql.select_queries[0]
+            if isinstance(select_query_hogql, ast.SelectUnionQuery)
+            else select_query_hogql
+        )
+        for node in columns_query.select:
+            if isinstance(node, ast.Alias):
+                print_columns.append(node.alias)
+            else:
+                print_columns.append(
+                    print_prepared_ast(
+                        node=node,
+                        context=context,
+                        dialect="hogql",
+                        stack=[select_query_hogql],
+                    )
+                )
+    return hogql, print_columns
+
+
+def _compile_plan(
+    template: ast.SelectQuery | ast.SelectUnionQuery,
+    slots: dict[str, str],
+    team: Team,
+    context: HogQLContext,
+    timings: HogQLTimings,
+    modifiers: HogQLQueryModifiers,
+    settings: HogQLGlobalSettings,
+    pretty: bool,
+) -> Optional[CompiledQueryPlan]:
+    """Print a query with its string constants replaced by slots. Returns None if the result can't be reused."""
+    hogql_query_context = dataclasses.replace(
+        context, team_id=team.pk, team=team, enable_select_queries=True, timings=timings, modifiers=modifiers
+    )
+    clickhouse_context = dataclasses.replace(hogql_query_context, values={})
+    try:
+        with timings.measure("hogql"):
+            hogql, print_columns = _print_hogql(template, hogql_query_context, timings, pretty)
+        with timings.measure("print_ast"):
+            clickhouse_sql = print_ast(
+                template, context=clickhouse_context, dialect="clickhouse", settings=settings, pretty=pretty
+            )
+    except Exception:
+        # The regular code path will surface the error, with the real constants in its message
+        return None
+    return build_plan(hogql, print_columns, clickhouse_sql, clickhouse_context.values, slots)
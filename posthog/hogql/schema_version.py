@@ -0,0 +1,27 @@
+from typing import Optional
+from uuid import uuid4
+
+from django.core.cache import cache
+
+# Version stamps for everything a team's HogQL schema is built from: warehouse tables, saved queries, joins, group
+# types, actions, team settings and (globally) materialized columns. Caches of derived artifacts include the stamp in
+# their keys, so bumping it invalidates them across all workers.
+TEAM_SCHEMA_VERSION_KEY = "hogql_schema_version:team:{team_id}"
+GLOBAL_SCHEMA_VERSION_KEY = "hogql_schema_version:global"
+SCHEMA_VERSION_TTL_SECONDS = 60 * 60 * 24 * 7
+
+
+def get_team_schema_version(team_id: int) -> str:
+    team_key = TEAM_SCHEMA_VERSION_KEY.format(team_id=team_id)
+    versions = cache.get_many([team_key, GLOBAL_SCHEMA_VERSION_KEY])
+    return f"{versions.get(team_key, '0')}.{versions.get(GLOBAL_SCHEMA_VERSION_KEY, '0')}"
+
+
+def bump_team_schema_version(team_id: Optional[int]) -> None:
+    if team_id is None:
+        return
+    cache.set(TEAM_SCHEMA_VERSION_KEY.format(team_id=team_id), uuid4().hex, timeout=SCHEMA_VERSION_TTL_SECONDS)
+
+
+def bump_global_schema_version() -> None:
+    cache.set(GLOBAL_SCHEMA_VERSION_KEY, uuid4().hex, timeout=SCHEMA_VERSION_TTL_SECONDS)
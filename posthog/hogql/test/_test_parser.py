@@ -1,6 +1,9 @@
 from typing import Literal, cast, Optional
 
 import math
+
+from prometheus_client import REGISTRY
+
 from posthog.hogql.ast import (
     VariableAssignment,
     Constant,
@@ -26,7 +29,13 @@ from posthog.hogql.ast import (
 from posthog.hogql.parser import parse_program
 from posthog.hogql import ast
 from posthog.hogql.errors import ExposedHogQLError, SyntaxError
-from posthog.hogql.parser import parse_expr, parse_order_expr, parse_select, parse_string_template
+from posthog.hogql.parser import (
+    parse_cache,
+    parse_expr,
+    parse_order_expr,
+    parse_select,
+    parse_string_template,
+)
 from posthog.hogql.visitor import clear_locations
 from posthog.test.base import BaseTest, MemoryLeakTestMixin
 
@@ -2524,4 +2533,42 @@ def parser_test_factory(backend: Literal["python", "cpp"]):
             )
             self.assertEqual(program, expected)
 
+        def test_parse_cache_returns_independent_copies(self):
+            parse_cache.clear()
+            first = cast(ast.SelectQuery, self._select("select event from events where 1 = 1"))
+            first.select.append(ast.Field(chain=["uuid"]))
+
+            second = cast(ast.SelectQuery, self._select("select event from events where 1 = 1"))
+            self.assertIsNot(first, second)
+            self.assertEqual(second.select, [ast.Field(chain=["event"])])
+            self.assertEqual(len(parse_cache), 1)
+
+        def test_parse_cache_placeholders_do_not_leak(self):
+            parse_cache.clear()
+            first = self._expr("{a} + 1", {"a": ast.Constant(value=2)})
+            second = self._expr("{a} + 1", {"a": ast.Constant(value=3)})
+            self.assertEqual(
+                first,
+                ast.ArithmeticOperation(
+                    left=ast.Constant(value=2), right=ast.Constant(value=1), op=ast.ArithmeticOperationOp.Add
+                ),
+            )
+            self.assertEqual(
+                second,
+                ast.ArithmeticOperation(
+                    left=ast.Constant(value=3), right=ast.Constant(value=1), op=ast.ArithmeticOperationOp.Add
+                ),
+            )
+
+        def test_parse_cache_hits_are_not_timed_as_parsing(self):
+            parse_cache.clear()
+
+            def parse_count() -> float:
+                return REGISTRY.get_sample_value("parse_expr_seconds_count", {"backend": backend}) or 0
+
+            before = parse_count()
+            self._expr("1 + 2")
+            self._expr("1 + 2")
+            self.assertEqual(parse_count(), before + 1)
+
     return TestParser
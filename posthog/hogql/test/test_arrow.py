@@ -0,0 +1,93 @@
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+import pyarrow as pa
+
+from posthog.hogql.arrow import OBJECT_METADATA, clickhouse_type_to_arrow, columns_to_table, table_to_rows
+from posthog.test.base import BaseTest
+
+
+class TestArrow(BaseTest):
+    def test_clickhouse_type_to_arrow(self):
+        self.assertEqual(pa.uint64(), clickhouse_type_to_arrow("UInt64"))
+        self.assertEqual(pa.string(), clickhouse_type_to_arrow("LowCardinality(Nullable(String))"))
+        self.assertEqual(pa.string(), clickhouse_type_to_arrow("FixedString(3)"))
+        self.assertEqual(pa.date32(), clickhouse_type_to_arrow("Nullable(Date)"))
+        self.assertIsNone(clickhouse_type_to_arrow("UInt128"))
+        self.assertIsNone(clickhouse_type_to_arrow("DateTime64(6, 'UTC')"))
+        self.assertIsNone(clickhouse_type_to_arrow("Array(UInt64)"))
+
+    def test_columns_to_table_types_columns_after_clickhouse(self):
+        columns: list[list] = [
+            ["a", None],
+            [2**64 - 1, 2**63],
+            [-1, 2],
+            [0.5, 1.0],
+            [date(2024, 1, 1), None],
+            [None, None],
+        ]
+        types = ["Nullable(String)", "UInt64", "Int64", "Float64", "Nullable(Date)", "Nullable(Nothing)"]
+
+        table = columns_to_table(["s", "u", "i", "f", "d", "n"], columns, types)
+
+        self.assertEqual(
+            [pa.string(), pa.uint64(), pa.int64(), pa.float64(), pa.date32(), pa.null()],
+            [field.type for field in table.schema],
+        )
+        self.assertEqual(
+            [["a", 2**64 - 1, -1, 0.5, date(2024, 1, 1), None], [None, 2**63, 2, 1.0, None, None]],
+            table_to_rows(table),
+        )
+
+    def test_columns_to_table_keeps_other_values_as_objects(self):
+        timestamp = datetime(2024, 1, 1, 12, tzinfo=UTC)
+        uuid = UUID("01902b86-6ae3-0000-ad2c-0a0a0a0a0a0a")
+        columns: list[list] = [
+            [("US", "CA"), None],
+            [(1, "x"), (2, 2.5)],
+            [[1, 2], []],
+            [uuid, uuid],
+            [timestamp, timestamp],
+            [Decimal("1.10"), None],
+            [2**100, 1],
+        ]
+        types = [
+            "Nullable(Tuple(String, String))",
+            "Tuple(UInt8, Variant(Float64, String))",
+            "Array(UInt8)",
+            "UUID",
+            "DateTime64(6, 'UTC')",
+            "Nullable(Decimal(10, 2))",
+            "UInt128",
+        ]
+
+        table = columns_to_table([f"c{index}" for index in range(len(columns))], columns, types)
+
+        self.assertTrue(all(field.metadata == OBJECT_METADATA for field in table.schema))
+        rows = table_to_rows(table)
+        self.assertEqual(
+            [
+                [("US", "CA"), (1, "x"), [1, 2], uuid, timestamp, Decimal("1.10"), 2**100],
+                [None, (2, 2.5), [], uuid, timestamp, None, 1],
+            ],
+            rows,
+        )
+        self.assertIs(type(rows[1][1][1]), float)
+
+    def test_columns_to_table_keeps_mixed_columns_as_objects(self):
+        columns: list[list] = [[1, 2.5], [True, 1], ["a", b"\xff"], [1, 2**64]]
+
+        table = columns_to_table(["a", "b", "c", "d"], columns, ["Float64", "UInt8", "String", "UInt64"])
+
+        self.assertTrue(all(field.metadata == OBJECT_METADATA for field in table.schema))
+        rows = table_to_rows(table)
+        self.assertEqual([[1, True, "a", 1], [2.5, 1, b"\xff", 2**64]], rows)
+        self.assertIs(type(rows[0][0]), int)
+        self.assertIs(type(rows[0][1]), bool)
+
+    def test_columns_to_table_without_results(self):
+        table = columns_to_table(["event", "count"], [], ["String", "UInt64"])
+
+        self.assertEqual([pa.string(), pa.uint64()], [field.type for field in table.schema])
+        self.assertEqual([], table_to_rows(table))
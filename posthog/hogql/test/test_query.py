@@ -10,8 +10,10 @@ from freezegun import freeze_time
 
 from posthog.hogql import ast
 from posthog.hogql.errors import QueryError
+from posthog.hogql.plan_cache import plan_cache
 from posthog.hogql.property import property_to_expr
-from posthog.hogql.query import execute_hogql_query
+from posthog.hogql.arrow import table_to_rows
+from posthog.hogql.query import execute_hogql_query, execute_hogql_query_arrow
 from posthog.hogql.test.utils import pretty_print_in_tests, pretty_print_response_in_tests
 from posthog.models import Cohort
 from posthog.models.cohort.util import recalculate_cohortpeople
@@ -1535,3 +1537,56 @@ class TestQuery(ClickhouseTestMixin, APIBaseTest):
             (session_id, 600),
             (session_id, 600),
         ]
+
+    def test_plan_cache_reuses_plan_with_new_constants(self):
+        plan_cache.clear()
+        with freeze_time("2020-01-10"):
+            random_uuid = self._create_random_events()
+
+            query = "select count(), event from events where properties.random_uuid = {random_uuid} group by event"
+            response = execute_hogql_query(
+                query, placeholders={"random_uuid": ast.Constant(value="not it")}, team=self.team, pretty=False
+            )
+            self.assertEqual(response.results, [])
+            self.assertEqual(len(plan_cache), 1)
+
+            response = execute_hogql_query(
+                query, placeholders={"random_uuid": ast.Constant(value=random_uuid)}, team=self.team, pretty=False
+            )
+            self.assertEqual(response.results, [(2, "random event")])
+            self.assertEqual(len(plan_cache), 1)
+            assert response.hogql is not None
+            self.assertIn(random_uuid, response.hogql)
+            self.assertNotIn("__hogql_slot_", response.hogql)
+            assert response.timings is not None
+            self.assertFalse(any(timing.k.endswith("/resolve_types") for timing in response.timings))
+
+    def test_plan_cache_does_not_reuse_folded_constants(self):
+        plan_cache.clear()
+        with freeze_time("2020-01-10"):
+            self._create_random_events()
+
+            response = execute_hogql_query("select count() from events where 'a' = 'a'", team=self.team)
+            self.assertEqual(response.results, [(2,)])
+
+            response = execute_hogql_query("select count() from events where 'a' = 'b'", team=self.team)
+            self.assertEqual(response.results, [(0,)])
+
+    def test_arrow_query_returns_the_same_results(self):
+        with freeze_time("2020-01-10"):
+            random_uuid = self._create_random_events()
+
+            query = (
+                "select event, count(), _toUInt64(18446744073709551615), uuid, tuple(event, 1), [distinct_id], "
+                "timestamp, null from events where properties.random_uuid = {random_uuid} "
+                "group by event, uuid, distinct_id, timestamp order by uuid"
+            )
+            placeholders: dict[str, ast.Expr] = {"random_uuid": ast.Constant(value=random_uuid)}
+            response = execute_hogql_query(query, placeholders=placeholders, team=self.team)
+            arrow_response, table = execute_hogql_query_arrow(query, placeholders=placeholders, team=self.team)
+
+            self.assertEqual(arrow_response.results, [])
+            self.assertEqual(arrow_response.columns, response.columns)
+            self.assertEqual(arrow_response.types, response.types)
+            self.assertEqual(table_to_rows(table), [list(row) for row in response.results])
+            self.assertEqual(table.num_rows, 2)
@@ -1,8 +1,9 @@
 from posthog.hogql import ast
 from posthog.hogql.ast import UUIDType, HogQLXTag, HogQLXAttribute
+from posthog.hogql.constants import HogQLQuerySettings
 from posthog.hogql.errors import InternalHogQLError
-from posthog.hogql.parser import parse_expr
-from posthog.hogql.visitor import CloningVisitor, Visitor, TraversingVisitor
+from posthog.hogql.parser import parse_expr, parse_select
+from posthog.hogql.visitor import CloningVisitor, Visitor, TraversingVisitor, clear_locations, clone_expr
 from posthog.test.base import BaseTest
 
 
@@ -154,3 +155,65 @@ class TestVisitor(BaseTest):
         assert NamingCheck().visit(UUIDType()) == "visit_uuid_type"
         assert NamingCheck().visit(HogQLXAttribute(name="a", value="a")) == "visit_hogqlx_attribute"
         assert NamingCheck().visit(HogQLXTag(kind="", attributes=[])) == "visit_hogqlx_tag"
+
+    def test_visitor_subclasses_dispatch_to_their_own_methods(self):
+        class ConstantVisitor(Visitor):
+            def visit_constant(self, node: ast.Constant):
+                return "constant"
+
+            def visit_unknown(self, node):
+                return "unknown"
+
+        class FieldVisitor(ConstantVisitor):
+            def visit_field(self, node: ast.Field):
+                return "field"
+
+        class OverridingVisitor(FieldVisitor):
+            def visit_constant(self, node: ast.Constant):
+                return "overridden"
+
+        constant, field = ast.Constant(value=1), ast.Field(chain=["a"])
+        for _ in range(2):  # dispatch is resolved on the first visit, and reused after
+            assert [ConstantVisitor().visit(constant), ConstantVisitor().visit(field)] == ["constant", "unknown"]
+            assert [FieldVisitor().visit(constant), FieldVisitor().visit(field)] == ["constant", "field"]
+            assert [OverridingVisitor().visit(constant), OverridingVisitor().visit(field)] == ["overridden", "field"]
+
+    def test_clone_expr_matches_cloning_visitor(self):
+        node = parse_select(
+            """
+            WITH recent AS (SELECT event, timestamp FROM events WHERE timestamp > now() - INTERVAL 1 DAY)
+            SELECT event, count() AS c, [1, (2, 3)], arrayMap(x -> x + 1, [1, 2]), ifNull(properties.$browser, ''),
+                min(timestamp) OVER (PARTITION BY event ORDER BY timestamp), <Sparkline data={[1, 2]} />
+            FROM recent e SAMPLE 1/10 LEFT JOIN persons p ON e.person_id = p.id
+            WHERE event IN ('a', 'b') AND NOT e.distinct_id LIKE '%x'
+            GROUP BY event
+            HAVING c > 1
+            ORDER BY c DESC
+            LIMIT 10
+            """
+        )
+        assert isinstance(node, ast.SelectQuery)
+        node.select[1].type = ast.IntegerType()
+        node.settings = HogQLQuerySettings(optimize_aggregation_in_order=True)
+
+        for clear_types, clear_locations_ in [(False, False), (True, False), (False, True), (True, True)]:
+            clone = clone_expr(node, clear_types=clear_types, clear_locations=clear_locations_)
+            assert clone == CloningVisitor(clear_types=clear_types, clear_locations=clear_locations_).visit(node)
+        assert clear_locations(node) == CloningVisitor(clear_locations=True).visit(node)
+
+        empty = ast.SelectQuery(select=[ast.WindowFunction(name="rank", args=[], exprs=[])], group_by=[], ctes={})
+        assert clone_expr(empty) == CloningVisitor().visit(empty)
+
+        clone = clone_expr(node)
+        assert isinstance(clone, ast.SelectQuery)
+        assert clone == node
+        assert clone.select is not node.select
+        assert clone.select[0] is not node.select[0]
+        assert clone.select[1].type is node.select[1].type  # types are shared, not cloned
+        assert clone.settings is not node.settings
+
+    def test_nodes_have_slots(self):
+        node = ast.Constant(value=1)
+        assert not hasattr(node, "__dict__")
+        with self.assertRaises(AttributeError):
+            node.not_a_field = 1  # type: ignore
@@ -1,18 +1,113 @@
+from collections.abc import Callable
 from copy import deepcopy
-from typing import Optional, TypeVar, Generic, Any
+from dataclasses import fields
+from enum import Enum
+from types import UnionType
+from typing import Literal, Optional, TypeVar, Generic, Any, Union, cast, get_args, get_origin
+
+from pydantic import BaseModel
 
 from posthog.hogql import ast
-from posthog.hogql.base import AST, Expr
+from posthog.hogql.base import AST, Expr, Type
 from posthog.hogql.errors import BaseHogQLError
 
 
 def clone_expr(expr: Expr, clear_types=False, clear_locations=False) -> Expr:
     """Clone an expression node."""
-    return CloningVisitor(clear_types=clear_types, clear_locations=clear_locations).visit(expr)
+    return clone_node(expr, clear_types=clear_types, clear_locations=clear_locations)
 
 
 def clear_locations(expr: Expr) -> Expr:
-    return CloningVisitor(clear_locations=True).visit(expr)
+    return clone_node(expr, clear_types=True, clear_locations=True)
+
+
+_ATOMIC_TYPES = frozenset((str, int, float, bool, type(None)))
+
+_AST = TypeVar("_AST", bound=AST)
+
+# Optional lists and dicts that `CloningVisitor` clones to None when they're empty
+_EMPTY_AS_NONE_FIELDS: dict[type[AST], frozenset[str]] = {
+    ast.SelectQuery: frozenset(("ctes", "array_join_list", "window_exprs", "group_by", "order_by", "limit_by")),
+    ast.WindowExpr: frozenset(("partition_by", "order_by")),
+    ast.WindowFunction: frozenset(("args", "exprs")),
+}
+
+# A function cloning nodes of each class, generated on the first clone
+_clone_functions: dict[type, Callable[[AST, bool, bool], AST]] = {}
+
+
+def clone_node(node: _AST, clear_types: bool = False, clear_locations: bool = False) -> _AST:
+    """
+    Copies the node and all nodes under it field by field, without going through visitor dispatch like
+    `CloningVisitor` does. Lists, tuples and dicts are copied. Types aren't, they're shared with the original nodes
+    unless cleared, and so are all other values.
+    """
+    clone_function = _clone_functions.get(node.__class__)
+    if clone_function is None:
+        clone_function = _clone_functions[node.__class__] = _create_clone_function(node.__class__)
+    return cast(_AST, clone_function(node, clear_types, clear_locations))
+
+
+def _is_atomic_annotation(annotation: Any) -> bool:
+    if annotation in _ATOMIC_TYPES or get_origin(annotation) is Literal:
+        return True
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return True
+    if get_origin(annotation) in (Union, UnionType):
+        return all(_is_atomic_annotation(arg) for arg in get_args(annotation))
+    return False
+
+
+def _create_clone_function(node_class: type[AST]) -> Callable[[AST, bool, bool], AST]:
+    # Generated per class, the same way dataclasses generate __init__, as it's several times faster than looping
+    # over the fields of each node
+    lines = ["def clone(node, clear_types, clear_locations):", "    new_node = new(node_class)"]
+    empty_as_none_fields = _EMPTY_AS_NONE_FIELDS.get(node_class, frozenset())
+    for field in fields(node_class):
+        if field.name in ("start", "end"):
+            lines.append(f"    new_node.{field.name} = None if clear_locations else node.{field.name}")
+        elif field.name == "type":
+            lines.append(f"    new_node.{field.name} = None if clear_types else node.{field.name}")
+        elif _is_atomic_annotation(field.type):
+            lines.append(f"    new_node.{field.name} = node.{field.name}")
+        elif field.name in empty_as_none_fields:
+            lines.append(f"    value = node.{field.name}")
+            lines.append(
+                f"    new_node.{field.name} = clone_value(value, clear_types, clear_locations) if value else None"
+            )
+        else:
+            lines.append(f"    value = node.{field.name}")
+            lines.append(
+                f"    new_node.{field.name} = value if value.__class__ in atomic_types "
+                "else clone_value(value, clear_types, clear_locations)"
+            )
+    lines.append("    return new_node")
+
+    namespace: dict[str, Any] = {
+        "new": object.__new__,
+        "node_class": node_class,
+        "atomic_types": _ATOMIC_TYPES,
+        "clone_value": _clone_value,
+    }
+    exec("\n".join(lines), namespace)
+    return namespace["clone"]
+
+
+def _clone_value(value: Any, clear_types: bool, clear_locations: bool) -> Any:
+    if isinstance(value, AST):
+        return value if isinstance(value, Type) else clone_node(value, clear_types, clear_locations)
+    if isinstance(value, list):
+        return [
+            item if item.__class__ in _ATOMIC_TYPES else _clone_value(item, clear_types, clear_locations)
+            for item in value
+        ]
+    if isinstance(value, tuple):
+        return tuple(_clone_value(item, clear_types, clear_locations) for item in value)
+    if isinstance(value, dict):
+        return {key: _clone_value(item, clear_types, clear_locations) for key, item in value.items()}
+    if isinstance(value, BaseModel):
+        return value.model_copy()
+    return value
 
 
 T = TypeVar("T")
@@ -625,13 +720,29 @@ class CloningVisitor(Visitor[Any]):
         )
 
     def visit_join_constraint(self, node: ast.JoinConstraint) -> ast.JoinConstraint:
-        return ast.JoinConstraint(expr=self.visit(node.expr), constraint_type=node.constraint_type)
+        return ast.JoinConstraint(
+            start=None if self.clear_locations else node.start,
+            end=None if self.clear_locations else node.end,
+            type=None if self.clear_types else node.type,
+            expr=self.visit(node.expr),
+            constraint_type=node.constraint_type,
+        )
 
     def visit_hogqlx_tag(self, node: ast.HogQLXTag):
-        return ast.HogQLXTag(kind=node.kind, attributes=[self.visit(a) for a in node.attributes])
+        return ast.HogQLXTag(
+            start=None if self.clear_locations else node.start,
+            end=None if self.clear_locations else node.end,
+            kind=node.kind,
+            attributes=[self.visit(a) for a in node.attributes],
+        )
 
     def visit_hogqlx_attribute(self, node: ast.HogQLXAttribute):
-        return ast.HogQLXAttribute(name=node.name, value=self.visit(node.value))
+        return ast.HogQLXAttribute(
+            start=None if self.clear_locations else node.start,
+            end=None if self.clear_locations else node.end,
+            name=node.name,
+            value=self.visit(node.value),
+        )
 
     def visit_program(self, node: ast.Program):
         return ast.Program(
@@ -1,3 +1,4 @@
+from collections.abc import Collection, Iterable
 from typing import cast, Literal, Optional
 
 from django.db import connection
@@ -9,9 +10,14 @@ from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
 from posthog.hogql_queries.utils.recordings_helper import RecordingsHelper
 from posthog.models import Team, Group
 from posthog.schema import ActorsQuery
+from posthog.utils import chunked
 
 import orjson as json
 
+# Persons are looked up this many UUIDs at a time, and read from Postgres this many rows at a time
+PERSONS_BATCH_SIZE = 5_000
+PERSONS_FETCH_SIZE = 1_000
+
 
 class ActorStrategy:
     field: str
@@ -23,7 +29,8 @@ class ActorStrategy:
         self.paginator = paginator
         self.query = query
 
-    def get_actors(self, actor_ids) -> dict[str, dict]:
+    def get_actors(self, actor_ids: Iterable, properties: Optional[Collection[str]] = None) -> dict[str, dict]:
+        """Looks up actors by ID. With `properties`, only those properties of the actors are returned."""
         raise NotImplementedError()
 
     def get_recordings(self, matching_events) -> dict[str, list[dict]]:
@@ -45,48 +52,59 @@ class PersonStrategy(ActorStrategy):
     origin_id = "id"
 
     # This is hand written instead of using the ORM because the ORM was blowing up the memory on exports and taking forever
-    def get_actors(self, actor_ids, order_by: str = "") -> dict[str, dict]:
-        # If actor queries start quietly dying again, this might need batching at some point
-        # but currently works with 800,000 persondistinctid entries (May 24, 2024)
-        persons_query = """SELECT posthog_person.id, posthog_person.uuid, posthog_person.properties, posthog_person.is_identified, posthog_person.created_at
+    def get_actors(
+        self, actor_ids: Iterable, properties: Optional[Collection[str]] = None, order_by: str = ""
+    ) -> dict[str, dict]:
+        if order_by:
+            # The order has to hold across all the persons, so they can't be looked up in batches
+            return self._get_persons(list(actor_ids), properties, order_by)
+
+        persons: dict[str, dict] = {}
+        for uuids in chunked(actor_ids, PERSONS_BATCH_SIZE):
+            persons.update(self._get_persons(uuids, properties))
+        return persons
+
+    def _get_persons(self, uuids: list, properties: Optional[Collection[str]], order_by: str = "") -> dict[str, dict]:
+        params: dict = {"uuids": uuids, "team_id": self.team.pk}
+        if properties is None:
+            properties_column = "posthog_person.properties"
+        else:
+            # Leave the properties that aren't needed in Postgres, instead of sending and decoding them
+            properties_column = """(
+                SELECT COALESCE(jsonb_object_agg(key, value), '{}'::jsonb)
+                FROM jsonb_each(posthog_person.properties)
+                WHERE key = ANY(%(property_keys)s)
+            )"""
+            params["property_keys"] = list(properties)
+
+        persons_query = f"""SELECT posthog_person.uuid, {properties_column}, posthog_person.is_identified, posthog_person.created_at,
+                ARRAY(
+                    SELECT posthog_persondistinctid.distinct_id
+                    FROM posthog_persondistinctid
+                    WHERE posthog_persondistinctid.person_id = posthog_person.id
+                    AND posthog_persondistinctid.team_id = %(team_id)s
+                    ORDER BY posthog_persondistinctid.id
+                )
             FROM posthog_person
             WHERE posthog_person.uuid = ANY(%(uuids)s)
             AND posthog_person.team_id = %(team_id)s"""
         if order_by:
             persons_query += f" ORDER BY {order_by}"
-        with connection.cursor() as cursor:
-            cursor.execute(
-                persons_query,
-                {"uuids": list(actor_ids), "team_id": self.team.pk},
-            )
-            people = cursor.fetchall()
-            cursor.execute(
-                """SELECT posthog_persondistinctid.person_id, posthog_persondistinctid.distinct_id
-            FROM posthog_persondistinctid
-            WHERE posthog_persondistinctid.person_id = ANY(%(people_ids)s)
-            AND posthog_persondistinctid.team_id = %(team_id)s""",
-                {"people_ids": [x[0] for x in people], "team_id": self.team.pk},
-            )
-            distinct_ids = cursor.fetchall()
-
-        person_id_to_raw_person_and_set: dict[int, tuple] = {person[0]: (person, []) for person in people}
-
-        for pdid in distinct_ids:
-            person_id_to_raw_person_and_set[pdid[0]][1].append(pdid[1])
-        del distinct_ids
 
-        person_uuid_to_person = {
-            str(person[1]): {
-                "id": person[1],
-                "properties": json.loads(person[2]),
-                "is_identified": person[3],
-                "created_at": person[4],
-                "distinct_ids": distinct_ids,
-            }
-            for person, distinct_ids in person_id_to_raw_person_and_set.values()
-        }
-
-        return person_uuid_to_person
+        persons: dict[str, dict] = {}
+        # A server-side cursor, unless they're disabled because of pgbouncer, so rows are read a few at a time
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(persons_query, params)
+            while rows := cursor.fetchmany(PERSONS_FETCH_SIZE):
+                for uuid, raw_properties, is_identified, created_at, distinct_ids in rows:
+                    persons[str(uuid)] = {
+                        "id": uuid,
+                        "properties": json.loads(raw_properties),
+                        "is_identified": is_identified,
+                        "created_at": created_at,
+                        "distinct_ids": distinct_ids,
+                    }
+        return persons
 
     def get_recordings(self, matching_events) -> dict[str, list[dict]]:
         return RecordingsHelper(self.team).get_recordings(matching_events)
@@ -158,20 +176,24 @@ class GroupStrategy(ActorStrategy):
         self.group_type_index = group_type_index
         super().__init__(**kwargs)
 
-    def get_actors(self, actor_ids) -> dict[str, dict]:
-        return {
-            str(p["group_key"]): {
+    def get_actors(self, actor_ids: Iterable, properties: Optional[Collection[str]] = None) -> dict[str, dict]:
+        groups = {}
+        for p in (
+            Group.objects.filter(team_id=self.team.pk, group_type_index=self.group_type_index, group_key__in=actor_ids)
+            .values("group_key", "group_type_index", "created_at", "group_properties")
+            .iterator(chunk_size=self.paginator.limit)
+        ):
+            if properties is not None:
+                p["group_properties"] = {
+                    key: value for key, value in p["group_properties"].items() if key in properties
+                }
+            groups[str(p["group_key"])] = {
                 "id": p["group_key"],
                 "type": "group",
                 "properties": p["group_properties"],  # TODO: Legacy for frontend
                 **p,
             }
-            for p in Group.objects.filter(
-                team_id=self.team.pk, group_type_index=self.group_type_index, group_key__in=actor_ids
-            )
-            .values("group_key", "group_type_index", "created_at", "group_properties")
-            .iterator(chunk_size=self.paginator.limit)
-        }
+        return groups
 
     def input_columns(self) -> list[str]:
         return ["group"]
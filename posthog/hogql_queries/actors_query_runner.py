@@ -1,7 +1,8 @@
 import itertools
 from typing import Optional
-from collections.abc import Sequence, Iterator
+from collections.abc import Collection, Sequence, Iterator
 
+from posthog.clickhouse.client.execute import STREAMING_CHUNK_SIZE
 from posthog.hogql import ast
 from posthog.hogql.constants import HogQLGlobalSettings
 from posthog.hogql.parser import parse_expr, parse_order_expr
@@ -17,6 +18,7 @@ from posthog.schema import (
     CachedActorsQueryResponse,
     DashboardFilter,
 )
+from posthog.utils import chunked
 
 
 class ActorsQueryRunner(QueryRunner):
@@ -27,7 +29,10 @@ class ActorsQueryRunner(QueryRunner):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.paginator = HogQLHasMorePaginator.from_limit_context(
-            limit_context=self.limit_context, limit=self.query.limit, offset=self.query.offset
+            limit_context=self.limit_context,
+            limit=self.query.limit,
+            offset=self.query.offset,
+            cursor=self.query.cursor,
         )
         self.source_query_runner: Optional[QueryRunner] = None
 
@@ -81,49 +86,82 @@ class ActorsQueryRunner(QueryRunner):
         return enriched
 
     def prepare_recordings(
-        self, column_name: str, input_columns: list[str]
+        self, column_name: str, input_columns: list[str], results: Sequence[Sequence]
     ) -> tuple[int | None, dict[str, list[dict]] | None]:
         if (column_name != "person" and column_name != "actor") or "matched_recordings" not in input_columns:
             return None, None
 
         column_index_events = input_columns.index("matched_recordings")
-        matching_events_list = itertools.chain.from_iterable(row[column_index_events] for row in self.paginator.results)
+        matching_events_list = itertools.chain.from_iterable(row[column_index_events] for row in results)
         return column_index_events, self.strategy.get_recordings(matching_events_list)
 
-    def calculate(self) -> ActorsQueryResponse:
+    def _query_settings(self) -> Optional[HogQLGlobalSettings]:
         # Funnel queries require the experimental analyzer to run correctly
         # Can remove once clickhouse moves to version 24.3 or above
-        settings = None
         if isinstance(self.source_query_runner, InsightActorsQueryRunner) and isinstance(
             self.source_query_runner.source_runner, FunnelsQueryRunner
         ):
-            settings = HogQLGlobalSettings(allow_experimental_analyzer=True)
-
-        response = self.paginator.execute_hogql_query(
-            query_type="ActorsQuery",
-            query=self.to_query(),
-            team=self.team,
-            timings=self.timings,
-            modifiers=self.modifiers,
-            settings=settings,
-        )
-        input_columns = self.input_columns()
+            return HogQLGlobalSettings(allow_experimental_analyzer=True)
+        return None
+
+    def _enrich_results(
+        self, results: Sequence[Sequence], input_columns: list[str], actor_properties: Optional[Collection[str]] = None
+    ) -> tuple[list, Optional[int]]:
+        """
+        Replaces actor IDs with the actors themselves. Returns the rows, and how many actors weren't found. With
+        `actor_properties`, the actors only have those properties.
+        """
         missing_actors_count = None
-        results: Sequence[list] | Iterator[list] = self.paginator.results
+        enriched: Sequence[Sequence] | Iterator[list] = results
 
         enrich_columns = filter(lambda column: column in ("person", "group", "actor"), input_columns)
         for column_name in enrich_columns:
             actor_column_index = input_columns.index(column_name)
-            actor_ids = (row[actor_column_index] for row in self.paginator.results)
-            actors_lookup = self.strategy.get_actors(actor_ids)
+            actor_ids = (row[actor_column_index] for row in results)
+            actors_lookup = self.strategy.get_actors(actor_ids, properties=actor_properties)
 
-            recordings_column_index, recordings_lookup = self.prepare_recordings(column_name, input_columns)
+            recordings_column_index, recordings_lookup = self.prepare_recordings(column_name, input_columns, results)
 
-            missing_actors_count = len(self.paginator.results) - len(actors_lookup)
-            results = self._enrich_with_actors(
-                results, actor_column_index, actors_lookup, recordings_column_index, recordings_lookup
+            missing_actors_count = len(results) - len(actors_lookup)
+            enriched = self._enrich_with_actors(
+                enriched, actor_column_index, actors_lookup, recordings_column_index, recordings_lookup
             )
 
+        return list(enriched), missing_actors_count
+
+    def cursor_keys(self, query: ast.SelectQuery) -> Optional[list[ast.OrderExpr]]:
+        """
+        Actors sorted by their id, or by when they were created with the id breaking ties, can be paginated with a
+        cursor. Returns None for aggregations and other sort orders, and for actors of an insight: every page of those
+        runs the insight query in full anyway, so skipping rows with a range predicate wouldn't save much.
+        """
+        if self.query.source is not None:
+            return None
+        if query.group_by is not None or query.having is not None or not query.order_by or len(query.order_by) != 1:
+            return None
+        order = query.order_by[0]
+        if not isinstance(order.expr, ast.Field):
+            return None
+        if order.expr.chain == [self.strategy.origin_id]:
+            return [order]
+        if order.expr.chain == ["created_at"]:
+            return [order, ast.OrderExpr(expr=ast.Field(chain=[self.strategy.origin_id]), order=order.order)]
+        return None
+
+    def calculate(self) -> ActorsQueryResponse:
+        query = self.to_query()
+        response = self.paginator.execute_hogql_query(
+            query_type="ActorsQuery",
+            query=query,
+            cursor_keys=self.cursor_keys(query),
+            team=self.team,
+            timings=self.timings,
+            modifiers=self.modifiers,
+            settings=self._query_settings(),
+        )
+        input_columns = self.input_columns()
+        results, missing_actors_count = self._enrich_results(self.paginator.results, input_columns)
+
         return ActorsQueryResponse(
             results=results,
             timings=response.timings,
@@ -135,6 +173,31 @@ class ActorsQueryRunner(QueryRunner):
             **self.paginator.response_params(),
         )
 
+    def calculate_iter(
+        self, chunk_size: int = STREAMING_CHUNK_SIZE, actor_properties: Optional[Collection[str]] = None
+    ) -> tuple[list[str], Iterator[list]]:
+        """
+        Like `calculate`, but streams the results in chunks of `chunk_size` rows, so that large exports don't need to
+        hold all of them in memory. Actors are looked up for each chunk, with only `actor_properties` if given.
+        Returns the columns and an iterator of rows.
+        """
+        _, rows = self.paginator.execute_hogql_query_iter(
+            query_type="ActorsQuery",
+            query=self.to_query(),
+            team=self.team,
+            timings=self.timings,
+            modifiers=self.modifiers,
+            settings=self._query_settings(),
+            chunk_size=chunk_size,
+        )
+        input_columns = self.input_columns()
+
+        def enriched_rows() -> Iterator[list]:
+            for chunk in chunked(rows, chunk_size):
+                yield from self._enrich_results(chunk, input_columns, actor_properties)[0]
+
+        return input_columns, enriched_rows()
+
     def input_columns(self) -> list[str]:
         if self.query.select:
             return self.query.select
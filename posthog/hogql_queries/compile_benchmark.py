@@ -0,0 +1,221 @@
+"""
+Times compiling the queries built by the query runners into ClickHouse SQL, stage by stage, without running them.
+
+The stages are the `HogQLTimings` of `execute_hogql_query`, plus `to_query` for building the query in the runner.
+All process-local compile caches are cleared before each run, so every run measures a cold compile. Only the
+Postgres database is used, for the fixture team and its schema. See `manage.py benchmark_hogql_compile`.
+"""
+
+import statistics
+from typing import Any
+
+from posthog.hogql.constants import LimitContext
+from posthog.hogql.database.database import clear_database_cache
+from posthog.hogql.parser import parse_cache
+from posthog.hogql.plan_cache import plan_cache
+from posthog.hogql.query import _prepare_hogql_query
+from posthog.hogql.timings import HogQLTimings
+from posthog.hogql_queries.query_runner import get_query_runner
+from posthog.models import Organization, Team
+from posthog.models.group_type_mapping import GroupTypeMapping
+from posthog.models.property_definition import PropertyDefinition, PropertyType
+
+RESULTS_FORMAT_VERSION = 1
+BENCHMARK_ORGANIZATION_NAME = "HogQL compile benchmark"
+BENCHMARK_TEAM_NAME = "HogQL compile benchmark"
+# Stages that take less than this are too noisy to compare between runs
+MIN_COMPARED_SECONDS = 0.002
+
+TOTAL_STAGE = "."
+
+_PAGEVIEW = {"kind": "EventsNode", "event": "$pageview", "name": "$pageview"}
+_SIGNUP = {"kind": "EventsNode", "event": "signed_up", "name": "signed_up"}
+_BROWSER_BREAKDOWN = {"breakdown": "$browser", "breakdown_type": "event"}
+_PRICING_PAGE = {"key": "$current_url", "value": "/pricing", "operator": "icontains", "type": "event"}
+
+COMPILE_BENCHMARK_QUERIES: dict[str, dict[str, Any]] = {
+    "trends_pageviews": {
+        "kind": "TrendsQuery",
+        "series": [_PAGEVIEW],
+        "dateRange": {"date_from": "-30d"},
+        "interval": "day",
+    },
+    "trends_breakdown_and_filters": {
+        "kind": "TrendsQuery",
+        "series": [
+            {**_PAGEVIEW, "math": "dau"},
+            {**_SIGNUP, "properties": [{"key": "plan", "value": ["free", "pro"], "operator": "exact"}]},
+        ],
+        "dateRange": {"date_from": "-90d"},
+        "interval": "week",
+        "properties": [_PRICING_PAGE],
+        "breakdownFilter": _BROWSER_BREAKDOWN,
+    },
+    "trends_formula_by_group": {
+        "kind": "TrendsQuery",
+        "series": [{**_PAGEVIEW, "math": "unique_group", "math_group_type_index": 0}, _SIGNUP],
+        "dateRange": {"date_from": "-30d"},
+        "interval": "day",
+        "trendsFilter": {"formula": "B / A"},
+    },
+    "funnels_steps": {
+        "kind": "FunnelsQuery",
+        "series": [_PAGEVIEW, {**_PAGEVIEW, "properties": [_PRICING_PAGE]}, _SIGNUP],
+        "dateRange": {"date_from": "-14d"},
+        "funnelsFilter": {"funnelWindowInterval": 14, "funnelWindowIntervalUnit": "day"},
+    },
+    "funnels_steps_breakdown": {
+        "kind": "FunnelsQuery",
+        "series": [_PAGEVIEW, _SIGNUP],
+        "dateRange": {"date_from": "-14d"},
+        "breakdownFilter": _BROWSER_BREAKDOWN,
+    },
+    "funnels_many_steps": {
+        "kind": "FunnelsQuery",
+        "series": [
+            _PAGEVIEW,
+            {**_PAGEVIEW, "properties": [_PRICING_PAGE]},
+            {**_PAGEVIEW, "properties": [{**_PRICING_PAGE, "value": "/signup"}]},
+            _SIGNUP,
+            {**_SIGNUP, "properties": [{"key": "plan", "value": ["free", "pro"], "operator": "exact"}]},
+            {"kind": "EventsNode", "event": "invited_teammate", "name": "invited_teammate"},
+            {"kind": "EventsNode", "event": "created_insight", "name": "created_insight"},
+            {"kind": "EventsNode", "event": "upgraded", "name": "upgraded"},
+        ],
+        "dateRange": {"date_from": "-30d"},
+        "properties": [{"key": "$browser", "value": "Safari", "operator": "is_not", "type": "event"}],
+        "breakdownFilter": _BROWSER_BREAKDOWN,
+        "funnelsFilter": {"funnelWindowInterval": 14, "funnelWindowIntervalUnit": "day"},
+    },
+    "funnels_trends": {
+        "kind": "FunnelsQuery",
+        "series": [_PAGEVIEW, _SIGNUP],
+        "dateRange": {"date_from": "-30d"},
+        "interval": "day",
+        "funnelsFilter": {"funnelVizType": "trends"},
+    },
+    "retention": {
+        "kind": "RetentionQuery",
+        "dateRange": {"date_from": "-7d"},
+        "retentionFilter": {
+            "period": "Day",
+            "totalIntervals": 7,
+            "targetEntity": {"id": "signed_up", "type": "events"},
+            "returningEntity": {"id": "$pageview", "type": "events"},
+        },
+    },
+    "paths": {
+        "kind": "PathsQuery",
+        "dateRange": {"date_from": "-7d"},
+        "pathsFilter": {"includeEventTypes": ["$pageview"], "stepLimit": 5},
+    },
+    "web_overview": {
+        "kind": "WebOverviewQuery",
+        "dateRange": {"date_from": "-7d"},
+        "properties": [],
+    },
+    "web_stats_pages": {
+        "kind": "WebStatsTableQuery",
+        "dateRange": {"date_from": "-7d"},
+        "properties": [],
+        "breakdownBy": "Page",
+        "includeBounceRate": True,
+    },
+    "web_stats_channels": {
+        "kind": "WebStatsTableQuery",
+        "dateRange": {"date_from": "-7d"},
+        "properties": [_PRICING_PAGE],
+        "breakdownBy": "InitialChannelType",
+    },
+}
+
+# Properties used by the queries, so that they're resolved and printed with their real types
+_EVENT_PROPERTIES = {
+    "$browser": PropertyType.String,
+    "$current_url": PropertyType.String,
+    "$pathname": PropertyType.String,
+    "plan": PropertyType.String,
+    "revenue": PropertyType.Numeric,
+}
+
+
+def get_or_create_benchmark_team() -> Team:
+    organization, _ = Organization.objects.get_or_create(name=BENCHMARK_ORGANIZATION_NAME)
+    team = Team.objects.filter(organization=organization, name=BENCHMARK_TEAM_NAME).first()
+    if team is None:
+        team = Team.objects.create(organization=organization, name=BENCHMARK_TEAM_NAME)
+
+    for name, property_type in _EVENT_PROPERTIES.items():
+        PropertyDefinition.objects.get_or_create(
+            team=team,
+            name=name,
+            type=PropertyDefinition.Type.EVENT,
+            defaults={"property_type": property_type, "is_numerical": property_type == PropertyType.Numeric},
+        )
+    GroupTypeMapping.objects.get_or_create(team=team, group_type="organization", group_type_index=0)
+    return team
+
+
+def clear_compile_caches() -> None:
+    parse_cache.clear()
+    plan_cache.clear()
+    clear_database_cache()
+
+
+def time_query_compile(team: Team, query: dict[str, Any]) -> dict[str, float]:
+    """Compiles the query once from scratch, returning the seconds spent in each stage."""
+    clear_compile_caches()
+    timings = HogQLTimings()
+    with timings.measure("to_query"):
+        runner = get_query_runner(query, team, timings=timings)
+        select_query = runner.to_query()
+    _prepare_hogql_query(
+        select_query,
+        team,
+        filters=None,
+        placeholders=None,
+        variables=None,
+        settings=None,
+        modifiers=runner.modifiers,
+        limit_context=LimitContext.QUERY,
+        timings=timings,
+        pretty=True,
+        context=None,
+    )
+    return timings.to_dict()
+
+
+def run_compile_benchmark(
+    team: Team, queries: dict[str, dict[str, Any]], repeat: int = 5
+) -> dict[str, dict[str, float]]:
+    """Returns the median seconds spent in each stage of compiling each query, over `repeat` runs."""
+    results: dict[str, dict[str, float]] = {}
+    for name, query in queries.items():
+        runs = [time_query_compile(team, query) for _ in range(repeat)]
+        stages = {stage for run in runs for stage in run}
+        results[name] = {stage: statistics.median(run.get(stage, 0.0) for run in runs) for stage in sorted(stages)}
+    return results
+
+
+def to_results_file(results: dict[str, dict[str, float]], repeat: int) -> dict[str, Any]:
+    return {"version": RESULTS_FORMAT_VERSION, "repeat": repeat, "results": results}
+
+
+def find_regressions(baseline: dict[str, Any], results: dict[str, dict[str, float]], threshold: float) -> list[str]:
+    """Describes each stage that got more than `threshold` (a fraction) slower than in the baseline results file."""
+    if baseline.get("version") != RESULTS_FORMAT_VERSION:
+        raise ValueError(f"Can't compare with results file version {baseline.get('version')}")
+
+    regressions = []
+    for name, stages in results.items():
+        baseline_stages = baseline["results"].get(name, {})
+        for stage, seconds in stages.items():
+            baseline_seconds = baseline_stages.get(stage)
+            if baseline_seconds is None or max(baseline_seconds, seconds) < MIN_COMPARED_SECONDS:
+                continue
+            if seconds > baseline_seconds * (1 + threshold):
+                regressions.append(
+                    f"{name} {stage}: {baseline_seconds * 1000:.2f} ms -> {seconds * 1000:.2f} ms "
+                    f"(+{(seconds / baseline_seconds - 1) * 100:.0f}%)"
+                )
+    return regressions
@@ -1,4 +1,5 @@
 from datetime import timedelta
+from collections.abc import Iterator
 from typing import Optional
 
 from dateutil.parser import isoparse
@@ -9,6 +10,7 @@ import orjson
 from posthog.api.element import ElementSerializer
 from posthog.api.utils import get_pk_or_uuid
 from posthog.hogql import ast
+from posthog.clickhouse.client.execute import STREAMING_CHUNK_SIZE
 from posthog.hogql.ast import Alias
 from posthog.hogql.parser import parse_expr, parse_order_expr
 from posthog.hogql.property import action_to_expr, has_aggregation, property_to_expr
@@ -20,7 +22,7 @@ from posthog.models.element import chain_to_elements
 from posthog.models.person.person import get_distinct_ids_for_subquery
 from posthog.models.person.util import get_persons_by_distinct_ids
 from posthog.schema import DashboardFilter, EventsQuery, EventsQueryResponse, CachedEventsQueryResponse
-from posthog.utils import relative_date_parse
+from posthog.utils import chunked, relative_date_parse
 
 # Allow-listed fields returned when you select "*" from events. Person and group fields will be nested later.
 SELECT_STAR_FROM_EVENTS_FIELDS = [
@@ -43,7 +45,10 @@ class EventsQueryRunner(QueryRunner):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.paginator = HogQLHasMorePaginator.from_limit_context(
-            limit_context=self.limit_context, limit=self.query.limit, offset=self.query.offset
+            limit_context=self.limit_context,
+            limit=self.query.limit,
+            offset=self.query.offset,
+            cursor=self.query.cursor,
         )
 
     def select_cols(self) -> tuple[list[str], list[ast.Expr]]:
@@ -188,22 +193,73 @@ class EventsQueryRunner(QueryRunner):
                 )
                 return stmt
 
+    def cursor_keys(self, query: ast.SelectQuery) -> Optional[list[ast.OrderExpr]]:
+        """
+        When listing events by timestamp, the uuid breaks ties between events with the same timestamp, so the rows can
+        be paginated with a cursor. Returns None for aggregations and other sort orders.
+        """
+        if query.group_by is not None or query.having is not None or not query.order_by or len(query.order_by) != 1:
+            return None
+        order = query.order_by[0]
+        if not isinstance(order.expr, ast.Field) or order.expr.chain != ["timestamp"]:
+            return None
+        return [
+            ast.OrderExpr(expr=ast.Field(chain=["timestamp"]), order=order.order),
+            ast.OrderExpr(expr=ast.Field(chain=["uuid"]), order=order.order),
+        ]
+
     def calculate(self) -> EventsQueryResponse:
+        query = self.to_query()
         query_result = self.paginator.execute_hogql_query(
+            query=query,
+            cursor_keys=self.cursor_keys(query),
+            team=self.team,
+            query_type="EventsQuery",
+            timings=self.timings,
+            modifiers=self.modifiers,
+            limit_context=self.limit_context,
+            cacheable=self.use_result_cache,
+        )
+        self.paginator.results = self._process_results(self.paginator.results)
+
+        return EventsQueryResponse(
+            results=self.paginator.results,
+            columns=self.columns(query_result.columns),
+            types=[t for _, t in query_result.types] if query_result.types else None,
+            timings=self.timings.to_list(),
+            hogql=query_result.hogql,
+            modifiers=self.modifiers,
+            **self.paginator.response_params(),
+        )
+
+    def calculate_iter(self, chunk_size: int = STREAMING_CHUNK_SIZE) -> tuple[list[str], Iterator[list]]:
+        """
+        Like `calculate`, but streams the results in chunks of `chunk_size` rows, so that large exports don't need to
+        hold all of them in memory. Returns the columns and an iterator of result rows.
+        """
+        result_columns, rows = self.paginator.execute_hogql_query_iter(
             query=self.to_query(),
             team=self.team,
             query_type="EventsQuery",
             timings=self.timings,
             modifiers=self.modifiers,
             limit_context=self.limit_context,
+            chunk_size=chunk_size,
         )
 
+        def processed_rows() -> Iterator[list]:
+            for chunk in chunked(rows, chunk_size):
+                yield from self._process_results(chunk)
+
+        return self.columns(result_columns), processed_rows()
+
+    def _process_results(self, results: list) -> list:
         # Convert star field from tuple to dict in each result
         if "*" in self.select_input_raw():
             with self.timings.measure("expand_asterisk"):
                 star_idx = self.select_input_raw().index("*")
-                for index, result in enumerate(self.paginator.results):
-                    self.paginator.results[index] = list(result)
+                for index, result in enumerate(results):
+                    results[index] = list(result)
                     select = result[star_idx]
                     new_result = dict(zip(SELECT_STAR_FROM_EVENTS_FIELDS, select))
                     new_result["properties"] = orjson.loads(new_result["properties"])
@@ -211,18 +267,18 @@ class EventsQueryRunner(QueryRunner):
                         new_result["elements"] = ElementSerializer(
                             chain_to_elements(new_result["elements_chain"]), many=True
                         ).data
-                    self.paginator.results[index][star_idx] = new_result
+                    results[index][star_idx] = new_result
 
         person_indices: list[int] = []
         for index, col in enumerate(self.select_input_raw()):
             if col.split("--")[0].strip() == "person":
                 person_indices.append(index)
 
-        if len(person_indices) > 0 and len(self.paginator.results) > 0:
+        if len(person_indices) > 0 and len(results) > 0:
             with self.timings.measure("person_column_extra_query"):
                 # Make a query into postgres to fetch person
                 person_idx = person_indices[0]
-                distinct_ids = list({event[person_idx] for event in self.paginator.results})
+                distinct_ids = list({event[person_idx] for event in results})
                 persons = get_persons_by_distinct_ids(self.team.pk, distinct_ids)
                 persons = persons.prefetch_related(Prefetch("persondistinctid_set", to_attr="distinct_ids_cache"))
                 distinct_to_person: dict[str, Person] = {}
@@ -233,31 +289,23 @@ class EventsQueryRunner(QueryRunner):
 
                 # Loop over all columns in case there is more than one "person" column
                 for column_index in person_indices:
-                    for index, result in enumerate(self.paginator.results):
+                    for index, result in enumerate(results):
                         distinct_id: str = result[column_index]
-                        self.paginator.results[index] = list(result)
+                        results[index] = list(result)
                         if distinct_to_person.get(distinct_id):
                             person = distinct_to_person[distinct_id]
-                            self.paginator.results[index][column_index] = {
+                            results[index][column_index] = {
                                 "uuid": person.uuid,
                                 "created_at": person.created_at,
                                 "properties": person.properties or {},
                                 "distinct_id": distinct_id,
                             }
                         else:
-                            self.paginator.results[index][column_index] = {
+                            results[index][column_index] = {
                                 "distinct_id": distinct_id,
                             }
 
-        return EventsQueryResponse(
-            results=self.paginator.results,
-            columns=self.columns(query_result.columns),
-            types=[t for _, t in query_result.types] if query_result.types else None,
-            timings=self.timings.to_list(),
-            hogql=query_result.hogql,
-            modifiers=self.modifiers,
-            **self.paginator.response_params(),
-        )
+        return results
 
     def apply_dashboard_filters(self, dashboard_filter: DashboardFilter):
         if dashboard_filter.date_to or dashboard_filter.date_from:
@@ -1,4 +1,12 @@
+import base64
+import binascii
+from collections.abc import Iterator, Sequence
+from datetime import datetime
 from typing import Any, Optional, cast
+from uuid import UUID
+
+import orjson
+import pyarrow as pa
 
 from posthog.hogql import ast
 from posthog.hogql.constants import (
@@ -7,40 +15,147 @@ from posthog.hogql.constants import (
     LimitContext,
     DEFAULT_RETURNED_ROWS,
 )
-from posthog.hogql.query import execute_hogql_query
+from posthog.hogql.errors import QueryError
+from posthog.hogql.query import execute_hogql_query, execute_hogql_query_arrow, execute_hogql_query_iter
 from posthog.schema import HogQLQueryResponse
 
+CURSOR_COLUMN_ALIAS = "__cursor_{index}"
+
+
+def _encode_cursor_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def _decode_cursor_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "datetime" in value:
+            return datetime.fromisoformat(value["datetime"])
+        if "uuid" in value:
+            return UUID(value["uuid"])
+        raise ValueError("Unknown cursor value")
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encodes the sort key of the last row of a page into an opaque, URL-safe cursor."""
+    payload = orjson.dumps([_encode_cursor_value(value) for value in values])
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list):
+            raise ValueError("Cursor is not a list")
+        return [_decode_cursor_value(value) for value in values]
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise QueryError("Invalid pagination cursor")
+
+
+def cursor_predicate(cursor_keys: list[ast.OrderExpr], values: list[Any]) -> ast.Expr:
+    """
+    Matches the rows that come after the row with the given sort key values, when sorting by `cursor_keys`. For keys
+    (a DESC, b DESC) that's `a <= x AND (a < x OR (a = x AND b < y))`. The first comparison is redundant, but lets
+    ClickHouse skip granules by the leading key.
+    """
+    if len(cursor_keys) != len(values):
+        raise QueryError("Invalid pagination cursor")
+
+    def after(key: ast.OrderExpr, value: Any, *, inclusive: bool = False) -> ast.CompareOperation:
+        if key.order == "DESC":
+            op = ast.CompareOperationOp.LtEq if inclusive else ast.CompareOperationOp.Lt
+        else:
+            op = ast.CompareOperationOp.GtEq if inclusive else ast.CompareOperationOp.Gt
+        return ast.CompareOperation(op=op, left=key.expr, right=ast.Constant(value=value))
+
+    alternatives: list[ast.Expr] = []
+    for index, (key, value) in enumerate(zip(cursor_keys, values)):
+        equal_prefix: list[ast.Expr] = [
+            ast.CompareOperation(op=ast.CompareOperationOp.Eq, left=prefix_key.expr, right=ast.Constant(value=prefix))
+            for prefix_key, prefix in zip(cursor_keys[:index], values[:index])
+        ]
+        alternatives.append(ast.And(exprs=[*equal_prefix, after(key, value)]) if equal_prefix else after(key, value))
+
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return ast.And(exprs=[after(cursor_keys[0], values[0], inclusive=True), ast.Or(exprs=alternatives)])
+
 
 class HogQLHasMorePaginator:
     """
     Paginator that fetches one more result than requested to determine if there are more results.
     Takes care of setting the limit and offset on the query.
+
+    Queries sorted by a unique key can instead be paginated with a cursor: pass the sort key as `cursor_keys` when
+    executing, and the response will contain a `nextCursor` with the key of the last row. Given that cursor, the next
+    page is found with a range predicate on the key, instead of reading and skipping all the previous rows.
     """
 
     def __init__(
-        self, *, limit: Optional[int] = None, offset: Optional[int] = None, limit_context: Optional[LimitContext] = None
+        self,
+        *,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        limit_context: Optional[LimitContext] = None,
+        cursor: Optional[str] = None,
     ):
         self.response: Optional[HogQLQueryResponse] = None
         self.results: list[Any] = []
+        self.results_table: Optional[pa.Table] = None
+        self._fetched_rows = 0
         self.limit = limit if limit and limit > 0 else DEFAULT_RETURNED_ROWS
         self.offset = offset if offset and offset > 0 else 0
         self.limit_context = limit_context
+        self.cursor = cursor or None
+        self.next_cursor: Optional[str] = None
+        self._cursor_columns = 0
 
     @classmethod
     def from_limit_context(
-        cls, *, limit_context: LimitContext, limit: Optional[int] = None, offset: Optional[int] = None
+        cls,
+        *,
+        limit_context: LimitContext,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> "HogQLHasMorePaginator":
         max_rows = get_max_limit_for_context(limit_context)
         default_rows = get_default_limit_for_context(limit_context)
         limit = min(max_rows, default_rows if (limit is None or limit <= 0) else limit)
-        return cls(limit=limit, offset=offset, limit_context=limit_context)
+        return cls(limit=limit, offset=offset, limit_context=limit_context, cursor=cursor)
+
+    def paginate(self, query: ast.SelectQuery, cursor_keys: Optional[list[ast.OrderExpr]] = None) -> ast.SelectQuery:
+        if cursor_keys is None and self.cursor is not None:
+            raise QueryError("This query can't be paginated with a cursor, as it's not sorted by a unique key")
+
+        if cursor_keys is not None:
+            # Select the sort key after the requested columns, to build the cursor from the last row
+            query.order_by = cursor_keys
+            query.select = [
+                *query.select,
+                *(
+                    ast.Alias(alias=CURSOR_COLUMN_ALIAS.format(index=index), expr=key.expr)
+                    for index, key in enumerate(cursor_keys)
+                ),
+            ]
+            self._cursor_columns = len(cursor_keys)
+            if self.cursor is not None:
+                predicate = cursor_predicate(cursor_keys, decode_cursor(self.cursor))
+                query.where = ast.And(exprs=[query.where, predicate]) if query.where else predicate
+                self.offset = 0
 
-    def paginate(self, query: ast.SelectQuery) -> ast.SelectQuery:
         query.limit = ast.Constant(value=self.limit + 1)
         query.offset = ast.Constant(value=self.offset)
         return query
 
     def has_more(self) -> bool:
+        if self.results_table is not None:
+            return self._fetched_rows > self.limit
+
         if not self.response or not self.response.results:
             return False
 
@@ -60,22 +175,71 @@ class HogQLHasMorePaginator:
         query: ast.SelectQuery,
         *,
         query_type: str,
+        cursor_keys: Optional[list[ast.OrderExpr]] = None,
         **kwargs,
     ) -> HogQLQueryResponse:
         self.response = cast(
             HogQLQueryResponse,
             execute_hogql_query(
-                query=self.paginate(query),
+                query=self.paginate(query, cursor_keys),
                 query_type=query_type,
                 **kwargs if self.limit_context is None else {"limit_context": self.limit_context, **kwargs},
             ),
         )
+        if self._cursor_columns:
+            self._split_cursor_columns(self.response)
         self.results = self.trim_results()
         return self.response
 
+    def _split_cursor_columns(self, response: HogQLQueryResponse) -> None:
+        """Removes the sort key columns from the response, after turning the key of the last row into `next_cursor`."""
+        count = self._cursor_columns
+        rows = response.results or []
+        if len(rows) > self.limit:
+            self.next_cursor = encode_cursor(rows[self.limit - 1][-count:])
+        response.results = [row[:-count] for row in rows]
+        if response.columns:
+            response.columns = response.columns[:-count]
+        if response.types:
+            response.types = response.types[:-count]
+
+    def execute_hogql_query_arrow(
+        self,
+        query: ast.SelectQuery,
+        *,
+        query_type: str,
+        **kwargs,
+    ) -> HogQLQueryResponse:
+        """Like `execute_hogql_query`, but the results end up in `results_table`, as an Arrow table."""
+        self.response, table = execute_hogql_query_arrow(
+            query=self.paginate(query),
+            query_type=query_type,
+            **kwargs if self.limit_context is None else {"limit_context": self.limit_context, **kwargs},
+        )
+        self._fetched_rows = table.num_rows
+        self.results_table = table.slice(0, self.limit)
+        return self.response
+
+    def execute_hogql_query_iter(
+        self,
+        query: ast.SelectQuery,
+        *,
+        query_type: str,
+        **kwargs,
+    ) -> tuple[list[str], Iterator[tuple]]:
+        """Streams all rows up to the limit, instead of loading them in memory. There's no `hasMore` for streams."""
+        query.limit = ast.Constant(value=self.limit)
+        query.offset = ast.Constant(value=self.offset)
+        return execute_hogql_query_iter(
+            query=query,
+            query_type=query_type,
+            **kwargs if self.limit_context is None else {"limit_context": self.limit_context, **kwargs},
+        )
+
     def response_params(self):
         return {
             "hasMore": self.has_more(),
             "limit": self.limit,
             "offset": self.offset,
+            **({"nextCursor": self.next_cursor} if self.next_cursor else {}),
         }
@@ -1,5 +1,8 @@
+from datetime import datetime
 from typing import cast
 from unittest.mock import MagicMock, patch
+from uuid import UUID
+from zoneinfo import ZoneInfo
 
 from posthog.hogql.ast import SelectQuery
 from posthog.hogql.constants import (
@@ -8,8 +11,9 @@ from posthog.hogql.constants import (
     get_max_limit_for_context,
     MAX_SELECT_RETURNED_ROWS,
 )
+from posthog.hogql.errors import QueryError
 from posthog.hogql.parser import parse_select
-from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator, decode_cursor, encode_cursor
 from posthog.hogql_queries.actors_query_runner import ActorsQueryRunner
 from posthog.models.utils import UUIDT
 from posthog.schema import (
@@ -80,6 +84,43 @@ class TestHogQLHasMorePaginator(ClickhouseTestMixin, APIBaseTest):
         self.assertEqual(response.results, [[f"jacob7@{self.random_uuid}.posthog.com"]])
         self.assertEqual(response.hasMore, True)
 
+    def test_persons_query_cursor(self):
+        all_results = self._create_runner(ActorsQuery(select=["id", "properties.email"])).calculate().results
+
+        results = []
+        cursor = None
+        for _ in range(4):
+            response = self._create_runner(
+                ActorsQuery(select=["id", "properties.email"], limit=3, cursor=cursor)
+            ).calculate()
+            results.extend(response.results)
+            self.assertEqual(response.hasMore, response.nextCursor is not None)
+            cursor = response.nextCursor
+        self.assertEqual(len(results), 10)
+        self.assertEqual(results, all_results)
+        self.assertEqual(cursor, None)
+
+    def test_persons_query_cursor_with_custom_order(self):
+        runner = self._create_runner(
+            ActorsQuery(select=["properties.email"], orderBy=["properties.email DESC"], limit=1)
+        )
+        self.assertEqual(runner.calculate().nextCursor, None)
+
+        runner = self._create_runner(
+            ActorsQuery(select=["properties.email"], orderBy=["properties.email DESC"], cursor=encode_cursor(["a"]))
+        )
+        with self.assertRaises(QueryError):
+            runner.calculate()
+
+    def test_invalid_cursor(self):
+        for cursor in ["not a cursor", encode_cursor([1, 2, 3])]:
+            with self.subTest(cursor=cursor), self.assertRaises(QueryError):
+                self._create_runner(ActorsQuery(select=["id"], cursor=cursor)).calculate()
+
+    def test_cursor_round_trip(self):
+        values = [datetime(2024, 1, 1, 12, 30, 0, 123456, tzinfo=ZoneInfo("UTC")), UUID(int=1), 5, "a"]
+        self.assertEqual(decode_cursor(encode_cursor(values)), values)
+
     def test_zero_limit(self):
         """Test behavior with limit set to zero."""
         runner = self._create_runner(ActorsQuery(select=["properties.email"], limit=0))
@@ -0,0 +1,106 @@
+from unittest.mock import patch
+
+from django.test import override_settings
+from freezegun import freeze_time
+
+from posthog.hogql.query import execute_hogql_query
+from posthog.hogql_queries.insights.trends.trends_query_batch import batch_trends_query_runners
+from posthog.hogql_queries.insights.trends.trends_query_runner import TrendsQueryRunner
+from posthog.models.property_definition import PropertyDefinition
+from posthog.schema import (
+    BreakdownFilter,
+    EventPropertyFilter,
+    EventsNode,
+    InsightDateRange,
+    IntervalType,
+    PropertyMathType,
+    PropertyOperator,
+    TrendsQuery,
+)
+from posthog.test.base import (
+    APIBaseTest,
+    ClickhouseTestMixin,
+    _create_event,
+    _create_person,
+    flush_persons_and_events,
+)
+
+
+@override_settings(IN_UNIT_TESTING=True)
+class TestTrendsQueryBatch(ClickhouseTestMixin, APIBaseTest):
+    def setUp(self):
+        super().setUp()
+        PropertyDefinition.objects.create(team=self.team, name="price", property_type="Numeric")
+        _create_person(team_id=self.team.pk, distinct_ids=["p1"], properties={})
+        for timestamp, event, browser, price in [
+            ("2020-01-11T12:00:00Z", "$pageview", "Chrome", 10),
+            ("2020-01-12T12:00:00Z", "$pageview", "Firefox", 20),
+            ("2020-01-12T13:00:00Z", "$pageview", "Chrome", 30),
+            ("2020-01-12T14:00:00Z", "purchase", "Chrome", 40),
+            ("2020-01-14T12:00:00Z", "purchase", "Firefox", 50),
+            ("2020-01-20T12:00:00Z", "$pageview", "Chrome", 60),
+        ]:
+            _create_event(
+                team=self.team,
+                event=event,
+                distinct_id="p1",
+                timestamp=timestamp,
+                properties={"$browser": browser, "price": price},
+            )
+        flush_persons_and_events()
+
+    def _runner(self, *series: EventsNode, **kwargs) -> TrendsQueryRunner:
+        return TrendsQueryRunner(
+            team=self.team,
+            query=TrendsQuery(
+                series=list(series),
+                dateRange=InsightDateRange(date_from="2020-01-10", date_to="2020-01-15"),
+                interval=IntervalType.DAY,
+                **kwargs,
+            ),
+        )
+
+    def _queries(self) -> list[TrendsQueryRunner]:
+        return [
+            self._runner(EventsNode(event="$pageview")),
+            self._runner(
+                EventsNode(event="purchase", math=PropertyMathType.SUM, math_property="price"),
+                EventsNode(
+                    event="$pageview",
+                    properties=[EventPropertyFilter(key="$browser", value="Chrome", operator=PropertyOperator.EXACT)],
+                ),
+            ),
+        ]
+
+    @freeze_time("2020-01-20T13:00:00Z")
+    def test_batched_results_match_separate_results(self):
+        expected = [runner.calculate().results for runner in self._queries()]
+
+        runners = self._queries()
+        batches = batch_trends_query_runners(runners)
+        self.assertEqual(1, len(batches))
+
+        with patch(
+            "posthog.hogql_queries.insights.trends.trends_query_batch.execute_hogql_query",
+            wraps=execute_hogql_query,
+        ) as execute_mock:
+            results = [runner.calculate().results for runner in runners]
+
+        self.assertEqual(1, execute_mock.call_count)
+        for batched, separate in zip(results, expected):
+            self.assertEqual([series["data"] for series in separate], [series["data"] for series in batched])
+            self.assertEqual([series["days"] for series in separate], [series["days"] for series in batched])
+            self.assertEqual([series["label"] for series in separate], [series["label"] for series in batched])
+        self.assertEqual([0, 1, 2, 0, 0, 0], results[0][0]["data"])
+        self.assertEqual([0, 0, 40, 0, 50, 0], results[1][0]["data"])
+
+    @freeze_time("2020-01-20T13:00:00Z")
+    def test_incompatible_queries_are_not_batched(self):
+        runners = [
+            self._runner(EventsNode(event="$pageview")),
+            self._runner(EventsNode(event="$pageview"), breakdownFilter=BreakdownFilter(breakdown="$browser")),
+            self._runner(EventsNode(event="$pageview"), filterTestAccounts=True),
+        ]
+
+        self.assertEqual([], batch_trends_query_runners(runners))
+        self.assertTrue(all(runner.batch is None for runner in runners))
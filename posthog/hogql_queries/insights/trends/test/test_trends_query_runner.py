@@ -25,6 +25,7 @@ from posthog.hogql_queries.insights.trends.trends_query_runner import (
     BREAKDOWN_OTHER_DISPLAY,
     TrendsQueryRunner,
 )
+from posthog.hogql_queries.query_runner import ExecutionMode
 from posthog.models import GroupTypeMapping
 from posthog.models.action.action import Action
 from posthog.models.cohort.cohort import Cohort
@@ -37,6 +38,7 @@ from posthog.schema import (
     BreakdownFilter,
     BreakdownItem,
     BreakdownType,
+    CachedTrendsQueryResponse,
     ChartDisplayType,
     CompareFilter,
     CompareItem,
@@ -44,6 +46,7 @@ from posthog.schema import (
     DayItem,
     EventPropertyFilter,
     EventsNode,
+    HogQLPropertyFilter,
     HogQLQueryModifiers,
     InCohortVia,
     InsightDateRange,
@@ -545,6 +548,97 @@ class TestTrendsQueryRunner(ClickhouseTestMixin, APIBaseTest):
         assert response_groups[2] == "series_1"
         assert response_groups[3] == ""
 
+    def test_incremental_calculation_reuses_closed_intervals(self):
+        self._create_test_events()
+
+        with freeze_time("2020-01-19T10:00:00Z"):
+            runner = self._create_query_runner("-7d", None, IntervalType.DAY, [EventsNode(event="$pageview")])
+            response = runner.run(ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+            assert isinstance(response, CachedTrendsQueryResponse)
+            self.assertEqual([3, 1, 0, 2, 0, 1, 0, 1], response.results[0]["data"])
+
+        # A late event in an interval that had long closed, and a new one in the open interval
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-13T12:00:00Z")
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-19T15:00:00Z")
+
+        with freeze_time("2020-01-19T18:00:00Z"):
+            runner = self._create_query_runner("-7d", None, IntervalType.DAY, [EventsNode(event="$pageview")])
+            response = runner.run(ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        assert isinstance(response, CachedTrendsQueryResponse)
+        self.assertFalse(response.is_cached)
+        self.assertEqual([3, 1, 0, 2, 0, 1, 0, 2], response.results[0]["data"])
+        self.assertEqual(9, response.results[0]["count"])
+        self.assertEqual("12-Jan-2020", response.results[0]["labels"][0])
+        self.assertEqual("2020-01-19", response.results[0]["days"][-1])
+
+    def test_incremental_calculation_recalculates_everything_when_query_changes(self):
+        self._create_test_events()
+
+        with freeze_time("2020-01-19T10:00:00Z"):
+            runner = self._create_query_runner("-7d", None, IntervalType.DAY, [EventsNode(event="$pageview")])
+            runner.run(ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-13T12:00:00Z")
+
+        # The relative date range has moved on
+        with freeze_time("2020-01-20T10:00:00Z"):
+            runner = self._create_query_runner("-7d", None, IntervalType.DAY, [EventsNode(event="$pageview")])
+            response = runner.run(ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        assert isinstance(response, CachedTrendsQueryResponse)
+        self.assertFalse(response.is_cached)
+        self.assertEqual([2, 0, 2, 0, 1, 0, 1, 0], response.results[0]["data"])
+
+    def test_incremental_calculation_recalculates_everything_for_persons(self):
+        self._create_test_events()
+
+        for math, properties in [
+            (None, [PersonPropertyFilter(key="name", operator=PropertyOperator.EXACT, value="p1")]),
+            (BaseMathType.DAU, None),
+        ]:
+            series: list[EventsNode | ActionsNode] = [EventsNode(event="$pageview", math=math)]
+            with freeze_time("2020-01-19T10:00:00Z"):
+                self._create_query_runner("-7d", None, IntervalType.DAY, series, properties=properties).run(
+                    ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE
+                )
+
+            # Persons and cohorts can change closed intervals just like a late event
+            _create_event(team=self.team, event="$pageview", distinct_id="p1", timestamp="2020-01-13T12:00:00Z")
+
+            with freeze_time("2020-01-19T18:00:00Z"):
+                runner = self._create_query_runner("-7d", None, IntervalType.DAY, series, properties=properties)
+                response = runner.run(ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+                recalculated = self._create_query_runner(
+                    "-7d", None, IntervalType.DAY, series, properties=properties
+                ).run(ExecutionMode.CALCULATE_BLOCKING_ALWAYS)
+
+            assert isinstance(response, CachedTrendsQueryResponse)
+            assert isinstance(recalculated, CachedTrendsQueryResponse)
+            self.assertFalse(response.is_cached)
+            self.assertEqual(recalculated.results[0]["data"], response.results[0]["data"])
+
+    def test_incremental_calculation_is_disabled_for_hogql_filters(self):
+        with freeze_time("2020-01-19T10:00:00Z"):
+            event_filter = self._create_query_runner(
+                "-7d",
+                None,
+                IntervalType.DAY,
+                [EventsNode(event="$pageview")],
+                properties=[EventPropertyFilter(key="$browser", operator=PropertyOperator.EXACT, value="Chrome")],
+            )
+            # HogQL filters can reference person properties, which change over time
+            hogql_filter = self._create_query_runner(
+                "-7d",
+                None,
+                IntervalType.DAY,
+                [EventsNode(event="$pageview")],
+                properties=[HogQLPropertyFilter(key="person.properties.email == 'x'")],
+            )
+
+            self.assertTrue(event_filter._can_calculate_incrementally())
+            self.assertFalse(hogql_filter._can_calculate_incrementally())
+
     def test_formula(self):
         self._create_test_events()
 
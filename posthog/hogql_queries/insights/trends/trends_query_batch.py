@@ -0,0 +1,245 @@
+import threading
+from datetime import tzinfo
+from typing import TYPE_CHECKING, Any, Optional
+
+import structlog
+from sentry_sdk import capture_exception
+
+from posthog.hogql import ast
+from posthog.hogql.constants import MAX_SELECT_RETURNED_ROWS
+from posthog.hogql.parser import parse_expr
+from posthog.hogql.property import action_to_expr, property_to_expr
+from posthog.hogql.query import execute_hogql_query
+from posthog.hogql_queries.insights.trends.aggregation_operations import AggregationOperations
+from posthog.hogql_queries.insights.trends.series_with_extras import SeriesWithExtras
+from posthog.hogql_queries.insights.trends.utils import series_event_name
+from posthog.models.action.action import Action
+from posthog.schema import ActionsNode, ChartDisplayType, EventsNode, HogQLQueryResponse
+
+if TYPE_CHECKING:
+    from posthog.hogql_queries.insights.trends.trends_query_runner import TrendsQueryRunner
+
+logger = structlog.get_logger(__name__)
+
+# More series than this make the fused query slower than running the queries separately
+MAX_SERIES_PER_BATCH = 50
+
+
+class TrendsQueryBatch:
+    """
+    Calculates the series of multiple trends queries that scan the same events (same date range, interval, properties
+    and test account filtering) in a single ClickHouse query, with one `countIf`/`sumIf` aggregation per series.
+
+    The fused query is executed lazily, when the first of the runners calculates, and each runner then gets responses
+    shaped like those of its own series queries.
+    """
+
+    def __init__(self, runners: list["TrendsQueryRunner"]):
+        self.runners = runners
+        self._lock = threading.Lock()
+        self._executed = False
+        self._responses: dict[tuple[int, int], HogQLQueryResponse] = {}
+
+    def series_response(self, runner: "TrendsQueryRunner", index: int) -> Optional[HogQLQueryResponse]:
+        """The response for one series of one of the runners, or None if the runner should query on its own."""
+        with self._lock:
+            if not self._executed:
+                self._executed = True
+                try:
+                    self._execute()
+                except Exception as e:
+                    # The runners will query separately instead
+                    logger.exception("trends_query_batch_failed", error=str(e))
+                    capture_exception(e)
+                    self._responses = {}
+        return self._responses.get((id(runner), index))
+
+    def _execute(self) -> None:
+        first_runner = self.runners[0]
+        query_date_range = first_runner.query_date_range
+
+        aggregations: list[ast.Expr] = []
+        conditions: list[ast.Expr] = []
+        for runner in self.runners:
+            for series in runner.series:
+                condition = _series_condition(runner, series)
+                aggregations.append(_aggregation_if(runner, series, condition))
+                conditions.append(condition)
+
+        filters: list[ast.Expr] = [
+            parse_expr(
+                "timestamp >= {date_from_with_adjusted_start_of_interval}",
+                placeholders=query_date_range.to_placeholders(),
+            ),
+            parse_expr("timestamp <= {date_to}", placeholders=query_date_range.to_placeholders()),
+            *_global_filters(first_runner),
+            ast.Or(exprs=conditions) if len(conditions) > 1 else conditions[0],
+        ]
+
+        query = ast.SelectQuery(
+            select=[
+                ast.Alias(
+                    alias="day_start",
+                    expr=ast.Call(
+                        name=f"toStartOf{query_date_range.interval_name.title()}",
+                        args=[ast.Field(chain=["timestamp"])],
+                    ),
+                ),
+                *[ast.Alias(alias=f"series_{index}", expr=expr) for index, expr in enumerate(aggregations)],
+            ],
+            select_from=ast.JoinExpr(table=ast.Field(chain=["events"]), alias="e"),
+            where=ast.And(exprs=filters),
+            group_by=[ast.Field(chain=["day_start"])],
+            limit=ast.Constant(value=MAX_SELECT_RETURNED_ROWS),
+        )
+
+        response = execute_hogql_query(
+            query_type="TrendsQueryBatch",
+            query=query,
+            team=first_runner.team,
+            timings=first_runner.timings.clone_for_subquery(0),
+            modifiers=first_runner.modifiers,
+            limit_context=first_runner.limit_context,
+        )
+
+        tz = first_runner.team.timezone_info
+        rows_by_interval = {_interval_key(row[0], tz): row for row in response.results}
+        dates = query_date_range.all_values()
+        rows = [rows_by_interval.get(_interval_key(date, tz)) for date in dates]
+
+        column = 1
+        for runner in self.runners:
+            for index in range(len(runner.series)):
+                totals = [row[column] if row is not None else 0 for row in rows]
+                self._responses[(id(runner), index)] = HogQLQueryResponse(
+                    columns=["date", "total"],
+                    results=[[dates, totals]],
+                    timings=response.timings if column == 1 else [],
+                    hogql=response.hogql,
+                    modifiers=response.modifiers,
+                )
+                column += 1
+
+
+def batch_trends_query_runners(runners: list["TrendsQueryRunner"]) -> list[TrendsQueryBatch]:
+    """Groups runners that can share their events scan, and attaches a batch to the runners of each group."""
+    groups: dict[tuple, list[TrendsQueryRunner]] = {}
+    for runner in runners:
+        if runner.batch is None and is_batchable(runner):
+            groups.setdefault(_batch_key(runner), []).append(runner)
+
+    batches: list[TrendsQueryBatch] = []
+    for group in groups.values():
+        # Split big groups into multiple batches
+        batch_runners: list[TrendsQueryRunner] = []
+        series_count = 0
+        for group_runner in [*group, None]:
+            if group_runner is None or series_count + len(group_runner.series) > MAX_SERIES_PER_BATCH:
+                if len(batch_runners) > 1:
+                    batch = TrendsQueryBatch(batch_runners)
+                    for batch_runner in batch_runners:
+                        batch_runner.batch = batch
+                    batches.append(batch)
+                batch_runners, series_count = [], 0
+            if group_runner is not None:
+                batch_runners.append(group_runner)
+                series_count += len(group_runner.series)
+    return batches
+
+
+def is_batchable(runner: "TrendsQueryRunner") -> bool:
+    query = runner.query
+    if (
+        runner._trends_display.is_total_value()
+        or runner._trends_display.display_type == ChartDisplayType.ACTIONS_LINE_GRAPH_CUMULATIVE
+    ):
+        return False
+    if runner.breakdown_enabled or (query.compareFilter is not None and query.compareFilter.compare):
+        return False
+    if query.trendsFilter is not None and (query.trendsFilter.smoothingIntervals or 1) > 1:
+        return False
+    if query.samplingFactor and query.samplingFactor != 1:
+        return False
+    if len(runner.query_date_range.all_values()) > MAX_SELECT_RETURNED_ROWS:
+        return False
+    if len(runner.series) == 0 or len(runner.series) > MAX_SERIES_PER_BATCH:
+        return False
+    return all(_is_batchable_series(series) for series in runner.series)
+
+
+def _is_batchable_series(series: SeriesWithExtras) -> bool:
+    if not isinstance(series.series, EventsNode | ActionsNode):
+        return False
+    math = series.series.math
+    if math is None or math == "total":
+        return True
+    # Session duration needs a join with sessions, which would multiply the rows of other series
+    return math == "sum" and series.series.math_property not in (None, "$session_duration")
+
+
+def _batch_key(runner: "TrendsQueryRunner") -> tuple:
+    query_date_range = runner.query_date_range
+    return (
+        query_date_range.interval_name,
+        query_date_range.date_from_str,
+        query_date_range.date_to_str,
+        query_date_range.use_start_of_interval(),
+        runner.query.model_dump_json(include={"properties", "filterTestAccounts"}),
+        runner.modifiers.model_dump_json(),
+        runner.limit_context,
+    )
+
+
+def _global_filters(runner: "TrendsQueryRunner") -> list[ast.Expr]:
+    filters: list[ast.Expr] = []
+    team = runner.team
+    if (
+        runner.query.filterTestAccounts
+        and isinstance(team.test_account_filters, list)
+        and len(team.test_account_filters) > 0
+    ):
+        for property in team.test_account_filters:
+            filters.append(property_to_expr(property, team))
+    if runner.query.properties is not None and runner.query.properties != []:
+        filters.append(property_to_expr(runner.query.properties, team))
+    return filters
+
+
+def _series_condition(runner: "TrendsQueryRunner", series: SeriesWithExtras) -> ast.Expr:
+    exprs: list[ast.Expr] = []
+    event_name = series_event_name(series.series)
+    if event_name is not None:
+        exprs.append(parse_expr("event = {event}", placeholders={"event": ast.Constant(value=event_name)}))
+    elif isinstance(series.series, ActionsNode):
+        try:
+            action = Action.objects.get(pk=int(series.series.id), team=runner.team)
+            exprs.append(action_to_expr(action))
+        except Action.DoesNotExist:
+            # If an action doesn't exist, we want to return no events
+            exprs.append(parse_expr("1 = 2"))
+    if series.series.properties is not None and series.series.properties != []:
+        exprs.append(property_to_expr(series.series.properties, runner.team))
+
+    if len(exprs) == 0:
+        return ast.Constant(value=True)
+    if len(exprs) == 1:
+        return exprs[0]
+    return ast.And(exprs=exprs)
+
+
+def _aggregation_if(runner: "TrendsQueryRunner", series: SeriesWithExtras, condition: ast.Expr) -> ast.Expr:
+    aggregation = AggregationOperations(
+        runner.team,
+        series.series,
+        runner._trends_display.display_type,
+        runner.query_date_range,
+        False,
+    ).select_aggregation()
+    assert isinstance(aggregation, ast.Call)
+    return ast.Call(name=f"{aggregation.name}If", args=[*aggregation.args, condition])
+
+
+def _interval_key(value: Any, tz: tzinfo) -> str:
+    if getattr(value, "tzinfo", None) is not None:
+        value = value.astimezone(tz)
+    return value.strftime("%Y-%m-%d %H:%M:%S")
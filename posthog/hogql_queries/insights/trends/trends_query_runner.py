@@ -1,19 +1,22 @@
 import threading
 from copy import deepcopy
+from dataclasses import dataclass
 from datetime import timedelta
 from math import ceil
 from operator import itemgetter
-from typing import Any, Optional, Union
+from typing import TYPE_CHECKING, Any, Optional, Union
 
 from django.conf import settings
 from django.utils.timezone import datetime
 from natsort import natsorted, ns
+from pydantic import BaseModel
 
 from posthog.caching.insights_api import (
     BASE_MINIMUM_INSIGHT_REFRESH_INTERVAL,
     REAL_TIME_INSIGHT_REFRESH_INTERVAL,
     REDUCED_MINIMUM_INSIGHT_REFRESH_INTERVAL,
 )
+from posthog.caching.utils import last_refresh_from_cached_result
 from posthog.clickhouse import query_tagging
 from posthog.hogql import ast
 from posthog.hogql.constants import MAX_SELECT_RETURNED_ROWS, LimitContext
@@ -34,7 +37,7 @@ from posthog.hogql_queries.insights.trends.trends_query_builder import TrendsQue
 from posthog.hogql_queries.query_runner import QueryRunner
 from posthog.hogql_queries.utils.formula_ast import FormulaAST
 from posthog.hogql_queries.utils.query_compare_to_date_range import QueryCompareToDateRange
-from posthog.hogql_queries.utils.query_date_range import QueryDateRange
+from posthog.hogql_queries.utils.query_date_range import QueryDateRange, QueryDateRangeTail
 from posthog.hogql_queries.utils.query_previous_period_date_range import (
     QueryPreviousPeriodDateRange,
 )
@@ -72,12 +75,50 @@ from posthog.schema import (
 from posthog.utils import format_label_date, multisort
 from posthog.warehouse.models.util import get_view_or_table_by_name
 
+if TYPE_CHECKING:
+    from posthog.hogql_queries.insights.trends.trends_query_batch import TrendsQueryBatch
+
+
+# Math that aggregates each interval independently of the others, and of persons. Unique users change with person
+# merges, and HogQL math can read person properties.
+INCREMENTAL_MATH_TYPES = {
+    None,
+    "total",
+    "unique_group",
+    "unique_session",
+    "sum",
+    "avg",
+    "min",
+    "max",
+    "median",
+    "p90",
+    "p95",
+    "p99",
+}
+# Events can arrive late, so intervals that closed shortly before a calculation may still change. Events arriving
+# later than this after their timestamp (e.g. offline batches from mobile apps, or imports) are missed by incremental
+# calculations, until the query changes or is refreshed with a forced recalculation.
+INCREMENTAL_LATE_DATA_BUFFER = timedelta(days=1)
+# Filters on these can match other events over time, as cohorts are recalculated and person properties change. HogQL
+# filters can reference persons, groups and cohorts in any expression, so they're treated as mutable too.
+INCREMENTAL_MUTABLE_PROPERTY_TYPES = {"person", "cohort", "precalculated-cohort", "static-cohort", "group", "hogql"}
+
+
+@dataclass
+class IncrementalTail:
+    # Start of the first interval to query again
+    date_from: datetime
+    # Cached values of the intervals before it, by interval start date
+    cached_values: dict[str, Any]
+
 
 class TrendsQueryRunner(QueryRunner):
     query: TrendsQuery
     response: TrendsQueryResponse
     cached_response: CachedTrendsQueryResponse
     series: list[SeriesWithExtras]
+    # Set when this query is calculated together with other queries scanning the same events
+    batch: Optional["TrendsQueryBatch"]
 
     def __init__(
         self,
@@ -90,6 +131,7 @@ class TrendsQueryRunner(QueryRunner):
         super().__init__(query, team=team, timings=timings, modifiers=modifiers, limit_context=limit_context)
         self.update_hogql_modifiers()
         self.series = self.setup_series()
+        self.batch = None
 
     def _refresh_frequency(self):
         date_to = self.query_date_range.date_to()
@@ -128,25 +170,30 @@ class TrendsQueryRunner(QueryRunner):
                 else:
                     query_date_range = self.query_previous_date_range
 
-                query_builder = TrendsQueryBuilder(
-                    trends_query=series.overriden_query or self.query,
-                    team=self.team,
-                    query_date_range=query_date_range,
-                    series=series.series,
-                    timings=self.timings,
-                    modifiers=self.modifiers,
-                    limit_context=self.limit_context,
-                )
-                query = query_builder.build_query()
-
-                # Get around the default 100 limit, bump to the max 10000.
-                # This is useful for the world map view and other cases with a lot of breakdowns.
-                if isinstance(query, ast.SelectQuery) and query.limit is None:
-                    query.limit = ast.Constant(value=MAX_SELECT_RETURNED_ROWS)
-                queries.append(query)
+                queries.append(self._series_query(series, query_date_range))
 
         return queries
 
+    def _series_query(
+        self, series: SeriesWithExtras, query_date_range: QueryDateRange
+    ) -> ast.SelectQuery | ast.SelectUnionQuery:
+        query_builder = TrendsQueryBuilder(
+            trends_query=series.overriden_query or self.query,
+            team=self.team,
+            query_date_range=query_date_range,
+            series=series.series,
+            timings=self.timings,
+            modifiers=self.modifiers,
+            limit_context=self.limit_context,
+        )
+        query = query_builder.build_query()
+
+        # Get around the default 100 limit, bump to the max 10000.
+        # This is useful for the world map view and other cases with a lot of breakdowns.
+        if isinstance(query, ast.SelectQuery) and query.limit is None:
+            query.limit = ast.Constant(value=MAX_SELECT_RETURNED_ROWS)
+        return query
+
     def to_actors_query(
         self,
         time_frame: Optional[str],
@@ -313,6 +360,21 @@ class TrendsQueryRunner(QueryRunner):
         with self.timings.measure("printing_hogql_for_response"):
             response_hogql = to_printed_hogql(response_hogql_query, self.team, self.modifiers)
 
+        # Only query the intervals that may have changed since the stale cached result, for series where we can
+        incremental_tails = self._incremental_tails(response_hogql) if self.batch is None else {}
+        if incremental_tails:
+            queries = [
+                (
+                    self._series_query(
+                        self.series[index],
+                        QueryDateRangeTail(self.query_date_range, incremental_tails[index].date_from),
+                    )
+                    if index in incremental_tails
+                    else query
+                )
+                for index, query in enumerate(queries)
+            ]
+
         res_matrix: list[list[Any] | Any | None] = [None] * len(queries)
         timings_matrix: list[list[QueryTiming] | None] = [None] * (2 + len(queries))
         errors: list[Exception] = []
@@ -331,14 +393,18 @@ class TrendsQueryRunner(QueryRunner):
 
                 series_with_extra = self.series[index]
 
-                response = execute_hogql_query(
-                    query_type="TrendsQuery",
-                    query=query,
-                    team=self.team,
-                    timings=timings,
-                    modifiers=self.modifiers,
-                    limit_context=self.limit_context,
-                )
+                response = self.batch.series_response(self, index) if self.batch is not None else None
+                if response is None:
+                    response = execute_hogql_query(
+                        query_type="TrendsQuery",
+                        query=query,
+                        team=self.team,
+                        timings=timings,
+                        modifiers=self.modifiers,
+                        limit_context=self.limit_context,
+                    )
+                if index in incremental_tails:
+                    response = self._merge_incremental_tail(response, incremental_tails[index])
 
                 timings_matrix[index + 1] = response.timings
                 res_matrix[index] = self.build_series_response(response, series_with_extra, len(queries))
@@ -437,6 +503,143 @@ class TrendsQueryRunner(QueryRunner):
             error=". ".join(debug_errors),
         )
 
+    def _incremental_tails(self, response_hogql: str) -> dict[int, IncrementalTail]:
+        """
+        For each series, the cached values of the intervals that closed before the stale cached result was calculated,
+        and the start of the first interval that must be queried again. Empty if the cached result can't be reused.
+
+        Only queries that don't depend on persons or cohorts are calculated incrementally, as those can change the
+        values of closed intervals. Relative date ranges are printed as absolute dates, so in practice a cached result
+        is only reused on the day it was calculated.
+        """
+        cached_response = self.stale_cached_response
+        if cached_response is None or not self._can_calculate_incrementally():
+            return {}
+        # The printed query covers the filters, the date range, actions, cohorts and test account filters.
+        # If any of them changed, we need to recalculate everything.
+        if cached_response.hogql != response_hogql or cached_response.last_refresh is None:
+            return {}
+
+        cached_results = {
+            result.get("action", {}).get("order"): result
+            for result in cached_response.results
+            if isinstance(result, dict)
+        }
+        if len(cached_results) != len(self.series):
+            return {}
+
+        last_refresh = last_refresh_from_cached_result(cached_response)
+        assert last_refresh is not None
+        closed_before = last_refresh - INCREMENTAL_LATE_DATA_BUFFER
+        interval_delta = self.query_date_range.interval_relativedelta()
+        all_values = self.query_date_range.all_values()
+
+        tails: dict[int, IncrementalTail] = {}
+        for index, series in enumerate(self.series):
+            cached_result = cached_results.get(series.series_order)
+            if cached_result is None or len(cached_result["days"]) != len(cached_result["data"]):
+                continue
+            cached_values = dict(zip(cached_result["days"], cached_result["data"]))
+
+            reused = 0
+            # Always query at least the last interval
+            for interval_start in all_values[:-1]:
+                if interval_start + interval_delta > closed_before:
+                    break
+                if self._interval_key(interval_start) not in cached_values:
+                    break
+                reused += 1
+            if reused == 0:
+                continue
+
+            tails[index] = IncrementalTail(
+                date_from=all_values[reused],
+                cached_values={
+                    key: cached_values[key] for key in (self._interval_key(value) for value in all_values[:reused])
+                },
+            )
+
+        return tails
+
+    def _can_calculate_incrementally(self) -> bool:
+        if self.query_date_range.interval_name not in ("day", "week", "month"):
+            return False
+        # Intervals are only complete in every query if they start at the beginning of the interval
+        if not self.query_date_range.use_start_of_interval():
+            return False
+        if (
+            self._trends_display.is_total_value()
+            or self._trends_display.display_type == ChartDisplayType.ACTIONS_LINE_GRAPH_CUMULATIVE
+        ):
+            return False
+        # Breakdowns can change their top values, and cached formula results don't contain the individual series
+        if self.breakdown_enabled or (self.query.compareFilter is not None and self.query.compareFilter.compare):
+            return False
+        if self.query.trendsFilter is not None and (
+            self.query.trendsFilter.formula or (self.query.trendsFilter.smoothingIntervals or 1) > 1
+        ):
+            return False
+        if self.query.samplingFactor and self.query.samplingFactor != 1:
+            return False
+        # Data warehouse tables can be re-synced with historical data
+        if not all(
+            isinstance(series.series, EventsNode | ActionsNode) and series.series.math in INCREMENTAL_MATH_TYPES
+            for series in self.series
+        ):
+            return False
+        return INCREMENTAL_MUTABLE_PROPERTY_TYPES.isdisjoint(self._filter_property_types())
+
+    def _filter_property_types(self) -> set[str]:
+        """Types of all property filters of the query: its own, its series', their actions' and test account filters."""
+        filters: list[Any] = [self.query.properties]
+        if self.query.filterTestAccounts:
+            filters.append(self.team.test_account_filters)
+        for series in self.series:
+            filters.append(series.series.properties)
+            if isinstance(series.series, ActionsNode):
+                action = Action.objects.get(pk=int(series.series.id), team=self.team)
+                filters.extend(step.properties for step in action.steps)
+
+        types: set[str] = set()
+        while filters:
+            value = filters.pop()
+            if isinstance(value, BaseModel):
+                value = value.model_dump()
+            if isinstance(value, list):
+                filters.extend(value)
+            elif isinstance(value, dict):
+                # Property groups have values, property filters have a type
+                if "values" in value:
+                    filters.append(value["values"])
+                elif value.get("type") is not None:
+                    types.add(str(value["type"]))
+        return types
+
+    def _interval_key(self, value: datetime) -> str:
+        return value.strftime("%Y-%m-%d")
+
+    def _merge_incremental_tail(self, response: HogQLQueryResponse, tail: IncrementalTail) -> HogQLQueryResponse:
+        """Returns the response for the whole date range, with the cached values for the intervals we didn't query."""
+        columns = response.columns or []
+        if "date" not in columns or "total" not in columns:
+            raise ValueError("Incremental trends query didn't return dates and totals")
+        date_index = columns.index("date")
+        total_index = columns.index("total")
+
+        tail_values: dict[str, Any] = {}
+        row: list[Any] = [None] * len(columns)
+        for result in response.results:
+            row = list(result)
+            tail_values.update(zip((self._interval_key(date) for date in result[date_index]), result[total_index]))
+
+        all_values = self.query_date_range.all_values()
+        row[date_index] = all_values
+        row[total_index] = [
+            tail.cached_values.get(key, tail_values.get(key, 0))
+            for key in (self._interval_key(value) for value in all_values)
+        ]
+        return response.model_copy(update={"results": [row]})
+
     def build_series_response(self, response: HogQLQueryResponse, series: SeriesWithExtras, series_count: int):
         def get_value(name: str, val: Any):
             if name not in ["date", "total", "breakdown_value"]:
@@ -448,6 +651,22 @@ class TrendsQueryRunner(QueryRunner):
             index = response.columns.index(name)
             return val[index]
 
+        # Breakdown rows all share the same dates, so format each list of dates only once
+        formatted_dates: dict[tuple, tuple[list[str], list[str]]] = {}
+
+        def format_dates(dates: list) -> tuple[list[str], list[str]]:
+            key = tuple(dates)
+            if key not in formatted_dates:
+                day_format = "%Y-%m-%d{}".format(
+                    " %H:%M:%S" if self.query_date_range.interval_name in ("hour", "minute") else ""
+                )
+                formatted_dates[key] = (
+                    [item.strftime(day_format) for item in dates],
+                    [format_label_date(item, self.query_date_range.interval_name) for item in dates],
+                )
+            days, labels = formatted_dates[key]
+            return list(days), list(labels)
+
         real_series_count = series_count
         if self.query.compareFilter is not None and self.query.compareFilter.compare:
             real_series_count = ceil(series_count / 2)
@@ -464,14 +683,7 @@ class TrendsQueryRunner(QueryRunner):
                 series_object = {
                     "data": [],
                     "days": (
-                        [
-                            item.strftime(
-                                "%Y-%m-%d{}".format(
-                                    " %H:%M:%S" if self.query_date_range.interval_name in ("hour", "minute") else ""
-                                )
-                            )
-                            for item in get_value("date", val)
-                        ]
+                        format_dates(get_value("date", val))[0]
                         if response.columns and "date" in response.columns
                         else []
                     ),
@@ -499,19 +711,11 @@ class TrendsQueryRunner(QueryRunner):
                 else:
                     count = float(sum(get_value("total", val)))
 
+                days, labels = format_dates(get_value("date", val))
                 series_object = {
                     "data": get_value("total", val),
-                    "labels": [
-                        format_label_date(item, self.query_date_range.interval_name) for item in get_value("date", val)
-                    ],
-                    "days": [
-                        item.strftime(
-                            "%Y-%m-%d{}".format(
-                                " %H:%M:%S" if self.query_date_range.interval_name in ("hour", "minute") else ""
-                            )
-                        )
-                        for item in get_value("date", val)
-                    ],
+                    "labels": labels,
+                    "days": days,
                     "count": count,
                     "label": "All events" if series_label is None else series_label,
                     "filter": self._query_to_filter(),
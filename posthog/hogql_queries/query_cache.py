@@ -1,13 +1,81 @@
 from datetime import datetime, UTC
-from typing import Optional
+from typing import Any, Optional
 
+import orjson
+import zstd
 from django.conf import settings
 from django.core.cache import cache
+from prometheus_client import Counter
 
 from posthog import redis
 from posthog.cache_utils import OrjsonJsonSerializer
 from posthog.utils import get_safe_cache
 
+QUERY_CACHE_WRITE_BYTES_COUNTER = Counter(
+    "posthog_query_cache_write_bytes_total",
+    "Size of query results written to the cache, before (serialized) and after (encoded) compression.",
+    labelnames=["stage"],
+)
+
+# Cache values start with a header: the magic bytes, a format version and a byte of flags.
+# Values without the magic bytes are plain orjson, as written before the header was introduced.
+CACHE_VALUE_MAGIC = b"PHQC"
+CACHE_VALUE_VERSION = 1
+FLAG_ZSTD = 1 << 0
+FLAG_COLUMNAR_RESULTS = 1 << 1
+
+COMPRESSION_MIN_LENGTH = 1024
+COMPRESSION_LEVEL = 3
+# Storing rows as columns groups similar values together, which compresses much better
+COLUMNAR_MIN_ROWS = 100
+
+
+def _results_as_columns(results: Any) -> Optional[list[list[Any]]]:
+    if not isinstance(results, list) or len(results) < COLUMNAR_MIN_ROWS:
+        return None
+    if not all(isinstance(row, list | tuple) for row in results):
+        return None
+    width = len(results[0])
+    if width == 0 or any(len(row) != width for row in results):
+        return None
+    return [list(column) for column in zip(*results)]
+
+
+def encode_cache_value(response: dict, *, compress: bool) -> bytes:
+    flags = 0
+    columns = _results_as_columns(response.get("results"))
+    if columns is not None:
+        response = {**response, "results": columns}
+        flags |= FLAG_COLUMNAR_RESULTS
+
+    serialized = OrjsonJsonSerializer({}).dumps(response)
+    QUERY_CACHE_WRITE_BYTES_COUNTER.labels(stage="serialized").inc(len(serialized))
+    if compress and len(serialized) >= COMPRESSION_MIN_LENGTH:
+        serialized = zstd.compress(serialized, COMPRESSION_LEVEL)
+        flags |= FLAG_ZSTD
+
+    encoded = CACHE_VALUE_MAGIC + bytes([CACHE_VALUE_VERSION, flags]) + serialized
+    QUERY_CACHE_WRITE_BYTES_COUNTER.labels(stage="encoded").inc(len(encoded))
+    return encoded
+
+
+def decode_cache_value(value: bytes) -> dict:
+    if not value.startswith(CACHE_VALUE_MAGIC):
+        return orjson.loads(value)
+
+    header_length = len(CACHE_VALUE_MAGIC) + 2
+    version, flags = value[len(CACHE_VALUE_MAGIC)], value[len(CACHE_VALUE_MAGIC) + 1]
+    if version != CACHE_VALUE_VERSION:
+        raise ValueError(f"Unknown query cache value version: {version}")
+
+    payload = value[header_length:]
+    if flags & FLAG_ZSTD:
+        payload = zstd.decompress(payload)
+    response = orjson.loads(payload)
+    if flags & FLAG_COLUMNAR_RESULTS:
+        response["results"] = [list(row) for row in zip(*response["results"])]
+    return response
+
 
 class QueryCacheManager:
     def __init__(
@@ -82,8 +150,9 @@ class QueryCacheManager:
         self.redis_client.zrem(f"cache_timestamps:{self.team_id}", self.identifier)
 
     def set_cache_data(self, *, response: dict, target_age: Optional[datetime]) -> None:
-        fresh_response_serialized = OrjsonJsonSerializer({}).dumps(response)
-        cache.set(self.cache_key, fresh_response_serialized, settings.CACHED_RESULTS_TTL)
+        # With USE_REDIS_COMPRESSION, the cache backend compresses all values already
+        fresh_response_encoded = encode_cache_value(response, compress=not settings.USE_REDIS_COMPRESSION)
+        cache.set(self.cache_key, fresh_response_encoded, settings.CACHED_RESULTS_TTL)
 
         if target_age:
             self.update_target_age(target_age)
@@ -95,4 +164,8 @@ class QueryCacheManager:
         if not cached_response_bytes:
             return None
 
-        return OrjsonJsonSerializer({}).loads(cached_response_bytes)
+        try:
+            return decode_cache_value(cached_response_bytes)
+        except ValueError:
+            # Written in a format we don't understand (yet), so treat it as missing
+            return None
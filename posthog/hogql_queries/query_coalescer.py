@@ -0,0 +1,106 @@
+import time
+from typing import Optional
+from uuid import uuid4
+
+import structlog
+from prometheus_client import Counter
+
+from posthog import redis
+from posthog.metrics import LABEL_TEAM_ID
+
+logger = structlog.get_logger(__name__)
+
+QUERY_COALESCING_COUNTER = Counter(
+    "posthog_query_coalescing_total",
+    "Calculations of a query runner cache key, by whether they ran or waited for another worker.",
+    labelnames=[LABEL_TEAM_ID, "result"],
+)
+
+# Longest a calculation may hold the lock, should the worker die without releasing it
+LOCK_TTL_SECONDS = 180
+# Longest a worker waits for someone else's calculation before calculating on its own
+WAIT_TIMEOUT_SECONDS = 60
+
+# Deletes the lock only if we still hold it. It may have expired, and been taken by another worker, in the meantime.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class QueryCoalescer:
+    """
+    Single-flight for query runner calculations: when multiple workers want to calculate the same cache key at the same
+    time, only the one holding the lock calculates. The others wait for a pub/sub notification, and then read the
+    result from the cache.
+    """
+
+    def __init__(self, *, team_id: int, cache_key: str):
+        self.redis_client = redis.get_client()
+        self.team_id = team_id
+        self.cache_key = cache_key
+        self._token: Optional[str] = None
+
+    @property
+    def lock_key(self) -> str:
+        return f"query_calculation_lock:{self.team_id}:{self.cache_key}"
+
+    @property
+    def channel(self) -> str:
+        return f"query_calculation_done:{self.team_id}:{self.cache_key}"
+
+    def acquire(self) -> bool:
+        """
+        Try to become the worker calculating this cache key. Returns whether to calculate, which is also the case when
+        Redis is unavailable: then the calculation just isn't coalesced.
+        """
+        token = uuid4().hex
+        try:
+            acquired = self.redis_client.set(self.lock_key, token, nx=True, ex=LOCK_TTL_SECONDS)
+        except Exception as e:
+            logger.warning("query_coalescer_acquire_failed", cache_key=self.cache_key, error=str(e))
+            QUERY_COALESCING_COUNTER.labels(team_id=self.team_id, result="unavailable").inc()
+            return True
+        if acquired:
+            self._token = token
+            QUERY_COALESCING_COUNTER.labels(team_id=self.team_id, result="calculated").inc()
+            return True
+        return False
+
+    def release(self) -> None:
+        """Release the lock, if we hold it, and notify all waiting workers."""
+        if self._token is None:
+            return
+        try:
+            self.redis_client.eval(RELEASE_LOCK_SCRIPT, 1, self.lock_key, self._token)
+            self.redis_client.publish(self.channel, "done")
+        except Exception as e:
+            # Waiters time out eventually, so failing to notify them must not fail the query
+            logger.warning("query_coalescer_release_failed", cache_key=self.cache_key, error=str(e))
+        finally:
+            self._token = None
+
+    def wait(self, timeout: float = WAIT_TIMEOUT_SECONDS) -> bool:
+        """Wait for the worker holding the lock to finish. Returns False if we timed out, or Redis failed."""
+        pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(self.channel)
+            deadline = time.monotonic() + timeout
+            # The calculation may have finished before we subscribed
+            while self.redis_client.exists(self.lock_key):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    QUERY_COALESCING_COUNTER.labels(team_id=self.team_id, result="timed_out").inc()
+                    return False
+                if pubsub.get_message(timeout=min(remaining, 1.0)) is not None:
+                    break
+            QUERY_COALESCING_COUNTER.labels(team_id=self.team_id, result="coalesced").inc()
+            return True
+        except Exception as e:
+            logger.warning("query_coalescer_wait_failed", cache_key=self.cache_key, error=str(e))
+            QUERY_COALESCING_COUNTER.labels(team_id=self.team_id, result="unavailable").inc()
+            return False
+        finally:
+            pubsub.close()
@@ -18,6 +18,7 @@ from posthog.hogql.printer import print_ast
 from posthog.hogql.query import create_default_modifiers_for_team
 from posthog.hogql.timings import HogQLTimings
 from posthog.hogql_queries.query_cache import QueryCacheManager
+from posthog.hogql_queries.query_coalescer import QueryCoalescer
 from posthog.metrics import LABEL_TEAM_ID
 from posthog.models import Team, User
 from posthog.schema import (
@@ -420,6 +421,10 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
     response: R
     cached_response: CR
     query_id: Optional[str]
+    # A stale result for the same cache key, which is being recalculated. Runners can reuse parts of it.
+    stale_cached_response: Optional[CR]
+    # Whether queries may be answered from the ClickHouse result cache, which they can't when recalculating is forced
+    use_result_cache: bool
 
     team: Team
     timings: HogQLTimings
@@ -441,6 +446,8 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
         _modifiers = modifiers or (query.modifiers if hasattr(query, "modifiers") else None)
         self.modifiers = create_default_modifiers_for_team(team, _modifiers)
         self.query_id = query_id
+        self.stale_cached_response = None
+        self.use_result_cache = True
 
         if not self.is_query_node(query):
             query = self.query_type.model_validate(query)
@@ -538,6 +545,7 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
                 return cached_response
 
             self.count_query_cache_hit(hit="stale", trigger=cached_response.calculation_trigger or "")
+            self.stale_cached_response = cached_response
             # We have a stale result. If we aren't allowed to calculate, let's still return it
             # – otherwise let's proceed to calculation
             if execution_mode == ExecutionMode.CACHE_ONLY_NEVER_CALCULATE:
@@ -598,6 +606,7 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
             set_tag("dashboard_id", str(dashboard_id))
 
         self.query_id = query_id or self.query_id
+        self.use_result_cache = execution_mode != ExecutionMode.CALCULATE_BLOCKING_ALWAYS
         CachedResponse: type[CR] = self.cached_response_type
         cache_manager = QueryCacheManager(
             team_id=self.team.pk,
@@ -621,41 +630,64 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
             if results is not None:
                 return results
 
-        last_refresh = datetime.now(UTC)
-        target_age = self.cache_target_age(last_refresh=last_refresh)
-
-        # Avoid affecting cache key
-        # Add user based modifiers here, primarily for user specific feature flagging
-        if user:
-            self.modifiers = create_default_modifiers_for_user(user, self.team, self.modifiers)
-            self.modifiers.useMaterializedViews = True
-
-        fresh_response_dict = {
-            **self.calculate().model_dump(),
-            "is_cached": False,
-            "last_refresh": last_refresh,
-            "next_allowed_client_refresh": last_refresh + self._refresh_frequency(),
-            "cache_key": cache_key,
-            "timezone": self.team.timezone,
-            "cache_target_age": target_age,
-        }
-        if get_query_tag_value("trigger"):
-            fresh_response_dict["calculation_trigger"] = get_query_tag_value("trigger")
-        fresh_response = CachedResponse(**fresh_response_dict)
-
-        # Don't cache debug queries with errors and export queries
-        has_error: Optional[list] = fresh_response_dict.get("error", None)
-        if (has_error is None or len(has_error) == 0) and self.limit_context != LimitContext.EXPORT:
-            cache_manager.set_cache_data(
-                response=fresh_response_dict,
-                # This would be a possible place to decide to not ever keep this cache warm
-                # Example: Not for super quickly calculated insights
-                # Set target_age to None in that case
-                target_age=target_age,
-            )
-            QUERY_CACHE_WRITE_COUNTER.labels(team_id=self.team.pk).inc()
+        # Only one worker calculates a given cache key at a time, the others wait for its result to land in the cache
+        coalescer: Optional[QueryCoalescer] = None
+        if execution_mode != ExecutionMode.CALCULATE_BLOCKING_ALWAYS and self.limit_context != LimitContext.EXPORT:
+            coalescer = QueryCoalescer(team_id=self.team.pk, cache_key=cache_key)
+            if not coalescer.acquire():
+                # The other worker signals it's done even when its calculation fails, leaving this entry in place
+                previous_response = cache_manager.get_cache_data()
+                previous_last_refresh = previous_response.get("last_refresh") if previous_response else None
+                if coalescer.wait():
+                    coalesced_response = cache_manager.get_cache_data()
+                    if (
+                        self.is_cached_response(coalesced_response)
+                        and coalesced_response.get("last_refresh") != previous_last_refresh
+                    ):
+                        coalesced_response["is_cached"] = True
+                        return CachedResponse(**coalesced_response)
+                # The other calculation timed out or failed, so calculate on our own
+                coalescer = None
+
+        try:
+            last_refresh = datetime.now(UTC)
+            target_age = self.cache_target_age(last_refresh=last_refresh)
+
+            # Avoid affecting cache key
+            # Add user based modifiers here, primarily for user specific feature flagging
+            if user:
+                self.modifiers = create_default_modifiers_for_user(user, self.team, self.modifiers)
+                self.modifiers.useMaterializedViews = True
+
+            fresh_response_dict = {
+                **self.calculate().model_dump(),
+                "is_cached": False,
+                "last_refresh": last_refresh,
+                "next_allowed_client_refresh": last_refresh + self._refresh_frequency(),
+                "cache_key": cache_key,
+                "timezone": self.team.timezone,
+                "cache_target_age": target_age,
+            }
+            if get_query_tag_value("trigger"):
+                fresh_response_dict["calculation_trigger"] = get_query_tag_value("trigger")
+            fresh_response = CachedResponse(**fresh_response_dict)
+
+            # Don't cache debug queries with errors and export queries
+            has_error: Optional[list] = fresh_response_dict.get("error", None)
+            if (has_error is None or len(has_error) == 0) and self.limit_context != LimitContext.EXPORT:
+                cache_manager.set_cache_data(
+                    response=fresh_response_dict,
+                    # This would be a possible place to decide to not ever keep this cache warm
+                    # Example: Not for super quickly calculated insights
+                    # Set target_age to None in that case
+                    target_age=target_age,
+                )
+                QUERY_CACHE_WRITE_COUNTER.labels(team_id=self.team.pk).inc()
 
-        return fresh_response
+            return fresh_response
+        finally:
+            if coalescer is not None:
+                coalescer.release()
 
     @abstractmethod
     def to_query(self) -> ast.SelectQuery | ast.SelectUnionQuery:
@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import patch
 
 from posthog.hogql import ast
 from posthog.hogql.test.utils import pretty_print_in_tests
@@ -265,3 +266,27 @@ class TestActorsQueryRunner(ClickhouseTestMixin, APIBaseTest):
         response = runner.calculate()
         # Should show a single person despite multiple distinct_ids
         self.assertEqual(len(response.results), 1)
+
+    def test_persons_are_looked_up_in_batches(self):
+        random_uuid = self._create_random_persons()
+        runner = self._create_runner(ActorsQuery(search=random_uuid, orderBy=["properties.email DESC"]))
+
+        with patch("posthog.hogql_queries.actor_strategies.PERSONS_BATCH_SIZE", 3):
+            response = runner.calculate()
+
+        self.assertEqual(len(response.results), 10)
+        self.assertEqual(response.missing_actors_count, 0)
+        person = response.results[0][0]
+        self.assertEqual(person["distinct_ids"], [f"id-{random_uuid}-9"])
+        self.assertEqual(person["properties"]["index"], 9)
+
+    def test_persons_with_only_some_properties(self):
+        random_uuid = self._create_random_persons()
+        runner = self._create_runner(ActorsQuery(search=random_uuid, orderBy=["properties.email DESC"]))
+
+        _, rows = runner.calculate_iter(actor_properties=["email", "missing"])
+        persons = [row[0] for row in rows]
+
+        self.assertEqual(len(persons), 10)
+        self.assertEqual(persons[0]["properties"], {"email": f"jacob9@{random_uuid}.posthog.com"})
+        self.assertEqual(persons[0]["distinct_ids"], [f"id-{random_uuid}-9"])
@@ -0,0 +1,38 @@
+from posthog.hogql_queries.compile_benchmark import (
+    COMPILE_BENCHMARK_QUERIES,
+    RESULTS_FORMAT_VERSION,
+    TOTAL_STAGE,
+    find_regressions,
+    get_or_create_benchmark_team,
+    run_compile_benchmark,
+    to_results_file,
+)
+from posthog.test.base import BaseTest
+
+
+class TestCompileBenchmark(BaseTest):
+    def test_all_queries_compile_without_clickhouse(self):
+        team = get_or_create_benchmark_team()
+        self.assertEqual(team.pk, get_or_create_benchmark_team().pk)
+
+        results = run_compile_benchmark(team, COMPILE_BENCHMARK_QUERIES, repeat=1)
+
+        self.assertEqual(set(COMPILE_BENCHMARK_QUERIES), set(results))
+        for stages in results.values():
+            self.assertIn(TOTAL_STAGE, stages)
+            self.assertIn("./to_query", stages)
+
+    def test_find_regressions(self):
+        baseline = to_results_file({"trends": {".": 0.100, "./to_query": 0.010, "./query": 0.0001}}, repeat=5)
+
+        self.assertEqual(
+            [],
+            find_regressions(baseline, {"trends": {".": 0.110, "./to_query": 0.010, "./query": 0.001}}, 0.25),
+        )
+        self.assertEqual(
+            ["trends ./to_query: 10.00 ms -> 20.00 ms (+100%)"],
+            find_regressions(baseline, {"trends": {".": 0.110, "./to_query": 0.020}, "new": {".": 1.0}}, 0.25),
+        )
+
+        with self.assertRaises(ValueError):
+            find_regressions({"version": RESULTS_FORMAT_VERSION + 1, "results": {}}, {}, 0.25)
@@ -4,6 +4,7 @@ from freezegun import freeze_time
 
 from posthog.hogql import ast
 from posthog.hogql.ast import CompareOperationOp
+from posthog.hogql.errors import QueryError
 from posthog.hogql_queries.events_query_runner import EventsQueryRunner
 from posthog.models import Person, Team
 from posthog.models.organization import Organization
@@ -184,3 +185,80 @@ class TestEventsQueryRunner(ClickhouseTestMixin, APIBaseTest):
             response = runner.run()
             assert isinstance(response, CachedEventsQueryResponse)
             assert response.results[0][0]["properties"]["bigInt"] == float(BIG_INT)
+
+    def test_calculate_iter_matches_calculate(self):
+        self._create_events(
+            data=[
+                ("p1", "2020-01-11T12:00:01Z", {"index": 1}),
+                ("p2", "2020-01-11T12:00:02Z", {"index": 2}),
+                ("p3", "2020-01-11T12:00:03Z", {"index": 3}),
+            ]
+        )
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-11T12:01:00"):
+            query = EventsQuery(
+                after="-24h",
+                event="$pageview",
+                kind="EventsQuery",
+                orderBy=["timestamp ASC"],
+                select=["*", "person", "properties.index"],
+            )
+
+            response = EventsQueryRunner(query=query, team=self.team).calculate()
+            columns, rows = EventsQueryRunner(query=query, team=self.team).calculate_iter(chunk_size=2)
+
+            self.assertEqual(response.columns, columns)
+            self.assertEqual(response.results, list(rows))
+            self.assertEqual(["p1", "p2", "p3"], [row[1]["distinct_id"] for row in response.results])
+
+    def test_cursor_pagination(self):
+        self._create_events(
+            data=[
+                ("p1", "2020-01-11T12:00:01Z", {"index": 1}),
+                ("p2", "2020-01-11T12:00:02Z", {"index": 2}),
+                ("p3", "2020-01-11T12:00:02Z", {"index": 3}),
+                ("p4", "2020-01-11T12:00:02Z", {"index": 4}),
+                ("p5", "2020-01-11T12:00:03Z", {"index": 5}),
+            ]
+        )
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-11T12:01:00"):
+            query = EventsQuery(
+                after="-24h",
+                event="$pageview",
+                kind="EventsQuery",
+                select=["properties.index", "timestamp"],
+            )
+            all_rows = EventsQueryRunner(query=query, team=self.team).calculate().results
+
+            pages = []
+            cursor = None
+            while True:
+                response = EventsQueryRunner(
+                    query=query.model_copy(update={"limit": 2, "cursor": cursor}), team=self.team
+                ).calculate()
+                pages.append(response.results)
+                if not response.hasMore:
+                    break
+                assert response.nextCursor is not None
+                cursor = response.nextCursor
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual([row for page in pages for row in page], all_rows)
+        self.assertEqual({row[0] for row in all_rows}, {1, 2, 3, 4, 5})
+        self.assertEqual(response.nextCursor, None)
+        self.assertEqual(response.columns, ["properties.index", "timestamp"])
+        self.assertEqual(len(response.types or []), 2)
+
+    def test_cursor_pagination_needs_a_unique_sort_key(self):
+        with freeze_time("2020-01-11T12:01:00"):
+            query = EventsQuery(
+                after="-24h",
+                kind="EventsQuery",
+                select=["event", "count()"],
+                cursor="WzFd",
+            )
+            with self.assertRaises(QueryError):
+                EventsQueryRunner(query=query, team=self.team).calculate()
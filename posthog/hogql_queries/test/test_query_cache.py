@@ -0,0 +1,45 @@
+from django.test import SimpleTestCase
+
+from posthog.cache_utils import OrjsonJsonSerializer
+from posthog.hogql_queries.query_cache import (
+    CACHE_VALUE_MAGIC,
+    FLAG_COLUMNAR_RESULTS,
+    FLAG_ZSTD,
+    decode_cache_value,
+    encode_cache_value,
+)
+
+
+class TestQueryCacheEncoding(SimpleTestCase):
+    def test_reads_legacy_values(self):
+        legacy = OrjsonJsonSerializer({}).dumps({"results": [[1, "a"]], "is_cached": False})
+
+        self.assertEqual(decode_cache_value(legacy), {"results": [[1, "a"]], "is_cached": False})
+
+    def test_small_values_are_not_compressed(self):
+        response = {"results": [[1, "a"], [2, "b"]], "columns": ["count", "event"]}
+        encoded = encode_cache_value(response, compress=True)
+
+        self.assertTrue(encoded.startswith(CACHE_VALUE_MAGIC))
+        self.assertEqual(encoded[len(CACHE_VALUE_MAGIC) + 1], 0)
+        self.assertEqual(decode_cache_value(encoded), response)
+
+    def test_large_row_results_are_columnar_and_compressed(self):
+        response = {"results": [[i, "$pageview", None] for i in range(1000)], "hasMore": False}
+        encoded = encode_cache_value(response, compress=True)
+
+        flags = encoded[len(CACHE_VALUE_MAGIC) + 1]
+        self.assertEqual(flags, FLAG_ZSTD | FLAG_COLUMNAR_RESULTS)
+        self.assertLess(len(encoded), len(OrjsonJsonSerializer({}).dumps(response)) / 5)
+        self.assertEqual(decode_cache_value(encoded), response)
+
+    def test_ragged_results_are_kept_as_rows(self):
+        response = {"results": [[i] if i % 2 else [i, i] for i in range(200)]}
+        encoded = encode_cache_value(response, compress=False)
+
+        self.assertEqual(encoded[len(CACHE_VALUE_MAGIC) + 1], 0)
+        self.assertEqual(decode_cache_value(encoded), response)
+
+    def test_unknown_version_is_rejected(self):
+        with self.assertRaises(ValueError):
+            decode_cache_value(CACHE_VALUE_MAGIC + bytes([99, 0]) + b"{}")
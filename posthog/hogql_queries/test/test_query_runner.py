@@ -3,9 +3,11 @@ from typing import Any, Literal, Optional
 from unittest import mock
 from zoneinfo import ZoneInfo
 
+from django.core.cache import cache
 from freezegun import freeze_time
 from pydantic import BaseModel
 
+from posthog.hogql_queries.query_coalescer import QueryCoalescer
 from posthog.hogql_queries.query_runner import ExecutionMode, QueryRunner
 from posthog.models.team.team import Team
 from posthog.schema import (
@@ -29,6 +31,11 @@ class TestQuery(BaseModel):
 class TestQueryRunner(BaseTest):
     maxDiff = None
 
+    def setUp(self):
+        super().setUp()
+        # All tests run the same query, so results cached by one test would be returned in the next
+        cache.clear()
+
     def setup_test_query_runner_class(self):
         """Setup required methods and attributes of the abstract base class."""
 
@@ -206,6 +213,112 @@ class TestQueryRunner(BaseTest):
             self.assertEqual(response.is_cached, True)
             mock_on_commit.assert_called_once()
 
+    def test_coalesces_concurrent_calculations(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+        other_worker = QueryCoalescer(team_id=self.team.pk, cache_key=runner.get_cache_key())
+        assert other_worker.acquire()
+
+        def other_worker_finishes(*args, **kwargs):
+            TestQueryRunner(query={"some_attr": "bla"}, team=self.team).run(
+                execution_mode=ExecutionMode.CALCULATE_BLOCKING_ALWAYS
+            )
+            other_worker.release()
+            return True
+
+        with mock.patch.object(QueryCoalescer, "wait", side_effect=other_worker_finishes) as mock_wait:
+            response = runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        mock_wait.assert_called_once()
+        self.assertIsInstance(response, TestCachedBasicQueryResponse)
+        self.assertEqual(response.is_cached, True)
+
+    def test_coalescer_calculates_on_its_own_when_the_other_calculation_fails(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+        with freeze_time(datetime(2023, 2, 4, 13, 37, 42)):
+            runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        with freeze_time(datetime(2023, 2, 4, 13, 37 + 11, 42)):
+            other_worker = QueryCoalescer(team_id=self.team.pk, cache_key=runner.get_cache_key())
+            assert other_worker.acquire()
+
+            def other_worker_fails(*args, **kwargs):
+                failing_calculate = mock.patch.object(
+                    TestQueryRunner, "calculate", side_effect=ValueError("Query failed")
+                )
+                with failing_calculate, self.assertRaises(ValueError):
+                    try:
+                        TestQueryRunner(query={"some_attr": "bla"}, team=self.team).calculate()
+                    finally:
+                        other_worker.release()
+                return True
+
+            with mock.patch.object(QueryCoalescer, "wait", side_effect=other_worker_fails) as mock_wait:
+                response = runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        mock_wait.assert_called_once()
+        self.assertIsInstance(response, TestCachedBasicQueryResponse)
+        self.assertEqual(response.is_cached, False)
+        self.assertEqual(response.last_refresh.isoformat(), "2023-02-04T13:48:42+00:00")
+
+    def test_coalescer_calculates_on_its_own_after_timeout(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+        other_worker = QueryCoalescer(team_id=self.team.pk, cache_key=runner.get_cache_key())
+        assert other_worker.acquire()
+
+        self.assertFalse(QueryCoalescer(team_id=self.team.pk, cache_key=runner.get_cache_key()).wait(timeout=0.1))
+        with mock.patch.object(QueryCoalescer, "wait", return_value=False):
+            response = runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        self.assertIsInstance(response, TestCachedBasicQueryResponse)
+        self.assertEqual(response.is_cached, False)
+
+        other_worker.release()
+        self.assertTrue(QueryCoalescer(team_id=self.team.pk, cache_key=runner.get_cache_key()).wait(timeout=0.1))
+
+    def test_coalescer_release_keeps_a_lock_taken_over_by_another_worker(self):
+        first_worker = QueryCoalescer(team_id=self.team.pk, cache_key="some_cache_key")
+        assert first_worker.acquire()
+
+        # The first worker's lock expires, and another worker takes it over
+        first_worker.redis_client.delete(first_worker.lock_key)
+        other_worker = QueryCoalescer(team_id=self.team.pk, cache_key="some_cache_key")
+        assert other_worker.acquire()
+
+        first_worker.release()
+        self.assertTrue(first_worker.redis_client.exists(first_worker.lock_key))
+
+        other_worker.release()
+        self.assertFalse(first_worker.redis_client.exists(first_worker.lock_key))
+
+    def test_calculates_without_coalescing_when_redis_is_unavailable(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+
+        redis_client = mock.MagicMock()
+        redis_client.set.side_effect = ConnectionError("Redis is down")
+        with mock.patch("posthog.hogql_queries.query_coalescer.redis.get_client", return_value=redis_client):
+            response = runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        self.assertIsInstance(response, TestCachedBasicQueryResponse)
+        self.assertEqual(response.is_cached, False)
+        redis_client.eval.assert_not_called()
+
+    def test_forced_calculations_dont_use_the_clickhouse_result_cache(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+
+        runner.run(execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+        self.assertTrue(runner.use_result_cache)
+
+        runner.run(execution_mode=ExecutionMode.CALCULATE_BLOCKING_ALWAYS)
+        self.assertFalse(runner.use_result_cache)
+
     def test_modifier_passthrough(self):
         try:
             from ee.clickhouse.materialized_columns.analyze import materialize
@@ -0,0 +1,110 @@
+import pickle
+from collections.abc import Sequence
+from typing import Any, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from posthog.hogql.arrow import OBJECT_METADATA
+
+BREAKDOWN_OTHER_VALUE = "$$_posthog_breakdown_other_$$"
+
+# Vectorized versions of the transforms query runners apply to their results. They take and return `pyarrow.Table`s,
+# as returned by `execute_hogql_query_arrow`, so that big results don't need to be processed row by row in Python.
+# Columns kept as Python objects (see `posthog.hogql.arrow`) can be passed through, but not used as keys or values.
+
+
+def zero_fill(table: pa.Table, key_column: str, keys: Sequence[Any], value_columns: Sequence[str]) -> pa.Table:
+    """
+    Returns one row per key, in the order of `keys`. Keys missing from the table get zeros in `value_columns`, and nulls
+    in any other column.
+    """
+    key_type = table.schema.field(key_column).type
+    all_keys = pa.array(keys, type=key_type if key_type != pa.null() else None)
+    indices = pc.index_in(all_keys, value_set=table[key_column].combine_chunks().cast(all_keys.type))
+    filled = table.take(indices).set_column(table.schema.get_field_index(key_column), key_column, all_keys)
+    for column in value_columns:
+        filled = _replace_column(filled, column, pc.fill_null(_numeric(filled[column]), 0))
+    return filled
+
+
+def unsample(table: pa.Table, columns: Sequence[str], factor: float) -> pa.Table:
+    """Scales up values from a sampled query, as floats. Nulls stay nulls."""
+    for column in columns:
+        values = _float(table[column])
+        table = _replace_column(table, column, pc.multiply(values, float(factor)))
+    return table
+
+
+def percentage_of_total(table: pa.Table, column: str, result_column: str) -> pa.Table:
+    """Appends `result_column`, with each value of `column` as a fraction of the column's sum."""
+    # Summed as floats, as big UInt64 values would overflow as integers
+    values = _float(table[column])
+    total = pc.sum(values).as_py()
+    if not total:
+        percentages = pa.nulls(table.num_rows, type=pa.float64())
+    else:
+        percentages = pc.divide(values, total)
+    return table.append_column(result_column, percentages)
+
+
+def aggregate_other(
+    table: pa.Table,
+    breakdown_column: str,
+    value_columns: Sequence[str],
+    limit: int,
+    *,
+    other_value: Any = BREAKDOWN_OTHER_VALUE,
+) -> pa.Table:
+    """
+    Keeps the `limit` breakdown values with the highest sum of the first value column, and sums up all the other rows
+    into a single row with `other_value` as the breakdown value. Columns that aren't summed are null in that row.
+    The order of the kept rows isn't preserved, they're sorted by the first value column.
+    """
+    if table.num_rows <= limit:
+        return table
+
+    order = pc.array_sort_indices(_numeric(table[value_columns[0]]).combine_chunks(), order="descending")
+    top = table.take(order[:limit])
+    rest = table.take(order[limit:])
+
+    other_row: dict[str, list[Any]] = {name: [None] for name in table.column_names}
+    if table.schema.field(breakdown_column).metadata == OBJECT_METADATA:
+        other_row[breakdown_column] = [pickle.dumps(other_value)]
+    else:
+        other_row[breakdown_column] = [other_value]
+    for column in value_columns:
+        other_row[column] = [_sum(rest[column])]
+
+    return pa.concat_tables([top, pa.Table.from_pydict(other_row, schema=table.schema)])
+
+
+def cumulative_sum(table: pa.Table, column: str) -> pa.Table:
+    """Replaces `column` with its running total. Nulls count as zero."""
+    values = pc.fill_null(_numeric(table[column]), 0)
+    return _replace_column(table, column, pc.cumulative_sum_checked(values))
+
+
+def _sum(values: pa.ChunkedArray) -> Any:
+    values = _numeric(values)
+    if pa.types.is_integer(values.type):
+        # Arrow's sum wraps around on overflow, which big UInt64 values easily do
+        total = pc.sum(pc.cast(values, pa.decimal128(38, 0))).as_py()
+        return int(total) if total is not None else None
+    return pc.sum(values).as_py()
+
+
+def _float(values: pa.ChunkedArray) -> pa.ChunkedArray:
+    # Integers above 2^53 are rounded, the way Python does when they're divided
+    return pc.cast(_numeric(values), pa.float64(), safe=False)
+
+
+def _numeric(values: pa.ChunkedArray) -> pa.ChunkedArray:
+    # Columns with no non-null values come back untyped
+    if values.type == pa.null():
+        return pc.cast(values, pa.float64())
+    return values
+
+
+def _replace_column(table: pa.Table, column: str, values: Optional[pa.ChunkedArray | pa.Array]) -> pa.Table:
+    return table.set_column(table.schema.get_field_index(column), column, values)
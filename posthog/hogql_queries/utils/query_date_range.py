@@ -342,3 +342,19 @@ class QueryDateRangeWithIntervals(QueryDateRange):
                 ast.Constant(value=int((WeekStartDay(self._team.week_start_day or 0)).clickhouse_mode))
             )
         return ast.Call(name=trunc_func, args=trunc_func_args)
+
+
+class QueryDateRangeTail(QueryDateRange):
+    """The trailing intervals of another date range, starting with the interval that begins at `date_from`."""
+
+    def __init__(self, query_date_range: QueryDateRange, date_from: datetime) -> None:
+        super().__init__(
+            query_date_range._date_range,
+            query_date_range._team,
+            query_date_range._interval,
+            query_date_range._now_without_timezone,
+        )
+        self._tail_date_from = date_from
+
+    def date_from(self) -> datetime:
+        return self._tail_date_from
@@ -0,0 +1,98 @@
+from datetime import date
+
+import pyarrow as pa
+
+from posthog.hogql.arrow import columns_to_table, table_to_rows
+from posthog.hogql_queries.utils.arrow import (
+    BREAKDOWN_OTHER_VALUE,
+    aggregate_other,
+    cumulative_sum,
+    percentage_of_total,
+    unsample,
+    zero_fill,
+)
+from posthog.test.base import BaseTest
+
+
+class TestArrow(BaseTest):
+    def _table(self) -> pa.Table:
+        return pa.table(
+            {
+                "day": [date(2024, 1, 3), date(2024, 1, 1)],
+                "breakdown": ["b", "a"],
+                "count": [3, 1],
+            }
+        )
+
+    def test_zero_fill(self):
+        filled = zero_fill(self._table(), "day", [date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3)], ["count"])
+
+        self.assertEqual(
+            [[date(2024, 1, 1), "a", 1], [date(2024, 1, 2), None, 0], [date(2024, 1, 3), "b", 3]],
+            table_to_rows(filled),
+        )
+
+    def test_zero_fill_empty_table(self):
+        table = pa.table({"day": pa.array([], type=pa.null()), "count": pa.array([], type=pa.null())})
+
+        filled = zero_fill(table, "day", [date(2024, 1, 1)], ["count"])
+
+        self.assertEqual([[date(2024, 1, 1), 0]], table_to_rows(filled))
+
+    def test_unsample(self):
+        table = pa.table({"breakdown": ["a", "b"], "count": [3, None]})
+
+        self.assertEqual([["a", 30.0], ["b", None]], table_to_rows(unsample(table, ["count"], 10)))
+        self.assertEqual([["a", 3.0], ["b", None]], table_to_rows(unsample(table, ["count"], 1)))
+
+    def test_unsample_big_uint64(self):
+        table = columns_to_table(["count"], [[2**64 - 1]], ["UInt64"])
+
+        self.assertEqual([[float(2**64 - 1) * 2]], table_to_rows(unsample(table, ["count"], 2)))
+
+    def test_percentage_of_total(self):
+        table = percentage_of_total(self._table(), "count", "percentage")
+
+        self.assertEqual([0.75, 0.25], table["percentage"].to_pylist())
+
+    def test_percentage_of_total_big_uint64(self):
+        table = columns_to_table(["count"], [[2**63, 2**63]], ["UInt64"])
+
+        self.assertEqual([0.5, 0.5], percentage_of_total(table, "count", "percentage")["percentage"].to_pylist())
+
+    def test_percentage_of_zero_total(self):
+        table = pa.table({"count": [0, 0]})
+
+        self.assertEqual([None, None], percentage_of_total(table, "count", "percentage")["percentage"].to_pylist())
+
+    def test_aggregate_other(self):
+        table = pa.table({"breakdown": ["a", "b", "c", "d"], "count": [1, 4, 2, 3], "label": ["A", "B", "C", "D"]})
+
+        aggregated = aggregate_other(table, "breakdown", ["count"], 2)
+
+        self.assertEqual(
+            [["b", 4, "B"], ["d", 3, "D"], [BREAKDOWN_OTHER_VALUE, 3, None]],
+            table_to_rows(aggregated),
+        )
+        self.assertIs(table, aggregate_other(table, "breakdown", ["count"], 4))
+
+    def test_aggregate_other_big_uint64(self):
+        table = columns_to_table(["breakdown", "count"], [["a", "b", "c"], [2**63, 2**62, 2**62]], ["String", "UInt64"])
+
+        aggregated = aggregate_other(table, "breakdown", ["count"], 1)
+
+        self.assertEqual([["a", 2**63], [BREAKDOWN_OTHER_VALUE, 2**63]], table_to_rows(aggregated))
+
+    def test_aggregate_other_object_breakdown(self):
+        table = columns_to_table(
+            ["breakdown", "count"], [[["a"], ["b"], ["c"]], [3, 2, 1]], ["Array(String)", "UInt64"]
+        )
+
+        aggregated = aggregate_other(table, "breakdown", ["count"], 1)
+
+        self.assertEqual([[["a"], 3], [BREAKDOWN_OTHER_VALUE, 3]], table_to_rows(aggregated))
+
+    def test_cumulative_sum(self):
+        table = pa.table({"count": [1, None, 2, 3]})
+
+        self.assertEqual([1, 1, 3, 6], cumulative_sum(table, "count")["count"].to_pylist())
@@ -1,4 +1,5 @@
 from posthog.hogql import ast
+from posthog.hogql.arrow import table_to_rows
 from posthog.hogql.constants import LimitContext
 from posthog.hogql.parser import parse_select
 from posthog.hogql.property import (
@@ -7,7 +8,6 @@ from posthog.hogql.property import (
 from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
 from posthog.hogql_queries.web_analytics.web_analytics_query_runner import (
     WebAnalyticsQueryRunner,
-    map_columns,
 )
 from posthog.schema import (
     CachedWebStatsTableQueryResponse,
@@ -90,28 +90,22 @@ ORDER BY "context.columns.visitors" DESC,
 
     def calculate(self):
         query = self.to_query()
-        response = self.paginator.execute_hogql_query(
+        response = self.paginator.execute_hogql_query_arrow(
             query_type="stats_table_query",
             query=query,
             team=self.team,
             timings=self.timings,
             modifiers=self.modifiers,
         )
-        results = self.paginator.results
+        results = self.paginator.results_table
 
         assert results is not None
 
-        results_mapped = map_columns(
-            results,
-            {
-                1: self._unsample,  # views
-                2: self._unsample,  # visitors
-            },
-        )
+        results_mapped = self._unsample_table(results, [1, 2])  # views, visitors
 
         return WebStatsTableQueryResponse(
             columns=response.columns,
-            results=results_mapped,
+            results=table_to_rows(results_mapped),
             timings=response.timings,
             types=response.types,
             hogql=response.hogql,
@@ -0,0 +1,461 @@
+"""
+Populating the web analytics rollups (see `posthog/models/web_stats/sql.py`), and routing web analytics queries to
+them.
+
+The rollups are populated per team by a periodic task, with HogQL, so that the rows match what the web analytics
+queries compute from the raw events (the team's timezone, how persons are resolved, and the sessions table). Only
+settled history is rolled up: everything older than `WEB_STATS_ROLLUP_SETTLE_HOURS`, so that sessions (at most 24
+hours long) have ended and late events have arrived. The covered range of each table is kept in the cache.
+
+Queries are only routed to the rollups with the `useWebAnalyticsRollups` modifier (which teams can turn on in their
+modifiers), because the results aren't exact: events arriving after their hour was rolled up are never counted, and
+persons are resolved as they were when rolling up, so later merges don't change visitor counts. A query is routed
+only when all its filters and its breakdown map to rollup dimensions. The covered part of the date range is read from
+the rollups, using the daily table for whole days, and the rest (the most recent hours) from the raw events as before.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import IntEnum
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from posthog.clickhouse.client.connection import Workload
+from posthog.client import sync_execute
+from posthog.hogql import ast
+from posthog.hogql.hogql import HogQLContext
+from posthog.hogql.modifiers import create_default_modifiers_for_team
+from posthog.hogql.parser import parse_select
+from posthog.hogql.printer import print_ast
+from posthog.hogql.visitor import CloningVisitor
+from posthog.models import Team
+from posthog.models.web_stats.sql import WEB_STATS_DAILY_TABLE, WEB_STATS_HOURLY_TABLE, WEB_STATS_LAST_PERIOD_SQL
+
+WEB_STATS_ROLLUP_COVERAGE_KEY = "web_stats_rollup:{table_name}:team:{team_id}"
+
+
+class WebStatsRollupKind(IntEnum):
+    PAGEVIEW = 1
+    SESSION = 2
+
+
+# Rollup columns, and the fields they're populated from
+PAGEVIEW_DIMENSIONS: dict[str, list[str | int]] = {
+    "pathname": ["events", "properties", "$pathname"],
+    "browser": ["events", "properties", "$browser"],
+    "os": ["events", "properties", "$os"],
+    "device_type": ["events", "properties", "$device_type"],
+    "country_code": ["events", "properties", "$geoip_country_code"],
+}
+SESSION_DIMENSIONS: dict[str, list[str | int]] = {
+    "entry_pathname": ["session", "$entry_pathname"],
+    "referring_domain": ["session", "$entry_referring_domain"],
+    "utm_source": ["session", "$entry_utm_source"],
+    "utm_medium": ["session", "$entry_utm_medium"],
+    "utm_campaign": ["session", "$entry_utm_campaign"],
+    "utm_term": ["session", "$entry_utm_term"],
+    "utm_content": ["session", "$entry_utm_content"],
+}
+METRIC_COLUMNS = ["persons_uniq", "sessions_uniq", "pageviews", "sessions", "bounces", "total_session_duration"]
+# The rows are inserted by position, in this order. Their aliases in the queries below are only for reading them, as
+# HogQL reserves `team_id`
+INSERTED_COLUMNS = [
+    "team_id",
+    "period_start",
+    "kind",
+    *PAGEVIEW_DIMENSIONS,
+    *SESSION_DIMENSIONS,
+    *METRIC_COLUMNS,
+]
+
+# Field chains of the web analytics queries, and the rollup columns they can be read from, by row kind
+_PAGEVIEW_FIELDS: dict[tuple[str | int, ...], str] = {
+    **{tuple(chain): column for column, chain in PAGEVIEW_DIMENSIONS.items()},
+    **{tuple(chain[1:]): column for column, chain in PAGEVIEW_DIMENSIONS.items()},
+    **{tuple(chain): column for column, chain in SESSION_DIMENSIONS.items()},
+    **{("events", *chain): column for column, chain in SESSION_DIMENSIONS.items()},
+}
+_SESSION_FIELDS: dict[tuple[str | int, ...], str] = {
+    **{tuple(chain): column for column, chain in SESSION_DIMENSIONS.items()},
+    **{("events", *chain): column for column, chain in SESSION_DIMENSIONS.items()},
+}
+ROLLUP_FIELDS: dict[WebStatsRollupKind, dict[tuple[str | int, ...], str]] = {
+    WebStatsRollupKind.PAGEVIEW: _PAGEVIEW_FIELDS,
+    WebStatsRollupKind.SESSION: _SESSION_FIELDS,
+}
+
+PAGEVIEW_ROWS_SQL = """
+SELECT
+    {team_id} AS rollup_team_id,
+    period_start,
+    {kind} AS kind,
+    pathname,
+    browser,
+    os,
+    device_type,
+    country_code,
+    entry_pathname,
+    referring_domain,
+    utm_source,
+    utm_medium,
+    utm_campaign,
+    utm_term,
+    utm_content,
+    uniqState(assumeNotNull(person_id)) AS persons_uniq,
+    uniqState(assumeNotNull(session_id)) AS sessions_uniq,
+    sum(session_pageviews) AS pageviews,
+    0 AS sessions,
+    0 AS bounces,
+    0 AS total_session_duration
+FROM (
+    SELECT
+        {period_start} AS period_start,
+        events.properties.$pathname AS pathname,
+        events.properties.$browser AS browser,
+        events.properties.$os AS os,
+        events.properties.$device_type AS device_type,
+        events.properties.$geoip_country_code AS country_code,
+        session.$entry_pathname AS entry_pathname,
+        session.$entry_referring_domain AS referring_domain,
+        session.$entry_utm_source AS utm_source,
+        session.$entry_utm_medium AS utm_medium,
+        session.$entry_utm_campaign AS utm_campaign,
+        session.$entry_utm_term AS utm_term,
+        session.$entry_utm_content AS utm_content,
+        events.`$session_id` AS session_id,
+        any(events.person_id) AS person_id,
+        count() AS session_pageviews
+    FROM events
+    WHERE and(
+        events.event == '$pageview',
+        timestamp >= {date_from},
+        timestamp < {date_to}
+    )
+    GROUP BY
+        period_start,
+        pathname,
+        browser,
+        os,
+        device_type,
+        country_code,
+        entry_pathname,
+        referring_domain,
+        utm_source,
+        utm_medium,
+        utm_campaign,
+        utm_term,
+        utm_content,
+        session_id
+)
+GROUP BY
+    period_start,
+    pathname,
+    browser,
+    os,
+    device_type,
+    country_code,
+    entry_pathname,
+    referring_domain,
+    utm_source,
+    utm_medium,
+    utm_campaign,
+    utm_term,
+    utm_content
+"""
+
+# Sessions are bucketed by when they started, with all their pageviews, like in the web overview query
+SESSION_ROWS_SQL = """
+SELECT
+    {team_id} AS rollup_team_id,
+    {period_start} AS period_start,
+    {kind} AS kind,
+    NULL AS pathname,
+    NULL AS browser,
+    NULL AS os,
+    NULL AS device_type,
+    NULL AS country_code,
+    entry_pathname,
+    referring_domain,
+    utm_source,
+    utm_medium,
+    utm_campaign,
+    utm_term,
+    utm_content,
+    uniqState(assumeNotNull(person_id)) AS persons_uniq,
+    uniqState(assumeNotNull(session_id)) AS sessions_uniq,
+    sum(session_pageviews) AS pageviews,
+    count() AS sessions,
+    sum(is_bounce) AS bounces,
+    sum(session_duration) AS total_session_duration
+FROM (
+    SELECT
+        any(events.person_id) AS person_id,
+        session.session_id AS session_id,
+        min(session.$start_timestamp) AS start_timestamp,
+        any(session.$entry_pathname) AS entry_pathname,
+        any(session.$entry_referring_domain) AS referring_domain,
+        any(session.$entry_utm_source) AS utm_source,
+        any(session.$entry_utm_medium) AS utm_medium,
+        any(session.$entry_utm_campaign) AS utm_campaign,
+        any(session.$entry_utm_term) AS utm_term,
+        any(session.$entry_utm_content) AS utm_content,
+        count() AS session_pageviews,
+        any(session.$is_bounce) AS is_bounce,
+        any(session.$session_duration) AS session_duration
+    FROM events
+    WHERE and(
+        events.`$session_id` IS NOT NULL,
+        events.event == '$pageview',
+        timestamp >= {date_from},
+        timestamp < {events_to}
+    )
+    GROUP BY session_id
+    HAVING and(
+        start_timestamp >= {date_from},
+        start_timestamp < {date_to}
+    )
+)
+GROUP BY
+    period_start,
+    entry_pathname,
+    referring_domain,
+    utm_source,
+    utm_medium,
+    utm_campaign,
+    utm_term,
+    utm_content
+"""
+
+
+@dataclass(frozen=True)
+class RollupCoverage:
+    """The range of time that a rollup table has all the rows for, in the team's timezone."""
+
+    date_from: datetime
+    date_to: datetime
+
+
+@dataclass(frozen=True)
+class RollupSegment:
+    table_name: str
+    date_from: datetime
+    date_to: datetime
+
+
+def floor_hour(dt: datetime, tz: ZoneInfo) -> datetime:
+    return dt.astimezone(tz).replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(dt: datetime, tz: ZoneInfo) -> datetime:
+    return dt.astimezone(tz).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def ceil_day(dt: datetime, tz: ZoneInfo) -> datetime:
+    day = floor_day(dt, tz)
+    return day if day == dt else day + timedelta(days=1)
+
+
+def get_rollup_coverage(team_id: int, table_name: str) -> Optional[RollupCoverage]:
+    return cache.get(WEB_STATS_ROLLUP_COVERAGE_KEY.format(table_name=table_name, team_id=team_id))
+
+
+def _set_rollup_coverage(team_id: int, table_name: str, coverage: RollupCoverage) -> None:
+    cache.set(WEB_STATS_ROLLUP_COVERAGE_KEY.format(table_name=table_name, team_id=team_id), coverage, timeout=None)
+
+
+def populate_web_stats_rollups(team: Team, now: Optional[datetime] = None) -> None:
+    """Rolls up the team's settled web analytics history that isn't rolled up yet."""
+    tz = team.timezone_info
+    now = (now or timezone.now()).astimezone(tz)
+    settled_until = floor_hour(now - timedelta(hours=settings.WEB_STATS_ROLLUP_SETTLE_HOURS), tz)
+    backfill_from = floor_day(settled_until - timedelta(days=settings.WEB_STATS_ROLLUP_BACKFILL_DAYS), tz)
+
+    _populate_rollup_table(team, WEB_STATS_HOURLY_TABLE, "toStartOfHour", backfill_from, settled_until)
+    # Days are only rolled up once they're over
+    _populate_rollup_table(team, WEB_STATS_DAILY_TABLE, "toStartOfDay", backfill_from, floor_day(settled_until, tz))
+
+
+def _populate_rollup_table(
+    team: Team, table_name: str, period_function: str, backfill_from: datetime, until: datetime
+) -> None:
+    tz = team.timezone_info
+    period = timedelta(hours=1) if table_name == WEB_STATS_HOURLY_TABLE else timedelta(days=1)
+
+    coverage = get_rollup_coverage(team.pk, table_name)
+    if coverage is not None and coverage.date_to < backfill_from:
+        # Too far behind, start over from the backfill window
+        coverage = None
+    start = coverage.date_to if coverage is not None else backfill_from
+
+    # Carry on after the rows that are already there, in case the coverage wasn't saved after inserting them
+    last_periods = sync_execute(
+        WEB_STATS_LAST_PERIOD_SQL.format(table_name=table_name), {"team_id": team.pk}, team_id=team.pk
+    )
+    starts = {kind: start for kind in WebStatsRollupKind}
+    for kind, last_period in last_periods:
+        last_period_start = last_period.replace(tzinfo=ZoneInfo("UTC")).astimezone(tz) + period
+        starts[WebStatsRollupKind(kind)] = max(start, last_period_start)
+
+    if coverage is None:
+        coverage = RollupCoverage(date_from=max(starts.values()), date_to=max(starts.values()))
+
+    for kind, kind_start in starts.items():
+        # One day at a time, so that each insert stays small
+        chunk_start = kind_start
+        while chunk_start < until:
+            chunk_end = min(floor_day(chunk_start, tz) + timedelta(days=1), until)
+            _insert_rollup_rows(team, table_name, kind, period_function, chunk_start, chunk_end)
+            chunk_start = chunk_end
+
+    if until > coverage.date_to:
+        _set_rollup_coverage(team.pk, table_name, RollupCoverage(date_from=coverage.date_from, date_to=until))
+
+
+def _insert_rollup_rows(
+    team: Team,
+    table_name: str,
+    kind: WebStatsRollupKind,
+    period_function: str,
+    date_from: datetime,
+    date_to: datetime,
+) -> None:
+    if kind == WebStatsRollupKind.PAGEVIEW:
+        query = parse_select(
+            PAGEVIEW_ROWS_SQL,
+            placeholders={
+                "team_id": ast.Constant(value=team.pk),
+                "kind": ast.Constant(value=kind.value),
+                "period_start": ast.Call(name=period_function, args=[ast.Field(chain=["timestamp"])]),
+                "date_from": ast.Constant(value=date_from),
+                "date_to": ast.Constant(value=date_to),
+            },
+        )
+    else:
+        query = parse_select(
+            SESSION_ROWS_SQL,
+            placeholders={
+                "team_id": ast.Constant(value=team.pk),
+                "kind": ast.Constant(value=kind.value),
+                "period_start": ast.Call(name=period_function, args=[ast.Field(chain=["start_timestamp"])]),
+                "date_from": ast.Constant(value=date_from),
+                "date_to": ast.Constant(value=date_to),
+                # all pageviews of the sessions that started in the range
+                "events_to": ast.Constant(value=date_to + timedelta(hours=24)),
+            },
+        )
+
+    context = HogQLContext(
+        team_id=team.pk,
+        enable_select_queries=True,
+        limit_top_select=False,
+        modifiers=create_default_modifiers_for_team(team),
+    )
+    select_sql = print_ast(query, context=context, dialect="clickhouse")
+    sync_execute(
+        f"INSERT INTO {table_name} ({', '.join(INSERTED_COLUMNS)}) {select_sql}",
+        context.values,
+        team_id=team.pk,
+        workload=Workload.OFFLINE,
+    )
+
+
+class RollupNotApplicable(Exception):
+    pass
+
+
+class RollupColumnMapper(CloningVisitor):
+    """Rewrites an expression over the events and sessions to the same expression over the rollup columns."""
+
+    def __init__(self, kind: WebStatsRollupKind):
+        super().__init__()
+        self.fields = ROLLUP_FIELDS[kind]
+
+    def visit_field(self, node: ast.Field):
+        column = self.fields.get(tuple(node.chain))
+        if column is None:
+            raise RollupNotApplicable(f"Field {'.'.join(str(part) for part in node.chain)} is not rolled up")
+        return ast.Field(chain=[column])
+
+
+def map_to_rollup_columns(expr: ast.Expr, kind: WebStatsRollupKind) -> Optional[ast.Expr]:
+    """Returns the expression over the rollup columns, or None if it uses fields that aren't rolled up."""
+    try:
+        return RollupColumnMapper(kind).visit(expr)
+    except RollupNotApplicable:
+        return None
+
+
+def get_rollup_segments(
+    team: Team, date_from: datetime, date_to: datetime, breakpoints: Optional[list[datetime]] = None
+) -> Optional[tuple[list[RollupSegment], datetime]]:
+    """
+    Splits [date_from, date_to) into the segments that can be read from the rollups, and the time from which the
+    rest has to be read from the raw events. No segment spans any of the breakpoints. Returns None if the rollups
+    don't cover the start of the range.
+    """
+    tz = team.timezone_info
+    hourly = get_rollup_coverage(team.pk, WEB_STATS_HOURLY_TABLE)
+    if hourly is None:
+        return None
+    if any(floor_hour(dt, tz) != dt for dt in [date_from, *(breakpoints or [])]):
+        return None
+    if date_from < hourly.date_from:
+        return None
+    rollup_end = min(hourly.date_to, floor_hour(date_to, tz))
+    if rollup_end <= date_from:
+        return None
+
+    daily = get_rollup_coverage(team.pk, WEB_STATS_DAILY_TABLE)
+    bounds = sorted({date_from, rollup_end, *(dt for dt in breakpoints or [] if date_from < dt < rollup_end)})
+    segments: list[RollupSegment] = []
+    for segment_from, segment_to in zip(bounds, bounds[1:]):
+        segments.extend(_segments_between(segment_from, segment_to, daily, tz))
+    return segments, rollup_end
+
+
+def _segments_between(
+    date_from: datetime, date_to: datetime, daily: Optional[RollupCoverage], tz: ZoneInfo
+) -> list[RollupSegment]:
+    if daily is not None:
+        days_from = max(ceil_day(date_from, tz), ceil_day(daily.date_from, tz))
+        days_to = min(floor_day(date_to, tz), floor_day(daily.date_to, tz))
+        if days_from < days_to:
+            segments = [
+                RollupSegment(table_name=WEB_STATS_HOURLY_TABLE, date_from=date_from, date_to=days_from),
+                RollupSegment(table_name=WEB_STATS_DAILY_TABLE, date_from=days_from, date_to=days_to),
+                RollupSegment(table_name=WEB_STATS_HOURLY_TABLE, date_from=days_to, date_to=date_to),
+            ]
+            return [segment for segment in segments if segment.date_from < segment.date_to]
+    return [RollupSegment(table_name=WEB_STATS_HOURLY_TABLE, date_from=date_from, date_to=date_to)]
+
+
+def rollup_segment_select(
+    segment: RollupSegment, kind: WebStatsRollupKind, select: list[ast.Expr], where: ast.Expr
+) -> ast.SelectQuery:
+    """Selects the rows of the kind in the segment, matching the `where` over the rollup columns."""
+    return ast.SelectQuery(
+        select=select,
+        select_from=ast.JoinExpr(table=ast.Field(chain=[segment.table_name])),
+        where=ast.And(
+            exprs=[
+                ast.CompareOperation(
+                    op=ast.CompareOperationOp.Eq, left=ast.Field(chain=["kind"]), right=ast.Constant(value=kind.value)
+                ),
+                ast.CompareOperation(
+                    op=ast.CompareOperationOp.GtEq,
+                    left=ast.Field(chain=["period_start"]),
+                    right=ast.Constant(value=segment.date_from),
+                ),
+                ast.CompareOperation(
+                    op=ast.CompareOperationOp.Lt,
+                    left=ast.Field(chain=["period_start"]),
+                    right=ast.Constant(value=segment.date_to),
+                ),
+                where,
+            ]
+        ),
+    )
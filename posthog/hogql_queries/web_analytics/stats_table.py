@@ -1,6 +1,7 @@
-from typing import Union
+from typing import Optional, Union
 
 from posthog.hogql import ast
+from posthog.hogql.arrow import table_to_rows
 from posthog.hogql.constants import LimitContext
 from posthog.hogql.parser import parse_select, parse_expr
 from posthog.hogql.property import (
@@ -11,10 +12,16 @@ from posthog.hogql.property import (
     get_property_key,
 )
 from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql_queries.web_analytics.rollups import (
+    WebStatsRollupKind,
+    get_rollup_segments,
+    map_to_rollup_columns,
+    rollup_segment_select,
+)
 from posthog.hogql_queries.web_analytics.web_analytics_query_runner import (
     WebAnalyticsQueryRunner,
-    map_columns,
 )
+from posthog.models.filters.mixins.utils import cached_property
 from posthog.schema import (
     CachedWebStatsTableQueryResponse,
     WebStatsTableQuery,
@@ -40,6 +47,8 @@ class WebStatsTableQueryRunner(WebAnalyticsQueryRunner):
         )
 
     def to_query(self) -> ast.SelectQuery:
+        if self.rollup_query is not None:
+            return self.rollup_query
         if self.query.breakdownBy == WebStatsBreakdown.PAGE:
             if self.query.includeScrollDepth and self.query.includeBounceRate:
                 return self.to_path_scroll_bounce_query()
@@ -91,6 +100,103 @@ ORDER BY "context.columns.visitors" DESC,
         assert isinstance(query, ast.SelectQuery)
         return query
 
+    @cached_property
+    def rollup_query(self) -> Optional[ast.SelectQuery]:
+        if not self.modifiers.useWebAnalyticsRollups:
+            return None
+        if self.query.includeBounceRate and self.query.breakdownBy in (
+            WebStatsBreakdown.PAGE,
+            WebStatsBreakdown.INITIAL_PAGE,
+        ):
+            return None
+        if (
+            map_to_rollup_columns(self._counts_breakdown_value(), WebStatsRollupKind.PAGEVIEW) is None
+            or map_to_rollup_columns(self._all_properties(), WebStatsRollupKind.PAGEVIEW) is None
+        ):
+            return None
+
+        # The same bounds as the raw query, which compares with them to the second
+        split = get_rollup_segments(
+            self.team,
+            self.query_date_range.date_from().replace(microsecond=0),
+            self.query_date_range.date_to().replace(microsecond=0),
+        )
+        if split is None:
+            return None
+        segments, rollup_end = split
+
+        rows: list[ast.SelectQuery] = []
+        for segment in segments:
+            breakdown_value = map_to_rollup_columns(self._counts_breakdown_value(), WebStatsRollupKind.PAGEVIEW)
+            where = map_to_rollup_columns(self._all_properties(), WebStatsRollupKind.PAGEVIEW)
+            assert breakdown_value is not None and where is not None
+            rows.append(
+                rollup_segment_select(
+                    segment,
+                    WebStatsRollupKind.PAGEVIEW,
+                    [
+                        ast.Alias(alias="breakdown_value", expr=breakdown_value),
+                        ast.Field(chain=["persons_uniq"]),
+                        ast.Field(chain=["pageviews"]),
+                    ],
+                    where,
+                )
+            )
+        recent_rows = parse_select(
+            """
+SELECT
+    breakdown_value,
+    uniqState(assumeNotNull(filtered_person_id)) AS persons_uniq,
+    sum(filtered_pageview_count) AS pageviews
+FROM (
+    SELECT
+        any(person_id) AS filtered_person_id,
+        count() AS filtered_pageview_count,
+        {breakdown_value} AS breakdown_value
+    FROM events
+    WHERE and(
+        timestamp >= {date_from},
+        timestamp < {date_to},
+        events.event == '$pageview',
+        {all_properties}
+    )
+    GROUP BY events.`$session_id`, breakdown_value
+)
+GROUP BY breakdown_value
+""",
+            timings=self.timings,
+            placeholders={
+                "breakdown_value": self._counts_breakdown_value(),
+                "all_properties": self._all_properties(),
+                "date_from": ast.Constant(value=rollup_end),
+                "date_to": self._date_to(),
+            },
+        )
+        assert isinstance(recent_rows, ast.SelectQuery)
+        rows.append(recent_rows)
+
+        with self.timings.measure("stats_table_rollup_query"):
+            query = parse_select(
+                """
+SELECT
+    breakdown_value AS "context.columns.breakdown_value",
+    uniqMerge(persons_uniq) AS "context.columns.visitors",
+    sum(pageviews) AS "context.columns.views"
+FROM {rows}
+WHERE {where_breakdown}
+GROUP BY "context.columns.breakdown_value"
+ORDER BY "context.columns.visitors" DESC,
+"context.columns.breakdown_value" ASC
+""",
+                timings=self.timings,
+                placeholders={
+                    "rows": ast.SelectUnionQuery(select_queries=rows),
+                    "where_breakdown": self.where_breakdown(),
+                },
+            )
+        assert isinstance(query, ast.SelectQuery)
+        return query
+
     def _to_main_query_with_session_properties(self) -> ast.SelectQuery:
         with self.timings.measure("stats_table_query"):
             query = parse_select(
@@ -419,28 +525,22 @@ ORDER BY "context.columns.visitors" DESC,
 
     def calculate(self):
         query = self.to_query()
-        response = self.paginator.execute_hogql_query(
+        response = self.paginator.execute_hogql_query_arrow(
             query_type="stats_table_query",
             query=query,
             team=self.team,
             timings=self.timings,
             modifiers=self.modifiers,
         )
-        results = self.paginator.results
+        results = self.paginator.results_table
 
         assert results is not None
 
-        results_mapped = map_columns(
-            results,
-            {
-                1: self._unsample,  # views
-                2: self._unsample,  # visitors
-            },
-        )
+        results_mapped = self._unsample_table(results, [1, 2])  # views, visitors
 
         return WebStatsTableQueryResponse(
             columns=response.columns,
-            results=results_mapped,
+            results=table_to_rows(results_mapped),
             timings=response.timings,
             types=response.types,
             hogql=response.hogql,
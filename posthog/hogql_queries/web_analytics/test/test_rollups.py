@@ -0,0 +1,231 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from django.core.cache import cache
+from django.test import override_settings
+from freezegun import freeze_time
+
+from posthog.hogql_queries.web_analytics.rollups import (
+    WEB_STATS_ROLLUP_COVERAGE_KEY,
+    RollupCoverage,
+    RollupSegment,
+    get_rollup_segments,
+    populate_web_stats_rollups,
+)
+from posthog.hogql_queries.web_analytics.stats_table import WebStatsTableQueryRunner
+from posthog.hogql_queries.web_analytics.web_overview import WebOverviewQueryRunner
+from posthog.models.web_stats.sql import WEB_STATS_DAILY_TABLE, WEB_STATS_HOURLY_TABLE
+from posthog.schema import (
+    DateRange,
+    EventPropertyFilter,
+    HogQLQueryModifiers,
+    PersonPropertyFilter,
+    PropertyOperator,
+    SessionPropertyFilter,
+    WebOverviewQuery,
+    WebStatsBreakdown,
+    WebStatsTableQuery,
+)
+from posthog.test.base import APIBaseTest, ClickhouseTestMixin, _create_event, _create_person
+
+UTC = ZoneInfo("UTC")
+ROLLUP_MODIFIERS = HogQLQueryModifiers(useWebAnalyticsRollups=True)
+
+
+def _dt(value: str) -> datetime:
+    return datetime.fromisoformat(value).replace(tzinfo=UTC)
+
+
+@override_settings(WEB_STATS_ROLLUP_SETTLE_HOURS=25, WEB_STATS_ROLLUP_BACKFILL_DAYS=20)
+class TestWebStatsRollups(ClickhouseTestMixin, APIBaseTest):
+    def setUp(self):
+        super().setUp()
+        self._clear_rollup_coverage()
+
+    def _clear_rollup_coverage(self):
+        for table_name in [WEB_STATS_HOURLY_TABLE, WEB_STATS_DAILY_TABLE]:
+            cache.delete(WEB_STATS_ROLLUP_COVERAGE_KEY.format(table_name=table_name, team_id=self.team.pk))
+
+    def _create_pageviews(self):
+        sessions = [
+            ("p1", "s1", "/", "google", ["2024-01-08T10:00:00", "2024-01-08T10:05:00"]),
+            ("p1", "s2", "/pricing", None, ["2024-01-14T23:50:00", "2024-01-15T00:10:00"]),
+            ("p2", "s3", "/", "twitter", ["2024-01-15T09:00:00"]),
+            ("p2", "s4", "/docs", "google", ["2024-01-18T08:00:00", "2024-01-18T08:30:00", "2024-01-18T09:00:00"]),
+            ("p3", "s5", "/docs", None, ["2024-01-19T10:30:00", "2024-01-19T11:30:00"]),
+            ("p3", "s6", "/", "google", ["2024-01-20T09:00:00"]),
+        ]
+        persons: set[str] = set()
+        for distinct_id, session_id, entry_pathname, utm_source, timestamps in sessions:
+            if distinct_id not in persons:
+                persons.add(distinct_id)
+                with freeze_time(timestamps[0]):
+                    _create_person(team_id=self.team.pk, distinct_ids=[distinct_id], properties={"name": distinct_id})
+            for index, timestamp in enumerate(timestamps):
+                _create_event(
+                    team=self.team,
+                    event="$pageview",
+                    distinct_id=distinct_id,
+                    timestamp=timestamp,
+                    properties={
+                        "$session_id": session_id,
+                        "$pathname": entry_pathname if index == 0 else f"{entry_pathname}/{index}",
+                        "$browser": "Chrome" if distinct_id != "p3" else "Firefox",
+                        **({"utm_source": utm_source} if utm_source else {}),
+                    },
+                )
+
+    def _raw_and_rollup_results(self, runner_class, queries):
+        raw_results = []
+        for query in queries:
+            raw = runner_class(team=self.team, query=query)
+            assert raw.rollup_query is None
+            raw_results.append(raw.calculate().results)
+
+        populate_web_stats_rollups(self.team)
+
+        rollup_results = []
+        for query in queries:
+            routed = runner_class(team=self.team, query=query, modifiers=ROLLUP_MODIFIERS)
+            assert routed.rollup_query is not None
+            rollup_results.append(routed.calculate().results)
+        return raw_results, rollup_results
+
+    @freeze_time("2024-01-20T12:00:00Z")
+    def test_overview_from_rollups_matches_raw_events(self):
+        self._create_pageviews()
+        query = WebOverviewQuery(dateRange=DateRange(date_from="-7d"), properties=[], compare=True)
+
+        raw, routed = self._raw_and_rollup_results(WebOverviewQueryRunner, [query])
+
+        assert routed == raw
+
+    @freeze_time("2024-01-20T12:00:00Z")
+    def test_overview_with_session_filter_from_rollups_matches_raw_events(self):
+        self._create_pageviews()
+        query = WebOverviewQuery(
+            dateRange=DateRange(date_from="-7d"),
+            properties=[
+                SessionPropertyFilter(key="$entry_utm_source", value="google", operator=PropertyOperator.EXACT)
+            ],
+            compare=False,
+        )
+
+        raw, routed = self._raw_and_rollup_results(WebOverviewQueryRunner, [query])
+
+        assert routed == raw
+
+    @freeze_time("2024-01-20T12:00:00Z")
+    def test_stats_table_from_rollups_matches_raw_events(self):
+        self._create_pageviews()
+        queries = [
+            WebStatsTableQuery(
+                dateRange=DateRange(date_from="-7d"),
+                properties=[EventPropertyFilter(key="$browser", value="Chrome", operator=PropertyOperator.EXACT)],
+                breakdownBy=breakdown,
+            )
+            for breakdown in [WebStatsBreakdown.PAGE, WebStatsBreakdown.INITIAL_UTM_SOURCE, WebStatsBreakdown.BROWSER]
+        ]
+
+        raw, routed = self._raw_and_rollup_results(WebStatsTableQueryRunner, queries)
+
+        assert routed == raw
+
+    @freeze_time("2024-01-20T12:00:00Z")
+    def test_queries_with_filters_that_are_not_rolled_up_read_raw_events(self):
+        self._create_pageviews()
+        populate_web_stats_rollups(self.team)
+        properties = [PersonPropertyFilter(key="name", value="p1", operator=PropertyOperator.EXACT)]
+
+        assert (
+            WebOverviewQueryRunner(
+                team=self.team,
+                query=WebOverviewQuery(dateRange=DateRange(date_from="-7d"), properties=properties),
+                modifiers=ROLLUP_MODIFIERS,
+            ).rollup_query
+            is None
+        )
+        assert (
+            WebStatsTableQueryRunner(
+                team=self.team,
+                query=WebStatsTableQuery(
+                    dateRange=DateRange(date_from="-7d"),
+                    properties=properties,
+                    breakdownBy=WebStatsBreakdown.PAGE,
+                ),
+                modifiers=ROLLUP_MODIFIERS,
+            ).rollup_query
+            is None
+        )
+        assert (
+            WebStatsTableQueryRunner(
+                team=self.team,
+                query=WebStatsTableQuery(
+                    dateRange=DateRange(date_from="-7d"), properties=[], breakdownBy=WebStatsBreakdown.CITY
+                ),
+                modifiers=ROLLUP_MODIFIERS,
+            ).rollup_query
+            is None
+        )
+
+    @freeze_time("2024-01-20T12:00:00Z")
+    def test_queries_read_raw_events_without_the_modifier(self):
+        self._create_pageviews()
+        populate_web_stats_rollups(self.team)
+
+        assert (
+            WebOverviewQueryRunner(
+                team=self.team, query=WebOverviewQuery(dateRange=DateRange(date_from="-7d"), properties=[])
+            ).rollup_query
+            is None
+        )
+
+    @freeze_time("2024-01-20T12:00:00Z")
+    def test_populating_again_does_not_count_twice(self):
+        self._create_pageviews()
+        query = WebOverviewQuery(dateRange=DateRange(date_from="-7d"), properties=[], compare=False)
+
+        raw, _ = self._raw_and_rollup_results(WebOverviewQueryRunner, [query])
+        populate_web_stats_rollups(self.team)
+        assert (
+            WebOverviewQueryRunner(team=self.team, query=query, modifiers=ROLLUP_MODIFIERS).calculate().results
+            == raw[0]
+        )
+
+        # Without the coverage, the rows that are already there can't be trusted to be complete
+        self._clear_rollup_coverage()
+        populate_web_stats_rollups(self.team)
+        runner = WebOverviewQueryRunner(team=self.team, query=query, modifiers=ROLLUP_MODIFIERS)
+        assert runner.rollup_query is None
+        assert runner.calculate().results == raw[0]
+
+    def test_segments_use_daily_rollups_for_whole_days(self):
+        cache.set(
+            WEB_STATS_ROLLUP_COVERAGE_KEY.format(table_name=WEB_STATS_HOURLY_TABLE, team_id=self.team.pk),
+            RollupCoverage(date_from=_dt("2024-01-01T00:00:00"), date_to=_dt("2024-01-19T11:00:00")),
+        )
+        cache.set(
+            WEB_STATS_ROLLUP_COVERAGE_KEY.format(table_name=WEB_STATS_DAILY_TABLE, team_id=self.team.pk),
+            RollupCoverage(date_from=_dt("2024-01-01T00:00:00"), date_to=_dt("2024-01-19T00:00:00")),
+        )
+
+        result = get_rollup_segments(
+            self.team,
+            _dt("2024-01-10T06:00:00"),
+            _dt("2024-01-20T23:59:59"),
+            breakpoints=[_dt("2024-01-15T00:00:00")],
+        )
+        assert result is not None
+        segments, rollup_end = result
+
+        assert rollup_end == _dt("2024-01-19T11:00:00")
+        assert segments == [
+            RollupSegment(WEB_STATS_HOURLY_TABLE, _dt("2024-01-10T06:00:00"), _dt("2024-01-11T00:00:00")),
+            RollupSegment(WEB_STATS_DAILY_TABLE, _dt("2024-01-11T00:00:00"), _dt("2024-01-15T00:00:00")),
+            RollupSegment(WEB_STATS_DAILY_TABLE, _dt("2024-01-15T00:00:00"), _dt("2024-01-19T00:00:00")),
+            RollupSegment(WEB_STATS_HOURLY_TABLE, _dt("2024-01-19T00:00:00"), _dt("2024-01-19T11:00:00")),
+        ]
+
+        # Not hour aligned, or before the rollups start
+        assert get_rollup_segments(self.team, _dt("2024-01-10T06:30:00"), _dt("2024-01-20T00:00:00")) is None
+        assert get_rollup_segments(self.team, _dt("2023-12-31T00:00:00"), _dt("2024-01-20T00:00:00")) is None
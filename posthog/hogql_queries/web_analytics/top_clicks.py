@@ -53,6 +53,7 @@ LIMIT 10
             timings=self.timings,
             modifiers=self.modifiers,
             limit_context=self.limit_context,
+            cacheable=self.use_result_cache,
         )
 
         return WebTopClicksQueryResponse(
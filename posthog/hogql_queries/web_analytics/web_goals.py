@@ -126,6 +126,7 @@ FROM {inner_select}
             timings=self.timings,
             modifiers=self.modifiers,
             limit_context=self.limit_context,
+            cacheable=self.use_result_cache,
         )
         assert response.results
 
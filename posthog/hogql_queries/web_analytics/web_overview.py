@@ -8,6 +8,13 @@ from posthog.hogql.parser import parse_select
 from posthog.hogql.property import property_to_expr, get_property_type, action_to_expr
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql_queries.utils.query_date_range import QueryDateRange
+from posthog.hogql_queries.web_analytics.rollups import (
+    METRIC_COLUMNS,
+    WebStatsRollupKind,
+    get_rollup_segments,
+    map_to_rollup_columns,
+    rollup_segment_select,
+)
 from posthog.hogql_queries.web_analytics.web_analytics_query_runner import (
     WebAnalyticsQueryRunner,
 )
@@ -29,7 +36,7 @@ class WebOverviewQueryRunner(WebAnalyticsQueryRunner):
     cached_response: CachedWebOverviewQueryResponse
 
     def to_query(self) -> ast.SelectQuery | ast.SelectUnionQuery:
-        return self.outer_select
+        return self.rollup_query or self.outer_select
 
     def calculate(self):
         response = execute_hogql_query(
@@ -39,6 +46,7 @@ class WebOverviewQueryRunner(WebAnalyticsQueryRunner):
             timings=self.timings,
             modifiers=self.modifiers,
             limit_context=self.limit_context,
+            cacheable=self.use_result_cache,
         )
         assert response.results
 
@@ -168,6 +176,9 @@ class WebOverviewQueryRunner(WebAnalyticsQueryRunner):
     def inner_select(self) -> ast.SelectQuery:
         start = self.query_date_range.previous_period_date_from_as_hogql()
         mid = self.query_date_range.date_from_as_hogql()
+        return self._inner_select(start if self.query.compare else mid)
+
+    def _inner_select(self, date_range_start: ast.Expr) -> ast.SelectQuery:
         end = self.query_date_range.date_to_as_hogql()
 
         parsed_select = parse_select(
@@ -192,7 +203,7 @@ HAVING and(
 )
         """,
             placeholders={
-                "date_range_start": start if self.query.compare else mid,
+                "date_range_start": date_range_start,
                 "date_range_end": end,
                 "event_properties": self.event_properties(),
                 "session_properties": self.session_properties(),
@@ -353,6 +364,113 @@ HAVING and(
         assert isinstance(query, ast.SelectQuery)
         return query
 
+    @cached_property
+    def rollup_query(self) -> Optional[ast.SelectQuery]:
+        if not self.modifiers.useWebAnalyticsRollups:
+            return None
+        if self.query.conversionGoal or self.query.includeLCPScore:
+            return None
+        # Sessions are rolled up with all their pageviews, but this only counts the ones before the end of the range
+        if self.query_date_range.date_to() < self.query_date_range.now_with_timezone:
+            return None
+        if any(get_property_type(p) != "session" for p in self.query.properties + self._test_account_filters):
+            return None
+        where = map_to_rollup_columns(self.session_properties(), WebStatsRollupKind.SESSION)
+        if where is None:
+            return None
+
+        # The same bounds as the raw query, which compares with them to the second
+        date_from = self.query_date_range.date_from().replace(microsecond=0)
+        date_to = self.query_date_range.date_to().replace(microsecond=0)
+        previous_date_from = self.query_date_range.previous_period_date_from.replace(microsecond=0)
+        split = get_rollup_segments(
+            self.team, previous_date_from if self.query.compare else date_from, date_to, breakpoints=[date_from]
+        )
+        if split is None:
+            return None
+        segments, rollup_end = split
+
+        rows: list[ast.SelectQuery] = [
+            rollup_segment_select(
+                segment,
+                WebStatsRollupKind.SESSION,
+                [ast.Field(chain=[column]) for column in ["period_start", *METRIC_COLUMNS]],
+                where,
+            )
+            for segment in segments
+        ]
+        recent_rows = parse_select(
+            """
+SELECT
+    start_timestamp AS period_start,
+    uniqState(assumeNotNull(person_id)) AS persons_uniq,
+    uniqState(assumeNotNull(session_id)) AS sessions_uniq,
+    sum(filtered_pageview_count) AS pageviews,
+    count() AS sessions,
+    sum(is_bounce) AS bounces,
+    sum(session_duration) AS total_session_duration
+FROM {inner_select}
+GROUP BY period_start
+        """,
+            placeholders={"inner_select": self._inner_select(ast.Constant(value=rollup_end))},
+        )
+        assert isinstance(recent_rows, ast.SelectQuery)
+        rows.append(recent_rows)
+
+        def period_aggregate(function_name: str, column_name: str, current: bool) -> ast.Expr:
+            if not self.query.compare:
+                return ast.Call(name=function_name, args=[ast.Field(chain=[column_name])])
+            return ast.Call(
+                name=function_name + "If",
+                args=[
+                    ast.Field(chain=[column_name]),
+                    ast.CompareOperation(
+                        op=ast.CompareOperationOp.GtEq if current else ast.CompareOperationOp.Lt,
+                        left=ast.Field(chain=["period_start"]),
+                        right=ast.Constant(value=date_from),
+                    ),
+                ],
+            )
+
+        def period_metrics(current: bool) -> list[ast.Expr]:
+            if not current and not self.query.compare:
+                return [ast.Constant(value=None) for _ in range(5)]
+            return [
+                period_aggregate("uniqMerge", "persons_uniq", current),
+                period_aggregate("sum", "pageviews", current),
+                period_aggregate("uniqMerge", "sessions_uniq", current),
+                ast.Call(
+                    name="divide",
+                    args=[
+                        period_aggregate("sum", "total_session_duration", current),
+                        period_aggregate("sum", "sessions", current),
+                    ],
+                ),
+                ast.Call(
+                    name="divide",
+                    args=[period_aggregate("sum", "bounces", current), period_aggregate("sum", "sessions", current)],
+                ),
+            ]
+
+        aliases = [
+            ("unique_users", "previous_unique_users"),
+            ("total_filtered_pageview_count", "previous_filtered_pageview_count"),
+            ("unique_sessions", "previous_unique_sessions"),
+            ("avg_duration_s", "prev_avg_duration_s"),
+            ("bounce_rate", "prev_bounce_rate"),
+        ]
+        select: list[ast.Expr] = []
+        for (alias, previous_alias), current_expr, previous_expr in zip(
+            aliases, period_metrics(current=True), period_metrics(current=False)
+        ):
+            select.append(ast.Alias(alias=alias, expr=current_expr))
+            select.append(ast.Alias(alias=previous_alias, expr=previous_expr))
+
+        return ast.SelectQuery(
+            select=select,
+            select_from=ast.JoinExpr(table=ast.SelectUnionQuery(select_queries=rows)),
+        )
+
 
 def to_data(
     key: str,
@@ -0,0 +1,62 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posthog.hogql_queries.compile_benchmark import (
+    COMPILE_BENCHMARK_QUERIES,
+    TOTAL_STAGE,
+    find_regressions,
+    get_or_create_benchmark_team,
+    run_compile_benchmark,
+    to_results_file,
+)
+
+
+class Command(BaseCommand):
+    help = "Benchmark compiling insight and web analytics queries to ClickHouse SQL, without running them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Number of runs per query, the median is reported")
+        parser.add_argument(
+            "--query", action="append", choices=sorted(COMPILE_BENCHMARK_QUERIES), help="Only run these queries"
+        )
+        parser.add_argument("--output", help="Save the results as JSON to this file")
+        parser.add_argument("--baseline", help="Compare with the results saved in this file")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="Fail if any stage is slower than in the baseline by more than this fraction",
+        )
+        parser.add_argument("--stages", action="store_true", help="Print the time spent in each stage")
+
+    def handle(self, *args, **options):
+        queries = {
+            name: query
+            for name, query in COMPILE_BENCHMARK_QUERIES.items()
+            if not options["query"] or name in options["query"]
+        }
+        team = get_or_create_benchmark_team()
+        results = run_compile_benchmark(team, queries, repeat=options["repeat"])
+
+        for name, stages in results.items():
+            self.stdout.write(f"{name:<32} {stages[TOTAL_STAGE] * 1000:>10.2f} ms")
+            if options["stages"]:
+                for stage, seconds in stages.items():
+                    if stage != TOTAL_STAGE:
+                        self.stdout.write(f"    {stage:<60} {seconds * 1000:>10.2f} ms")
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(to_results_file(results, options["repeat"]), f, indent=2, sort_keys=True)
+
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+            regressions = find_regressions(baseline, results, options["threshold"])
+            if regressions:
+                raise CommandError(
+                    f"{len(regressions)} stages regressed by more than {options['threshold']:.0%}:\n"
+                    + "\n".join(regressions)
+                )
+            self.stdout.write(f"No stages regressed by more than {options['threshold']:.0%}")
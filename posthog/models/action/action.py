@@ -7,6 +7,7 @@ from django.dispatch.dispatcher import receiver
 from django.utils import timezone
 
 from posthog.hogql.errors import BaseHogQLError
+from posthog.hogql.schema_version import bump_team_schema_version
 from posthog.models.signals import mutable_receiver
 from posthog.plugins.plugin_server_api import drop_action_on_workers, reload_action_on_workers
 
@@ -113,3 +114,9 @@ def action_saved(sender, instance: Action, created, **kwargs):
 @mutable_receiver(post_delete, sender=Action)
 def action_deleted(sender, instance: Action, **kwargs):
     drop_action_on_workers(team_id=instance.team_id, action_id=instance.id)
+
+
+@mutable_receiver([post_save, post_delete], sender=Action)
+def invalidate_hogql_schema_on_action_change(sender, instance: Action, **kwargs):
+    # Actions are inlined into printed queries
+    bump_team_schema_version(instance.team_id)
@@ -0,0 +1,186 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from prometheus_client import Counter
+
+from posthog.models.filters import Filter
+from posthog.models.property import GroupTypeIndex
+from posthog.models.property.property import Property
+from posthog.queries.base import match_property
+
+from .feature_flag import (
+    FeatureFlag,
+    get_feature_flags_data_in_cache,
+    get_feature_flags_version,
+    get_feature_flags_version_in_cache,
+    parse_feature_flags_data,
+)
+
+COMPILED_FLAGS_MAX_TEAMS = 1000
+
+COMPILED_FLAGS_CACHE_COUNTER = Counter(
+    "flag_compiled_cache_lookups_total",
+    "Lookups in the process-local cache of compiled feature flags",
+    labelnames=["result"],
+)
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    index: int
+    properties: list[Property]
+    # The rollout percentage as a fraction of 1, compared against the flag hash
+    rollout: Optional[float]
+    variant: Optional[str]
+    match_if_entity_doesnt_exist: bool
+    # Matches the condition's properties against the given values. Returns None if some are missing.
+    match_locally: Callable[[dict[str, Any]], Optional[bool]]
+
+
+@dataclass(frozen=True)
+class CompiledFeatureFlag:
+    """A feature flag's filters, parsed once so that evaluating it doesn't need to construct any Filter objects."""
+
+    flag: FeatureFlag
+    # Sorted with variant overrides first, so that an override applies to the first matching condition
+    conditions: list[CompiledCondition]
+    aggregation_group_type_index: Optional[GroupTypeIndex]
+    has_super_conditions: bool
+    variant_lookup_table: list[dict]
+    variant_keys: frozenset[str]
+
+
+@dataclass
+class CompiledTeamFeatureFlags:
+    version: str
+    flags: list[FeatureFlag]
+    # Compiled lazily by the matcher, so that one broken flag doesn't break the others
+    compiled: dict[str, CompiledFeatureFlag] = field(default_factory=dict)
+
+
+def compile_feature_flag(feature_flag: FeatureFlag) -> CompiledFeatureFlag:
+    conditions = [compile_condition(index, condition) for index, condition in enumerate(feature_flag.conditions)]
+    variants = feature_flag.variants
+
+    # Contiguous sub-domains within [0, 1], one per variant.
+    # e.g. the first of two variants with 50% rollout percentage will have value_max: 0.5
+    # and the second will have value_min: 0.5 and value_max: 1.0
+    lookup_table = []
+    value_min = 0
+    for variant in variants:
+        value_max = value_min + variant["rollout_percentage"] / 100
+        lookup_table.append({"value_min": value_min, "value_max": value_max, "key": variant["key"]})
+        value_min = value_max
+
+    return CompiledFeatureFlag(
+        flag=feature_flag,
+        conditions=sorted(conditions, key=lambda condition: 0 if condition.variant else 1),
+        aggregation_group_type_index=feature_flag.aggregation_group_type_index,
+        has_super_conditions=bool(feature_flag.filters.get("super_groups", None)),
+        variant_lookup_table=lookup_table,
+        variant_keys=frozenset(variant["key"] for variant in variants),
+    )
+
+
+def compile_condition(index: int, condition: dict) -> CompiledCondition:
+    properties = Filter(data=condition).property_groups.flat if condition.get("properties", []) else []
+    rollout_percentage = condition.get("rollout_percentage")
+    return CompiledCondition(
+        index=index,
+        properties=properties,
+        rollout=rollout_percentage / 100 if rollout_percentage is not None else None,
+        variant=condition.get("variant"),
+        match_if_entity_doesnt_exist=check_pure_is_not_operator_condition(condition),
+        match_locally=_compile_local_match(properties),
+    )
+
+
+def _compile_local_match(properties: list[Property]) -> Callable[[dict[str, Any]], Optional[bool]]:
+    # Cohorts always need to be fetched
+    if any(property.type == "cohort" for property in properties):
+        return lambda values: None
+
+    keys = [property.key for property in properties]
+
+    def match_locally(values: dict[str, Any]) -> Optional[bool]:
+        for key in keys:
+            if key not in values:
+                return None
+        return all(match_property(property, values) for property in properties)
+
+    return match_locally
+
+
+def check_pure_is_not_operator_condition(condition: dict) -> bool:
+    properties = condition.get("properties", [])
+    if properties and all(prop.get("operator") in ("is_not_set", "is_not") for prop in properties):
+        return True
+    return False
+
+
+class CompiledFeatureFlagsCache:
+    """Process-local LRU of each team's compiled flags, by the version of the team's flags in the shared cache."""
+
+    def __init__(self, max_teams: int = COMPILED_FLAGS_MAX_TEAMS):
+        self.max_teams = max_teams
+        self._entries: OrderedDict[int, CompiledTeamFeatureFlags] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, team_id: int) -> Optional[CompiledTeamFeatureFlags]:
+        with self._lock:
+            entry = self._entries.get(team_id)
+            if entry is not None:
+                self._entries.move_to_end(team_id)
+            return entry
+
+    def set(self, team_id: int, entry: CompiledTeamFeatureFlags) -> None:
+        with self._lock:
+            self._entries[team_id] = entry
+            self._entries.move_to_end(team_id)
+            while len(self._entries) > self.max_teams:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+compiled_flags_cache = CompiledFeatureFlagsCache()
+
+
+def get_compiled_feature_flags_for_team(team_id: int) -> Optional[CompiledTeamFeatureFlags]:
+    """
+    Returns the team's flags from the shared cache, reusing this process' compiled flags as long as the version
+    stamp in the shared cache hasn't changed. Returns None if the flags aren't cached.
+
+    The returned flags are shared between requests and must not be modified.
+    """
+    entry = compiled_flags_cache.get(team_id)
+    if entry is not None and entry.version == get_feature_flags_version_in_cache(team_id):
+        COMPILED_FLAGS_CACHE_COUNTER.labels(result="hit").inc()
+        return entry
+
+    flag_data = get_feature_flags_data_in_cache(team_id)
+    if flag_data is None:
+        COMPILED_FLAGS_CACHE_COUNTER.labels(result="miss").inc()
+        return None
+
+    # The version is computed from the data itself, so it's right even if the flags changed since the stamp was read
+    version = get_feature_flags_version(flag_data)
+    if entry is not None and entry.version == version:
+        # The stamp was missing, but the flags didn't change
+        COMPILED_FLAGS_CACHE_COUNTER.labels(result="hit").inc()
+        return entry
+
+    flags = parse_feature_flags_data(flag_data)
+    if flags is None:
+        COMPILED_FLAGS_CACHE_COUNTER.labels(result="miss").inc()
+        return None
+
+    COMPILED_FLAGS_CACHE_COUNTER.labels(result="stale" if entry is not None else "miss").inc()
+    entry = CompiledTeamFeatureFlags(version=version, flags=flags)
+    compiled_flags_cache.set(team_id, entry)
+    return entry
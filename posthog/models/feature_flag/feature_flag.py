@@ -1,3 +1,4 @@
+import hashlib
 import json
 from django.http import HttpRequest
 import structlog
@@ -409,9 +410,17 @@ def set_feature_flags_for_team_in_cache(
         )
 
     serialized_flags = MinimalFeatureFlagSerializer(all_feature_flags, many=True).data
+    flag_data = json.dumps(serialized_flags)
 
     try:
-        cache.set(f"team_feature_flags_{team_id}", json.dumps(serialized_flags), FIVE_DAYS)
+        cache.set_many(
+            {
+                feature_flags_cache_key(team_id): flag_data,
+                # Lets workers check whether their compiled flags are stale without fetching all the flags
+                feature_flags_version_cache_key(team_id): get_feature_flags_version(flag_data),
+            },
+            FIVE_DAYS,
+        )
     except Exception:
         # redis is unavailable
         logger.exception("Redis is unavailable")
@@ -421,23 +430,51 @@ def set_feature_flags_for_team_in_cache(
 
 
 def get_feature_flags_for_team_in_cache(team_id: int) -> Optional[list[FeatureFlag]]:
+    flag_data = get_feature_flags_data_in_cache(team_id)
+    if flag_data is not None:
+        return parse_feature_flags_data(flag_data)
+
+    return None
+
+
+def feature_flags_cache_key(team_id: int) -> str:
+    return f"team_feature_flags_{team_id}"
+
+
+def feature_flags_version_cache_key(team_id: int) -> str:
+    return f"team_feature_flags_version_{team_id}"
+
+
+def get_feature_flags_version(flag_data: str) -> str:
+    return hashlib.sha1(flag_data.encode("utf-8")).hexdigest()
+
+
+def get_feature_flags_version_in_cache(team_id: int) -> Optional[str]:
     try:
-        flag_data = cache.get(f"team_feature_flags_{team_id}")
+        return cache.get(feature_flags_version_cache_key(team_id))
     except Exception:
         # redis is unavailable
         logger.exception("Redis is unavailable")
         return None
 
-    if flag_data is not None:
-        try:
-            parsed_data = json.loads(flag_data)
-            return [FeatureFlag(**flag) for flag in parsed_data]
-        except Exception as e:
-            logger.exception("Error parsing flags from cache")
-            capture_exception(e)
-            return None
 
-    return None
+def get_feature_flags_data_in_cache(team_id: int) -> Optional[str]:
+    try:
+        return cache.get(feature_flags_cache_key(team_id))
+    except Exception:
+        # redis is unavailable
+        logger.exception("Redis is unavailable")
+        return None
+
+
+def parse_feature_flags_data(flag_data: str) -> Optional[list[FeatureFlag]]:
+    try:
+        parsed_data = json.loads(flag_data)
+        return [FeatureFlag(**flag) for flag in parsed_data]
+    except Exception as e:
+        logger.exception("Error parsing flags from cache")
+        capture_exception(e)
+        return None
 
 
 class FeatureFlagDashboards(models.Model):
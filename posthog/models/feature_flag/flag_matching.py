@@ -1,5 +1,6 @@
 import hashlib
-from dataclasses import dataclass
+import json
+from dataclasses import dataclass, field
 from enum import StrEnum
 import time
 import structlog
@@ -24,17 +25,24 @@ from posthog.models.property import GroupTypeIndex, GroupTypeName
 from posthog.models.property.property import Property
 from posthog.models.cohort import Cohort, CohortOrEmpty
 from posthog.models.utils import execute_with_timeout
-from posthog.queries.base import match_property, properties_to_Q, sanitize_property_key
+from posthog.queries.base import properties_to_Q, sanitize_property_key
 from posthog.database_healthcheck import (
     postgres_healthcheck,
     DATABASE_FOR_FLAG_MATCHING,
 )
 from posthog.utils import label_for_team_id_to_track
 
+from .compiled_flags import (
+    CompiledCondition,
+    CompiledFeatureFlag,
+    check_pure_is_not_operator_condition,
+    compile_condition,
+    compile_feature_flag,
+    get_compiled_feature_flags_for_team,
+)
 from .feature_flag import (
     FeatureFlag,
     FeatureFlagHashKeyOverride,
-    get_feature_flags_for_team_in_cache,
     set_feature_flags_for_team_in_cache,
 )
 
@@ -43,6 +51,7 @@ logger = structlog.get_logger(__name__)
 __LONG_SCALE__ = float(0xFFFFFFFFFFFFFFF)
 
 FLAG_MATCHING_QUERY_TIMEOUT_MS = 300  # 300 ms. Any longer and we'll just error out.
+MAX_BULK_EVALUATION_TARGETS = 1000
 
 FLAG_EVALUATION_ERROR_COUNTER = Counter(
     "flag_evaluation_error_total",
@@ -95,6 +104,14 @@ class FeatureFlagMatchReason(StrEnum):
         raise NotImplementedError(f"Cannot compare {self.__class__} and {other.__class__}")
 
 
+@dataclass(frozen=True)
+class FlagEvaluationTarget:
+    distinct_id: str
+    groups: dict[GroupTypeName, str] = field(default_factory=dict)
+    person_properties: dict[str, Union[str, int]] = field(default_factory=dict)
+    group_properties: dict[str, dict[str, Union[str, int]]] = field(default_factory=dict)
+
+
 @dataclass(frozen=True)
 class FeatureFlagMatch:
     match: bool = False
@@ -142,6 +159,7 @@ class FeatureFlagMatcher:
         group_property_value_overrides: Optional[dict[str, dict[str, Union[str, int]]]] = None,
         skip_database_flags: bool = False,
         cohorts_cache: Optional[dict[int, CohortOrEmpty]] = None,
+        compiled_flags: Optional[dict[str, CompiledFeatureFlag]] = None,
     ):
         if group_property_value_overrides is None:
             group_property_value_overrides = {}
@@ -165,16 +183,26 @@ class FeatureFlagMatcher:
         else:
             self.cohorts_cache = cohorts_cache
 
+        # Flags compiled by earlier requests, by key. Filled in as flags are evaluated.
+        self.compiled_flags = compiled_flags if compiled_flags is not None else {}
+
+    def compiled(self, feature_flag: FeatureFlag) -> CompiledFeatureFlag:
+        compiled_flag = self.compiled_flags.get(feature_flag.key)
+        if compiled_flag is None or compiled_flag.flag is not feature_flag:
+            compiled_flag = self.compiled_flags[feature_flag.key] = compile_feature_flag(feature_flag)
+        return compiled_flag
+
     def get_match(self, feature_flag: FeatureFlag) -> FeatureFlagMatch:
         # If aggregating flag by groups and relevant group type is not passed - flag is off!
         if self.hashed_identifier(feature_flag) is None:
             return FeatureFlagMatch(match=False, reason=FeatureFlagMatchReason.NO_GROUP_TYPE)
 
+        compiled_flag = self.compiled(feature_flag)
         highest_priority_evaluation_reason = FeatureFlagMatchReason.NO_CONDITION_MATCH
         highest_priority_index = 0
 
         # Match for boolean super condition first
-        if feature_flag.filters.get("super_groups", None):
+        if compiled_flag.has_super_conditions:
             (
                 is_match,
                 super_condition_value,
@@ -189,18 +217,16 @@ class FeatureFlagMatcher:
                     payload=payload,
                 )
 
-        # Stable sort conditions with variant overrides to the top. This ensures that if overrides are present, they are
+        # Conditions with variant overrides are sorted to the top. This ensures that if overrides are present, they are
         # evaluated first, and the variant override is applied to the first matching condition.
-        # :TRICKY: We need to include the enumeration index before the sort so the flag evaluation reason gets the right condition index.
-        sorted_flag_conditions = sorted(
-            enumerate(feature_flag.conditions),
-            key=lambda condition_tuple: 0 if condition_tuple[1].get("variant") else 1,
-        )
-        for index, condition in sorted_flag_conditions:
-            is_match, evaluation_reason = self.is_condition_match(feature_flag, condition, index)
+        # :TRICKY: Each condition keeps its original index, so the flag evaluation reason gets the right condition index.
+        for condition in compiled_flag.conditions:
+            index = condition.index
+            is_match, evaluation_reason = self.is_compiled_condition_match(compiled_flag, condition)
             if is_match:
-                variant_override = condition.get("variant")
-                if variant_override in [variant["key"] for variant in feature_flag.variants]:
+                variant_override = condition.variant
+                variant: Optional[str]
+                if variant_override in compiled_flag.variant_keys:
                     variant = variant_override
                 else:
                     variant = self.get_matching_variant(feature_flag)
@@ -268,11 +294,12 @@ class FeatureFlagMatcher:
         )
 
     def get_matching_variant(self, feature_flag: FeatureFlag) -> Optional[str]:
-        for variant in self.variant_lookup_table(feature_flag):
-            if (
-                self.get_hash(feature_flag, salt="variant") >= variant["value_min"]
-                and self.get_hash(feature_flag, salt="variant") < variant["value_max"]
-            ):
+        lookup_table = self.variant_lookup_table(feature_flag)
+        if not lookup_table:
+            return None
+        variant_hash = self.get_hash(feature_flag, salt="variant")
+        for variant in lookup_table:
+            if variant_hash >= variant["value_min"] and variant_hash < variant["value_max"]:
                 return variant["key"]
         return None
 
@@ -322,35 +349,39 @@ class FeatureFlagMatcher:
     def is_condition_match(
         self, feature_flag: FeatureFlag, condition: dict, condition_index: int
     ) -> tuple[bool, FeatureFlagMatchReason]:
-        rollout_percentage = condition.get("rollout_percentage")
-        if len(condition.get("properties", [])) > 0:
-            properties = Filter(data=condition).property_groups.flat
-            if self.can_compute_locally(properties, feature_flag.aggregation_group_type_index):
-                # :TRICKY: If overrides are enough to determine if a condition is a match,
-                # we can skip checking the query.
-                # This ensures match even if the person hasn't been ingested yet.
-                target_properties = self.property_value_overrides
-                if feature_flag.aggregation_group_type_index is not None:
-                    target_properties = self.group_property_value_overrides.get(
-                        self.cache.group_type_index_to_name[feature_flag.aggregation_group_type_index],
-                        {},
-                    )
-                condition_match = all(match_property(property, target_properties) for property in properties)
-            else:
-                match_if_entity_doesnt_exist = check_pure_is_not_operator_condition(condition)
+        compiled_flag = self.compiled(feature_flag)
+        compiled_condition = compile_condition(condition_index, condition)
+        return self.is_compiled_condition_match(compiled_flag, compiled_condition)
+
+    def is_compiled_condition_match(
+        self, compiled_flag: CompiledFeatureFlag, condition: CompiledCondition
+    ) -> tuple[bool, FeatureFlagMatchReason]:
+        feature_flag = compiled_flag.flag
+        group_type_index = compiled_flag.aggregation_group_type_index
+        if condition.properties:
+            # :TRICKY: If overrides are enough to determine if a condition is a match,
+            # we can skip checking the query.
+            # This ensures match even if the person hasn't been ingested yet.
+            target_properties = self.property_value_overrides
+            if group_type_index is not None:
+                target_properties = self.group_property_value_overrides.get(
+                    self.cache.group_type_index_to_name[group_type_index], {}
+                )
+            condition_match = condition.match_locally(target_properties)
+            if condition_match is None:
                 condition_match = self._condition_matches(
                     feature_flag,
-                    condition_index,
-                    match_if_entity_doesnt_exist,
-                    feature_flag.aggregation_group_type_index,
+                    condition.index,
+                    condition.match_if_entity_doesnt_exist,
+                    group_type_index,
                 )
 
             if not condition_match:
                 return False, FeatureFlagMatchReason.NO_CONDITION_MATCH
-            elif rollout_percentage is None:
+            elif condition.rollout is None:
                 return True, FeatureFlagMatchReason.CONDITION_MATCH
 
-        if rollout_percentage is not None and self.get_hash(feature_flag) > (rollout_percentage / 100):
+        if condition.rollout is not None and self.get_hash(feature_flag) > condition.rollout:
             return False, FeatureFlagMatchReason.OUT_OF_ROLLOUT_BOUND
 
         return True, FeatureFlagMatchReason.CONDITION_MATCH
@@ -391,25 +422,17 @@ class FeatureFlagMatcher:
 
         return self.query_conditions.get(key, False)
 
-    # Define contiguous sub-domains within [0, 1].
+    # Contiguous sub-domains within [0, 1].
     # By looking up a random hash value, you can find the associated variant key.
-    # e.g. the first of two variants with 50% rollout percentage will have value_max: 0.5
-    # and the second will have value_min: 0.5 and value_max: 1.0
     def variant_lookup_table(self, feature_flag: FeatureFlag):
-        lookup_table = []
-        value_min = 0
-        for variant in feature_flag.variants:
-            value_max = value_min + variant["rollout_percentage"] / 100
-            lookup_table.append({"value_min": value_min, "value_max": value_max, "key": variant["key"]})
-            value_min = value_max
-        return lookup_table
+        return self.compiled(feature_flag).variant_lookup_table
 
     @cached_property
     def query_conditions(self) -> dict[str, bool]:
         try:
             # Some extra wiggle room here for timeouts because this depends on the number of flags as well,
             # and not just the database query.
-            with execute_with_timeout(FLAG_MATCHING_QUERY_TIMEOUT_MS * 2, DATABASE_FOR_FLAG_MATCHING):
+            with execute_with_timeout(FLAG_MATCHING_QUERY_TIMEOUT_MS * 2, DATABASE_FOR_FLAG_MATCHING) as cursor:
                 all_conditions: dict = {}
                 team_id = self.feature_flags[0].team_id
                 person_query: QuerySet = Person.objects.db_manager(DATABASE_FOR_FLAG_MATCHING).filter(
@@ -435,20 +458,6 @@ class FeatureFlagMatcher:
 
                 person_fields: list[str] = []
 
-                for existence_condition_key in self.has_pure_is_not_conditions:
-                    if existence_condition_key == PERSON_KEY:
-                        person_exists = person_query.exists()
-                        all_conditions[f"{ENTITY_EXISTS_PREFIX}{PERSON_KEY}"] = person_exists
-                    else:
-                        if existence_condition_key not in group_query_per_group_type_mapping:
-                            continue
-
-                        group_query, _ = group_query_per_group_type_mapping[
-                            cast(GroupTypeIndex, existence_condition_key)
-                        ]
-                        group_exists = group_query.exists()
-                        all_conditions[f"{ENTITY_EXISTS_PREFIX}{existence_condition_key}"] = group_exists
-
                 def condition_eval(key, condition):
                     team_id = self.feature_flags[0].team_id
                     expr = None
@@ -576,21 +585,35 @@ class FeatureFlagMatcher:
                             key = f"flag_{feature_flag.pk}_condition_{index}"
                             condition_eval(key, condition)
 
-                if len(person_fields) > 0:
-                    person_query = person_query.values(*person_fields)
-                    if len(person_query) > 0:
-                        all_conditions = {**all_conditions, **person_query[0]}
-
-                for (
+                # Fetch the person and all the groups in one round trip. Whether an entity exists, as needed for pure
+                # is not conditions, is whether its row is returned.
+                entity_queries: list[tuple[str | GroupTypeIndex, QuerySet, list[str]]] = []
+                if len(person_fields) > 0 or PERSON_KEY in self.has_pure_is_not_conditions:
+                    entity_queries.append((PERSON_KEY, person_query, person_fields))
+                for group_type_index, (
                     group_query,
                     group_fields,
-                ) in group_query_per_group_type_mapping.values():
-                    # Only query the group if there's a field to query
-                    if len(group_fields) > 0:
-                        group_query = group_query.values(*group_fields)
-                        if len(group_query) > 0:
-                            assert len(group_query) == 1, f"Expected 1 group query result, got {len(group_query)}"
-                            all_conditions = {**all_conditions, **group_query[0]}
+                ) in group_query_per_group_type_mapping.items():
+                    # Only query the group if there's a field to query, or we need to know whether it exists
+                    if len(group_fields) > 0 or group_type_index in self.has_pure_is_not_conditions:
+                        entity_queries.append((group_type_index, group_query, group_fields))
+
+                if entity_queries:
+                    entity_rows = fetch_rows_in_one_query(
+                        cursor,
+                        [
+                            (str(entity), (query.values(*fields) if fields else query.values("pk"))[:2])
+                            for entity, query, fields in entity_queries
+                        ],
+                    )
+                    for entity, _, fields in entity_queries:
+                        rows = entity_rows.get(str(entity), [])
+                        if entity != PERSON_KEY:
+                            assert len(rows) <= 1, f"Expected 1 group query result, got {len(rows)}"
+                        if entity in self.has_pure_is_not_conditions:
+                            all_conditions[f"{ENTITY_EXISTS_PREFIX}{entity}"] = len(rows) > 0
+                        if len(rows) > 0:
+                            all_conditions.update({field: rows[0][field] for field in fields})
                 return all_conditions
         except DatabaseError:
             self.failed_to_fetch_conditions = True
@@ -631,25 +654,6 @@ class FeatureFlagMatcher:
         hash_val = int(hashlib.sha1(hash_key.encode("utf-8")).hexdigest()[:15], 16)
         return hash_val / __LONG_SCALE__
 
-    def can_compute_locally(
-        self,
-        properties: list[Property],
-        group_type_index: Optional[GroupTypeIndex] = None,
-    ) -> bool:
-        target_properties = self.property_value_overrides
-        if group_type_index is not None:
-            target_properties = self.group_property_value_overrides.get(
-                self.cache.group_type_index_to_name[group_type_index], {}
-            )
-        for property in properties:
-            # can't locally compute if property is a cohort
-            # need to atleast fetch the cohort
-            if property.type == "cohort":
-                return False
-            if property.key not in target_properties:
-                return False
-        return True
-
     def get_highest_priority_match_evaluation(
         self,
         current_match: FeatureFlagMatchReason,
@@ -720,6 +724,7 @@ def _get_all_feature_flags(
     property_value_overrides: Optional[dict[str, Union[str, int]]] = None,
     group_property_value_overrides: Optional[dict[str, dict[str, Union[str, int]]]] = None,
     skip_database_flags: bool = False,
+    compiled_flags: Optional[dict[str, CompiledFeatureFlag]] = None,
 ) -> tuple[dict[str, Union[str, bool]], dict[str, dict], dict[str, object], bool]:
     if group_property_value_overrides is None:
         group_property_value_overrides = {}
@@ -739,6 +744,7 @@ def _get_all_feature_flags(
             property_value_overrides,
             group_property_value_overrides,
             skip_database_flags,
+            compiled_flags=compiled_flags,
         ).get_matches()
 
     return {}, {}, {}, False
@@ -762,9 +768,14 @@ def get_all_feature_flags(
     property_value_overrides, group_property_value_overrides = add_local_person_and_group_properties(
         distinct_id, groups, property_value_overrides, group_property_value_overrides
     )
-    all_feature_flags = get_feature_flags_for_team_in_cache(team_id)
+    # Flags compiled by this process for earlier requests are reused until the team's flags change
+    compiled_team_flags = get_compiled_feature_flags_for_team(team_id)
+    compiled_flags: Optional[dict[str, CompiledFeatureFlag]] = None
     cache_hit = True
-    if all_feature_flags is None:
+    if compiled_team_flags is not None:
+        all_feature_flags = compiled_team_flags.flags
+        compiled_flags = compiled_team_flags.compiled
+    else:
         cache_hit = False
         all_feature_flags = set_feature_flags_for_team_in_cache(team_id)
 
@@ -786,6 +797,7 @@ def get_all_feature_flags(
                 property_value_overrides=property_value_overrides,
                 group_property_value_overrides=group_property_value_overrides,
                 skip_database_flags=not is_database_alive,
+                compiled_flags=compiled_flags,
             )
 
     with start_span(op="with_experience_continuity_write_path"):
@@ -890,6 +902,7 @@ def get_all_feature_flags(
                 property_value_overrides=property_value_overrides,
                 group_property_value_overrides=group_property_value_overrides,
                 skip_database_flags=True,
+                compiled_flags=compiled_flags,
             )
 
     return _get_all_feature_flags(
@@ -900,9 +913,89 @@ def get_all_feature_flags(
         groups=groups,
         property_value_overrides=property_value_overrides,
         group_property_value_overrides=group_property_value_overrides,
+        compiled_flags=compiled_flags,
     )
 
 
+# Return flags for each of many distinct IDs, e.g. for server side SDKs evaluating flags for all their users
+def get_all_feature_flags_for_targets(
+    team_id: int,
+    targets: list[FlagEvaluationTarget],
+) -> list[tuple[dict[str, Union[str, bool]], dict[str, dict], dict[str, object], bool]]:
+    """
+    Like `get_all_feature_flags` for each target, but loads the persons of all targets (and their hash key overrides)
+    with one query each, and shares the compiled flags, group type mappings and cohorts between all of them.
+
+    The stored person properties are used as property overrides, so conditions on properties the person has are
+    matched without going to the database. Properties passed in with a target take precedence.
+    """
+    compiled_team_flags = get_compiled_feature_flags_for_team(team_id)
+    compiled_flags: Optional[dict[str, CompiledFeatureFlag]] = None
+    if compiled_team_flags is not None:
+        all_feature_flags = compiled_team_flags.flags
+        compiled_flags = compiled_team_flags.compiled
+    else:
+        all_feature_flags = set_feature_flags_for_team_in_cache(team_id)
+    FLAG_CACHE_HIT_COUNTER.labels(
+        team_id=label_for_team_id_to_track(team_id), cache_hit=compiled_team_flags is not None
+    ).inc()
+
+    if not all_feature_flags:
+        return [({}, {}, {}, False) for _ in targets]
+
+    is_database_alive = (not settings.DECIDE_SKIP_POSTGRES_FLAGS) and postgres_healthcheck.is_connected()
+    persons: dict[str, tuple[int, dict]] = {}
+    hash_key_overrides: dict[int, dict[str, str]] = {}
+    if is_database_alive:
+        try:
+            with execute_with_timeout(FLAG_MATCHING_QUERY_TIMEOUT_MS, DATABASE_FOR_FLAG_MATCHING):
+                persons = {
+                    distinct_id: (person_id, properties or {})
+                    for distinct_id, person_id, properties in PersonDistinctId.objects.db_manager(
+                        DATABASE_FOR_FLAG_MATCHING
+                    )
+                    .filter(team_id=team_id, distinct_id__in=[target.distinct_id for target in targets])
+                    .values_list("distinct_id", "person_id", "person__properties")
+                }
+                if persons and any(feature_flag.ensure_experience_continuity for feature_flag in all_feature_flags):
+                    for feature_flag_key, hash_key, override_person_id in (
+                        FeatureFlagHashKeyOverride.objects.db_manager(DATABASE_FOR_FLAG_MATCHING)
+                        .filter(team_id=team_id, person_id__in={person_id for person_id, _ in persons.values()})
+                        .values_list("feature_flag_key", "hash_key", "person_id")
+                    ):
+                        hash_key_overrides.setdefault(override_person_id, {})[feature_flag_key] = hash_key
+        except Exception as e:
+            handle_feature_flag_exception(e, "[Feature Flags] Error loading persons for bulk flag evaluation")
+            is_database_alive = False
+
+    cache = FlagsMatcherCache(team_id)
+    cohorts_cache: dict[int, CohortOrEmpty] = {}
+    results = []
+    for target in targets:
+        person_id, stored_properties = persons.get(target.distinct_id, (None, {}))
+        property_value_overrides, group_property_value_overrides = add_local_person_and_group_properties(
+            target.distinct_id,
+            target.groups,
+            {**stored_properties, **target.person_properties},
+            target.group_properties,
+        )
+        results.append(
+            FeatureFlagMatcher(
+                all_feature_flags,
+                target.distinct_id,
+                target.groups,
+                cache,
+                hash_key_overrides.get(person_id, {}) if person_id is not None else {},
+                property_value_overrides,
+                group_property_value_overrides,
+                skip_database_flags=not is_database_alive,
+                cohorts_cache=cohorts_cache,
+                compiled_flags=compiled_flags,
+            ).get_matches()
+        )
+    return results
+
+
 def set_feature_flag_hash_key_overrides(team_id: int, distinct_ids: list[str], hash_key_override: str) -> bool:
     # As a product decision, the first override wins, i.e consistency matters for the first walkthrough.
     # Thus, we don't need to do upserts here.
@@ -1002,6 +1095,25 @@ def parse_exception_for_error_message(err: Exception):
     return reason
 
 
+def fetch_rows_in_one_query(cursor, queries: list[tuple[str, QuerySet]]) -> dict[str, list[dict]]:
+    """
+    Runs the querysets as a single statement, with UNION ALL. Returns the rows of each queryset as dicts of its values,
+    by the key the queryset was passed with.
+    """
+    statements: list[str] = []
+    params: list = []
+    for key, queryset in queries:
+        sql, queryset_params = queryset.query.get_compiler(using=queryset.db).as_sql()
+        statements.append(f"SELECT %s::text, row_to_json(entity_row) FROM ({sql}) AS entity_row")
+        params.extend([key, *queryset_params])
+    cursor.execute(" UNION ALL ".join(statements), params)
+
+    rows: dict[str, list[dict]] = {}
+    for key, row in cursor.fetchall():
+        rows.setdefault(key, []).append(json.loads(row) if isinstance(row, str) else row)
+    return rows
+
+
 def key_and_field_for_property(property: Property) -> tuple[str, str]:
     column = "group_properties" if property.type == "group" else "properties"
     key = property.key
@@ -1054,13 +1166,6 @@ def add_local_person_and_group_properties(distinct_id, groups, person_properties
     return all_person_properties, all_group_properties
 
 
-def check_pure_is_not_operator_condition(condition: dict) -> bool:
-    properties = condition.get("properties", [])
-    if properties and all(prop.get("operator") in ("is_not_set", "is_not") for prop in properties):
-        return True
-    return False
-
-
 def check_flag_evaluation_query_is_ok(feature_flag: FeatureFlag, team_id: int) -> bool:
     # TRICKY: There are some cases where the regex is valid re2 syntax, but postgresql doesn't like it.
     # This function tries to validate such cases. See `test_cant_create_flag_with_data_that_fails_to_query` for an example.
@@ -1,4 +1,8 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+
+from posthog.hogql.schema_version import bump_team_schema_version
+from posthog.models.signals import mutable_receiver
 
 
 # This table is responsible for mapping between group types for a Team/Project and event columns
@@ -23,3 +27,8 @@ class GroupTypeMapping(models.Model):
                 name="group_type_index is less than or equal 5",
             ),
         ]
+
+
+@mutable_receiver([post_save, post_delete], sender=GroupTypeMapping)
+def invalidate_hogql_schema_on_group_type_change(sender, instance: GroupTypeMapping, **kwargs):
+    bump_team_schema_version(instance.team_id)
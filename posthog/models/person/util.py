@@ -12,6 +12,7 @@ from django.dispatch import receiver
 from django.utils.timezone import now
 
 from posthog.client import sync_execute
+from posthog.clickhouse.client.result_cache import bump_team_data_watermark
 from posthog.kafka_client.client import ClickhouseProducer
 from posthog.kafka_client.topics import (
     KAFKA_PERSON,
@@ -235,6 +236,7 @@ def delete_person(person: Person, sync: bool = False) -> None:
     _delete_person(person.team_id, person.uuid, int(person.version or 0), person.created_at, sync)
     for distinct_id, version in distinct_ids_to_version.items():
         _delete_ch_distinct_id(person.team_id, person.uuid, distinct_id, version, sync)
+    bump_team_data_watermark(person.team_id)
 
 
 def _delete_person(
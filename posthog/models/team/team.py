@@ -38,6 +38,7 @@ from posthog.settings.utils import get_list
 from posthog.utils import GenericEmails
 
 from ...hogql.modifiers import set_default_modifier_values
+from ...hogql.schema_version import bump_team_schema_version
 from ...schema import HogQLQueryModifiers, PathCleaningFilter, PersonsOnEventsMode
 from .team_caching import get_team_in_cache, set_team_in_cache
 
@@ -517,6 +518,7 @@ class Team(UUIDClassicModel):
 @mutable_receiver(post_save, sender=Team)
 def put_team_in_cache_on_save(sender, instance: Team, **kwargs):
     set_team_in_cache(instance.api_token, instance)
+    bump_team_schema_version(instance.id)
 
 
 @mutable_receiver(post_delete, sender=Team)
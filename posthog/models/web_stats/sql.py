@@ -0,0 +1,122 @@
+from django.conf import settings
+
+from posthog.clickhouse.table_engines import (
+    AggregatingMergeTree,
+    Distributed,
+    ReplicationScheme,
+)
+
+"""
+Rollups of web analytics stats, so that the web analytics queries don't need to scan all events and sessions in the
+date range. They're populated per team by a periodic task, see `posthog/hogql_queries/web_analytics/rollups.py`.
+
+Each row has one of two kinds:
+- pageview rows aggregate pageviews by the hour (or day) they happened in. They have all the dimensions, including
+  the session's entry dimensions.
+- session rows aggregate sessions by the hour (or day) they started in. Only the session dimensions are set, and
+  the metrics are for the whole session, so they answer the overview tiles.
+
+Buckets are in the team's timezone, stored as the UTC time they start at.
+"""
+
+WEB_STATS_HOURLY_TABLE = "web_stats_hourly"
+WEB_STATS_DAILY_TABLE = "web_stats_daily"
+
+WEB_STATS_TABLE_BASE_SQL = """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    team_id Int64,
+    period_start DateTime('UTC'),
+    kind UInt8,
+
+    -- pageview dimensions
+    pathname Nullable(String),
+    browser Nullable(String),
+    os Nullable(String),
+    device_type Nullable(String),
+    country_code Nullable(String),
+
+    -- session dimensions
+    entry_pathname Nullable(String),
+    referring_domain Nullable(String),
+    utm_source Nullable(String),
+    utm_medium Nullable(String),
+    utm_campaign Nullable(String),
+    utm_term Nullable(String),
+    utm_content Nullable(String),
+
+    persons_uniq AggregateFunction(uniq, UUID),
+    sessions_uniq AggregateFunction(uniq, String),
+    pageviews SimpleAggregateFunction(sum, UInt64),
+
+    -- only set on session rows
+    sessions SimpleAggregateFunction(sum, UInt64),
+    bounces SimpleAggregateFunction(sum, UInt64),
+    total_session_duration SimpleAggregateFunction(sum, Float64)
+) ENGINE = {engine}
+"""
+
+WEB_STATS_DATA_TABLE_ENGINE = lambda table_name: AggregatingMergeTree(
+    table_name, replication_scheme=ReplicationScheme.SHARDED
+)
+
+
+def _web_stats_table_sql(table_name: str) -> str:
+    return (
+        WEB_STATS_TABLE_BASE_SQL
+        + """
+PARTITION BY toYYYYMM(period_start)
+ORDER BY (
+    team_id,
+    period_start,
+    kind,
+    pathname,
+    entry_pathname,
+    referring_domain,
+    utm_source,
+    utm_medium,
+    utm_campaign,
+    utm_term,
+    utm_content,
+    browser,
+    os,
+    device_type,
+    country_code
+)
+SETTINGS allow_nullable_key = 1
+"""
+    ).format(
+        table_name=f"sharded_{table_name}",
+        cluster=settings.CLICKHOUSE_CLUSTER,
+        engine=WEB_STATS_DATA_TABLE_ENGINE(table_name),
+    )
+
+
+def _distributed_web_stats_table_sql(table_name: str) -> str:
+    return WEB_STATS_TABLE_BASE_SQL.format(
+        table_name=table_name,
+        cluster=settings.CLICKHOUSE_CLUSTER,
+        # keep each team's rollups on one shard, they're small enough
+        engine=Distributed(data_table=f"sharded_{table_name}", sharding_key="sipHash64(team_id)"),
+    )
+
+
+WEB_STATS_HOURLY_TABLE_SQL = lambda: _web_stats_table_sql(WEB_STATS_HOURLY_TABLE)
+WEB_STATS_DAILY_TABLE_SQL = lambda: _web_stats_table_sql(WEB_STATS_DAILY_TABLE)
+DISTRIBUTED_WEB_STATS_HOURLY_TABLE_SQL = lambda: _distributed_web_stats_table_sql(WEB_STATS_HOURLY_TABLE)
+DISTRIBUTED_WEB_STATS_DAILY_TABLE_SQL = lambda: _distributed_web_stats_table_sql(WEB_STATS_DAILY_TABLE)
+
+TRUNCATE_WEB_STATS_HOURLY_TABLE_SQL = (
+    lambda: f"TRUNCATE TABLE IF EXISTS sharded_{WEB_STATS_HOURLY_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+TRUNCATE_WEB_STATS_DAILY_TABLE_SQL = (
+    lambda: f"TRUNCATE TABLE IF EXISTS sharded_{WEB_STATS_DAILY_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+# The latest bucket with rows of each kind, which is where populating the rollups carries on from
+WEB_STATS_LAST_PERIOD_SQL = """
+SELECT kind, max(period_start)
+FROM {table_name}
+WHERE team_id = %(team_id)s
+GROUP BY kind
+"""
@@ -1,5 +1,7 @@
+from datetime import datetime
 from typing import Any, Optional, Union
 from uuid import UUID
+from zoneinfo import ZoneInfo
 
 from posthog.clickhouse.materialized_columns import ColumnName
 from posthog.constants import PropertyOperatorType
@@ -63,6 +65,8 @@ class PersonQuery:
         # this supports multiple cohort filters, but is not as performant as the above.
         cohort_filters: Optional[list[Property]] = None,
         include_distinct_ids: Optional[bool] = False,
+        # When paginating, only return persons after this (created_at, id), in the order of the paginated query
+        cursor: Optional[tuple[datetime, UUID]] = None,
     ) -> None:
         self._filter = filter
         self._team_id = team_id
@@ -72,6 +76,7 @@ class PersonQuery:
         self._extra_fields = set(extra_fields) if extra_fields else set()
         self._cohort_filters = cohort_filters
         self._include_distinct_ids = include_distinct_ids
+        self._cursor = cursor
 
         if self.PERSON_PROPERTIES_ALIAS in self._extra_fields:
             self._extra_fields = self._extra_fields - {self.PERSON_PROPERTIES_ALIAS} | {"properties"}
@@ -110,9 +115,11 @@ class PersonQuery:
         if paginate:
             order = "ORDER BY argMax(person.created_at, version) DESC, id DESC" if paginate else ""
             limit_offset, limit_params = self._get_limit_offset_clause()
+            cursor_condition, cursor_params = self._get_cursor_clause()
         else:
             order = ""
             limit_offset, limit_params = "", {}
+            cursor_condition, cursor_params = "", {}
         (
             search_prefiltering_condition,
             search_finalization_condition,
@@ -156,7 +163,7 @@ class PersonQuery:
             HAVING max(is_deleted) = 0
             {filter_future_persons_condition} {updated_after_condition}
             {person_filters_finalization_condition} {search_finalization_condition}
-            {distinct_id_condition} {email_condition}
+            {distinct_id_condition} {email_condition} {cursor_condition}
             {order}
             {limit_offset}
             SETTINGS optimize_aggregation_in_order = 1
@@ -166,6 +173,7 @@ class PersonQuery:
                 **person_filters_params,
                 **single_cohort_params,
                 **limit_params,
+                **cursor_params,
                 **search_params,
                 **distinct_id_params,
                 **email_params,
@@ -295,6 +303,18 @@ class PersonQuery:
 
         return clause, params
 
+    def _get_cursor_clause(self) -> tuple[str, dict]:
+        if self._cursor is None:
+            return "", {}
+
+        created_at, person_id = self._cursor
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(ZoneInfo("UTC"))
+        return (
+            "AND (argMax(person.created_at, version), id) < (toDateTime64(%(cursor_created_at)s, 6, 'UTC'), toUUID(%(cursor_id)s))",
+            {"cursor_created_at": created_at.strftime("%Y-%m-%d %H:%M:%S.%f"), "cursor_id": str(person_id)},
+        )
+
     def _get_search_clauses(self, prepend: str = "") -> tuple[str, str, dict]:
         """
         Return - respectively - the prefiltering search clause (not aggregated by is_deleted or version, which is great
@@ -295,6 +295,12 @@ class AISustainedRateThrottle(UserRateThrottle):
     rate = "40/day"
 
 
+class QueryStatusStreamThrottle(UserRateThrottle):
+    # Each open stream holds a web worker, see QueryViewSet.stream
+    scope = "query_status_stream"
+    rate = "30/minute"
+
+
 class HogQLQueryThrottle(PersonalApiKeyRateThrottle):
     # Lower rate limit for HogQL queries
     scope = "query"
@@ -697,6 +697,10 @@ class HogQLQueryModifiers(BaseModel):
     s3TableUseInvalidColumns: Optional[bool] = None
     sessionTableVersion: Optional[SessionTableVersion] = None
     useMaterializedViews: Optional[bool] = None
+    useWebAnalyticsRollups: Optional[bool] = Field(
+        default=None,
+        description="Read web analytics from the rollups, which miss events arriving after they're rolled up",
+    )
 
 
 class HogQLVariable(BaseModel):
@@ -1637,6 +1641,10 @@ class ActorsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Cursor to fetch the next page with, when there are more rows and they are sorted by a unique key",
+    )
     offset: int
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -1712,6 +1720,10 @@ class CachedActorsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Cursor to fetch the next page with, when there are more rows and they are sorted by a unique key",
+    )
     next_allowed_client_refresh: AwareDatetime
     offset: int
     query_status: Optional[QueryStatus] = Field(
@@ -1781,6 +1793,10 @@ class CachedEventsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Cursor to fetch the next page with, when there are more rows and they are sorted by a unique key",
+    )
     next_allowed_client_refresh: AwareDatetime
     offset: Optional[int] = None
     query_status: Optional[QueryStatus] = Field(
@@ -2318,6 +2334,10 @@ class Response(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Cursor to fetch the next page with, when there are more rows and they are sorted by a unique key",
+    )
     offset: Optional[int] = None
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -2345,6 +2365,10 @@ class Response1(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Cursor to fetch the next page with, when there are more rows and they are sorted by a unique key",
+    )
     offset: int
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -2643,6 +2667,10 @@ class EventsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Cursor to fetch the next page with, when there are more rows and they are sorted by a unique key",
+    )
     offset: Optional[int] = None
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -2992,6 +3020,10 @@ class QueryResponseAlternative1(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Cursor to fetch the next page with, when there are more rows and they are sorted by a unique key",
+    )
     offset: Optional[int] = None
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -3019,6 +3051,10 @@ class QueryResponseAlternative2(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Cursor to fetch the next page with, when there are more rows and they are sorted by a unique key",
+    )
     offset: int
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -3274,6 +3310,10 @@ class QueryResponseAlternative18(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Cursor to fetch the next page with, when there are more rows and they are sorted by a unique key",
+    )
     offset: Optional[int] = None
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -3301,6 +3341,10 @@ class QueryResponseAlternative19(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Cursor to fetch the next page with, when there are more rows and they are sorted by a unique key",
+    )
     offset: int
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -5044,6 +5088,10 @@ class EventsQuery(BaseModel):
     actionId: Optional[int] = Field(default=None, description="Show events matching a given action")
     after: Optional[str] = Field(default=None, description="Only fetch events that happened after this timestamp")
     before: Optional[str] = Field(default=None, description="Only fetch events that happened before this timestamp")
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Fetch the rows after this cursor, from the `nextCursor` of the previous page, instead of skipping rows",
+    )
     event: Optional[str] = Field(default=None, description="Limit to events matching this string")
     filterTestAccounts: Optional[bool] = Field(default=None, description="Filter test accounts")
     fixedProperties: Optional[
@@ -5750,6 +5798,10 @@ class ActorsQuery(BaseModel):
     model_config = ConfigDict(
         extra="forbid",
     )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Fetch the rows after this cursor, from the `nextCursor` of the previous page, instead of skipping rows",
+    )
     fixedProperties: Optional[
         list[Union[PersonPropertyFilter, CohortPropertyFilter, HogQLPropertyFilter, EmptyPropertyFilter]]
     ] = Field(
@@ -3,7 +3,6 @@ import os
 import time
 from collections.abc import Generator
 from contextlib import contextmanager
-from datetime import UTC, datetime, timedelta
 from typing import Any, cast
 
 import posthoganalytics
@@ -55,6 +54,12 @@ from posthog.session_recordings.realtime_snapshots import (
     get_realtime_snapshots,
     publish_subscription,
 )
+from posthog.session_recordings.snapshots.sources_manifest import (
+    blob_sources_are_complete,
+    blob_sources_from_keys,
+    get_sources_manifest,
+    save_sources_manifest,
+)
 from posthog.session_recordings.snapshots.convert_legacy_snapshots import (
     convert_original_version_lts_recording,
 )
@@ -547,13 +552,13 @@ class SessionRecordingViewSet(TeamAndOrgViewSetMixin, viewsets.GenericViewSet, U
         newest_timestamp = None
         response_data = {}
         sources: list[dict] = []
-        blob_keys: list[str] | None = None
         blob_prefix = ""
+        is_persisted = False
 
         if recording.object_storage_path:
             if recording.storage_version == "2023-08-01":
                 blob_prefix = recording.object_storage_path
-                blob_keys = object_storage.list_objects(cast(str, blob_prefix))
+                is_persisted = True
             else:
                 # originally LTS files were in a single file
                 # TODO this branch can be deleted after 01-08-2024
@@ -568,30 +573,21 @@ class SessionRecordingViewSet(TeamAndOrgViewSetMixin, viewsets.GenericViewSet, U
                 might_have_realtime = False
         else:
             blob_prefix = recording.build_blob_ingestion_storage_path()
-            blob_keys = object_storage.list_objects(blob_prefix)
 
-        if blob_keys:
-            for full_key in blob_keys:
-                # Keys are like 1619712000-1619712060
-                blob_key = full_key.replace(blob_prefix.rstrip("/") + "/", "")
-                blob_key_base = blob_key.split(".")[0]  # Remove the extension if it exists
-                time_range = [datetime.fromtimestamp(int(x) / 1000, tz=UTC) for x in blob_key_base.split("-")]
+        if blob_prefix:
+            blob_sources = get_sources_manifest(blob_prefix)
+            if blob_sources is None:
+                blob_sources = blob_sources_from_keys(blob_prefix, object_storage.list_objects(blob_prefix) or [])
+                if is_persisted or blob_sources_are_complete(blob_sources):
+                    save_sources_manifest(blob_prefix, blob_sources)
+            sources.extend(blob_sources)
 
-                sources.append(
-                    {
-                        "source": "blob",
-                        "start_timestamp": time_range[0],
-                        "end_timestamp": time_range.pop(),
-                        "blob_key": blob_key,
-                    }
-                )
         if sources:
             sources = sorted(sources, key=lambda x: x["start_timestamp"])
-            oldest_timestamp = min(sources, key=lambda k: k["start_timestamp"])["start_timestamp"]
             newest_timestamp = min(sources, key=lambda k: k["end_timestamp"])["end_timestamp"]
 
             if might_have_realtime:
-                might_have_realtime = oldest_timestamp + timedelta(hours=24) > datetime.now(UTC)
+                might_have_realtime = not blob_sources_are_complete(sources)
         if might_have_realtime:
             sources.append(
                 {
@@ -0,0 +1,67 @@
+"""
+Cache of the blob sources of session recordings, so that starting playback doesn't need to list the recording's
+blobs in object storage every time.
+
+The manifest is keyed by the storage prefix the blobs were listed from, and only saved once no more blobs can land
+under it: after a recording is persisted to long term storage, or once it's too old to still be ingested. Persisting
+a recording moves it to a new prefix, so a manifest never has to be invalidated.
+"""
+
+import hashlib
+from datetime import UTC, datetime, timedelta
+from typing import Optional
+
+from django.core.cache import cache
+from prometheus_client import Counter
+
+SOURCES_MANIFEST_COUNTER = Counter(
+    "session_recording_sources_manifest_lookups_total",
+    "Lookups in the cache of session recording blob sources",
+    labelnames=["result"],
+)
+
+SOURCES_MANIFEST_KEY = "session_recording_sources:{digest}"
+SOURCES_MANIFEST_TTL_SECONDS = 60 * 60 * 24 * 7
+# Recordings are ingested for at most this long after they start
+RECORDING_INGESTION_WINDOW = timedelta(hours=24)
+
+
+def _manifest_key(blob_prefix: str) -> str:
+    return SOURCES_MANIFEST_KEY.format(digest=hashlib.sha256(blob_prefix.encode("utf-8")).hexdigest())
+
+
+def blob_sources_from_keys(blob_prefix: str, blob_keys: list[str]) -> list[dict]:
+    """Converts the keys of a recording's blobs to snapshot sources, sorted by their start time."""
+    sources = []
+    for full_key in blob_keys:
+        # Keys are like 1619712000-1619712060
+        blob_key = full_key.replace(blob_prefix.rstrip("/") + "/", "")
+        blob_key_base = blob_key.split(".")[0]  # Remove the extension if it exists
+        time_range = [datetime.fromtimestamp(int(x) / 1000, tz=UTC) for x in blob_key_base.split("-")]
+
+        sources.append(
+            {
+                "source": "blob",
+                "start_timestamp": time_range[0],
+                "end_timestamp": time_range.pop(),
+                "blob_key": blob_key,
+            }
+        )
+    return sorted(sources, key=lambda x: x["start_timestamp"])
+
+
+def blob_sources_are_complete(sources: list[dict]) -> bool:
+    """Whether the recording of these (sorted) sources is too old for more blobs to be ingested."""
+    return bool(sources) and sources[0]["start_timestamp"] + RECORDING_INGESTION_WINDOW <= datetime.now(UTC)
+
+
+def get_sources_manifest(blob_prefix: str) -> Optional[list[dict]]:
+    sources = cache.get(_manifest_key(blob_prefix))
+    SOURCES_MANIFEST_COUNTER.labels(result="miss" if sources is None else "hit").inc()
+    return sources
+
+
+def save_sources_manifest(blob_prefix: str, sources: list[dict]) -> None:
+    """Saves the sources of a prefix that won't get any more blobs."""
+    if sources:
+        cache.set(_manifest_key(blob_prefix), sources, timeout=SOURCES_MANIFEST_TTL_SECONDS)
@@ -778,6 +778,38 @@ class TestSessionRecordings(APIBaseTest, ClickhouseTestMixin, QueryMatchingTest)
             ]
         }
 
+    @freeze_time("2023-01-01T00:00:00Z")
+    @patch(
+        "posthog.session_recordings.queries.session_replay_events.SessionReplayEvents.exists",
+        return_value=True,
+    )
+    @patch("posthog.session_recordings.session_recording_api.object_storage.list_objects")
+    def test_get_snapshots_v2_only_lists_blobs_again_while_they_can_change(
+        self, mock_list_objects, _mock_exists
+    ) -> None:
+        old_session_id = str(uuid.uuid4())
+        old_timestamp = round((now() - timedelta(hours=26)).timestamp() * 1000)
+        recent_session_id = str(uuid.uuid4())
+        recent_timestamp = round(now().timestamp() * 1000)
+
+        def list_objects_func(path: str) -> list[str]:
+            if old_session_id in path:
+                return [f"{path}/{old_timestamp - 10000}-{old_timestamp}"]
+            return [f"{path}/{recent_timestamp - 10000}-{recent_timestamp}"]
+
+        mock_list_objects.side_effect = list_objects_func
+
+        responses = [
+            self.client.get(f"/api/projects/{self.team.id}/session_recordings/{session_id}/snapshots").json()
+            for session_id in [old_session_id, old_session_id, recent_session_id, recent_session_id]
+        ]
+
+        assert responses[0] == responses[1]
+        assert responses[2] == responses[3]
+        assert [len(response["sources"]) for response in responses] == [1, 1, 2, 2]
+        # the old recording's blobs are only listed once, the recent one can still get more blobs
+        assert mock_list_objects.call_count == 3
+
     @patch(
         "posthog.session_recordings.queries.session_replay_events.SessionReplayEvents.exists",
         return_value=True,
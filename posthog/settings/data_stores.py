@@ -169,6 +169,21 @@ try:
 except Exception:
     CLICKHOUSE_PER_TEAM_SETTINGS = {}
 
+# Cache of query results shared by everything calling `sync_execute(..., cacheable=True)`. One of "redis", "local"
+# (per process) or "" to disable it, which is the default.
+CLICKHOUSE_RESULT_CACHE_BACKEND: str = get_from_env("CLICKHOUSE_RESULT_CACHE_BACKEND", "")
+CLICKHOUSE_RESULT_CACHE_TTL_SECONDS: int = get_from_env("CLICKHOUSE_RESULT_CACHE_TTL_SECONDS", 60 * 10, type_cast=int)
+# Results are considered fresh for this long after the team's data last changed, as ingestion doesn't signal writes
+CLICKHOUSE_RESULT_CACHE_FRESHNESS_SECONDS: int = get_from_env(
+    "CLICKHOUSE_RESULT_CACHE_FRESHNESS_SECONDS", 60, type_cast=int
+)
+CLICKHOUSE_RESULT_CACHE_MAX_ENTRY_BYTES: int = get_from_env(
+    "CLICKHOUSE_RESULT_CACHE_MAX_ENTRY_BYTES", 1024 * 1024, type_cast=int
+)
+CLICKHOUSE_RESULT_CACHE_LOCAL_MAX_BYTES: int = get_from_env(
+    "CLICKHOUSE_RESULT_CACHE_LOCAL_MAX_BYTES", 64 * 1024 * 1024, type_cast=int
+)
+
 _clickhouse_http_protocol = "http://"
 _clickhouse_http_port = "8123"
 if CLICKHOUSE_SECURE:
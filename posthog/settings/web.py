@@ -143,6 +143,8 @@ else:
 
 # Max size of a POST body (for event ingestion)
 DATA_UPLOAD_MAX_MEMORY_SIZE = 20971520  # 20 MB
+# Max size of a compressed POST body once decompressed, checked while decompressing
+MAX_DECOMPRESSED_REQUEST_SIZE = get_from_env("MAX_DECOMPRESSED_REQUEST_SIZE", 200 * 1024 * 1024, type_cast=int)
 
 ROOT_URLCONF = "posthog.urls"
 
@@ -392,3 +394,11 @@ LOGO_DEV_TOKEN = get_from_env("LOGO_DEV_TOKEN", "")
 
 # disables frontend side navigation hooks to make hot-reload work seamlessly
 DEV_DISABLE_NAVIGATION_HOOKS = get_from_env("DEV_DISABLE_NAVIGATION_HOOKS", False, type_cast=bool)
+
+# Teams whose web_stats rollups are populated, see posthog/hogql_queries/web_analytics/rollups.py. Their queries read
+# from the rollups with the useWebAnalyticsRollups modifier.
+WEB_STATS_ROLLUP_TEAM_IDS = get_list(os.getenv("WEB_STATS_ROLLUP_TEAM_IDS", ""))
+# Only hours older than this are rolled up, so that sessions have ended and late events have arrived
+WEB_STATS_ROLLUP_SETTLE_HOURS = get_from_env("WEB_STATS_ROLLUP_SETTLE_HOURS", 25, type_cast=int)
+# How far back to roll up a team's history when it's added
+WEB_STATS_ROLLUP_BACKFILL_DAYS = get_from_env("WEB_STATS_ROLLUP_BACKFILL_DAYS", 90, type_cast=int)
@@ -1,7 +1,9 @@
 import datetime
 import io
+import itertools
+import tempfile
 from typing import Any, Optional
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
 from urllib.parse import parse_qsl, quote, urlencode, urlparse, urlunparse
 
 from pydantic import BaseModel
@@ -12,7 +14,7 @@ from django.http import QueryDict
 from sentry_sdk import capture_exception, push_scope
 from requests.exceptions import HTTPError
 
-from posthog.api.services.query import process_query_dict
+from posthog.api.services.query import process_query_dict, process_query_dict_iter
 from posthog.hogql_queries.query_runner import ExecutionMode
 from posthog.jwt import PosthogJwtAudience, encode_jwt
 from posthog.models.exported_asset import ExportedAsset, save_content
@@ -32,6 +34,8 @@ logger = structlog.get_logger(__name__)
 
 RESULT_LIMIT_KEYS = ("distinct_ids",)
 RESULT_LIMIT_LENGTH = 10
+# Query kinds whose rows are streamed from ClickHouse, rather than loaded in memory all at once
+STREAMED_QUERY_KINDS = ("EventsQuery", "ActorsQuery")
 
 
 # SUPPORTED CSV TYPES
@@ -81,6 +85,22 @@ def add_query_params(url: str, params: dict[str, str]) -> str:
     return urlunparse(parsed)
 
 
+def _convert_row_to_csv_data(row: list | tuple, columns: Optional[list[str]]) -> dict[str, Any]:
+    row_dict = {}
+    for idx, x in enumerate(row):
+        if isinstance(x, dict):
+            for key in filter(lambda y: y in RESULT_LIMIT_KEYS and len(x[y]) > RESULT_LIMIT_LENGTH, x.keys()):
+                total = len(x[key])
+                x[key] = x[key][:RESULT_LIMIT_LENGTH]
+                row_dict[f"{key}.total"] = f"Note: {total} {key} in total"
+
+        if not columns:
+            row_dict[f"column_{idx}"] = x
+        else:
+            row_dict[columns[idx]] = x
+    return row_dict
+
+
 def _convert_response_to_csv_data(data: Any) -> Generator[Any, None, None]:
     if isinstance(data.get("results"), list):
         results = data.get("results")
@@ -88,21 +108,7 @@ def _convert_response_to_csv_data(data: Any) -> Generator[Any, None, None]:
             # e.g. {'columns': ['count()'], 'hasMore': False, 'results': [[1775]], 'types': ['UInt64']}
             # or {'columns': ['count()', 'event'], 'hasMore': False, 'results': [[551, '$feature_flag_called'], [265, '$autocapture']], 'types': ['UInt64', 'String']}
             for row in results:
-                row_dict = {}
-                for idx, x in enumerate(row):
-                    if isinstance(x, dict):
-                        for key in filter(
-                            lambda y: y in RESULT_LIMIT_KEYS and len(x[y]) > RESULT_LIMIT_LENGTH, x.keys()
-                        ):
-                            total = len(x[key])
-                            x[key] = x[key][:RESULT_LIMIT_LENGTH]
-                            row_dict[f"{key}.total"] = f"Note: {total} {key} in total"
-
-                    if not data.get("columns"):
-                        row_dict[f"column_{idx}"] = x
-                    else:
-                        row_dict[data["columns"][idx]] = x
-                yield row_dict
+                yield _convert_row_to_csv_data(row, data.get("columns"))
             return
 
     if isinstance(data.get("results"), list) or isinstance(data.get("results"), dict):
@@ -256,12 +262,45 @@ def get_from_insights_api(exported_asset: ExportedAsset, limit: int, resource: d
         next_url = data.get("next")
 
 
+def _exported_actor_properties(columns: list[str]) -> Optional[set[str]]:
+    """
+    Returns the actor properties that the export columns need, e.g. `email` for `person.properties.email`, or None if
+    all of them are needed.
+    """
+    if not columns:
+        return None
+    properties = set()
+    for column in columns:
+        parts = column.split(".")
+        if parts[0] not in ("person", "group", "actor"):
+            continue
+        if len(parts) == 1 or (parts[1] == "properties" and len(parts) == 2):
+            return None
+        if parts[1] == "properties":
+            # Keys with dots in them are flattened the same way as nested properties
+            properties.add(parts[2])
+            properties.add(".".join(parts[2:]))
+    return properties
+
+
 def get_from_hogql_query(exported_asset: ExportedAsset, limit: int, resource: dict) -> Generator[Any, None, None]:
     query = resource.get("source")
     assert query is not None
 
     while True:
         try:
+            if query.get("kind") in STREAMED_QUERY_KINDS:
+                # These can return lots of rows, so don't load them all in memory
+                columns, rows = process_query_dict_iter(
+                    team=exported_asset.team,
+                    query_json=query,
+                    limit_context=LimitContext.EXPORT,
+                    actor_properties=_exported_actor_properties(resource.get("columns", [])),
+                )
+                for row in rows:
+                    yield _convert_row_to_csv_data(row, columns)
+                return
+
             query_response = process_query_dict(
                 team=exported_asset.team,
                 query_json=query,
@@ -283,18 +322,20 @@ def get_from_hogql_query(exported_asset: ExportedAsset, limit: int, resource: di
         return
 
 
-def _export_to_dict(exported_asset: ExportedAsset, limit: int) -> Any:
+def _get_csv_rows(exported_asset: ExportedAsset, limit: int) -> Generator[Any, None, None]:
     resource = exported_asset.export_context
 
-    columns: list[str] = resource.get("columns", [])
-    returned_rows: Generator[Any, None, None]
-
     if resource.get("source"):
-        returned_rows = get_from_hogql_query(exported_asset, limit, resource)
+        return get_from_hogql_query(exported_asset, limit, resource)
     else:
-        returned_rows = get_from_insights_api(exported_asset, limit, resource)
+        return get_from_insights_api(exported_asset, limit, resource)
+
 
-    all_csv_rows = list(returned_rows)
+def _export_to_dict(exported_asset: ExportedAsset, limit: int) -> Any:
+    resource = exported_asset.export_context
+
+    columns: list[str] = resource.get("columns", [])
+    all_csv_rows = list(_get_csv_rows(exported_asset, limit))
     renderer = OrderedCsvRenderer()
     render_context = {}
     if columns:
@@ -315,10 +356,25 @@ def _export_to_dict(exported_asset: ExportedAsset, limit: int) -> Any:
 
 
 def _export_to_csv(exported_asset: ExportedAsset, limit: int) -> None:
-    renderer, all_csv_rows, render_context = _export_to_dict(exported_asset, limit)
+    # Same output as rendering the rows of `_export_to_dict`, without holding all of them in memory
+    columns: list[str] = exported_asset.export_context.get("columns", [])
+    returned_rows = _get_csv_rows(exported_asset, limit)
+
+    renderer = OrderedCsvRenderer()
+    first_row = next(returned_rows, None)
+    if first_row is None:
+        # If we have no rows, that means we couldn't convert anything, so put something to avoid confusion
+        csv_rows: Iterator[Any] = iter([{"error": "No data available or unable to format for export."}])
+    else:
+        is_any_col_list_or_dict = [x for x in first_row.values() if isinstance(x, dict) or isinstance(x, list)]
+        if not is_any_col_list_or_dict:
+            # If values are serialised then keep the order of the keys, else allow it to be unordered
+            renderer.header = first_row.keys()
+        csv_rows = itertools.chain([first_row], returned_rows)
 
-    rendered_csv_content = renderer.render(all_csv_rows, renderer_context=render_context)
-    save_content(exported_asset, rendered_csv_content)
+    with tempfile.TemporaryFile() as csv_file:
+        renderer.render_spooled(csv_rows, csv_file, header=columns or renderer.header)
+        save_content(exported_asset, csv_file)
 
 
 def _export_to_excel(exported_asset: ExportedAsset, limit: int) -> None:
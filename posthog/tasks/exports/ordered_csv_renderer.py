@@ -1,8 +1,12 @@
 import itertools
+import pickle
+import tempfile
 from collections import OrderedDict
-from typing import Any
-from collections.abc import Generator
+from typing import IO, Any
+from collections.abc import Generator, Iterable
 
+import unicodecsv
+from django.conf import settings
 from more_itertools import unique_everseen
 from rest_framework_csv.renderers import CSVRenderer
 
@@ -28,11 +32,57 @@ class OrderedCsvRenderer(
 
         # Get the set of all unique headers, and sort them.
         unique_fields = list(unique_everseen(itertools.chain(*(item.keys() for item in data))))
+        field_headers = self._field_headers(unique_fields, header)
 
+        # Return your "table", with the headers as the first row.
+        if labels:
+            yield [labels.get(x, x) for x in field_headers]
+        else:
+            yield field_headers
+
+        # Create a row for each dictionary, filling in columns for which the
+        # item has no data with None values.
+        for item in data:
+            yield [item.get(key, None) for key in field_headers]
+
+    def render_spooled(self, data: Iterable[dict], output: IO[bytes], header: Any = None) -> None:
+        """
+        Like `render`, but for rows that don't need to fit in memory. The CSV is written to `output`, e.g. a temporary
+        file, rather than returned.
+        """
+        csv_writer = unicodecsv.writer(output, encoding=settings.DEFAULT_CHARSET, **(self.writer_opts or {}))
+        for row in self.tablize_spooled(data, header=header):
+            csv_writer.writerow(row)
+
+    def tablize_spooled(self, data: Iterable[dict], header: Any = None) -> Generator:
+        """
+        Like `tablize`, but for rows that don't need to fit in memory. The flattened rows are spooled to a temporary
+        file while collecting their fields, and then read back one at a time.
+        """
+        unique_fields: dict[str, None] = {}
+        with tempfile.TemporaryFile() as spool:
+            row_count = 0
+            for item in self.flatten_data(data):
+                unique_fields.update(dict.fromkeys(item.keys()))
+                pickle.dump(item, spool, protocol=pickle.HIGHEST_PROTOCOL)
+                row_count += 1
+
+            if row_count == 0:
+                return
+
+            field_headers = self._field_headers(list(unique_fields), header)
+            yield field_headers
+
+            spool.seek(0)
+            for _ in range(row_count):
+                item = pickle.load(spool)
+                yield [item.get(key, None) for key in field_headers]
+
+    @staticmethod
+    def _field_headers(unique_fields: list[str], header: Any = None) -> list[str]:
         ordered_fields: dict[str, Any] = OrderedDict()
         for item in unique_fields:
-            field = item.split(".")
-            field = field[0]
+            field = item.split(".")[0]
             if field in ordered_fields:
                 ordered_fields[field].append(item)
             else:
@@ -40,24 +90,14 @@ class OrderedCsvRenderer(
 
         flat_ordered_fields = list(itertools.chain(*ordered_fields.values()))
         if not header:
-            field_headers = flat_ordered_fields
-        else:
-            field_headers = header
-            for single_header in field_headers:
-                if single_header in flat_ordered_fields or single_header not in ordered_fields:
-                    continue
+            return flat_ordered_fields
 
-                pos_single_header = field_headers.index(single_header)
-                field_headers.remove(single_header)
-                field_headers[pos_single_header:pos_single_header] = ordered_fields[single_header]
-
-        # Return your "table", with the headers as the first row.
-        if labels:
-            yield [labels.get(x, x) for x in field_headers]
-        else:
-            yield field_headers
+        field_headers = header
+        for single_header in field_headers:
+            if single_header in flat_ordered_fields or single_header not in ordered_fields:
+                continue
 
-        # Create a row for each dictionary, filling in columns for which the
-        # item has no data with None values.
-        for item in data:
-            yield [item.get(key, None) for key in field_headers]
+            pos_single_header = field_headers.index(single_header)
+            field_headers.remove(single_header)
+            field_headers[pos_single_header:pos_single_header] = ordered_fields[single_header]
+        return field_headers
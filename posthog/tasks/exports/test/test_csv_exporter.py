@@ -28,6 +28,7 @@ from posthog.tasks.exports.csv_exporter import (
     UnexpectedEmptyJsonResponse,
     add_query_params,
     _convert_response_to_csv_data,
+    _exported_actor_properties,
 )
 from posthog.hogql.constants import CSV_EXPORT_BREAKDOWN_LIMIT_INITIAL
 from posthog.test.base import APIBaseTest, _create_event, flush_persons_and_events, _create_person
@@ -355,6 +356,39 @@ class TestCSVExporter(APIBaseTest):
             }
             assert expected_bits == actual_bits
 
+    @patch("posthog.models.exported_asset.UUIDT")
+    @patch("posthog.models.exported_asset.object_storage.write")
+    def test_csv_exporter_uploads_streamed_queries_from_a_file(
+        self, mocked_object_storage_write: MagicMock, mocked_uuidt: MagicMock
+    ) -> None:
+        random_uuid = f"RANDOM_TEST_ID::{UUIDT()}"
+        _create_event(event="$pageview", distinct_id=random_uuid, team=self.team)
+        flush_persons_and_events()
+        uploaded: list[bytes] = []
+        mocked_object_storage_write.side_effect = lambda path, content: uploaded.append(content.read())
+        mocked_uuidt.return_value = "a-guid"
+
+        exported_asset = ExportedAsset.objects.create(
+            team=self.team,
+            export_format=ExportedAsset.ExportFormat.CSV,
+            export_context={
+                "source": {"kind": "EventsQuery", "select": ["event"], "where": [f"distinct_id = '{random_uuid}'"]}
+            },
+        )
+        with self.settings(OBJECT_STORAGE_ENABLED=True, OBJECT_STORAGE_EXPORTS_FOLDER="Test-Exports"):
+            csv_exporter.export_tabular(exported_asset)
+
+        assert uploaded == [b"event\r\n$pageview\r\n"]
+
+    def test_exported_actor_properties(self) -> None:
+        assert _exported_actor_properties(
+            ["person.distinct_ids.0", "person.properties.email", "person.properties.$geoip.city", "created_at"]
+        ) == {"email", "$geoip", "$geoip.city"}
+        assert _exported_actor_properties(["created_at"]) == set()
+        assert _exported_actor_properties([]) is None
+        assert _exported_actor_properties(["person.properties.email", "person"]) is None
+        assert _exported_actor_properties(["group.properties"]) is None
+
     @patch("posthog.tasks.exports.csv_exporter.make_api_call")
     def test_raises_expected_error_when_json_is_none(self, patched_api_call) -> None:
         mock_response = Mock()
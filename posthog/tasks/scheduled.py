@@ -54,6 +54,7 @@ from posthog.tasks.tasks import (
     update_survey_iteration,
     verify_persons_data_in_sync,
 )
+from posthog.tasks.web_stats_rollups import schedule_web_stats_rollups
 from posthog.utils import get_crontab
 
 
@@ -102,6 +103,13 @@ def setup_periodic_tasks(sender: Celery, **kwargs: Any) -> None:
         name="schedule warming for largest teams",
     )
 
+    # Roll up the hours that settled since the last run, see posthog/hogql_queries/web_analytics/rollups.py
+    sender.add_periodic_task(
+        crontab(hour="*", minute="15"),
+        schedule_web_stats_rollups.s(),
+        name="populate web analytics rollups",
+    )
+
     # Update events table partitions twice a week
     sender.add_periodic_task(
         crontab(day_of_week="mon,fri", hour="0", minute="0"),
@@ -0,0 +1,34 @@
+import structlog
+from celery import shared_task
+from django.conf import settings
+
+from posthog.clickhouse.query_tagging import tag_queries
+from posthog.errors import CHQueryErrorTooManySimultaneousQueries
+from posthog.tasks.utils import CeleryQueue
+
+logger = structlog.get_logger(__name__)
+
+
+@shared_task(ignore_result=True, expires=60 * 50)
+def schedule_web_stats_rollups() -> None:
+    for team_id in settings.WEB_STATS_ROLLUP_TEAM_IDS:
+        populate_web_stats_rollups_for_team.delay(int(team_id))
+
+
+@shared_task(
+    queue=CeleryQueue.LONG_RUNNING.value,
+    ignore_result=True,
+    expires=60 * 50,
+    autoretry_for=(CHQueryErrorTooManySimultaneousQueries,),
+    retry_backoff=1,
+    retry_backoff_max=10,
+    max_retries=3,
+)
+def populate_web_stats_rollups_for_team(team_id: int) -> None:
+    from posthog.hogql_queries.web_analytics.rollups import populate_web_stats_rollups
+    from posthog.models import Team
+
+    team = Team.objects.get(pk=team_id)
+    tag_queries(team_id=team_id, trigger="web_stats_rollups")
+    populate_web_stats_rollups(team)
+    logger.info("web_stats_rollups_populated", team_id=team_id)
@@ -1,8 +1,10 @@
+import json
 from datetime import timedelta
 from time import sleep
 from typing import Optional
 from unittest.mock import Mock
 
+from posthog import cache_utils
 from posthog.cache_utils import cache_for
 from posthog.test.base import APIBaseTest
 
@@ -17,6 +19,21 @@ def fn(number: Optional[int] = None) -> int:
     return mocked_dependency(number)
 
 
+@cache_for(timedelta(seconds=10), max_size=2)
+def fn_bounded(number: int) -> int:
+    return mocked_dependency(number)
+
+
+@cache_for(timedelta(seconds=10), invalidate_across_workers=True)
+def fn_shared(number: int, other: int = 0) -> int:
+    return mocked_dependency(number)
+
+
+@cache_for(timedelta(milliseconds=100), background_refresh=True, stale_time=timedelta(milliseconds=200))
+def fn_stale_for_a_while() -> int:
+    return mocked_dependency()
+
+
 @cache_for(timedelta(milliseconds=200), background_refresh=True)
 def fn_background(number: float) -> int:
     order_of_events("Background task started")
@@ -32,7 +49,11 @@ class TestCacheUtils(APIBaseTest):
     def setUp(self):
         mocked_dependency.reset_mock()
         mocked_dependency.return_value = 1
+        mocked_dependency.side_effect = None
         order_of_events.reset_mock()
+        fn_bounded.invalidate_all()
+        fn_stale_for_a_while.invalidate_all()
+        fn_shared.invalidate_all()
 
     def test_cache_for_with_different_passed_arguments_styles_when_skipping_cache(self) -> None:
         assert 1 == fn(use_cache=False)
@@ -93,3 +114,71 @@ class TestCacheUtils(APIBaseTest):
             "Background task finished",
             "Post refresh call 1",
         ]
+
+    def test_cache_for_evicts_least_recently_used_entries_over_max_size(self) -> None:
+        fn_bounded(1, use_cache=True)
+        fn_bounded(2, use_cache=True)
+        fn_bounded(1, use_cache=True)
+        fn_bounded(3, use_cache=True)  # evicts 2, which was used least recently
+        assert len(fn_bounded.cache) == 2
+        assert mocked_dependency.call_count == 3
+
+        fn_bounded(1, use_cache=True)
+        assert mocked_dependency.call_count == 3
+        fn_bounded(2, use_cache=True)
+        assert mocked_dependency.call_count == 4
+
+    def test_cache_for_invalidate(self) -> None:
+        fn_bounded(1, use_cache=True)
+        fn_bounded(2, use_cache=True)
+
+        fn_bounded.invalidate(1)
+        fn_bounded(1, use_cache=True)
+        fn_bounded(2, use_cache=True)
+        assert mocked_dependency.call_count == 3
+
+        fn_bounded.invalidate_all()
+        assert len(fn_bounded.cache) == 0
+
+    def test_cache_for_doesnt_cache_values_invalidated_while_calculating(self) -> None:
+        def invalidate_while_calculating(number):
+            fn_bounded.invalidate(number)
+            return 1
+
+        mocked_dependency.side_effect = invalidate_while_calculating
+        fn_bounded(1, use_cache=True)
+        assert len(fn_bounded.cache) == 0
+
+        mocked_dependency.side_effect = None
+        fn_bounded(1, use_cache=True)
+        fn_bounded(1, use_cache=True)
+        assert mocked_dependency.call_count == 2
+
+    def test_cache_for_applies_invalidations_from_other_processes_whatever_the_order_of_kwargs(self) -> None:
+        fn_shared(number=1, other=2, use_cache=True)
+        fn_shared(number=2, other=2, use_cache=True)
+
+        cache_utils._apply_invalidation(
+            json.dumps(
+                {"name": fn_shared.cache.name, "key": repr(((), [("number", 1), ("other", 2)])), "process": "other"}
+            ).encode()
+        )
+        assert len(fn_shared.cache) == 1
+        fn_shared(other=2, number=1, use_cache=True)
+        assert mocked_dependency.call_count == 3
+
+    def test_cache_for_ignores_its_own_invalidations(self) -> None:
+        fn_shared(1, use_cache=True)
+
+        cache_utils._apply_invalidation(
+            json.dumps({"name": fn_shared.cache.name, "key": None, "process": cache_utils._process_id}).encode()
+        )
+        assert len(fn_shared.cache) == 1
+
+    def test_background_refresh_recomputes_synchronously_after_stale_time(self) -> None:
+        assert 1 == fn_stale_for_a_while(use_cache=True)
+
+        mocked_dependency.return_value = 2
+        sleep(0.4)  # past both the cache time and the stale time
+        assert 2 == fn_stale_for_a_while(use_cache=True)
+        assert mocked_dependency.call_count == 2
@@ -13,6 +13,7 @@ import pytest
 from posthog.api.test.test_feature_flag import QueryTimeoutWrapper
 from posthog.models import Cohort, FeatureFlag, GroupTypeMapping, Person
 from posthog.models.feature_flag import get_feature_flags_for_team_in_cache
+from posthog.models.feature_flag.compiled_flags import get_compiled_feature_flags_for_team
 from posthog.models.feature_flag.flag_matching import (
     FeatureFlagHashKeyOverride,
     FeatureFlagMatch,
@@ -745,6 +746,34 @@ class TestModelCache(BaseTest):
         assert cached_flags is not None
         self.assertEqual(0, len(cached_flags))
 
+    def test_compiled_flags_are_reused_until_flags_change(self):
+        FeatureFlag.objects.create(
+            team=self.team,
+            key="beta-feature",
+            created_by=self.user,
+            filters={"groups": [{"properties": [], "rollout_percentage": None}]},
+        )
+
+        compiled_flags = get_compiled_feature_flags_for_team(self.team.pk)
+        assert compiled_flags is not None
+        self.assertEqual(["beta-feature"], [flag.key for flag in compiled_flags.flags])
+        self.assertIs(compiled_flags, get_compiled_feature_flags_for_team(self.team.pk))
+
+        FeatureFlag.objects.create(
+            team=self.team,
+            key="other-feature",
+            created_by=self.user,
+            filters={"groups": [{"properties": [], "rollout_percentage": 50}]},
+        )
+
+        recompiled_flags = get_compiled_feature_flags_for_team(self.team.pk)
+        assert recompiled_flags is not None
+        self.assertIsNot(compiled_flags, recompiled_flags)
+        self.assertEqual({"beta-feature", "other-feature"}, {flag.key for flag in recompiled_flags.flags})
+
+        cache.clear()
+        self.assertIsNone(get_compiled_feature_flags_for_team(self.team.pk))
+
 
 class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
     maxDiff = None
@@ -1043,7 +1072,7 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
             },
         )
 
-        with snapshot_postgres_queries_context(self), self.assertNumQueries(5):
+        with snapshot_postgres_queries_context(self), self.assertNumQueries(4):
             self.assertEqual(
                 self.match_flag(feature_flag, "307"),
                 FeatureFlagMatch(False, None, FeatureFlagMatchReason.NO_CONDITION_MATCH, 0),
@@ -1072,7 +1101,7 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
         )
 
         # test with a flag where the property is a number
-        with snapshot_postgres_queries_context(self), self.assertNumQueries(5):
+        with snapshot_postgres_queries_context(self), self.assertNumQueries(4):
             self.assertEqual(
                 self.match_flag(feature_flag2, "307"),
                 FeatureFlagMatch(False, None, FeatureFlagMatchReason.NO_CONDITION_MATCH, 3),
@@ -1551,7 +1580,7 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
             FeatureFlagMatch(True, None, FeatureFlagMatchReason.CONDITION_MATCH, 1),
         )
 
-        with snapshot_postgres_queries_context(self), self.assertNumQueries(5):
+        with snapshot_postgres_queries_context(self), self.assertNumQueries(4):
             self.assertEqual(
                 self.match_flag(feature_flag2, "307"),
                 FeatureFlagMatch(False, None, FeatureFlagMatchReason.NO_CONDITION_MATCH, 8),
@@ -2843,9 +2872,9 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
         )
 
         with (
-            self.assertNumQueries(10),
+            self.assertNumQueries(8),
             snapshot_postgres_queries_context(self),
-        ):  # 1 to fill group cache, 2 to match feature flags with group properties (of each type), 1 to match feature flags with person properties
+        ):  # 1 to fill group cache, 1 to match feature flags with person and group properties
             matches, reasons, payloads, _ = FeatureFlagMatcher(
                 [
                     feature_flag_one,
@@ -2919,9 +2948,9 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
         self.assertEqual(payloads, {"variant": {"color": "blue"}})
 
         with (
-            self.assertNumQueries(9),
+            self.assertNumQueries(8),
             snapshot_postgres_queries_context(self),
-        ):  # 1 to fill group cache, 1 to match feature flags with group properties (only 1 group provided), 1 to match feature flags with person properties
+        ):  # 1 to fill group cache, 1 to match feature flags with person and group properties
             matches, reasons, payloads, _ = FeatureFlagMatcher(
                 [
                     feature_flag_one,
@@ -3343,7 +3372,7 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
         feature_flag = self.create_feature_flag(
             filters={"groups": [{"properties": [{"key": "email", "operator": "is_not_set"}]}]}
         )
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             self.assertEqual(
                 FeatureFlagMatcher([feature_flag], "example_id", property_value_overrides={}).get_match(feature_flag),
                 FeatureFlagMatch(False, None, FeatureFlagMatchReason.NO_CONDITION_MATCH, 0),
@@ -3358,7 +3387,7 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
                 FeatureFlagMatch(False, None, FeatureFlagMatchReason.NO_CONDITION_MATCH, 0),
             )
 
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             self.assertEqual(
                 FeatureFlagMatcher([feature_flag], "random_id").get_match(feature_flag),
                 FeatureFlagMatch(True, None, FeatureFlagMatchReason.CONDITION_MATCH, 0),
@@ -3379,7 +3408,7 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
         )
 
         # one extra query to check existence
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             self.assertEqual(
                 FeatureFlagMatcher([feature_flag], "not-seen-person").get_match(feature_flag),
                 FeatureFlagMatch(True, None, FeatureFlagMatchReason.CONDITION_MATCH, 0),
@@ -3407,7 +3436,7 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
         )
 
         # one extra query to check existence
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             self.assertEqual(
                 FeatureFlagMatcher([feature_flag], "not-seen-person").get_match(feature_flag),
                 FeatureFlagMatch(True, None, FeatureFlagMatchReason.CONDITION_MATCH, 0),
@@ -3531,7 +3560,7 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
         )
 
         # 1 extra query to get existence clause
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             self.assertEqual(
                 FeatureFlagMatcher([feature_flag1], "not-seen-person").get_match(feature_flag1),
                 FeatureFlagMatch(True, None, FeatureFlagMatchReason.CONDITION_MATCH, 0),
@@ -3559,7 +3588,7 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
 
         # now dealing with existing person
         # one extra query to check existence
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             self.assertEqual(
                 FeatureFlagMatcher([feature_flag1], "another_id").get_match(feature_flag1),
                 FeatureFlagMatch(True, None, FeatureFlagMatchReason.CONDITION_MATCH, 1),
@@ -3576,7 +3605,7 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
             )
 
         # without email, person exists though, should thus return True
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             self.assertEqual(
                 FeatureFlagMatcher([feature_flag1], "another_id_without_email").get_match(feature_flag1),
                 FeatureFlagMatch(True, None, FeatureFlagMatchReason.CONDITION_MATCH, 0),
@@ -3670,19 +3699,19 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
             },
         )
 
-        # one extra query for existence clause
-        with self.assertNumQueries(9):
+        # the existence clause is fetched in the same query
+        with self.assertNumQueries(8):
             self.assertEqual(
                 FeatureFlagMatcher([feature_flag], "", {"organization": "target_group"}).get_match(feature_flag),
                 FeatureFlagMatch(True, None, FeatureFlagMatchReason.CONDITION_MATCH, 0),
             )
 
-        with self.assertNumQueries(9):
+        with self.assertNumQueries(8):
             self.assertEqual(
                 FeatureFlagMatcher([feature_flag], "", {"organization": "foo"}).get_match(feature_flag),
                 FeatureFlagMatch(False, None, FeatureFlagMatchReason.NO_CONDITION_MATCH, 0),
             )
-        with self.assertNumQueries(9):
+        with self.assertNumQueries(8):
             self.assertEqual(
                 FeatureFlagMatcher([feature_flag], "", {"organization": "unknown-new-org"}).get_match(feature_flag),
                 FeatureFlagMatch(True, None, FeatureFlagMatchReason.CONDITION_MATCH, 0),
@@ -3710,10 +3739,10 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
                 FeatureFlagMatch(False, None, FeatureFlagMatchReason.NO_CONDITION_MATCH, 0),
             )
 
-        # now queries with additional flags - check if existence queries are made for different group types / persons
+        # now queries with additional flags - existence checks for other group types / persons are part of the same query
 
-        # no extra query for second group type because groups not passed in
-        with self.assertNumQueries(9):
+        # no extra subquery for second group type because groups not passed in
+        with self.assertNumQueries(8):
             self.assertEqual(
                 FeatureFlagMatcher(
                     [feature_flag, feature_flag_different_group], "", {"organization": "target_group"}
@@ -3721,17 +3750,16 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
                 FeatureFlagMatch(True, None, FeatureFlagMatchReason.CONDITION_MATCH, 0),
             )
 
-        # no extra query for second group type because unknown group not passed in
-        with self.assertNumQueries(9):
+        # no extra subquery for second group type because unknown group not passed in
+        with self.assertNumQueries(8):
             self.assertEqual(
                 FeatureFlagMatcher(
                     [feature_flag, feature_flag_unknown_group_type], "", {"organization": "target_group"}
                 ).get_match(feature_flag),
                 FeatureFlagMatch(True, None, FeatureFlagMatchReason.CONDITION_MATCH, 0),
             )
-        # one extra query to query group
-        # second extra query to check existence
-        with self.assertNumQueries(11):
+        # the second group and its existence check are one more subquery of the same query
+        with self.assertNumQueries(8):
             self.assertEqual(
                 FeatureFlagMatcher(
                     [feature_flag, feature_flag_different_group],
@@ -3741,9 +3769,8 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
                 FeatureFlagMatch(True, None, FeatureFlagMatchReason.CONDITION_MATCH, 0),
             )
 
-        # override means one less query to fetch group property values
-        # TODO: We still make a query for existence check, but this is unnecessary. Consider optimising.
-        with self.assertNumQueries(10):
+        # override means no property values to fetch for the second group, but its existence is still checked
+        with self.assertNumQueries(8):
             matcher = FeatureFlagMatcher(
                 [feature_flag, feature_flag_different_group],
                 "",
@@ -3759,8 +3786,8 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
                 FeatureFlagMatch(False, None, FeatureFlagMatchReason.NO_CONDITION_MATCH, 0),
             )
 
-        # 9 queries same as before for groups, 1 extra for person existence check, 1 extra for person query
-        with self.assertNumQueries(11):
+        # person conditions and existence check are one more subquery of the same query
+        with self.assertNumQueries(8):
             self.assertEqual(
                 FeatureFlagMatcher(
                     [feature_flag, feature_flag_with_person_is_not_set], "random_id", {"organization": "target_group"}
@@ -3768,9 +3795,8 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
                 FeatureFlagMatch(True, None, FeatureFlagMatchReason.CONDITION_MATCH, 0),
             )
 
-        # 9 queries same as before for groups, 1 extra for person existence check, no person query because overrides
-        # TODO: We still make a query for existence check, but this is unnecessary. Consider optimising.
-        with self.assertNumQueries(10):
+        # person existence is still checked, in the same query, even though properties are overridden
+        with self.assertNumQueries(8):
             self.assertEqual(
                 FeatureFlagMatcher(
                     [feature_flag, feature_flag_with_person_is_not_set],
@@ -3782,7 +3808,7 @@ class TestFeatureFlagMatcher(BaseTest, QueryMatchingTest):
             )
 
         # no existence check for person because flag has not is_not_set condition
-        with self.assertNumQueries(10):
+        with self.assertNumQueries(8):
             self.assertEqual(
                 FeatureFlagMatcher(
                     [feature_flag, feature_flag_with_no_person_is_not_set],
@@ -1,10 +1,12 @@
 import base64
+import gzip
 from datetime import datetime
 import json
 from unittest.mock import call, patch
 from zoneinfo import ZoneInfo
 
 import pytest
+from django.core.exceptions import RequestDataTooBig
 from django.core.handlers.wsgi import WSGIRequest
 from django.http import HttpRequest
 from django.test import TestCase
@@ -396,14 +398,14 @@ class TestLoadDataFromRequest(TestCase):
             str(ctx.exception),
         )
 
-    @patch("posthog.utils.gzip")
-    def test_can_decompress_gzipped_body_received_with_no_compression_flag(self, patched_gzip):
+    @patch("posthog.utils.gunzip")
+    def test_can_decompress_gzipped_body_received_with_no_compression_flag(self, patched_gunzip):
         # see https://sentry.io/organizations/posthog2/issues/3136510367
         # one organization is causing a request parsing error by sending an encoded body
         # but the empty string for the compression value
         # this accounts for a large majority of our Sentry errors
 
-        patched_gzip.decompress.return_value = '{"what is it": "the decompressed value"}'
+        patched_gunzip.return_value = '{"what is it": "the decompressed value"}'
 
         rf = RequestFactory()
         # a request with no compression set
@@ -412,6 +414,25 @@ class TestLoadDataFromRequest(TestCase):
         data = load_data_from_request(post_request)
         self.assertEqual({"what is it": "the decompressed value"}, data)
 
+    def test_rejects_gzipped_body_that_decompresses_to_more_than_the_limit(self):
+        rf = RequestFactory()
+        body = gzip.compress(json.dumps([{"event": "x" * 1000}] * 100).encode("utf-8"))
+        post_request = rf.post("/batch/?compression=gzip", body, "text/plain")
+
+        with self.settings(MAX_DECOMPRESSED_REQUEST_SIZE=10_000):
+            with self.assertRaises(RequestDataTooBig):
+                load_data_from_request(post_request)
+
+        with self.settings(MAX_DECOMPRESSED_REQUEST_SIZE=1_000_000):
+            self.assertEqual(100, len(load_data_from_request(post_request)))
+
+    def test_decompresses_concatenated_gzip_members(self):
+        rf = RequestFactory()
+        body = gzip.compress(b'[{"event": "a"},') + gzip.compress(b'{"event": "b"}]')
+        post_request = rf.post("/batch/?compression=gzip", body, "text/plain")
+
+        self.assertEqual([{"event": "a"}, {"event": "b"}], load_data_from_request(post_request))
+
 
 class TestShouldRefresh(TestCase):
     def test_refresh_requested_by_client_with_refresh_true(self):
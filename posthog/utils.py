@@ -3,8 +3,8 @@ import base64
 import dataclasses
 import datetime
 import datetime as dt
-import gzip
 import hashlib
+import itertools
 import json
 import os
 import re
@@ -13,11 +13,11 @@ import string
 import time
 import uuid
 import zlib
-from collections.abc import Generator, Mapping
+from collections.abc import Generator, Iterable, Mapping
 from enum import Enum
 from functools import lru_cache, wraps
 from operator import itemgetter
-from typing import TYPE_CHECKING, Any, Optional, Union, cast
+from typing import TYPE_CHECKING, Any, Optional, TypeVar, Union, cast
 from urllib.parse import unquote, urljoin, urlparse
 from zoneinfo import ZoneInfo
 from rest_framework import serializers
@@ -33,6 +33,7 @@ from dateutil import parser
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.core.cache import cache
+from django.core.exceptions import RequestDataTooBig
 from django.db.utils import DatabaseError
 from django.http import HttpRequest, HttpResponse
 from django.template.loader import get_template
@@ -72,6 +73,8 @@ DEFAULT_DATE_FROM_DAYS = 7
 
 logger = structlog.get_logger(__name__)
 
+T = TypeVar("T")
+
 # https://stackoverflow.com/questions/4060221/how-to-reliably-open-a-file-in-the-same-directory-as-a-python-script
 __location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
 
@@ -606,6 +609,9 @@ def get_celery_heartbeat() -> Union[str, int]:
     return "offline"
 
 
+DECOMPRESSION_CHUNK_SIZE = 64 * 1024
+
+
 def base64_decode(data):
     """
     Decodes base64 bytes into string taking into account necessary transformations to match client libraries.
@@ -631,6 +637,44 @@ def base64_decode(data):
     return decoded.decode("utf-8", "surrogatepass")
 
 
+def gunzip(data: bytes, max_size: int) -> bytes:
+    """
+    Like `gzip.decompress`, but inflates the data a chunk at a time, raising `RequestDataTooBig` as soon as the output
+    goes over `max_size` bytes, so that a small body can't be used to make us allocate an arbitrarily large one.
+    """
+    output = bytearray()
+    view = memoryview(data)
+    offset = 0
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    while offset < len(view):
+        chunk = view[offset : offset + DECOMPRESSION_CHUNK_SIZE]
+        offset += len(chunk)
+        # Asking for one byte more than is allowed is enough to tell that the data is too big
+        output += decompressor.decompress(chunk, max_size + 1 - len(output))
+        if len(output) > max_size:
+            raise RequestDataTooBig(f"Decompressed request body is larger than {max_size} bytes.")
+
+        if decompressor.eof:
+            # The data can be several concatenated gzip members
+            remaining = decompressor.unused_data + view[offset:]
+            if not remaining.strip(b"\x00"):
+                break
+            view = memoryview(remaining)
+            offset = 0
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    if not decompressor.eof:
+        raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+    return bytes(output)
+
+
+def _looks_like_json(data: Any) -> bool:
+    if isinstance(data, str):
+        data = data[:1024].encode("utf-8", "surrogatepass")
+    start = data[:1024].lstrip()
+    return start.startswith((b"{", b"["))
+
+
 def decompress(data: Any, compression: str):
     if not data:
         return None
@@ -642,7 +686,7 @@ def decompress(data: Any, compression: str):
             )
 
         try:
-            data = gzip.decompress(data)
+            data = gunzip(data, settings.MAX_DECOMPRESSED_REQUEST_SIZE)
         except (EOFError, OSError, zlib.error) as error:
             raise RequestParsingError("Failed to decompress data. {}".format(str(error)))
 
@@ -659,13 +703,15 @@ def decompress(data: Any, compression: str):
 
         data = data.encode("utf-16", "surrogatepass").decode("utf-16")
 
-    # Attempt base64 decoding after decompression
-    try:
-        base64_decoded = base64_decode(data)
-        KLUDGES_COUNTER.labels(kludge=f"base64_after_decompression_{compression}").inc()
-        data = base64_decoded
-    except Exception:
-        pass
+    # Attempt base64 decoding after decompression, unless it's clearly JSON already, as failing to decode
+    # makes several copies of the whole payload
+    if not _looks_like_json(data):
+        try:
+            base64_decoded = base64_decode(data)
+            KLUDGES_COUNTER.labels(kludge=f"base64_after_decompression_{compression}").inc()
+            data = base64_decoded
+        except Exception:
+            pass
 
     try:
         # Use custom parse_constant to handle NaN, Infinity, etc.
@@ -677,6 +723,8 @@ def decompress(data: Any, compression: str):
                 fallback = decompress(data, "gzip")
                 KLUDGES_COUNTER.labels(kludge="unspecified_gzip_fallback").inc()
                 return fallback
+            except RequestDataTooBig:
+                raise
             except Exception:
                 # Increment a separate counter for JSON parsing failures after all decompression attempts
                 # We do this because we're no longer tracking these fallbacks in Sentry (since they're not actionable defects),
@@ -1429,3 +1477,10 @@ def get_from_dict_or_attr(obj: Any, key: str):
         return getattr(obj, key, None)
     else:
         raise AttributeError(f"Object {obj} has no key {key}")
+
+
+def chunked(iterable: Iterable[T], size: int) -> Generator[list[T], None, None]:
+    """Splits an iterable into lists of `size` items (the last one may be shorter), consuming it lazily."""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
@@ -3,11 +3,14 @@ from typing import Any, Optional, Union
 
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 from django.conf import settings
 
 from posthog.hogql import ast
 from posthog.hogql.database.database import Database
 from posthog.hogql.database.models import FieldOrTable, SavedQuery
+from posthog.hogql.schema_version import bump_team_schema_version
+from posthog.models.signals import mutable_receiver
 from posthog.models.team import Team
 from posthog.models.utils import CreatedMetaFields, DeletedMetaFields, UUIDModel
 from posthog.schema import HogQLQueryModifiers
@@ -212,3 +215,8 @@ def asave_saved_query(saved_query: DataWarehouseSavedQuery) -> None:
 @database_sync_to_async
 def aget_table_by_saved_query_id(saved_query_id: str, team_id: int):
     return DataWarehouseSavedQuery.objects.get(id=saved_query_id, team_id=team_id).table
+
+
+@mutable_receiver([post_save, post_delete], sender=DataWarehouseSavedQuery)
+def invalidate_hogql_schema_on_saved_query_change(sender, instance: DataWarehouseSavedQuery, **kwargs):
+    bump_team_schema_version(instance.team_id)
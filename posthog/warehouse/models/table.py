@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional, TypeAlias
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 
 from posthog.client import sync_execute
 from posthog.errors import wrap_query_error
@@ -9,6 +10,8 @@ from posthog.hogql.database.models import (
     FieldOrTable,
 )
 from posthog.hogql.database.s3_table import S3Table, build_function_call
+from posthog.hogql.schema_version import bump_team_schema_version
+from posthog.models.signals import mutable_receiver
 from posthog.models.team import Team
 from posthog.models.utils import (
     CreatedMetaFields,
@@ -296,3 +299,8 @@ def acreate_datawarehousetable(**kwargs):
 @database_sync_to_async
 def asave_datawarehousetable(table: DataWarehouseTable) -> None:
     table.save()
+
+
+@mutable_receiver([post_save, post_delete], sender=DataWarehouseTable)
+def invalidate_hogql_schema_on_table_change(sender, instance: DataWarehouseTable, **kwargs):
+    bump_team_schema_version(instance.team_id)